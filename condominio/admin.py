@@ -4,7 +4,8 @@ from .models import (
     Servicio, Paquete, PaqueteServicio, CampaniaServicio, Pago, Reprogramacion,
     Ticket, TicketMessage, Notificacion, Bitacora, ComprobantePago,
     ReglaReprogramacion, HistorialReprogramacion,
-    ConfiguracionGlobalReprogramacion, FCMDevice, CampanaNotificacion
+    ConfiguracionGlobalReprogramacion, FCMDevice, CampanaNotificacion, TasaCambio,
+    SuscripcionReporte, Departamento, Ciudad
 )
 
 # =====================================================
@@ -98,3 +99,32 @@ class BitacoraAdmin(admin.ModelAdmin):
     search_fields = ['usuario__nombre', 'accion', 'descripcion']
     readonly_fields = ['created_at']
     date_hierarchy = 'created_at'
+
+
+@admin.register(TasaCambio)
+class TasaCambioAdmin(admin.ModelAdmin):
+    list_display = ['fecha', 'bob_por_usd', 'fuente', 'creado']
+    search_fields = ['fuente']
+    date_hierarchy = 'fecha'
+
+
+class CiudadInline(admin.TabularInline):
+    model = Ciudad
+    extra = 0
+    fields = ['nombre', 'clave']
+
+
+@admin.register(Departamento)
+class DepartamentoAdmin(admin.ModelAdmin):
+    """Tras corregir nombres o agregar lugares: manage.py normalizar_ubicaciones --todo."""
+    list_display = ['nombre', 'clave']
+    search_fields = ['nombre', 'clave']
+    inlines = [CiudadInline]
+
+
+@admin.register(SuscripcionReporte)
+class SuscripcionReporteAdmin(admin.ModelAdmin):
+    list_display = ['usuario', 'tipo_reporte', 'formato', 'programacion', 'activa', 'proxima_ejecucion', 'ultima_ejecucion']
+    list_filter = ['tipo_reporte', 'formato', 'activa']
+    search_fields = ['usuario__nombre']
+    readonly_fields = ['proxima_ejecucion', 'ultima_ejecucion', 'ultimo_reporte', 'ultimo_error']
@@ -5,6 +5,7 @@ from django.utils import timezone
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from django_filters.rest_framework import DjangoFilterBackend
 from condominio.pagination import ReservaPagination
+from condominio.presupuestos_consulta import presupuesto_consultas
 
 def get_user_perfil(user):
     """Safely get perfil from user object"""
@@ -114,7 +115,7 @@ class AuditedModelViewSet(viewsets.ModelViewSet):
 from .models import (
     Categoria, Proveedor, Servicio, Suscripcion, Usuario, Campania, Paquete, PaqueteServicio, Cupon, Reserva, Visitante,
     ReservaVisitante, CampaniaServicio, Pago, ReglaReprogramacion, 
-    HistorialReprogramacion, ConfiguracionGlobalReprogramacion, Reprogramacion, Plan
+    HistorialReprogramacion, ConfiguracionGlobalReprogramacion, Reprogramacion, Plan, Departamento
 )
 from .serializer import (
     CategoriaSerializer, ServicioSerializer, UsuarioSerializer, CampaniaSerializer,
@@ -122,7 +123,7 @@ from .serializer import (
     CampaniaServicioSerializer, PagoSerializer, ReglaReprogramacionSerializer,
     HistorialReprogramacionSerializer, ConfiguracionGlobalReprogramacionSerializer,
     ReprogramacionSerializer, PaqueteCompletoSerializer, PaqueteSerializer, PerfilUsuarioSerializer,
-    SoporteResumenSerializer, SuscripcionSerializer, ProveedorSerializer,PlanSerializer
+    SoporteResumenSerializer, SuscripcionSerializer, ProveedorSerializer,PlanSerializer, DepartamentoSerializer
 )
 from .serializer import TicketSerializer, TicketDetailSerializer, TicketMessageSerializer, NotificacionSerializer
 from .serializer import BitacoraSerializer
@@ -143,6 +144,16 @@ class CategoriaViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.AllowAny]
 
 
+# =====================================================
+# 📍 UBICACIÓN (departamentos y ciudades canónicos)
+# =====================================================
+class DepartamentoViewSet(viewsets.ReadOnlyModelViewSet):
+    """Departamentos con sus ciudades; sus ids son los filtros departamento_canonico / ciudad_canonica."""
+    queryset = Departamento.objects.prefetch_related('ciudades')
+    serializer_class = DepartamentoSerializer
+    permission_classes = [permissions.AllowAny]
+
+
 # =====================================================
 # 🧍 USUARIO
 # =====================================================
@@ -514,7 +525,7 @@ class PaqueteViewSet(viewsets.ModelViewSet):
     serializer_class = PaqueteSerializer
     permission_classes = [permissions.AllowAny]
     filter_backends = [filters.SearchFilter, DjangoFilterBackend]
-    filterset_fields = ['id','proveedor', 'estado', 'servicios']
+    filterset_fields = ['id','proveedor', 'estado', 'servicios', 'departamento_canonico', 'ciudad_canonica']
 
 # =====================================================
 # 🎟️ CUPON
@@ -535,7 +546,7 @@ class ServicioViewSet(viewsets.ModelViewSet):
     serializer_class = ServicioSerializer
     permission_classes = [permissions.AllowAny]
     filter_backends = [filters.SearchFilter, DjangoFilterBackend]
-    filterset_fields = ['id', 'proveedor', 'estado']
+    filterset_fields = ['id', 'proveedor', 'estado', 'departamento_canonico', 'ciudad_canonica']
 
 
 
@@ -545,6 +556,8 @@ class ServicioViewSet(viewsets.ModelViewSet):
 # 🧾 RESERVA
 # =====================================================
 
+# El search sobre cliente__nombre admite combinaciones costosas
+@presupuesto_consultas()
 class ReservaViewSet(viewsets.ModelViewSet):
     queryset = (
         Reserva.objects
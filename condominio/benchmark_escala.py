@@ -0,0 +1,370 @@
+"""
+Suite de benchmark de reportes a 1x / 10x / 100x del volumen de datos.
+
+``generar_datos_historicos`` crea ~1.500 reservas de a una (con señales),
+muy por debajo del volumen de producción. Aquí los datos se siembran de
+forma determinista (misma semilla → mismas filas, fechas ancladas a
+``FECHA_FIN_DATASET``) con ``bulk_create`` por lotes, y luego se mide cada
+endpoint de reportes y cada formato de exportación:
+
+- latencia (mediana y máximo de N repeticiones, con la caché vacía),
+- cantidad de consultas SQL,
+- pico de memoria Python (tracemalloc) y RSS máximo del proceso.
+
+El resultado es un JSON (``guardar_resultados``) que se puede comparar
+entre commits con ``comparar_resultados``. Lo usa
+``manage.py benchmark_escala``.
+"""
+import json
+import math
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import date, datetime, time as hora, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import Categoria, Pago, Paquete, Reserva, ReservaServicio, Servicio, Usuario
+from .tasas_cambio import normalizar_montos
+from .ubicaciones import normalizar_ubicaciones
+
+PREFIJO = 'bench'
+FECHA_FIN_DATASET = date(2025, 12, 31)
+MESES_DATASET = 24
+TAMANO_LOTE = 5000
+
+# Volumen 1x: similar a generar_datos_historicos
+RESERVAS_BASE = 1500
+CLIENTES_BASE = 300
+SERVICIOS_BASE = 40
+PAQUETES_BASE = 30
+
+ESCALAS = {'1x': 1, '10x': 10, '100x': 100}
+
+DEPARTAMENTOS = {
+    'La Paz': 'La Paz', 'Santa Cruz': 'Santa Cruz de la Sierra', 'Cochabamba': 'Cochabamba',
+    'Potosí': 'Uyuni', 'Oruro': 'Oruro', 'Tarija': 'Tarija', 'Chuquisaca': 'Sucre',
+    'Beni': 'Rurrenabaque', 'Pando': 'Cobija',
+}
+# (estado, peso)
+ESTADOS = [('PAGADA', 45), ('COMPLETADA', 25), ('CONFIRMADA', 15), ('PENDIENTE', 8), ('CANCELADA', 7)]
+# Multiplicador de demanda por mes (temporada alta en invierno y fin de año)
+TEMPORADA = {1: 1.1, 2: 1.3, 3: 0.8, 4: 0.8, 5: 0.9, 6: 1.1, 7: 1.4, 8: 1.3, 9: 0.9, 10: 0.9, 11: 1.0, 12: 1.5}
+
+FORMATOS = ('pdf', 'excel', 'docx')
+_RANGO = {'fecha_inicio': '2025-01-01', 'fecha_fin': '2025-12-31'}
+
+# (nombre, método, url, parámetros, formatos) — los formatos se agregan como ?formato=
+ENDPOINTS = [
+    ('graficas', 'post', '/api/reportes/graficas/', {**_RANGO, 'refrescar': True}, None),
+    ('graficas_departamento', 'post', '/api/reportes/graficas/', {**_RANGO, 'departamento': 'La Paz', 'refrescar': True}, None),
+    ('tendencias', 'get', '/api/reportes/tendencias/', {**_RANGO, 'granularidad': 'week', 'metricas': 'ventas,reservas,clientes'}, None),
+    ('cohortes', 'get', '/api/reportes/cohortes/', {'desde': '2024-01', 'hasta': '2025-12', 'refrescar': '1'}, None),
+    ('segmentos_recalcular', 'post', '/api/reportes/segmentos/', {}, None),
+    ('segmentos', 'get', '/api/reportes/segmentos/', {}, None),
+    ('reporte_ventas', 'get', '/api/reportes/ventas/', dict(_RANGO), FORMATOS),
+    ('reporte_clientes', 'get', '/api/reportes/clientes/', dict(_RANGO), FORMATOS),
+    ('reporte_productos', 'get', '/api/reportes/productos/', dict(_RANGO), FORMATOS),
+]
+
+
+# ============================================================================
+# 🌱 DATASET DETERMINISTA
+# ============================================================================
+
+def exigir_base_descartable(confirmada=False):
+    """
+    Los benchmarks siembran miles de filas (y ``benchmark_indices`` elimina
+    índices) en la base ``default``, que ``config/settings.py`` apunta a la
+    de producción. Solo corren con ``DEBUG`` y sobre una base descartable:
+    SQLite, o una base dedicada confirmada con ``--base-descartable`` o
+    ``BENCHMARK_BASE_DESCARTABLE=1``. Si no, lanza ``CommandError``.
+    """
+    confirmada = confirmada or os.getenv('BENCHMARK_BASE_DESCARTABLE', '').lower() in ('1', 'true', 'si', 'yes')
+    if settings.DEBUG and (connection.vendor == 'sqlite' or confirmada):
+        return
+    base = connection.settings_dict
+    raise CommandError(
+        f"Base '{base.get('NAME')}' en {base.get('HOST') or 'localhost'} no confirmada como descartable. "
+        "Apunta DATABASES a una base de pruebas (con DEBUG) y confirma con --base-descartable "
+        "o BENCHMARK_BASE_DESCARTABLE=1"
+    )
+
+
+def volumen(factor):
+    """Filas a sembrar por tabla para un factor de escala."""
+    catalogo = math.ceil(math.sqrt(factor))
+    return {
+        'clientes': CLIENTES_BASE * factor,
+        'reservas': RESERVAS_BASE * factor,
+        'servicios': SERVICIOS_BASE * catalogo,
+        'paquetes': PAQUETES_BASE * catalogo,
+    }
+
+
+def _en_lotes(generador, tamano=TAMANO_LOTE):
+    lote = []
+    for item in generador:
+        lote.append(item)
+        if len(lote) >= tamano:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def sembrar_dataset(factor, semilla=42):
+    """
+    Inserta el dataset de la escala ``factor`` con inserciones por lotes
+    (sin señales de modelo). Retorna el conteo de filas creadas por tabla.
+    """
+    rnd = random.Random(semilla)
+    filas = volumen(factor)
+    departamentos = list(DEPARTAMENTOS)
+
+    categoria = Categoria.objects.create(nombre=f'[{PREFIJO}] Turismo')
+
+    usuarios_django = User.objects.bulk_create(
+        [User(username=f'{PREFIJO}_{i}', email=f'{PREFIJO}_{i}@example.com', password='!')
+         for i in range(filas['clientes'])],
+        batch_size=TAMANO_LOTE,
+    )
+    clientes = Usuario.objects.bulk_create(
+        [Usuario(user=u, nombre=f'Cliente {i}', pais='Bolivia', num_viajes=0)
+         for i, u in enumerate(usuarios_django)],
+        batch_size=TAMANO_LOTE,
+    )
+
+    servicios = Servicio.objects.bulk_create([
+        Servicio(
+            titulo=f'[{PREFIJO}] Servicio {i}', descripcion='Benchmark', duracion='4 horas',
+            capacidad_max=20, punto_encuentro='Plaza principal', categoria=categoria,
+            precio_usd=Decimal(rnd.randint(20, 300)),
+            departamento=departamentos[i % len(departamentos)],
+            ciudad=DEPARTAMENTOS[departamentos[i % len(departamentos)]],
+        )
+        for i in range(filas['servicios'])
+    ])
+    paquetes = Paquete.objects.bulk_create([
+        Paquete(
+            nombre=f'[{PREFIJO}] Paquete {i}', descripcion='Benchmark', duracion='3 días',
+            precio_base=Decimal(rnd.randint(150, 1500)), fecha_inicio=date(2024, 1, 1),
+            fecha_fin=FECHA_FIN_DATASET, punto_salida='Terminal',
+            departamento=departamentos[i % len(departamentos)],
+            ciudad=DEPARTAMENTOS[departamentos[i % len(departamentos)]],
+        )
+        for i in range(filas['paquetes'])
+    ])
+
+    # Días del periodo con peso de temporada, para repartir las reservas
+    inicio = FECHA_FIN_DATASET - timedelta(days=30 * MESES_DATASET)
+    dias = [inicio + timedelta(days=d) for d in range((FECHA_FIN_DATASET - inicio).days + 1)]
+    pesos_dias = [TEMPORADA[d.month] for d in dias]
+    estados, pesos_estados = zip(*ESTADOS)
+    zona = timezone.get_current_timezone()
+
+    def reservas():
+        fechas = rnd.choices(dias, weights=pesos_dias, k=filas['reservas'])
+        for fecha in fechas:
+            es_paquete = rnd.random() < 0.4
+            producto = rnd.choice(paquetes if es_paquete else servicios)
+            base = producto.precio_base if es_paquete else producto.precio_usd * Decimal('6.96')
+            inicio_servicio = timezone.make_aware(datetime.combine(fecha, hora(rnd.choice((8, 10, 14)))), zona)
+            yield Reserva(
+                fecha=fecha,
+                fecha_inicio=inicio_servicio,
+                fecha_fin=inicio_servicio + timedelta(hours=4),
+                estado=rnd.choices(estados, weights=pesos_estados)[0],
+                total=(base * Decimal(rnd.randint(1, 4))).quantize(Decimal('0.01')),
+                moneda='BOB',
+                cliente=clientes[int(rnd.paretovariate(1.2)) % len(clientes)],
+                paquete=producto if es_paquete else None,
+                servicio=None if es_paquete else producto,
+            )
+
+    conteo = {'clientes': len(clientes), 'servicios': len(servicios), 'paquetes': len(paquetes),
+              'reservas': 0, 'pagos': 0, 'reserva_servicios': 0}
+    for lote in _en_lotes(reservas()):
+        creadas = Reserva.objects.bulk_create(lote)
+        pagos = [
+            Pago(monto=r.total, metodo='Tarjeta', fecha_pago=r.fecha, estado='Confirmado', reserva=r)
+            for r in creadas if r.estado in ('PAGADA', 'COMPLETADA')
+        ]
+        detalle = [
+            ReservaServicio(reserva=r, servicio=r.servicio, fecha=r.fecha,
+                            fecha_inicio=r.fecha_inicio, fecha_fin=r.fecha_fin)
+            for r in creadas if r.servicio_id
+        ]
+        Pago.objects.bulk_create(pagos)
+        ReservaServicio.objects.bulk_create(detalle)
+        conteo['reservas'] += len(creadas)
+        conteo['pagos'] += len(pagos)
+        conteo['reserva_servicios'] += len(detalle)
+    normalizar_montos()  # bulk_create no pasa por save(): columnas BOB/USD en un UPDATE por lotes
+    normalizar_ubicaciones()  # ídem para departamento/ciudad canónicos
+    return conteo
+
+
+def limpiar_dataset():
+    """Elimina lo sembrado por ``sembrar_dataset`` (cascada desde usuarios y catálogo)."""
+    User.objects.filter(username__startswith=f'{PREFIJO}_').delete()
+    Servicio.objects.filter(titulo__startswith=f'[{PREFIJO}]').delete()
+    Paquete.objects.filter(nombre__startswith=f'[{PREFIJO}]').delete()
+    Categoria.objects.filter(nombre__startswith=f'[{PREFIJO}]').delete()
+
+
+# ============================================================================
+# ⏱️ MEDICIÓN
+# ============================================================================
+
+def _rss_max_mb():
+    # ru_maxrss: KB en Linux, bytes en macOS
+    maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(maximo / (1024 * 1024 if platform.system() == 'Darwin' else 1024), 1)
+
+
+def _ejecutar(cliente, metodo, url, parametros):
+    """Ejecuta la petición con la caché vacía. Retorna (status, bytes, consultas SQL)."""
+    cache.clear()
+    consultas = []
+
+    # execute_wrapper y no CaptureQueriesContext: request_started reinicia connection.queries
+    def contar(execute, sql, params, many, context):
+        consultas.append(sql)
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(contar):
+        if metodo == 'post':
+            respuesta = cliente.post(url, parametros, format='json')
+        else:
+            respuesta = cliente.get(url, parametros)
+        # Consumir el cuerpo completo (el PDF se envía por streaming)
+        cuerpo = b''.join(respuesta.streaming_content) if respuesta.streaming else respuesta.content
+    return respuesta.status_code, len(cuerpo), len(consultas)
+
+
+def casos_a_medir(solo=None):
+    """(etiqueta, formato, método, url, parámetros) de cada endpoint/formato."""
+    for nombre, metodo, url, parametros, formatos in ENDPOINTS:
+        if solo and not any(nombre.startswith(prefijo) for prefijo in solo):
+            continue
+        for formato in formatos or (None,):
+            params = {**parametros, 'formato': formato} if formato else parametros
+            yield nombre, formato, metodo, url, params
+
+
+def medir_endpoints(repeticiones=3, solo=None):
+    """Mide cada endpoint/formato. Retorna una fila por caso."""
+    # El cliente de pruebas usa el host "testserver"
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+        return _medir_endpoints(repeticiones, solo)
+
+
+def _medir_endpoints(repeticiones, solo):
+    admin, _ = User.objects.get_or_create(
+        username=f'{PREFIJO}_admin', defaults={'is_staff': True, 'is_superuser': True, 'password': '!'}
+    )
+    cliente = APIClient()
+    cliente.force_authenticate(user=admin)
+
+    resultados = []
+    for nombre, formato, metodo, url, params in casos_a_medir(solo):
+        inicio = time.perf_counter()
+        estado, tamano, consultas = _ejecutar(cliente, metodo, url, params)
+        tiempos = [(time.perf_counter() - inicio) * 1000]
+        for _ in range(repeticiones - 1):
+            inicio = time.perf_counter()
+            _ejecutar(cliente, metodo, url, params)
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+
+        # Memoria en una corrida aparte: tracemalloc distorsiona los tiempos
+        tracemalloc.start()
+        _ejecutar(cliente, metodo, url, params)
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        resultados.append({
+            'endpoint': nombre,
+            'formato': formato,
+            'status': estado,
+            'bytes': tamano,
+            'latencia_ms': round(statistics.median(tiempos), 1),
+            'latencia_max_ms': round(max(tiempos), 1),
+            'consultas': consultas,
+            'python_pico_mb': round(pico / 1024 / 1024, 1),
+            'rss_max_mb': _rss_max_mb(),
+        })
+    return resultados
+
+
+# ============================================================================
+# 💾 RESULTADOS
+# ============================================================================
+
+def _commit_actual():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=5,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def metadatos():
+    return {
+        'commit': _commit_actual(),
+        'fecha': timezone.now().isoformat(timespec='seconds'),
+        'motor': connection.vendor,
+        'python': platform.python_version(),
+    }
+
+
+def guardar_resultados(ruta, escalas):
+    """``escalas``: {'1x': {'filas': {...}, 'resultados': [...]}, ...}"""
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        json.dump({**metadatos(), 'escalas': escalas}, archivo, ensure_ascii=False, indent=2)
+
+
+def comparar_resultados(anterior, actual, umbral=0.2):
+    """
+    Compara dos archivos de resultados ya cargados. Retorna una fila por
+    caso común con la variación de latencia y consultas; ``regresion`` indica
+    latencia mayor al umbral (20 %) o más consultas.
+    """
+    filas = []
+    for escala, datos in actual['escalas'].items():
+        previos = {
+            (r['endpoint'], r['formato']): r
+            for r in anterior.get('escalas', {}).get(escala, {}).get('resultados', [])
+        }
+        for r in datos['resultados']:
+            previo = previos.get((r['endpoint'], r['formato']))
+            if not previo:
+                continue
+            variacion = (r['latencia_ms'] - previo['latencia_ms']) / previo['latencia_ms'] if previo['latencia_ms'] else 0
+            filas.append({
+                'escala': escala,
+                'endpoint': r['endpoint'],
+                'formato': r['formato'],
+                'latencia_antes_ms': previo['latencia_ms'],
+                'latencia_ms': r['latencia_ms'],
+                'variacion': round(variacion, 3),
+                'consultas_antes': previo['consultas'],
+                'consultas': r['consultas'],
+                'regresion': variacion > umbral or r['consultas'] > previo['consultas'],
+            })
+    return filas
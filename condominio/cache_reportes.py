@@ -0,0 +1,158 @@
+"""
+Caché compartida de agregados del dashboard y de los reportes.
+
+Las claves se derivan del tipo de consulta y de los filtros normalizados
+(JSON ordenado → hash), de modo que la vista y el precalentamiento
+programado (``precalentamiento.py``) escriben y leen exactamente las mismas
+entradas. El backend es el ``default`` de ``CACHES`` (tabla en la base de
+datos), compartido entre los workers de Gunicorn y el proceso del scheduler.
+
+``obtener_o_calcular`` además coalesce pedidos idénticos concurrentes
+(single-flight): cuando varios usuarios abren el mismo dashboard a la vez,
+uno solo calcula y el resto espera su resultado.
+
+- El que calcula toma un candado en la caché compartida (``cache.add``, con
+  un token propio y vencimiento ``COALESCENCIA_CANDADO_TTL``). Si el proceso
+  muere o tarda más que ese vencimiento, el candado expira y otro pedido
+  toma el relevo; al terminar solo se suelta el candado si sigue siendo el
+  propio.
+- Los demás consultan la caché con pausas crecientes hasta que aparece el
+  resultado. Solo calculan cuando obtienen el candado: porque venció o
+  porque el cálculo falló y lo soltó. La espera queda acotada por
+  ``COALESCENCIA_CANDADO_TTL`` y nunca hay dos cálculos en paralelo.
+- Cada entrada guarda hasta cuándo está fresca. Vencida, se conserva
+  ``CACHE_STALE_SEGUNDOS`` más (stale-while-revalidate): el pedido que toma
+  el candado la recalcula y los demás reciben al instante la anterior.
+"""
+import hashlib
+import json
+import logging
+import secrets
+import time
+from typing import Any, NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .planes_consulta import capturar_planes
+
+logger = logging.getLogger(__name__)
+
+PREFIJO = 'reportes'
+TTL_POR_DEFECTO = 6 * 60 * 60
+STALE_POR_DEFECTO = 10 * 60
+CANDADO_TTL_POR_DEFECTO = 120
+PAUSA_INICIAL = 0.05
+PAUSA_MAXIMA = 1.0
+
+
+class EntradaCache(NamedTuple):
+    resultado: Any
+    calculado_en: float  # epoch: lo comparan workers de distintos procesos
+    fresca_hasta: float
+
+
+def ttl_dashboard():
+    return getattr(settings, 'CACHE_DASHBOARD_TTL', TTL_POR_DEFECTO)
+
+
+def clave_cache(tipo, filtros):
+    """Clave estable para ``tipo`` + ``filtros`` (el orden de las llaves no importa)."""
+    normalizado = json.dumps(filtros, sort_keys=True, default=str)
+    huella = hashlib.sha1(normalizado.encode()).hexdigest()[:20]
+    return f"{PREFIJO}:{tipo}:{huella}"
+
+
+# ============================================================================
+# 🔒 CANDADO COMPARTIDO
+# ============================================================================
+
+def _tomar_candado(clave):
+    """Token del candado de ``clave`` si se obtuvo, None si otro pedido ya está calculando."""
+    token = secrets.token_hex(8)
+    ttl = getattr(settings, 'COALESCENCIA_CANDADO_TTL', CANDADO_TTL_POR_DEFECTO)
+    return token if cache.add(f'{clave}:candado', token, ttl) else None
+
+
+def _soltar_candado(clave, token):
+    # Si el candado venció y lo tomó otro pedido, no se le quita
+    if cache.get(f'{clave}:candado') == token:
+        cache.delete(f'{clave}:candado')
+
+
+# ============================================================================
+# ⚡ OBTENER O CALCULAR (single-flight)
+# ============================================================================
+
+def _leer(clave):
+    valor = cache.get(clave)
+    if valor is None or isinstance(valor, EntradaCache):
+        return valor
+    # Entrada escrita antes de guardar la frescura: vale hasta su TTL
+    return EntradaCache(valor, 0.0, float('inf'))
+
+
+def _calcular_y_guardar(clave, tipo, filtros, calcular, ttl, stale, token):
+    try:
+        with capturar_planes(tipo, filtros):
+            resultado = calcular()
+        ahora = time.time()
+        cache.set(clave, EntradaCache(resultado, ahora, ahora + ttl), ttl + stale)
+        return resultado
+    finally:
+        if token:
+            _soltar_candado(clave, token)
+
+
+def obtener_o_calcular(tipo, filtros, calcular, ttl=None, refrescar=False, stale=None):
+    """
+    Devuelve ``(resultado, desde_cache)``. Si la entrada no existe (o se pide
+    ``refrescar``) ejecuta ``calcular()`` y guarda el resultado; pedidos
+    idénticos concurrentes esperan ese mismo cálculo y reciben
+    ``desde_cache=True``. ``stale`` son los segundos que una entrada vencida
+    se sigue sirviendo mientras se recalcula (default
+    ``CACHE_STALE_SEGUNDOS``). Con la captura de planes activa, las consultas
+    del cálculo quedan registradas bajo ``tipo`` + ``filtros`` (ver
+    ``planes_consulta.py``).
+    """
+    clave = clave_cache(tipo, filtros)
+    ttl = ttl or ttl_dashboard()
+    stale = getattr(settings, 'CACHE_STALE_SEGUNDOS', STALE_POR_DEFECTO) if stale is None else stale
+    inicio = time.time()
+
+    def _vigente(entrada):
+        # Con ``refrescar`` solo sirve un resultado calculado después del pedido
+        if entrada is None:
+            return False
+        return entrada.calculado_en >= inicio if refrescar else entrada.fresca_hasta > time.time()
+
+    entrada = None if refrescar else _leer(clave)
+    if _vigente(entrada):
+        return entrada.resultado, True
+    if entrada is not None:
+        token = _tomar_candado(clave)
+        if token is None:
+            return entrada.resultado, True  # otro pedido ya la está revalidando
+        return _calcular_y_guardar(clave, tipo, filtros, calcular, ttl, stale, token), False
+
+    pausa = PAUSA_INICIAL
+    esperando = False
+    while True:
+        # Mientras otro pedido tenga el candado no se calcula; vencido, cualquiera lo toma
+        token = _tomar_candado(clave)
+        if token is not None:
+            # Otro pedido pudo terminar entre la lectura y el candado
+            entrada = _leer(clave)
+            if _vigente(entrada):
+                _soltar_candado(clave, token)
+                return entrada.resultado, True
+            if esperando:
+                logger.warning(f"⏳ {tipo}: el cálculo compartido no terminó (candado vencido o soltado), se toma el relevo")
+            return _calcular_y_guardar(clave, tipo, filtros, calcular, ttl, stale, token), False
+
+        esperando = True
+        time.sleep(pausa)
+        entrada = _leer(clave)
+        if _vigente(entrada):
+            return entrada.resultado, True
+        pausa = min(pausa * 2, PAUSA_MAXIMA)
@@ -0,0 +1,145 @@
+"""
+Análisis de cohortes y retención de clientes.
+
+Cada cliente pertenece a la cohorte del mes de su primera reserva. La matriz
+(cohorte × mes de actividad → clientes distintos) se calcula en una sola
+consulta: la subconsulta interna obtiene el mes de cada reserva y el mes de
+la primera reserva del cliente con ``MIN(...) OVER (PARTITION BY cliente)``,
+y la consulta externa agrupa por (cohorte, mes). A Python solo llega la
+matriz ya agregada (meses × meses), no las reservas.
+
+El resultado se guarda en caché durante el día (la clave incluye la fecha y
+los parámetros), así que el cálculo corre como máximo una vez por día y
+combinación de filtros.
+"""
+from datetime import date, datetime, time, timedelta
+
+from django.db import connection
+from django.db.models import F, Min, Window
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .cache_reportes import obtener_o_calcular
+from .dataset_reportes import ESTADOS_VENTA
+from .models import Reserva
+
+MESES_POR_DEFECTO = 12
+PREFIJO_CACHE = 'cohortes_retencion'
+
+
+def _a_mes(valor):
+    """Normaliza el mes devuelto por el driver (date o texto ISO) a 'YYYY-MM'."""
+    if isinstance(valor, (date, datetime)):
+        return valor.strftime('%Y-%m')
+    return str(valor)[:7]
+
+
+def _diferencia_meses(desde, hasta):
+    anio_d, mes_d = map(int, desde.split('-'))
+    anio_h, mes_h = map(int, hasta.split('-'))
+    return (anio_h - anio_d) * 12 + (mes_h - mes_d)
+
+
+def matriz_cohortes(estados=None):
+    """
+    Retorna filas ``(cohorte, mes, clientes)`` con meses en formato 'YYYY-MM'.
+
+    La subconsulta se construye con el ORM (TruncMonth y Window son
+    portables entre PostgreSQL y SQLite) y se envuelve en un GROUP BY.
+    """
+    actividad = (
+        Reserva.objects
+        .filter(estado__in=estados or ESTADOS_VENTA)
+        .order_by()
+        .annotate(
+            mes=TruncMonth('fecha'),
+            cohorte=Window(Min(TruncMonth('fecha')), partition_by=[F('cliente_id')]),
+        )
+        .values('cliente_id', 'mes', 'cohorte')
+    )
+    sql, params = actividad.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT cohorte, mes, COUNT(DISTINCT cliente_id) "
+            f"FROM ({sql}) actividad GROUP BY cohorte, mes",
+            params,
+        )
+        return [(_a_mes(c), _a_mes(m), n) for c, m, n in cursor.fetchall()]
+
+
+def calcular_retencion(desde=None, hasta=None, meses=MESES_POR_DEFECTO, estados=None):
+    """
+    Construye la tabla de retención.
+
+    desde / hasta: rango de cohortes 'YYYY-MM' (inclusive, opcional)
+    meses: cantidad de periodos posteriores a mostrar por cohorte
+    """
+    por_cohorte = {}
+    for cohorte, mes, clientes in matriz_cohortes(estados):
+        if (desde and cohorte < desde) or (hasta and cohorte > hasta):
+            continue
+        periodo = _diferencia_meses(cohorte, mes)
+        if 0 <= periodo <= meses:
+            por_cohorte.setdefault(cohorte, {})[periodo] = clientes
+
+    cohortes = []
+    retenidos_por_periodo = [0] * (meses + 1)
+    base_por_periodo = [0] * (meses + 1)
+    mes_actual = timezone.localdate().strftime('%Y-%m')
+    for cohorte in sorted(por_cohorte):
+        conteos = por_cohorte[cohorte]
+        tamano = conteos.get(0, 0)
+        # Solo periodos que ya transcurrieron (los futuros no cuentan como abandono)
+        transcurridos = min(meses, _diferencia_meses(cohorte, mes_actual))
+        retencion = []
+        for periodo in range(transcurridos + 1):
+            clientes = conteos.get(periodo, 0)
+            retencion.append({
+                'periodo': periodo,
+                'clientes': clientes,
+                'porcentaje': round(clientes / tamano * 100, 2) if tamano else 0.0,
+            })
+            retenidos_por_periodo[periodo] += clientes
+            base_por_periodo[periodo] += tamano
+        cohortes.append({'cohorte': cohorte, 'tamano': tamano, 'retencion': retencion})
+
+    promedio = [
+        {
+            'periodo': periodo,
+            'porcentaje': round(retenidos_por_periodo[periodo] / base_por_periodo[periodo] * 100, 2),
+        }
+        for periodo in range(meses + 1)
+        if base_por_periodo[periodo]
+    ]
+    return {
+        'cohortes': cohortes,
+        'retencion_promedio': promedio,
+        'total_clientes': sum(c['tamano'] for c in cohortes),
+        'meses': meses,
+    }
+
+
+def _segundos_hasta_medianoche():
+    ahora = timezone.localtime()
+    manana = timezone.make_aware(datetime.combine(ahora.date() + timedelta(days=1), time.min))
+    return max(60, int((manana - ahora).total_seconds()))
+
+
+def obtener_retencion(desde=None, hasta=None, meses=MESES_POR_DEFECTO, estados=None, refrescar=False):
+    """
+    ``calcular_retencion`` con caché diaria; pedidos idénticos concurrentes
+    comparten un cálculo (ver cache_reportes.py). Retorna (resultado, desde_cache).
+    """
+    parametros = {
+        'dia': timezone.localdate().isoformat(),
+        'desde': desde, 'hasta': hasta, 'meses': meses, 'estados': sorted(estados or ESTADOS_VENTA),
+    }
+
+    def _calcular():
+        resultado = calcular_retencion(desde, hasta, meses, estados)
+        resultado['calculado_en'] = timezone.now().isoformat()
+        return resultado
+
+    # Sin ventana stale: el corte es diario
+    return obtener_o_calcular(PREFIJO_CACHE, parametros, _calcular, ttl=_segundos_hasta_medianoche(),
+                              refrescar=refrescar, stale=0)
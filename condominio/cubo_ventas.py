@@ -0,0 +1,209 @@
+"""
+Cubo de ventas: cortes multidimensionales con subtotales en una sola consulta.
+
+El cliente elige dimensiones y medidas de listas blancas (``DIMENSIONES``,
+``MEDIDAS``) y el modo de subtotales:
+
+- ``rollup``: jerárquico, ``(a, b) → (a) → ()`` (como ``ROLLUP(a, b)``).
+- ``cubo``: todas las combinaciones (como ``CUBE(a, b)``).
+- ``ninguno``: solo el nivel de detalle.
+
+La base (reservas filtradas con sus dimensiones) se construye con el ORM,
+igual que en cohortes.py, y se envuelve en un ``GROUP BY GROUPING SETS`` en
+PostgreSQL. En SQLite, que no lo soporta, se arma la consulta equivalente
+con ``UNION ALL`` de un ``GROUP BY`` por conjunto. En ambos casos es una sola
+consulta y cada fila trae la máscara ``GROUPING()`` para distinguir un
+subtotal de un valor NULL real.
+
+El SQL exterior se cachea por forma (dimensiones + medidas + modo + motor) y
+el resultado en la caché compartida de reportes. ``max_filas`` corta
+resultados de cardinalidad excesiva con un error explícito en lugar de
+devolver un volcado de la tabla.
+"""
+from decimal import Decimal
+from functools import lru_cache
+from itertools import combinations
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, CharField, F, Q, Value, When
+from django.db.models.functions import Coalesce, ExtractYear, TruncMonth
+
+from .cohortes import _a_mes
+from .dataset_reportes import ESTADOS_VENTA
+from .models import Reserva
+from .ubicaciones import filtro_ubicacion
+
+MAX_DIMENSIONES = 4
+MAX_FILAS = 5000
+MODOS = ('rollup', 'cubo', 'ninguno')
+
+_SIN_DATO = Value('Sin especificar')
+
+DIMENSIONES = {
+    'departamento': lambda: Coalesce('paquete__departamento_canonico__nombre',
+                                     'servicio__departamento_canonico__nombre', _SIN_DATO),
+    'ciudad': lambda: Coalesce('paquete__ciudad_canonica__nombre', 'servicio__ciudad_canonica__nombre', _SIN_DATO),
+    'mes': lambda: TruncMonth('fecha'),
+    'anio': lambda: ExtractYear('fecha'),
+    'tipo_producto': lambda: Case(When(paquete__isnull=False, then=Value('paquete')),
+                                  default=Value('servicio'), output_field=CharField()),
+    'paquete': lambda: Coalesce('paquete__nombre', _SIN_DATO),
+    'servicio': lambda: Coalesce('servicio__titulo', _SIN_DATO),
+    'categoria': lambda: Coalesce('servicio__categoria__nombre', _SIN_DATO),
+    'tipo_destino': lambda: Coalesce('paquete__tipo_destino', _SIN_DATO),
+    'moneda': lambda: F('moneda'),
+    'estado': lambda: F('estado'),
+}
+
+# Agregados sobre las columnas de la base (montos normalizados, ver tasas_cambio.py)
+MEDIDAS = {
+    'reservas': 'COUNT(*)',
+    'clientes': 'COUNT(DISTINCT cliente_id)',
+    'ventas_bob': 'SUM(total_bob)',
+    'ventas_usd': 'SUM(total_usd)',
+    'ticket_promedio_bob': 'AVG(total_bob)',
+    'ticket_promedio_usd': 'AVG(total_usd)',
+}
+
+
+class CuboDemasiadoGrande(ValueError):
+    """El resultado supera ``max_filas``: se piden menos dimensiones o más filtros."""
+
+
+def max_filas():
+    return getattr(settings, 'CUBO_MAX_FILAS', MAX_FILAS)
+
+
+def validar_consulta(dimensiones, medidas, modo):
+    if not dimensiones:
+        raise ValueError('Indique al menos una dimensión')
+    if len(dimensiones) > MAX_DIMENSIONES:
+        raise ValueError(f'Máximo {MAX_DIMENSIONES} dimensiones')
+    if len(set(dimensiones)) != len(dimensiones):
+        raise ValueError('Dimensiones repetidas')
+    invalidas = [d for d in dimensiones if d not in DIMENSIONES] + [m for m in medidas if m not in MEDIDAS]
+    if invalidas:
+        raise ValueError(f"No soportadas: {', '.join(invalidas)}")
+    if not medidas:
+        raise ValueError('Indique al menos una medida')
+    if modo not in MODOS:
+        raise ValueError(f"Modo de subtotales inválido (use {', '.join(MODOS)})")
+
+
+def conjuntos_agrupacion(dimensiones, modo):
+    """Grouping sets del modo, del más detallado al total general."""
+    if modo == 'ninguno':
+        return [tuple(dimensiones)]
+    if modo == 'rollup':
+        return [tuple(dimensiones[:n]) for n in range(len(dimensiones), -1, -1)]
+    return [c for n in range(len(dimensiones), -1, -1) for c in combinations(dimensiones, n)]
+
+
+def _mascara(dimensiones, conjunto):
+    """Valor de ``GROUPING(d1, ..., dn)``: bit en 1 para cada dimensión no agrupada."""
+    n = len(dimensiones)
+    return sum(1 << (n - 1 - i) for i, d in enumerate(dimensiones) if d not in conjunto)
+
+
+# ============================================================================
+# 🧱 SQL
+# ============================================================================
+
+def consulta_base(dimensiones, filtros):
+    """Reservas filtradas con una columna ``d_<dimensión>`` por dimensión pedida."""
+    queryset = Reserva.objects.filter(estado__in=filtros.get('estados') or ESTADOS_VENTA)
+    if filtros.get('fecha_inicio'):
+        queryset = queryset.filter(fecha__gte=filtros['fecha_inicio'])
+    if filtros.get('fecha_fin'):
+        queryset = queryset.filter(fecha__lte=filtros['fecha_fin'])
+    queryset = queryset.filter(filtro_ubicacion(filtros, 'paquete__', 'servicio__'))
+    if filtros.get('moneda'):
+        queryset = queryset.filter(moneda=filtros['moneda'])
+    return (
+        queryset.order_by()
+        .annotate(**{f'd_{d}': DIMENSIONES[d]() for d in dimensiones})
+        .values('cliente_id', 'total_bob', 'total_usd', *[f'd_{d}' for d in dimensiones])
+    )
+
+
+@lru_cache(maxsize=256)
+def sql_cubo(dimensiones, medidas, modo, vendor):
+    """
+    SQL exterior (sobre ``base``) para una forma de consulta. Cacheado: la
+    misma forma con otros filtros reutiliza el texto, solo cambian los
+    parámetros de la base.
+    """
+    columnas = [f'd_{d}' for d in dimensiones]
+    agregados = ', '.join(f'{MEDIDAS[m]} AS {m}' for m in medidas)
+    conjuntos = conjuntos_agrupacion(list(dimensiones), modo)
+    orden = f"ORDER BY grupo, {', '.join(str(i + 1) for i in range(len(columnas)))} LIMIT %s"
+
+    if vendor == 'postgresql':
+        sets = ', '.join('(' + ', '.join(f'd_{d}' for d in c) + ')' for c in conjuntos)
+        return (
+            f"SELECT {', '.join(columnas)}, GROUPING({', '.join(columnas)}) AS grupo, {agregados} "
+            f"FROM base GROUP BY GROUPING SETS ({sets}) {orden}"
+        )
+
+    ramas = []
+    for conjunto in conjuntos:
+        select = ', '.join(f'd_{d}' if d in conjunto else f'NULL AS d_{d}' for d in dimensiones)
+        agrupar = f" GROUP BY {', '.join(f'd_{d}' for d in conjunto)}" if conjunto else ''
+        ramas.append(f"SELECT {select}, {_mascara(dimensiones, conjunto)} AS grupo, {agregados} FROM base{agrupar}")
+    return f"{' UNION ALL '.join(ramas)} {orden}"
+
+
+# ============================================================================
+# 📊 CÁLCULO
+# ============================================================================
+
+def _valor(valor):
+    if isinstance(valor, Decimal):
+        return float(round(valor, 2))
+    if isinstance(valor, float):
+        return round(valor, 2)
+    return valor
+
+
+def _valor_dimension(dimension, valor):
+    # Los cursores crudos no convierten fechas en SQLite: el mes llega como texto
+    return _a_mes(valor) if dimension == 'mes' and valor is not None else _valor(valor)
+
+
+def calcular_cubo(dimensiones, medidas, modo='rollup', filtros=None):
+    """
+    Ejecuta el cubo. Retorna ``{'filas': [...], 'total_filas': n, ...}``;
+    cada fila trae sus dimensiones (None en las que se subtotalizaron), las
+    medidas, ``agrupado_por`` y ``subtotal``.
+    """
+    validar_consulta(dimensiones, medidas, modo)
+    base_sql, base_params = consulta_base(dimensiones, filtros or {}).query.sql_with_params()
+    sql = f"WITH base AS ({base_sql}) {sql_cubo(tuple(dimensiones), tuple(medidas), modo, connection.vendor)}"
+    limite = max_filas()
+    with connection.cursor() as cursor:
+        cursor.execute(sql, (*base_params, limite + 1))
+        crudas = cursor.fetchall()
+    if len(crudas) > limite:
+        raise CuboDemasiadoGrande(
+            f'El cubo supera {limite} filas; use menos dimensiones, subtotales=ninguno o más filtros'
+        )
+
+    n = len(dimensiones)
+    filas = []
+    for cruda in crudas:
+        grupo = cruda[n]
+        agrupado_por = [d for i, d in enumerate(dimensiones) if not grupo & (1 << (n - 1 - i))]
+        fila = {d: (_valor_dimension(d, cruda[i]) if d in agrupado_por else None) for i, d in enumerate(dimensiones)}
+        fila.update({m: _valor(cruda[n + 1 + j]) or 0 for j, m in enumerate(medidas)})
+        fila['agrupado_por'] = agrupado_por
+        fila['subtotal'] = len(agrupado_por) < n
+        filas.append(fila)
+
+    return {
+        'dimensiones': list(dimensiones),
+        'medidas': list(medidas),
+        'subtotales': modo,
+        'filas': filas,
+        'total_filas': len(filas),
+    }
@@ -0,0 +1,274 @@
+"""
+Cuotas de los planes de proveedores.
+
+``Plan.max_servicios`` limita los servicios publicados del proveedor y
+``Plan.max_clientes_potenciales`` los clientes distintos que le reservan
+(clientes potenciales) por periodo de facturación. El periodo es mensual y
+se cuenta desde el día de ``Suscripcion.fecha_inicio``. En ambos límites 0
+significa ilimitado.
+
+Superar la cuota de servicios rechaza la creación (``CuotaExcedida``). La
+de clientes no rechaza la reserva, que es del cliente: el proveedor queda
+marcado con ``UsoPlanProveedor.clientes_excedidos``.
+
+Verificar una cuota no cuesta ``COUNT`` sobre servicios ni reservas:
+
+- El plan vigente de cada proveedor se resuelve una vez y queda en la caché
+  compartida (``plan_en_cache``). Se invalida al guardar la suscripción o
+  el plan.
+- El uso vive en ``UsoPlanProveedor``, una fila por proveedor. ``consumir``
+  hace un único ``UPDATE ... WHERE usado < limite``: verifica e incrementa de
+  forma atómica, y si no actualizó ninguna fila se excedió la cuota. El
+  contador de clientes potenciales se reinicia en el mismo ``UPDATE`` cuando
+  cambia el periodo.
+
+Las señales de ``signals_cuotas.py`` llaman a ``consumir`` antes de insertar
+un servicio, a ``liberar`` al borrarlo y a ``registrar_cliente_potencial``
+cuando se confirma la transacción de una reserva nueva. Las operaciones
+masivas no disparan señales (``bulk_create``, ``QuerySet.delete``); para
+ellas ``sincronizar_uso`` reconcilia los contadores cada noche (y
+``manage.py recalcular_cuotas`` a demanda). Los proveedores sin plan
+vigente no tienen cuotas ni contadores.
+"""
+import calendar
+import logging
+from datetime import date
+
+from django.core.cache import cache
+from django.db.models import Case, Count, F, Q, Value, When
+from django.utils import timezone
+from rest_framework.exceptions import PermissionDenied
+
+from .models import Reserva, Servicio, Suscripcion, UsoPlanProveedor
+
+logger = logging.getLogger(__name__)
+
+RECURSO_SERVICIOS = 'servicios'
+RECURSO_CLIENTES = 'clientes_potenciales'
+_LIMITES = {RECURSO_SERVICIOS: 'max_servicios', RECURSO_CLIENTES: 'max_clientes_potenciales'}
+
+PREFIJO_CACHE = 'cuotas:plan'
+TTL_PLAN = 60 * 60
+
+
+class CuotaExcedida(PermissionDenied):
+    """El proveedor alcanzó un límite de su plan (DRF responde 403)."""
+    default_code = 'cuota_excedida'
+
+    def __init__(self, recurso, limite):
+        self.recurso = recurso
+        self.limite = limite
+        super().__init__({
+            'success': False,
+            'error': f'Límite de {recurso.replace("_", " ")} del plan alcanzado',
+            'detalle': f'El plan actual permite {limite} {recurso.replace("_", " ")}',
+            'recurso': recurso,
+            'limite': limite,
+        })
+
+
+# ============================================================================
+# 🔐 PLAN VIGENTE (CACHÉ)
+# ============================================================================
+
+def _clave(usuario_id):
+    return f'{PREFIJO_CACHE}:{usuario_id}'
+
+
+def _cargar_plan(usuario_id):
+    hoy = timezone.localdate()
+    suscripcion = (
+        Suscripcion.objects
+        .filter(proveedor__usuario_id=usuario_id, activa=True, plan__isnull=False,
+                fecha_inicio__lte=hoy, fecha_fin__gte=hoy)
+        .order_by('-fecha_fin')
+        .values('fecha_inicio', 'fecha_fin', 'plan__max_servicios', 'plan__max_clientes_potenciales')
+        .first()
+    )
+    if not suscripcion:
+        return {}
+    return {
+        'inicio': suscripcion['fecha_inicio'],
+        'fin': suscripcion['fecha_fin'],
+        'max_servicios': suscripcion['plan__max_servicios'],
+        'max_clientes_potenciales': suscripcion['plan__max_clientes_potenciales'],
+    }
+
+
+def plan_en_cache(usuario_id):
+    """
+    Límites y vigencia del plan del proveedor (``{}`` sin plan vigente).
+    Se cachea también la ausencia de plan, así los proveedores sin
+    suscripción tampoco consultan la base en cada escritura.
+    """
+    datos = cache.get(_clave(usuario_id))
+    if datos is None:
+        datos = _cargar_plan(usuario_id)
+        cache.set(_clave(usuario_id), datos, TTL_PLAN)
+    if datos and not datos['inicio'] <= timezone.localdate() <= datos['fin']:
+        return {}
+    return datos
+
+
+def invalidar_plan(*usuario_ids):
+    cache.delete_many([_clave(u) for u in usuario_ids if u])
+
+
+def periodo_facturacion(inicio, hoy=None):
+    """Inicio del periodo mensual vigente, contado desde el día de ``inicio``."""
+    hoy = hoy or timezone.localdate()
+    meses = (hoy.year - inicio.year) * 12 + hoy.month - inicio.month
+    if hoy.day < inicio.day:
+        meses -= 1
+    indice = inicio.year * 12 + inicio.month - 1 + max(meses, 0)
+    anio, mes = divmod(indice, 12)
+    mes += 1
+    return date(anio, mes, min(inicio.day, calendar.monthrange(anio, mes)[1]))
+
+
+# ============================================================================
+# 🧮 CONTADORES
+# ============================================================================
+
+def _actualizar_contador(proveedor_id, recurso, limite, plan):
+    filas = UsoPlanProveedor.objects.filter(proveedor_id=proveedor_id)
+    if recurso == RECURSO_SERVICIOS:
+        if limite:
+            filas = filas.filter(servicios__lt=limite)
+        return filas.update(servicios=F('servicios') + 1)
+
+    periodo = periodo_facturacion(plan['inicio'])
+    mismo_periodo = Q(periodo_inicio=periodo)
+    if limite:
+        filas = filas.filter(~mismo_periodo | Q(clientes_potenciales__lt=limite))
+    return filas.update(
+        clientes_potenciales=Case(When(mismo_periodo, then=F('clientes_potenciales') + 1), default=Value(1)),
+        clientes_excedidos=Case(When(mismo_periodo, then=F('clientes_excedidos')), default=Value(0)),
+        periodo_inicio=periodo,
+    )
+
+
+def _asegurar_contador(proveedor_id, recurso, limite, plan):
+    """Incrementa el contador; sin fila todavía la crea con el conteo real (una sola vez) y reintenta."""
+    if _actualizar_contador(proveedor_id, recurso, limite, plan):
+        return True
+    _, creado = UsoPlanProveedor.objects.get_or_create(
+        proveedor_id=proveedor_id,
+        defaults={'servicios': Servicio.objects.filter(proveedor_id=proveedor_id).count()},
+    )
+    return bool(creado and _actualizar_contador(proveedor_id, recurso, limite, plan))
+
+
+def consumir(proveedor_id, recurso):
+    """
+    Reserva una unidad de ``recurso`` para el proveedor o lanza
+    ``CuotaExcedida``. Sin plan vigente no hace nada.
+    """
+    if not proveedor_id:
+        return
+    plan = plan_en_cache(proveedor_id)
+    if not plan:
+        return
+    limite = plan[_LIMITES[recurso]]
+    if _asegurar_contador(proveedor_id, recurso, limite, plan):
+        return
+    logger.info(f"⛔ Proveedor {proveedor_id} alcanzó el límite de {recurso} ({limite})")
+    raise CuotaExcedida(recurso, limite)
+
+
+def _reservas_del_proveedor(proveedor_id):
+    return Reserva.objects.filter(Q(servicio__proveedor_id=proveedor_id) | Q(paquete__proveedor_id=proveedor_id))
+
+
+def registrar_cliente_potencial(proveedor_id, cliente_id, reserva_id=None):
+    """
+    Cuenta al cliente de una reserva nueva si no tiene otra anterior en el
+    periodo con ese proveedor. Nunca lanza ``CuotaExcedida``: pasado el límite marca al
+    proveedor en ``clientes_excedidos`` y lo deja en el log.
+    """
+    if not proveedor_id:
+        return
+    plan = plan_en_cache(proveedor_id)
+    if not plan:
+        return
+    periodo = periodo_facturacion(plan['inicio'])
+    anteriores = _reservas_del_proveedor(proveedor_id).filter(cliente_id=cliente_id, created_at__date__gte=periodo)
+    if reserva_id:
+        anteriores = anteriores.filter(pk__lt=reserva_id)
+    if cliente_id and anteriores.exists():
+        return  # el cliente ya cuenta en este periodo
+
+    limite = plan[_LIMITES[RECURSO_CLIENTES]]
+    if _asegurar_contador(proveedor_id, RECURSO_CLIENTES, limite, plan):
+        return
+    UsoPlanProveedor.objects.filter(proveedor_id=proveedor_id).update(clientes_excedidos=F('clientes_excedidos') + 1)
+    logger.warning(f"⚠️ Proveedor {proveedor_id} recibió un cliente por encima del límite de su plan ({limite})")
+
+
+def liberar(proveedor_id, recurso=RECURSO_SERVICIOS):
+    """Devuelve una unidad al borrar (solo servicios: un cliente potencial ya recibido no se devuelve)."""
+    if proveedor_id:
+        UsoPlanProveedor.objects.filter(proveedor_id=proveedor_id, **{f'{recurso}__gt': 0}).update(
+            **{recurso: F(recurso) - 1}
+        )
+
+
+def uso_plan(usuario_id):
+    """Uso y límites actuales del proveedor (para mostrar en su panel)."""
+    plan = plan_en_cache(usuario_id)
+    if not plan:
+        return None
+    uso = UsoPlanProveedor.objects.filter(proveedor_id=usuario_id).first()
+    periodo = periodo_facturacion(plan['inicio'])
+    return {
+        'periodo_inicio': periodo.isoformat(),
+        RECURSO_SERVICIOS: {'usado': uso.servicios if uso else 0, 'limite': plan['max_servicios']},
+        RECURSO_CLIENTES: {
+            'usado': uso.clientes_potenciales if uso and uso.periodo_inicio == periodo else 0,
+            'limite': plan['max_clientes_potenciales'],
+            'excedidos': uso.clientes_excedidos if uso and uso.periodo_inicio == periodo else 0,
+        },
+    }
+
+
+# ============================================================================
+# 🔁 RECONCILIACIÓN (fuera del camino de las peticiones)
+# ============================================================================
+
+def sincronizar_uso(usuario_ids=None):
+    """
+    Recalcula los contadores con ``COUNT`` agrupados (servicios actuales y
+    clientes distintos del periodo vigente). Corrige la deriva de operaciones
+    masivas; corre cada noche en el scheduler y al guardar una suscripción.
+    Retorna filas sincronizadas.
+    """
+    suscripciones = Suscripcion.objects.filter(activa=True, plan__isnull=False)
+    if usuario_ids is not None:
+        suscripciones = suscripciones.filter(proveedor__usuario_id__in=usuario_ids)
+    proveedores = set(suscripciones.values_list('proveedor__usuario_id', flat=True))
+    if not proveedores:
+        return 0
+
+    servicios = dict(
+        Servicio.objects.filter(proveedor_id__in=proveedores).order_by()
+        .values_list('proveedor_id').annotate(n=Count('id'))
+    )
+    sincronizadas = 0
+    for proveedor_id in proveedores:
+        plan = plan_en_cache(proveedor_id)
+        periodo = periodo_facturacion(plan['inicio']) if plan else None
+        clientes = 0
+        if periodo:
+            clientes = _reservas_del_proveedor(proveedor_id).filter(
+                created_at__date__gte=periodo,
+            ).aggregate(n=Count('cliente_id', distinct=True))['n']
+        limite = plan['max_clientes_potenciales'] if plan else 0
+        UsoPlanProveedor.objects.update_or_create(
+            proveedor_id=proveedor_id,
+            defaults={'servicios': servicios.get(proveedor_id, 0), 'clientes_potenciales': clientes,
+                      'clientes_excedidos': max(clientes - limite, 0) if limite else 0,
+                      'periodo_inicio': periodo},
+        )
+        sincronizadas += 1
+    logger.info(f"🔁 Contadores de cuotas sincronizados: {sincronizadas} proveedores")
+    return sincronizadas
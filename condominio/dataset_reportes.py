@@ -0,0 +1,385 @@
+"""
+Capa de datasets para los reportes descargables (ventas, clientes, productos).
+
+Las filas y las métricas de resumen se calculan en la base de datos
+(annotate/aggregate) y se entregan en forma columnar en un ``DatasetReporte``.
+Los exportadores PDF, Excel y DOCX consumen el mismo dataset: los totales,
+la separación paquetes/servicios y las conversiones de moneda se hacen una
+sola vez aquí y no en cada renderer.
+"""
+import heapq
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.db.models import (
+    Case, CharField, Count, DecimalField, ExpressionWrapper, F, FloatField,
+    Max, OuterRef, Q, Subquery, Sum, Value, When,
+)
+from django.db.models.functions import Coalesce
+
+from .models import Reserva, Usuario, Servicio, Paquete, SegmentoCliente
+from .tasas_cambio import TASA_POR_DEFECTO, campo_monto
+from .ubicaciones import filtro_ubicacion
+
+
+TASA_CAMBIO_BOB = TASA_POR_DEFECTO  # precios de catálogo; los montos de reservas usan tasas_cambio
+ESTADOS_VENTA = ['CONFIRMADA', 'COMPLETADA', 'PAGADA']
+
+_DECIMAL = DecimalField(max_digits=14, decimal_places=2)
+
+
+# ============================================================================
+# 📦 ESTRUCTURAS
+# ============================================================================
+
+@dataclass
+class SeccionDataset:
+    """Columnas de una tabla del reporte: ``{nombre_columna: [valores]}``."""
+    columnas: Dict[str, List[Any]]
+
+    def __len__(self):
+        return len(next(iter(self.columnas.values()), []))
+
+    def registros(self, alias: Optional[Dict[str, Any]] = None) -> List[dict]:
+        """
+        Filas como diccionarios. ``alias`` renombra columnas al nombre que
+        espera cada renderer; un alias puede ser una tupla de nombres cuando
+        el renderer lee el mismo valor con varias claves. Las columnas sin
+        alias conservan su nombre.
+        """
+        alias = alias or {}
+        claves = []
+        for nombre in self.columnas:
+            destino = alias.get(nombre, nombre)
+            claves.append(destino if isinstance(destino, tuple) else (destino,))
+        registros = []
+        for fila in zip(*self.columnas.values()):
+            registro = {}
+            for nombres, valor in zip(claves, fila):
+                for nombre in nombres:
+                    registro[nombre] = valor
+            registros.append(registro)
+        return registros
+
+
+@dataclass
+class DatasetReporte:
+    tipo: str                                   # 'ventas' | 'clientes' | 'productos'
+    filtros: dict
+    secciones: Dict[str, SeccionDataset]
+    resumen: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def moneda(self):
+        return (self.filtros.get('moneda') or 'BOB').upper()
+
+    @property
+    def total_registros(self):
+        return sum(len(s) for s in self.secciones.values())
+
+    def __len__(self):
+        return self.total_registros
+
+    def seccion(self, nombre) -> SeccionDataset:
+        return self.secciones.get(nombre) or SeccionDataset({})
+
+    def registros(self, nombre, alias=None) -> List[dict]:
+        return self.seccion(nombre).registros(alias)
+
+
+def _materializar(queryset, columnas: Iterable, conversores=None) -> SeccionDataset:
+    """
+    Ejecuta el queryset y lo transpone a columnas, aplicando conversiones de
+    tipo en la misma pasada.
+
+    ``columnas`` acepta nombres de campo/anotación o tuplas
+    ``(nombre_columna, lookup)`` cuando el nombre de salida difiere.
+    """
+    pares = [c if isinstance(c, tuple) else (c, c) for c in columnas]
+    conversores = conversores or {}
+    datos = {nombre: [] for nombre, _ in pares}
+    listas = [datos[nombre] for nombre, _ in pares]
+    funciones = [conversores.get(nombre) for nombre, _ in pares]
+    for fila in queryset.values_list(*[lookup for _, lookup in pares]).iterator(chunk_size=2000):
+        for lista, funcion, valor in zip(listas, funciones, fila):
+            lista.append(funcion(valor) if funcion else valor)
+    return SeccionDataset(datos)
+
+
+def _a_float(valor):
+    return float(valor or 0)
+
+
+def _monto_en(moneda_destino, prefijo='reservas__'):
+    """Total de la reserva en ``moneda_destino``: columna normalizada al guardar (tasas_cambio)."""
+    return F(campo_monto(moneda_destino, prefijo))
+
+
+# ============================================================================
+# 💰 VENTAS
+# ============================================================================
+
+def dataset_ventas(filtros) -> DatasetReporte:
+    """
+    Detalle de reservas vendidas + métricas generales.
+
+    filtros: fecha_inicio, fecha_fin, departamento (o departamento_id), moneda,
+    monto_minimo y monto_maximo (total de la reserva en la moneda del reporte)
+    """
+    campo = campo_monto((filtros.get('moneda') or 'BOB').upper())
+    queryset = Reserva.objects.filter(estado__in=ESTADOS_VENTA)
+    if filtros.get('fecha_inicio'):
+        queryset = queryset.filter(fecha__gte=filtros['fecha_inicio'])
+    if filtros.get('fecha_fin'):
+        queryset = queryset.filter(fecha__lte=filtros['fecha_fin'])
+    if filtros.get('monto_minimo') not in (None, ''):
+        queryset = queryset.filter(**{f'{campo}__gte': filtros['monto_minimo']})
+    if filtros.get('monto_maximo') not in (None, ''):
+        queryset = queryset.filter(**{f'{campo}__lte': filtros['monto_maximo']})
+    queryset = queryset.filter(filtro_ubicacion(filtros, 'paquete__', 'servicio__'))
+
+    filas = queryset.annotate(
+        cliente_nombre=Coalesce('cliente__nombre', Value('N/A')),
+        producto=Coalesce('paquete__nombre', 'servicio__titulo', Value('N/A'), output_field=CharField()),
+        tipo=Case(
+            When(paquete__isnull=False, then=Value('Paquete')),
+            default=Value('Servicio'),
+            output_field=CharField(),
+        ),
+        monto=F(campo),
+    )
+    seccion = _materializar(
+        filas,
+        ['fecha', ('cliente', 'cliente_nombre'), 'producto', 'tipo', 'monto', 'estado'],
+        conversores={'fecha': lambda f: f.strftime('%d/%m/%Y'), 'monto': _a_float},
+    )
+
+    agregados = queryset.aggregate(
+        total_ventas=Coalesce(Sum(campo), Value(Decimal('0')), output_field=_DECIMAL),
+        cantidad=Count('id'),
+    )
+    total_ventas = float(agregados['total_ventas'])
+    cantidad = agregados['cantidad']
+    return DatasetReporte(
+        tipo='ventas',
+        filtros=filtros,
+        secciones={'ventas': seccion},
+        resumen={
+            'total_ventas': total_ventas,
+            'cantidad_reservas': cantidad,
+            'ticket_promedio': total_ventas / cantidad if cantidad else 0,
+        },
+    )
+
+
+# ============================================================================
+# 👥 CLIENTES
+# ============================================================================
+
+def dataset_clientes(filtros, estados=None) -> DatasetReporte:
+    """
+    Clientes con reservas en los estados indicados + resumen global.
+
+    filtros: tipo_cliente, segmento, moneda, fecha_inicio, fecha_fin, departamento, ciudad
+    (o departamento_id, ciudad_id)
+    estados: lista de estados de reserva a considerar (default: ESTADOS_VENTA)
+    """
+    estados = estados or ESTADOS_VENTA
+    moneda = (filtros.get('moneda') or 'USD').upper()
+
+    filtro = Q(reservas__estado__in=estados)
+    if filtros.get('fecha_inicio'):
+        filtro &= Q(reservas__fecha__gte=filtros['fecha_inicio'])
+    if filtros.get('fecha_fin'):
+        filtro &= Q(reservas__fecha__lte=filtros['fecha_fin'])
+    # Filtro por ubicación (aplica a paquete o servicio de la reserva)
+    filtro &= filtro_ubicacion(filtros, 'reservas__paquete__', 'reservas__servicio__')
+
+    usuarios = Usuario.objects.annotate(
+        num_reservas=Count('reservas', filter=filtro),
+        reservas_pagadas=Count('reservas', filter=filtro & Q(reservas__estado='PAGADA')),
+        reservas_confirmadas=Count('reservas', filter=filtro & Q(reservas__estado='CONFIRMADA')),
+        reservas_completadas=Count('reservas', filter=filtro & Q(reservas__estado='COMPLETADA')),
+        ultima_compra=Max('reservas__fecha', filter=filtro),
+        total_gastado_usd=Coalesce(Sum(_monto_en('USD'), filter=filtro), Value(Decimal('0')), output_field=_DECIMAL),
+        total_gastado_bob=Coalesce(Sum(_monto_en('BOB'), filter=filtro), Value(Decimal('0')), output_field=_DECIMAL),
+    ).filter(num_reservas__gt=0)
+
+    # Tipo de cliente: join contra la tabla precalculada de segmentos RFM
+    if filtros.get('tipo_cliente') in ('nuevo', 'recurrente', 'vip'):
+        usuarios = usuarios.filter(segmento_rfm__tipo_cliente=filtros['tipo_cliente'])
+    if filtros.get('segmento'):
+        usuarios = usuarios.filter(segmento_rfm__segmento=filtros['segmento'])
+
+    campo_gastado = 'total_gastado_bob' if moneda == 'BOB' else 'total_gastado_usd'
+    if len(estados) == 1 and estados[0] in ('PAGADA', 'CONFIRMADA', 'COMPLETADA'):
+        campo_estado = f"reservas_{estados[0].lower()}s"
+    else:
+        campo_estado = 'num_reservas'
+
+    filas = usuarios.annotate(
+        email=Coalesce('user__email', Value('N/A')),
+        total_gastado=F(campo_gastado),
+        ticket_promedio=ExpressionWrapper(F(campo_gastado) / F('num_reservas'), output_field=_DECIMAL),
+        reservas_estado=F(campo_estado),
+        # Tipo de la segmentación RFM (historial completo), no de las reservas del rango filtrado
+        tipo=Case(
+            *[When(segmento_rfm__tipo_cliente=valor, then=Value(etiqueta))
+              for valor, etiqueta in SegmentoCliente.TIPOS_CLIENTE],
+            default=Value('Sin segmento'),
+            output_field=CharField(),
+        ),
+    )
+    seccion = _materializar(
+        filas,
+        [
+            'nombre', 'email', 'num_reservas', 'reservas_pagadas', 'reservas_confirmadas',
+            'reservas_completadas', 'reservas_estado', 'ultima_compra', 'total_gastado_usd',
+            'total_gastado_bob', 'total_gastado', 'ticket_promedio', 'tipo',
+        ],
+        conversores={
+            'total_gastado_usd': _a_float,
+            'total_gastado_bob': _a_float,
+            'total_gastado': _a_float,
+            'ticket_promedio': _a_float,
+        },
+    )
+
+    agregados = usuarios.aggregate(
+        total_clientes=Count('id'),
+        total_reservas=Sum('num_reservas'),
+        ingresos_totales=Sum(campo_gastado),
+    )
+    total_clientes = agregados['total_clientes'] or 0
+    ingresos = float(agregados['ingresos_totales'] or 0)
+    return DatasetReporte(
+        tipo='clientes',
+        filtros={**filtros, 'estado': ','.join(estados)},
+        secciones={'clientes': seccion},
+        resumen={
+            'total_clientes': total_clientes,
+            'total_reservas': agregados['total_reservas'] or 0,
+            'ingresos_totales': ingresos,
+            'promedio_por_cliente': ingresos / total_clientes if total_clientes else 0,
+            'simbolo_moneda': 'Bs.' if moneda == 'BOB' else '$',
+            'moneda': moneda,
+        },
+    )
+
+
+# ============================================================================
+# 📦 PRODUCTOS
+# ============================================================================
+
+COLUMNAS_PRODUCTO = [
+    ('nombre', 'nombre_producto'), ('tipo', 'tipo_producto'), ('categoria', 'categoria_nombre'),
+    ('departamento', 'departamento_nombre'), ('precio', 'precio_producto'), ('precio_bob', 'precio_producto_bob'),
+    'num_ventas', 'total_ventas_usd', 'total_ventas_bob', 'tasa_conversion',
+]
+
+
+def _anotar_ventas_producto(queryset, filtro):
+    return queryset.annotate(
+        num_ventas=Count('reservas', filter=filtro),
+        total_reservas=Count('reservas'),  # Total de reservas (incluyendo canceladas)
+        total_ventas_usd=Coalesce(Sum(_monto_en('USD'), filter=filtro), Value(Decimal('0')), output_field=_DECIMAL),
+        total_ventas_bob=Coalesce(Sum(_monto_en('BOB'), filter=filtro), Value(Decimal('0')), output_field=_DECIMAL),
+    ).filter(num_ventas__gt=0).annotate(
+        # Tasa de conversión: ventas confirmadas / total reservas
+        tasa_conversion=Case(
+            When(total_reservas=0, then=Value(0.0)),
+            default=ExpressionWrapper(F('num_ventas') * 100.0 / F('total_reservas'), output_field=FloatField()),
+            output_field=FloatField(),
+        ),
+        departamento_nombre=Coalesce('departamento_canonico__nombre', 'departamento', Value('N/A')),
+    ).order_by('-total_ventas_usd')
+
+
+def dataset_productos(filtros) -> DatasetReporte:
+    """
+    Rendimiento de paquetes y servicios vendidos.
+
+    filtros: tipo_producto (paquete|servicio), moneda, fecha_inicio, fecha_fin,
+    departamento, ciudad (o departamento_id, ciudad_id)
+    """
+    tipo_producto = filtros.get('tipo_producto')
+    filtro = Q(reservas__estado__in=ESTADOS_VENTA)
+    if filtros.get('fecha_inicio'):
+        filtro &= Q(reservas__fecha__gte=filtros['fecha_inicio'])
+    if filtros.get('fecha_fin'):
+        filtro &= Q(reservas__fecha__lte=filtros['fecha_fin'])
+
+    conversores = {
+        'precio': _a_float,
+        'precio_bob': _a_float,
+        'total_ventas_usd': _a_float,
+        'total_ventas_bob': _a_float,
+        'tasa_conversion': lambda v: round(v or 0, 1),
+    }
+    secciones = {}
+    totales_usd = Decimal('0')
+    totales_bob = Decimal('0')
+
+    lugar = filtro_ubicacion(filtros)
+
+    if not tipo_producto or tipo_producto == 'paquete':
+        # Categoría del primer servicio del paquete
+        categoria = Servicio.objects.filter(paquetes=OuterRef('pk')).order_by('pk').values('categoria__nombre')[:1]
+        paquetes = _anotar_ventas_producto(Paquete.objects.filter(lugar), filtro)
+        agregados = paquetes.aggregate(usd=Sum('total_ventas_usd'), bob=Sum('total_ventas_bob'))
+        totales_usd += agregados['usd'] or 0
+        totales_bob += agregados['bob'] or 0
+        secciones['paquetes'] = _materializar(
+            paquetes.annotate(
+                nombre_producto=F('nombre'),
+                tipo_producto=Value('Paquete', output_field=CharField()),
+                categoria_nombre=Coalesce(Subquery(categoria), Value('Paquete Turístico')),
+                precio_producto=F('precio_base'),
+                precio_producto_bob=ExpressionWrapper(F('precio_base') * TASA_CAMBIO_BOB, output_field=_DECIMAL),
+            ),
+            COLUMNAS_PRODUCTO,
+            conversores,
+        )
+
+    if not tipo_producto or tipo_producto == 'servicio':
+        servicios = _anotar_ventas_producto(Servicio.objects.filter(lugar), filtro)
+        agregados = servicios.aggregate(usd=Sum('total_ventas_usd'), bob=Sum('total_ventas_bob'))
+        totales_usd += agregados['usd'] or 0
+        totales_bob += agregados['bob'] or 0
+        secciones['servicios'] = _materializar(
+            servicios.annotate(
+                nombre_producto=F('titulo'),
+                tipo_producto=Value('Servicio', output_field=CharField()),
+                categoria_nombre=Coalesce('categoria__nombre', Value('N/A')),
+                precio_producto=F('precio_usd'),
+                precio_producto_bob=ExpressionWrapper(F('precio_usd') * TASA_CAMBIO_BOB, output_field=_DECIMAL),
+            ),
+            COLUMNAS_PRODUCTO,
+            conversores,
+        )
+
+    dataset = DatasetReporte(tipo='productos', filtros=filtros, secciones=secciones)
+    primeros = [s.columnas for s in secciones.values() if len(s)]
+    mas_vendido = max(primeros, key=lambda c: c['total_ventas_usd'][0])['nombre'][0] if primeros else 'N/A'
+    moneda = dataset.moneda
+    dataset.resumen = {
+        'total_productos': dataset.total_registros,
+        'ventas_totales_usd': float(totales_usd),
+        'ventas_totales_bob': float(totales_bob),
+        'ventas_totales': float(totales_bob if moneda == 'BOB' else totales_usd),
+        'producto_mas_vendido': mas_vendido,
+        'simbolo_moneda': 'Bs.' if moneda == 'BOB' else '$',
+        'moneda': moneda,
+    }
+    return dataset
+
+
+def productos_combinados(dataset: DatasetReporte, alias=None) -> List[dict]:
+    """Paquetes y servicios intercalados por ventas en USD (ambos ya vienen ordenados)."""
+    return list(heapq.merge(
+        dataset.registros('paquetes', alias),
+        dataset.registros('servicios', alias),
+        key=lambda r: r.get('total_ventas_usd', 0),
+        reverse=True,
+    ))
@@ -1,15 +1,22 @@
 """
 Utilidades para exportación de reportes a PDF y Excel.
 """
+import multiprocessing
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib import colors
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
+from reportlab.platypus import SimpleDocTemplate, Table, LongTable, TableStyle, Paragraph, Spacer, PageBreak
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
 from io import BytesIO
+from functools import lru_cache
+from types import GeneratorType
 from datetime import datetime, date
 from decimal import Decimal
+from xml.sax.saxutils import escape
 
 from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
@@ -22,54 +29,153 @@ from docx import Document
 from docx.shared import Inches, Pt, RGBColor
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.enum.table import WD_TABLE_ALIGNMENT, WD_ALIGN_VERTICAL
+from docx.enum.style import WD_STYLE_TYPE
 from docx.oxml.ns import nsdecls
 from docx.oxml import parse_xml
 
 
+# Filas por bloque al renderizar tablas largas en PDF. reportlab calcula el
+# layout de cada tabla completa, así que una tabla única de miles de filas
+# escala mal en tiempo y memoria; en bloques el costo crece linealmente.
+TAMANO_BLOQUE_PDF = 250
+
+# Filas de datos que se parsean juntas al armar tablas DOCX grandes (ver
+# ``_agregar_tabla_docx``).
+TAMANO_BLOQUE_DOCX = 500
+
+
+@lru_cache(maxsize=1)
+def _hoja_estilos_pdf():
+    """Hoja de estilos base + estilos personalizados, creada una sola vez por proceso."""
+    styles = getSampleStyleSheet()
+    _crear_estilos_personalizados(styles)
+    return styles
+
+
+def _crear_estilos_personalizados(styles):
+    """Crea estilos personalizados para el documento."""
+    # Estilo para título principal
+    styles.add(ParagraphStyle(
+        name='TituloReporte',
+        parent=styles['Title'],
+        fontSize=20,
+        textColor=colors.HexColor('#2C3E50'),
+        spaceAfter=30,
+        alignment=TA_CENTER,
+        fontName='Helvetica-Bold'
+    ))
+    
+    # Estilo para subtítulos
+    styles.add(ParagraphStyle(
+        name='SubtituloReporte',
+        parent=styles['Heading2'],
+        fontSize=14,
+        textColor=colors.HexColor('#34495E'),
+        spaceAfter=12,
+        spaceBefore=12,
+        fontName='Helvetica-Bold'
+    ))
+    
+    # Estilo para información
+    styles.add(ParagraphStyle(
+        name='InfoReporte',
+        parent=styles['Normal'],
+        fontSize=10,
+        textColor=colors.HexColor('#7F8C8D'),
+        spaceAfter=6
+    ))
+
+
+@lru_cache(maxsize=None)
+def _estilo_tabla_detalle(color_encabezado, columna_numerica=2):
+    """TableStyle compartido por todos los bloques de una tabla de detalle."""
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor(color_encabezado)),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('ALIGN', (columna_numerica, 1), (-1, -1), 'RIGHT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 8),
+        ('FONTSIZE', (0, 1), (-1, -1), 7),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+        ('TOPPADDING', (0, 1), (-1, -1), 4),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), 4),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#BDC3C7')),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#ECF0F1')])
+    ])
+
+
+def _tablas_por_bloques(encabezados, filas, col_widths, estilo, tamano_bloque=TAMANO_BLOQUE_PDF):
+    """
+    Genera LongTables de ``tamano_bloque`` filas (con encabezado repetido)
+    a partir de un iterable de filas, sin materializar la tabla completa.
+    """
+    lote = []
+    for fila in filas:
+        lote.append(fila)
+        if len(lote) >= tamano_bloque:
+            yield LongTable([encabezados] + lote, colWidths=col_widths, repeatRows=1, style=estilo)
+            lote = []
+    if lote:
+        yield LongTable([encabezados] + lote, colWidths=col_widths, repeatRows=1, style=estilo)
+
+
+class _FlowablesPerezosos(list):
+    """
+    Lista de flowables que se rellena bajo demanda.
+
+    Recibe el ``story`` del reporte, donde las secciones largas pueden ser
+    generadores de bloques (ver ``_tablas_por_bloques``). ``doc.build``
+    consume la lista por el frente (``del flowables[0]``), así que solo se
+    mantienen en memoria unos pocos bloques a la vez.
+    """
+
+    def __init__(self, story, minimo=2):
+        super().__init__()
+        self._generador = self._aplanar(story)
+        self._minimo = minimo
+        self._rellenar()
+
+    @staticmethod
+    def _aplanar(story):
+        for item in story:
+            if isinstance(item, GeneratorType):
+                yield from item
+            else:
+                yield item
+
+    def _rellenar(self):
+        while self._generador is not None and list.__len__(self) < self._minimo:
+            try:
+                self.append(next(self._generador))
+            except StopIteration:
+                self._generador = None
+
+    def __delitem__(self, indice):
+        super().__delitem__(indice)
+        self._rellenar()
+
+
+def _construir_pdf(doc, story, destino):
+    """Construye el PDF consumiendo el story de forma perezosa."""
+    doc.build(_FlowablesPerezosos(story))
+    if hasattr(destino, 'seek'):
+        destino.seek(0)
+    return destino
+
+
 class ExportadorReportesPDF:
     """
     Clase para generar reportes en formato PDF con estructura profesional.
     """
     
-    def __init__(self, moneda='USD'):
-        self.styles = getSampleStyleSheet()
+    def __init__(self, moneda='USD', tamano_bloque=TAMANO_BLOQUE_PDF):
+        # La hoja de estilos se comparte entre instancias: solo se lee al renderizar
+        self.styles = _hoja_estilos_pdf()
+        self.tamano_bloque = tamano_bloque
         self.moneda = moneda  # USD o BOB
         self.simbolo_moneda = '$' if moneda == 'USD' else 'Bs.'
         self.tasa_cambio = 6.96  # 1 USD = 6.96 BOB
-        self._crear_estilos_personalizados()
-    
-    def _crear_estilos_personalizados(self):
-        """Crea estilos personalizados para el documento."""
-        # Estilo para título principal
-        self.styles.add(ParagraphStyle(
-            name='TituloReporte',
-            parent=self.styles['Title'],
-            fontSize=20,
-            textColor=colors.HexColor('#2C3E50'),
-            spaceAfter=30,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold'
-        ))
-        
-        # Estilo para subtítulos
-        self.styles.add(ParagraphStyle(
-            name='SubtituloReporte',
-            parent=self.styles['Heading2'],
-            fontSize=14,
-            textColor=colors.HexColor('#34495E'),
-            spaceAfter=12,
-            spaceBefore=12,
-            fontName='Helvetica-Bold'
-        ))
-        
-        # Estilo para información
-        self.styles.add(ParagraphStyle(
-            name='InfoReporte',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            textColor=colors.HexColor('#7F8C8D'),
-            spaceAfter=6
-        ))
     
     def _formatear_valor(self, valor, convertir_moneda=True):
         """
@@ -105,11 +211,14 @@ class ExportadorReportesPDF:
         
         return str(valor)
     
-    def generar_reporte_ventas_general(self, reporte_data, titulo="Reporte de Ventas General"):
+    def generar_reporte_ventas_general(self, reporte_data, titulo="Reporte de Ventas General", destino=None):
         """
         Genera PDF para reporte de ventas general.
+
+        Si ``destino`` es una ruta (o archivo abierto) el PDF se escribe ahí
+        directamente en vez de acumularse en un BytesIO.
         """
-        buffer = BytesIO()
+        buffer = destino if destino is not None else BytesIO()
         doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.75*inch, bottomMargin=0.75*inch)
         story = []
         
@@ -259,16 +368,40 @@ class ExportadorReportesPDF:
             ]))
             story.append(table_clientes)
         
+        # Detalle de ventas (tabla larga renderizada por bloques)
+        ventas = reporte_data.get('ventas', [])
+        if ventas:
+            story.append(PageBreak())
+            story.append(Paragraph("Detalle de Ventas", self.styles['SubtituloReporte']))
+            filas = (
+                [
+                    str(venta.get('fecha', 'N/A')),
+                    str(venta.get('cliente', 'N/A'))[:28],
+                    str(venta.get('producto', 'N/A'))[:32],
+                    str(venta.get('tipo', 'N/A')),
+                    self._formatear_valor(venta.get('monto')),
+                    str(venta.get('estado', 'N/A')),
+                ]
+                for venta in ventas
+            )
+            story.append(_tablas_por_bloques(
+                ['Fecha', 'Cliente', 'Producto', 'Tipo', 'Monto', 'Estado'],
+                filas,
+                [0.9*inch, 1.8*inch, 2.1*inch, 0.8*inch, 1.0*inch, 0.9*inch],
+                _estilo_tabla_detalle('#2980B9', columna_numerica=4),
+                self.tamano_bloque,
+            ))
+        
         # Construir PDF
-        doc.build(story)
-        buffer.seek(0)
-        return buffer
+        return _construir_pdf(doc, story, buffer)
     
-    def generar_reporte_clientes(self, reporte_data, titulo="Reporte de Clientes"):
+    def generar_reporte_clientes(self, reporte_data, titulo="Reporte de Clientes", destino=None):
         """
         Genera PDF para reporte de clientes.
+
+        Todos los clientes se incluyen; la tabla se renderiza por bloques.
         """
-        buffer = BytesIO()
+        buffer = destino if destino is not None else BytesIO()
         doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=0.75*inch, bottomMargin=0.75*inch)
         story = []
         
@@ -290,55 +423,43 @@ class ExportadorReportesPDF:
         if clientes:
             story.append(Paragraph("Detalle de Clientes", self.styles['SubtituloReporte']))
             
-            data_clientes = [[
+            encabezados = [
                 'Cliente', 'Email', 'Total Gastado', 
                 'Reservas', 'Ticket Prom.', 'Última Compra'
-            ]]
+            ]
             
-            for cliente in clientes[:50]:  # Limitar a 50 clientes por página
-                ultima_compra = cliente.get('ultima_compra')
-                # Aceptar tanto datetime como date
-                if isinstance(ultima_compra, (datetime, date)):
-                    ultima_compra = ultima_compra.strftime('%d/%m/%Y')
-                
-                data_clientes.append([
-                    cliente.get('cliente__nombre', 'N/A')[:25],
-                    cliente.get('cliente__user__email', 'N/A')[:30],  # Email del User de Django
-                    self._formatear_valor(cliente.get('total_gastado')),
-                    str(cliente.get('cantidad_reservas', 0)),
-                    self._formatear_valor(cliente.get('ticket_promedio')),
-                    str(ultima_compra) if ultima_compra else 'N/A'
-                ])
+            def filas_clientes():
+                for cliente in clientes:
+                    ultima_compra = cliente.get('ultima_compra')
+                    # Aceptar tanto datetime como date
+                    if isinstance(ultima_compra, (datetime, date)):
+                        ultima_compra = ultima_compra.strftime('%d/%m/%Y')
+                    
+                    yield [
+                        cliente.get('cliente__nombre', 'N/A')[:25],
+                        cliente.get('cliente__user__email', 'N/A')[:30],  # Email del User de Django
+                        self._formatear_valor(cliente.get('total_gastado')),
+                        str(cliente.get('cantidad_reservas', 0)),
+                        self._formatear_valor(cliente.get('ticket_promedio')),
+                        str(ultima_compra) if ultima_compra else 'N/A'
+                    ]
             
             # Ajuste de anchos: dar más espacio al Email
-            table_clientes = Table(data_clientes, colWidths=[
-                1.6*inch, 2.0*inch, 1.2*inch, 0.8*inch, 1.0*inch, 1.2*inch
-            ])
-            table_clientes.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498DB')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('ALIGN', (2, 1), (-1, -1), 'RIGHT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 8),
-                ('FONTSIZE', (0, 1), (-1, -1), 7),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-                ('TOPPADDING', (0, 1), (-1, -1), 4),
-                ('BOTTOMPADDING', (0, 1), (-1, -1), 4),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#BDC3C7')),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#ECF0F1')])
-            ]))
-            story.append(table_clientes)
-        
-        doc.build(story)
-        buffer.seek(0)
-        return buffer
+            story.append(_tablas_por_bloques(
+                encabezados,
+                filas_clientes(),
+                [1.6*inch, 2.0*inch, 1.2*inch, 0.8*inch, 1.0*inch, 1.2*inch],
+                _estilo_tabla_detalle('#3498DB', columna_numerica=2),
+                self.tamano_bloque,
+            ))
+        
+        return _construir_pdf(doc, story, buffer)
     
-    def generar_reporte_productos(self, reporte_data, titulo="Reporte de Productos"):
+    def generar_reporte_productos(self, reporte_data, titulo="Reporte de Productos", destino=None):
         """
         Genera PDF para reporte de productos con filtros aplicados.
         """
-        buffer = BytesIO()
+        buffer = destino if destino is not None else BytesIO()
         doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.75*inch, bottomMargin=0.75*inch)
         story = []
         filtros = reporte_data.get('filtros_aplicados', {})
@@ -526,9 +647,7 @@ class ExportadorReportesPDF:
             ]))
             story.append(table_servicios)
         
-        doc.build(story)
-        buffer.seek(0)
-        return buffer
+        return _construir_pdf(doc, story, buffer)
 
 
 class ExportadorReportesExcel:
@@ -1114,6 +1233,88 @@ class ExportadorReportesExcel:
         return buffer
 
 
+# ============================================================================
+# 📝 TABLAS DOCX GRANDES
+# ============================================================================
+# ``table.add_row()`` de python-docx recorre la tabla completa en cada fila y
+# asignar texto, fuente y ancho celda por celda crea objetos proxy y
+# elementos XML uno a uno, así que una tabla de miles de filas tarda minutos.
+# Aquí el encabezado se arma con python-docx (una sola fila) y las filas de
+# datos se generan como texto XML a partir de una plantilla por tabla, se
+# parsean por bloques y se agregan al <w:tbl>. El formato de las celdas
+# vive en un estilo de párrafo compartido en lugar de repetirse en cada run.
+
+def _estilo_celda_docx(doc, tamano_fuente):
+    """Estilo de párrafo de las celdas de datos (uno por documento y tamaño de fuente)."""
+    nombre = f'Celda Reporte {tamano_fuente}'
+    try:
+        return doc.styles[nombre]
+    except KeyError:
+        estilo = doc.styles.add_style(nombre, WD_STYLE_TYPE.PARAGRAPH)
+        estilo.base_style = doc.styles['Normal']
+        estilo.font.size = Pt(tamano_fuente)
+        estilo.paragraph_format.space_after = Pt(0)
+        return estilo
+
+
+def _plantilla_fila_docx(estilo_id, anchos, alineaciones):
+    """Plantilla ``str.format`` de un <w:tr> con un campo por columna."""
+    celdas = []
+    for ancho, alineacion in zip(anchos, alineaciones):
+        justificacion = f'<w:jc w:val="{alineacion}"/>' if alineacion else ''
+        celdas.append(
+            f'<w:tc><w:tcPr><w:tcW w:w="{ancho.twips}" w:type="dxa"/></w:tcPr>'
+            f'<w:p><w:pPr><w:pStyle w:val="{estilo_id}"/>{justificacion}</w:pPr>'
+            '<w:r><w:t xml:space="preserve">{}</w:t></w:r></w:p></w:tc>'
+        )
+    return '<w:tr>' + ''.join(celdas) + '</w:tr>'
+
+
+def _agregar_tabla_docx(doc, encabezados, filas, anchos, alineaciones=None, tamano_fuente=9,
+                        tamano_bloque=TAMANO_BLOQUE_DOCX):
+    """
+    Agrega una tabla con encabezado azul y una fila por elemento de
+    ``filas`` (iterable de textos por columna). ``alineaciones`` admite
+    None (izquierda), 'center' o 'right' por columna.
+    """
+    tabla = doc.add_table(rows=1, cols=len(encabezados))
+    tabla.style = 'Light Grid Accent 1'
+    for celda, encabezado, ancho in zip(tabla.rows[0].cells, encabezados, anchos):
+        celda.text = encabezado
+        celda.width = ancho
+        celda._tc.get_or_add_tcPr().append(parse_xml(r'<w:shd {} w:fill="2980B9"/>'.format(nsdecls('w'))))
+        for run in celda.paragraphs[0].runs:
+            run.font.bold = True
+            run.font.color.rgb = RGBColor(255, 255, 255)
+            run.font.size = Pt(11)
+    for columna, ancho in zip(tabla.columns, anchos):
+        columna.width = ancho
+
+    plantilla = _plantilla_fila_docx(
+        _estilo_celda_docx(doc, tamano_fuente).style_id, anchos, alineaciones or [None] * len(encabezados)
+    )
+    apertura, cierre = f'<w:tbl {nsdecls("w")}>', '</w:tbl>'
+    tbl = tabla._tbl
+    bloque = []
+    for fila in filas:
+        bloque.append(plantilla.format(*(escape(str(valor)) for valor in fila)))
+        if len(bloque) >= tamano_bloque:
+            tbl.extend(list(parse_xml(apertura + ''.join(bloque) + cierre)))
+            bloque = []
+    if bloque:
+        tbl.extend(list(parse_xml(apertura + ''.join(bloque) + cierre)))
+    return tabla
+
+
+def _guardar_docx(doc, destino):
+    """Escribe el paquete en ``destino`` (ruta o archivo) o en un BytesIO nuevo."""
+    buffer = destino if destino is not None else BytesIO()
+    doc.save(buffer)
+    if hasattr(buffer, 'seek'):
+        buffer.seek(0)
+    return buffer
+
+
 class ExportadorReportesWord:
     """
     Clase para generar reportes de clientes en formato Word (DOCX) con estructura profesional.
@@ -1128,7 +1329,7 @@ class ExportadorReportesWord:
             'texto': RGBColor(0, 0, 0),
         }
     
-    def generar_reporte_clientes(self, datos_reporte):
+    def generar_reporte_clientes(self, datos_reporte, destino=None):
         """
         Genera un reporte de clientes en formato Word.
         
@@ -1137,9 +1338,10 @@ class ExportadorReportesWord:
                 - resumen (dict): Resumen general
                 - clientes (list): Lista de clientes
                 - filtros (dict): Filtros aplicados
+            destino: Ruta o archivo donde escribir el DOCX (opcional)
         
         Returns:
-            BytesIO: Buffer con el documento Word generado
+            BytesIO: Buffer con el documento Word generado (o ``destino`` si se indicó)
         """
         
         
@@ -1290,65 +1492,24 @@ class ExportadorReportesWord:
         if not clientes:
             doc.add_paragraph('No se encontraron clientes con los filtros aplicados.')
         else:
-            # Tabla de clientes
-            num_cols = 5
-            table_clientes = doc.add_table(rows=1, cols=num_cols)
-            table_clientes.style = 'Light Grid Accent 1'
-            
-            # Encabezados
-            headers = ['Cliente', 'Email', 'Total Reservas', 
+            # Tabla de clientes (filas generadas en bloque, ver _agregar_tabla_docx)
+            headers = ['Cliente', 'Email', 'Total Reservas',
                       f'Total Gastado ({simbolo})', 'Tipo Cliente']
-            
-            header_cells = table_clientes.rows[0].cells
-            for i, header in enumerate(headers):
-                header_cells[i].text = header
-                
-                # Fondo azul para encabezados
-                shading_elm = parse_xml(r'<w:shd {} w:fill="2980B9"/>'.format(nsdecls('w')))
-                header_cells[i]._tc.get_or_add_tcPr().append(shading_elm)
-                
-                cell_paragraph = header_cells[i].paragraphs[0]
-                cell_paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                for run in cell_paragraph.runs:
-                    run.font.bold = True
-                    run.font.color.rgb = RGBColor(255, 255, 255)
-                    run.font.size = Pt(10)
-            
-            # Datos de clientes
-            for cliente in clientes:
-                row_cells = table_clientes.add_row().cells
-                
-                # Nombre del cliente
-                nombre_cliente = cliente.get('cliente__nombre', 'N/A')
-                row_cells[0].text = nombre_cliente
-                
-                # Email
-                row_cells[1].text = cliente.get('cliente__user__email', 'N/A')
-                
-                # Total reservas
-                row_cells[2].text = str(cliente.get('cantidad_reservas', 0))
-                row_cells[2].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
-                
-                # Total gastado
-                total = cliente.get('total_gastado', 0)
-                row_cells[3].text = f"{simbolo}{float(total):,.2f}"
-                row_cells[3].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.RIGHT
-                
-                # Tipo de cliente
-                tipo_cliente = cliente.get('tipo_cliente', 'N/A')
-                row_cells[4].text = tipo_cliente.title()
-                row_cells[4].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
-                
-                # Ajustar tamaño de fuente en celdas
-                for cell in row_cells:
-                    for paragraph in cell.paragraphs:
-                        for run in paragraph.runs:
-                            run.font.size = Pt(9)
-            
-            # Ajustar anchos de columna
-            for i, width in enumerate([Inches(1.8), Inches(2.2), Inches(1.0), Inches(1.5), Inches(1.2)]):
-                for row in table_clientes.rows:
-                    row.cells[i].width = width
+            filas = (
+                (
+                    cliente.get('cliente__nombre', 'N/A'),
+                    cliente.get('cliente__user__email', 'N/A'),
+                    cliente.get('cantidad_reservas', 0),
+                    f"{simbolo}{float(cliente.get('total_gastado', 0)):,.2f}",
+                    (cliente.get('tipo_cliente') or 'N/A').title(),
+                )
+                for cliente in clientes
+            )
+            _agregar_tabla_docx(
+                doc, headers, filas,
+                anchos=[Inches(1.8), Inches(2.2), Inches(1.0), Inches(1.5), Inches(1.2)],
+                alineaciones=[None, None, 'center', 'right', 'center'],
+            )
         
         # ============================================
         # 5. PIE DE PÁGINA
@@ -1368,13 +1529,9 @@ class ExportadorReportesWord:
         info_run.font.color.rgb = RGBColor(150, 150, 150)
         info_run.italic = True
         
-        # Guardar en buffer
-        buffer = BytesIO()
-        doc.save(buffer)
-        buffer.seek(0)
-        return buffer
+        return _guardar_docx(doc, destino)
     
-    def generar_reporte_ventas(self, datos_reporte):
+    def generar_reporte_ventas(self, datos_reporte, destino=None):
         """
         Genera un reporte de ventas en formato Word.
         
@@ -1383,9 +1540,10 @@ class ExportadorReportesWord:
                 - resumen (dict): Resumen general de ventas
                 - ventas (list): Lista de ventas
                 - filtros (dict): Filtros aplicados
+            destino: Ruta o archivo donde escribir el DOCX (opcional)
         
         Returns:
-            BytesIO: Buffer con el documento Word generado
+            BytesIO: Buffer con el documento Word generado (o ``destino`` si se indicó)
         """
         doc = Document()
         
@@ -1501,45 +1659,21 @@ class ExportadorReportesWord:
             for run in detalle_heading.runs:
                 run.font.color.rgb = self.colores['subtitulo']
             
-            # Tabla de ventas
-            table_ventas = doc.add_table(rows=1, cols=5)
-            table_ventas.style = 'Light Grid Accent 1'
-            
-            # Encabezados
-            hdr_cells = table_ventas.rows[0].cells
-            headers = ['Cliente', 'Producto', 'Fecha', 'Monto', 'Estado']
-            for i, header in enumerate(headers):
-                hdr_cells[i].text = header
-            
-            # Formato de encabezados
-            for cell in hdr_cells:
-                shading_elm = parse_xml(r'<w:shd {} w:fill="2980B9"/>'.format(nsdecls('w')))
-                cell._tc.get_or_add_tcPr().append(shading_elm)
-                for paragraph in cell.paragraphs:
-                    for run in paragraph.runs:
-                        run.font.bold = True
-                        run.font.color.rgb = RGBColor(255, 255, 255)
-                        run.font.size = Pt(11)
-            
-            # Datos de ventas
-            for venta in ventas[:50]:  # Limitar a 50 ventas
-                row_cells = table_ventas.add_row().cells
-                row_cells[0].text = venta.get('cliente', 'N/A')
-                row_cells[1].text = venta.get('producto', 'N/A')
-                row_cells[2].text = venta.get('fecha', 'N/A')
-                row_cells[3].text = f"{simbolo_moneda}{venta.get('monto', 0):,.2f}"
-                row_cells[4].text = venta.get('estado', 'N/A')
-                
-                # Ajustar tamaño de fuente
-                for cell in row_cells:
-                    for paragraph in cell.paragraphs:
-                        for run in paragraph.runs:
-                            run.font.size = Pt(9)
-            
-            # Ajustar anchos de columna
-            for i, width in enumerate([Inches(1.8), Inches(2.2), Inches(1.0), Inches(1.2), Inches(1.0)]):
-                for row in table_ventas.rows:
-                    row.cells[i].width = width
+            # Tabla de ventas (todas las filas, generadas en bloque)
+            filas = (
+                (
+                    venta.get('cliente', 'N/A'),
+                    venta.get('producto', 'N/A'),
+                    venta.get('fecha', 'N/A'),
+                    f"{simbolo_moneda}{venta.get('monto', 0):,.2f}",
+                    venta.get('estado', 'N/A'),
+                )
+                for venta in ventas
+            )
+            _agregar_tabla_docx(
+                doc, ['Cliente', 'Producto', 'Fecha', 'Monto', 'Estado'], filas,
+                anchos=[Inches(1.8), Inches(2.2), Inches(1.0), Inches(1.2), Inches(1.0)],
+            )
         
         # ============================================
         # 5. PIE DE PÁGINA
@@ -1559,13 +1693,9 @@ class ExportadorReportesWord:
         info_run.font.color.rgb = RGBColor(150, 150, 150)
         info_run.italic = True
         
-        # Guardar en buffer
-        buffer = BytesIO()
-        doc.save(buffer)
-        buffer.seek(0)
-        return buffer
+        return _guardar_docx(doc, destino)
     
-    def generar_reporte_productos(self, datos_reporte):
+    def generar_reporte_productos(self, datos_reporte, destino=None):
         """
         Genera un reporte de productos/paquetes en formato Word.
         
@@ -1574,9 +1704,10 @@ class ExportadorReportesWord:
                 - resumen (dict): Resumen general
                 - productos (list): Lista de productos
                 - filtros (dict): Filtros aplicados
+            destino: Ruta o archivo donde escribir el DOCX (opcional)
         
         Returns:
-            BytesIO: Buffer con el documento Word generado
+            BytesIO: Buffer con el documento Word generado (o ``destino`` si se indicó)
         """
         doc = Document()
         
@@ -1705,54 +1836,24 @@ class ExportadorReportesWord:
             moneda = resumen.get('moneda', 'USD')
             simbolo_moneda = resumen.get('simbolo_moneda', '$')
             
-            # Tabla de productos con 5 columnas
-            table_productos = doc.add_table(rows=1, cols=5)
-            table_productos.style = 'Light Grid Accent 1'
-            
-            # Encabezados
-            hdr_cells = table_productos.rows[0].cells
-            headers = ['Nombre', 'Categoría', 'Precio', 'Ventas', 'Conv. %']
-            for i, header in enumerate(headers):
-                hdr_cells[i].text = header
-            
-            # Formato de encabezados
-            for cell in hdr_cells:
-                shading_elm = parse_xml(r'<w:shd {} w:fill="2980B9"/>'.format(nsdecls('w')))
-                cell._tc.get_or_add_tcPr().append(shading_elm)
-                for paragraph in cell.paragraphs:
-                    for run in paragraph.runs:
-                        run.font.bold = True
-                        run.font.color.rgb = RGBColor(255, 255, 255)
-                        run.font.size = Pt(11)
-            
-            # Datos de productos
-            for producto in productos[:50]:  # Limitar a 50 productos
-                row_cells = table_productos.add_row().cells
-                row_cells[0].text = producto.get('nombre', 'N/A')
-                row_cells[1].text = producto.get('categoria', 'N/A')
-                row_cells[2].text = f"{simbolo_moneda}{producto.get('precio', 0):,.2f}"
-                
-                # Ventas según moneda seleccionada
-                if moneda == 'USD':
-                    ventas = producto.get('total_ventas_usd', 0)
-                elif moneda == 'BOB':
-                    ventas = producto.get('total_ventas_bob', 0)
-                else:  # AMBAS
-                    ventas = producto.get('total_ventas_usd', 0)
-                
-                row_cells[3].text = f"{simbolo_moneda}{ventas:,.2f}"
-                row_cells[4].text = f"{producto.get('tasa_conversion', 0):.1f}%"
-                
-                # Ajustar tamaño de fuente
-                for cell in row_cells:
-                    for paragraph in cell.paragraphs:
-                        for run in paragraph.runs:
-                            run.font.size = Pt(9)
-            
-            # Ajustar anchos de columna
-            for i, width in enumerate([Inches(2.5), Inches(1.5), Inches(1.2), Inches(1.5), Inches(0.8)]):
-                for row in table_productos.rows:
-                    row.cells[i].width = width
+            # Ventas según moneda seleccionada (AMBAS muestra USD)
+            campo_ventas = 'total_ventas_bob' if moneda == 'BOB' else 'total_ventas_usd'
+            
+            # Tabla de productos con 5 columnas (todas las filas, generadas en bloque)
+            filas = (
+                (
+                    producto.get('nombre', 'N/A'),
+                    producto.get('categoria', 'N/A'),
+                    f"{simbolo_moneda}{producto.get('precio', 0):,.2f}",
+                    f"{simbolo_moneda}{producto.get(campo_ventas, 0):,.2f}",
+                    f"{producto.get('tasa_conversion', 0):.1f}%",
+                )
+                for producto in productos
+            )
+            _agregar_tabla_docx(
+                doc, ['Nombre', 'Categoría', 'Precio', 'Ventas', 'Conv. %'], filas,
+                anchos=[Inches(2.5), Inches(1.5), Inches(1.2), Inches(1.5), Inches(0.8)],
+            )
         
         # ============================================
         # 5. PIE DE PÁGINA
@@ -1772,470 +1873,270 @@ class ExportadorReportesWord:
         info_run.font.color.rgb = RGBColor(150, 150, 150)
         info_run.italic = True
         
-        # Guardar en buffer
-        buffer = BytesIO()
-        doc.save(buffer)
-        buffer.seek(0)
-        return buffer
+        return _guardar_docx(doc, destino)
 
 
 # ============================================================================
 # 🎯 FUNCIONES WRAPPER PARA views_reportes.py
 # ============================================================================
 
-def exportar_reporte_pdf(datos, tipo_reporte, filtros):
+# ============================================================================
+# 🔁 WRAPPERS: DatasetReporte → estructuras de cada exportador
+# ============================================================================
+# Los tres formatos consumen el mismo DatasetReporte (ver dataset_reportes.py):
+# filas, separación paquetes/servicios y totales ya vienen calculados desde la
+# base de datos. Aquí solo se renombran columnas a las claves que lee cada
+# exportador.
+
+ALIAS_PAQUETES = {
+    'nombre': 'paquete__nombre',
+    'categoria': 'paquete__categoria__nombre',
+    'departamento': 'paquete__departamento',
+    'precio': ('paquete__precio_base', 'paquete__precio_base_usd'),
+    'precio_bob': 'paquete__precio_base_bob',
+    'num_ventas': 'cantidad_vendida',
+    'total_ventas_usd': 'ventas_totales_usd',
+    'total_ventas_bob': 'ventas_totales_bob',
+}
+
+ALIAS_SERVICIOS = {
+    'nombre': 'servicio__titulo',
+    'categoria': 'servicio__categoria__nombre',
+    'departamento': 'servicio__departamento',
+    'precio': 'servicio__precio_usd',
+    'precio_bob': 'servicio__precio_bob',
+    'num_ventas': 'cantidad_vendida',
+    'total_ventas_usd': 'ventas_totales_usd',
+    'total_ventas_bob': 'ventas_totales_bob',
+}
+
+ALIAS_CLIENTES = {
+    'nombre': 'cliente__nombre',
+    'email': 'cliente__user__email',
+    'num_reservas': 'cantidad_reservas',
+    'tipo': 'tipo_cliente',
+}
+
+ETIQUETAS_ESTADO = {
+    'PAGADA': 'Reservas Pagadas',
+    'CONFIRMADA': 'Reservas Confirmadas',
+    'COMPLETADA': 'Reservas Completadas',
+}
+
+
+def _datos_productos(dataset):
+    return {
+        'paquetes': dataset.registros('paquetes', ALIAS_PAQUETES),
+        'servicios': dataset.registros('servicios', ALIAS_SERVICIOS),
+        'filtros_aplicados': dataset.filtros,
+        'total_registros': dataset.total_registros,
+        'fecha_generacion': datetime.now().strftime('%d/%m/%Y %H:%M')
+    }
+
+
+def _datos_ventas(dataset):
+    resumen = dataset.resumen
+    return {
+        'metricas_generales': {
+            'total_ventas': resumen['total_ventas'],
+            'cantidad_reservas': resumen['cantidad_reservas'],
+            'ticket_promedio': resumen['ticket_promedio'],
+            'total_pagado': resumen['total_ventas']
+        },
+        'periodo': {
+            'fecha_inicio': dataset.filtros.get('fecha_inicio'),
+            'fecha_fin': dataset.filtros.get('fecha_fin')
+        },
+        'ventas': dataset.registros('ventas'),
+        'filtros_aplicados': dataset.filtros,
+        'total_registros': dataset.total_registros
+    }
+
+
+def _datos_clientes(dataset):
+    estados = [e for e in (dataset.filtros.get('estado') or '').split(',') if e]
+    if len(estados) == 1 and estados[0] in ETIQUETAS_ESTADO:
+        estado_label = ETIQUETAS_ESTADO[estados[0]]
+    else:
+        estado_label = 'Reservas (Filtro)'
+    return {
+        'clientes': dataset.registros('clientes', ALIAS_CLIENTES),
+        'cantidad_clientes': dataset.resumen['total_clientes'],
+        'resumen': dataset.resumen,
+        'estado_label': estado_label,
+        'filtros': dataset.filtros,
+        'filtros_aplicados': dataset.filtros,
+        'total_registros': dataset.total_registros,
+        'fecha_generacion': datetime.now().strftime('%d/%m/%Y %H:%M')
+    }
+
+
+def exportar_reporte_pdf(dataset, destino=None):
     """
-    Función wrapper para generar reportes en PDF.
+    Genera el reporte en PDF a partir de un DatasetReporte.
     
     Args:
-        datos: Lista de diccionarios con los datos
-        tipo_reporte: 'ventas', 'clientes' o 'productos'
-        filtros: Diccionario con filtros aplicados
+        dataset: DatasetReporte ('ventas', 'clientes' o 'productos')
+        destino: Ruta o archivo donde escribir el PDF (opcional). Útil para
+            reportes grandes: evita mantener el documento completo en memoria.
     
     Returns:
-        BytesIO con el PDF generado
+        BytesIO con el PDF generado (o ``destino`` si se indicó)
     """
-    moneda = filtros.get('moneda', 'BOB')
-    exportador = ExportadorReportesPDF(moneda=moneda)
-    
-    # Preparar estructura de datos según el tipo
-    if tipo_reporte == 'productos':
-        # Separar productos por tipo
-        paquetes = [d for d in datos if d.get('tipo') == 'Paquete']
-        servicios = [d for d in datos if d.get('tipo') == 'Servicio']
-        
-        # Convertir a formato esperado por generar_reporte_productos
-        paquetes_formateados = []
-        for p in paquetes:
-            paquetes_formateados.append({
-                'paquete__nombre': p.get('nombre', 'N/A'),
-                'paquete__categoria__nombre': p.get('categoria', 'N/A'),
-                'paquete__departamento': p.get('departamento', 'N/A'),
-                'paquete__precio_base': p.get('precio', 0),
-                'paquete__precio_base_usd': p.get('precio', 0),
-                'paquete__precio_base_bob': p.get('precio', 0) * 6.96,
-                'cantidad_vendida': p.get('num_ventas', 0),
-                'ventas_totales_usd': p.get('total_ventas_usd', 0),
-                'ventas_totales_bob': p.get('total_ventas_bob', 0),
-                'tasa_conversion': p.get('tasa_conversion', 0)
-            })
-        
-        servicios_formateados = []
-        for s in servicios:
-            servicios_formateados.append({
-                'servicio__titulo': s.get('nombre', 'N/A'),
-                'servicio__categoria__nombre': s.get('categoria', 'N/A'),
-                'servicio__departamento': s.get('departamento', 'N/A'),
-                'servicio__precio_usd': s.get('precio', 0),
-                'servicio__precio_bob': s.get('precio', 0) * 6.96,
-                'cantidad_vendida': s.get('num_ventas', 0),
-                'ventas_totales_usd': s.get('total_ventas_usd', 0),
-                'ventas_totales_bob': s.get('total_ventas_bob', 0),
-                'tasa_conversion': s.get('tasa_conversion', 0)
-            })
-        
-        reporte_data = {
-            'paquetes': paquetes_formateados,
-            'servicios': servicios_formateados,
-            'filtros_aplicados': filtros,
-            'total_registros': len(datos),
-            'fecha_generacion': datetime.now().strftime('%d/%m/%Y %H:%M')
-        }
-        return exportador.generar_reporte_productos(reporte_data)
-    
-    elif tipo_reporte == 'ventas':
-        # Calcular métricas desde datos simples
-        total_ventas = sum(d.get('monto', 0) for d in datos)
-        cantidad_reservas = len(datos)
-        ticket_promedio = total_ventas / cantidad_reservas if cantidad_reservas > 0 else 0
-        
-        reporte_data = {
-            'metricas_generales': {
-                'total_ventas': total_ventas,
-                'cantidad_reservas': cantidad_reservas,
-                'ticket_promedio': ticket_promedio,
-                'total_pagado': total_ventas
-            },
-            'periodo': {
-                'fecha_inicio': filtros.get('fecha_inicio'),
-                'fecha_fin': filtros.get('fecha_fin')
-            },
-            'ventas': datos,  # Lista de ventas individuales
-            'filtros_aplicados': filtros,
-            'total_registros': len(datos)
-        }
-        return exportador.generar_reporte_ventas_general(reporte_data)
-    
-    elif tipo_reporte == 'clientes':
-        # Obtener moneda de filtros
-        moneda = filtros.get('moneda', 'USD').upper()
-        
-        # Calcular resumen con moneda correcta
-        total_clientes = len(datos)
-        if moneda == 'BOB':
-            total_gastado_global = sum(d.get('total_gastado_bob', 0) for d in datos)
-            simbolo_moneda = 'Bs.'
-        else:  # USD o AMBAS
-            total_gastado_global = sum(d.get('total_gastado_usd', 0) for d in datos)
-            simbolo_moneda = '$'
-        
-        # Preparar clientes con el campo correcto de monto
-        clientes_formateados = []
-        for cliente in datos:
-            if moneda == 'BOB':
-                total_gastado = cliente.get('total_gastado_bob', 0)
-            else:
-                total_gastado = cliente.get('total_gastado_usd', 0)
-            
-            clientes_formateados.append({
-                'cliente__nombre': cliente.get('nombre', 'N/A'),
-                'cliente__user__email': cliente.get('email', 'N/A'),
-                'total_gastado': total_gastado,
-                'cantidad_reservas': cliente.get('num_reservas', 0),
-                'ticket_promedio': total_gastado / cliente.get('num_reservas', 1) if cliente.get('num_reservas', 0) > 0 else 0,
-                # Pasar la última compra real para que el generador PDF la formatee
-                'ultima_compra': cliente.get('ultima_compra'),
-                'tipo_cliente': cliente.get('tipo', 'N/A')
-            })
-        
-        reporte_data = {
-            'clientes': clientes_formateados,
-            'cantidad_clientes': total_clientes,
-            'resumen': {
-                'total_clientes': total_clientes,
-                'total_gastado_global': total_gastado_global,
-                'simbolo_moneda': simbolo_moneda,
-                'moneda': moneda
-            },
-            'filtros': filtros,
-            'filtros_aplicados': filtros,
-            'total_registros': len(datos),
-            'fecha_generacion': datetime.now().strftime('%d/%m/%Y %H:%M')
-        }
-        return exportador.generar_reporte_clientes(reporte_data)
-    
-    else:
-        # Fallback genérico
-        reporte_data = {
-            'datos': datos,
-            'filtros': filtros,
-            'total_registros': len(datos),
-            'fecha_generacion': datetime.now().strftime('%d/%m/%Y %H:%M')
-        }
-        return exportador.generar_reporte_ventas_general(reporte_data)
+    exportador = ExportadorReportesPDF(moneda=dataset.moneda)
+    if dataset.tipo == 'productos':
+        return exportador.generar_reporte_productos(_datos_productos(dataset), destino=destino)
+    if dataset.tipo == 'clientes':
+        return exportador.generar_reporte_clientes(_datos_clientes(dataset), destino=destino)
+    return exportador.generar_reporte_ventas_general(_datos_ventas(dataset), destino=destino)
 
 
-def exportar_reporte_excel(datos, tipo_reporte, filtros):
+def exportar_reporte_excel(dataset):
     """
-    Función wrapper para generar reportes en Excel.
-    
-    Args:
-        datos: Lista de diccionarios con los datos
-        tipo_reporte: 'ventas', 'clientes' o 'productos'
-        filtros: Diccionario con filtros aplicados
+    Genera el reporte en Excel a partir de un DatasetReporte.
     
     Returns:
         BytesIO con el Excel generado
     """
-    moneda = filtros.get('moneda', 'BOB')
-    exportador = ExportadorReportesExcel(moneda=moneda)
-    
-    # Preparar estructura de datos según el tipo
-    if tipo_reporte == 'productos':
-        # Separar productos por tipo
-        paquetes = [d for d in datos if d.get('tipo') == 'Paquete']
-        servicios = [d for d in datos if d.get('tipo') == 'Servicio']
-        
-        # Convertir a formato esperado
-        paquetes_formateados = []
-        for p in paquetes:
-            paquetes_formateados.append({
-                'paquete__nombre': p.get('nombre', 'N/A'),
-                'paquete__categoria__nombre': p.get('categoria', 'N/A'),
-                'paquete__departamento': p.get('departamento', 'N/A'),
-                'paquete__precio_base': p.get('precio', 0),
-                'paquete__precio_base_usd': p.get('precio', 0),
-                'paquete__precio_base_bob': p.get('precio', 0) * 6.96,
-                'cantidad_vendida': p.get('num_ventas', 0),
-                'ventas_totales_usd': p.get('total_ventas_usd', 0),
-                'ventas_totales_bob': p.get('total_ventas_bob', 0),
-                'tasa_conversion': p.get('tasa_conversion', 0)
-            })
-        
-        servicios_formateados = []
-        for s in servicios:
-            servicios_formateados.append({
-                'servicio__titulo': s.get('nombre', 'N/A'),
-                'servicio__categoria__nombre': s.get('categoria', 'N/A'),
-                'servicio__departamento': s.get('departamento', 'N/A'),
-                'servicio__precio_usd': s.get('precio', 0),
-                'servicio__precio_bob': s.get('precio', 0) * 6.96,
-                'cantidad_vendida': s.get('num_ventas', 0),
-                'ventas_totales_usd': s.get('total_ventas_usd', 0),
-                'ventas_totales_bob': s.get('total_ventas_bob', 0),
-                'tasa_conversion': s.get('tasa_conversion', 0)
-            })
-        
-        reporte_data = {
-            'paquetes': paquetes_formateados,
-            'servicios': servicios_formateados,
-            'filtros_aplicados': filtros,
-            'total_registros': len(datos),
-            'fecha_generacion': datetime.now().strftime('%d/%m/%Y %H:%M')
-        }
-        return exportador.generar_reporte_productos(reporte_data)
-    
-    elif tipo_reporte == 'ventas':
-        # Calcular métricas desde datos simples
-        total_ventas = sum(d.get('monto', 0) for d in datos)
-        cantidad_reservas = len(datos)
-        ticket_promedio = total_ventas / cantidad_reservas if cantidad_reservas > 0 else 0
-        
-        reporte_data = {
-            'metricas_generales': {
-                'total_ventas': total_ventas,
-                'cantidad_reservas': cantidad_reservas,
-                'ticket_promedio': ticket_promedio,
-                'total_pagado': total_ventas
-            },
-            'periodo': {
-                'fecha_inicio': filtros.get('fecha_inicio'),
-                'fecha_fin': filtros.get('fecha_fin')
-            },
-            'ventas': datos,
-            'filtros_aplicados': filtros,
-            'total_registros': len(datos)
-        }
-        return exportador.generar_reporte_ventas_general(reporte_data)
-    
-    elif tipo_reporte == 'clientes':
-        # Obtener moneda de filtros
-        moneda = filtros.get('moneda', 'USD').upper()
-        estados_raw = filtros.get('estado')
-        if estados_raw:
-            estados = [e.strip().upper() for e in estados_raw.split(',') if e.strip()]
-        else:
-            estados = ['CONFIRMADA', 'COMPLETADA', 'PAGADA']
-        # Etiqueta dinámica para la columna de reservas por estado
-        estado_label_map = {
-            'PAGADA': 'Reservas Pagadas',
-            'CONFIRMADA': 'Reservas Confirmadas',
-            'COMPLETADA': 'Reservas Completadas',
-        }
-        if len(estados) == 1 and estados[0] in estado_label_map:
-            estado_label = estado_label_map[estados[0]]
-        else:
-            estado_label = 'Reservas (Filtro)'
-        
-        # Preparar clientes con moneda correcta
-        clientes_formateados = []
-        for cliente in datos:
-            if moneda == 'BOB':
-                total_gastado = cliente.get('total_gastado_bob', 0)
-            else:
-                total_gastado = cliente.get('total_gastado_usd', 0)
-            
-            # Seleccionar métrica por estado
-            if len(estados) == 1:
-                est = estados[0]
-                if est == 'PAGADA':
-                    reservas_estado = cliente.get('reservas_pagadas', 0)
-                elif est == 'CONFIRMADA':
-                    reservas_estado = cliente.get('reservas_confirmadas', 0)
-                elif est == 'COMPLETADA':
-                    reservas_estado = cliente.get('reservas_completadas', 0)
-                else:
-                    reservas_estado = cliente.get('num_reservas', 0)
-            else:
-                reservas_estado = cliente.get('num_reservas', 0)
-
-            clientes_formateados.append({
-                'cliente__nombre': cliente.get('nombre', 'N/A'),
-                'cliente__user__email': cliente.get('email', 'N/A'),
-                'total_gastado': total_gastado,
-                'cantidad_reservas': cliente.get('num_reservas', 0),
-                'reservas_pagadas': cliente.get('reservas_pagadas', 0),
-                'reservas_confirmadas': cliente.get('reservas_confirmadas', 0),
-                'reservas_completadas': cliente.get('reservas_completadas', 0),
-                'reservas_estado': reservas_estado,
-                'ticket_promedio': total_gastado / cliente.get('num_reservas', 1) if cliente.get('num_reservas', 0) > 0 else 0,
-                'ultima_compra': cliente.get('ultima_compra'),
-                'tipo_cliente': cliente.get('tipo', 'N/A')
-            })
-        
-        reporte_data = {
-            'clientes': clientes_formateados,
-            'cantidad_clientes': len(datos),
-            'filtros_aplicados': filtros,
-            'estado_label': estado_label,
-            'total_registros': len(datos),
-            'fecha_generacion': datetime.now().strftime('%d/%m/%Y %H:%M')
-        }
-        return exportador.generar_reporte_clientes(reporte_data)
-    
-    else:
-        reporte_data = {
-            'datos': datos,
-            'filtros': filtros,
-            'total_registros': len(datos),
-            'fecha_generacion': datetime.now().strftime('%d/%m/%Y %H:%M')
-        }
-        return exportador.generar_reporte_ventas_general(reporte_data)
+    exportador = ExportadorReportesExcel(moneda=dataset.moneda)
+    if dataset.tipo == 'productos':
+        return exportador.generar_reporte_productos(_datos_productos(dataset))
+    if dataset.tipo == 'clientes':
+        return exportador.generar_reporte_clientes(_datos_clientes(dataset))
+    return exportador.generar_reporte_ventas_general(_datos_ventas(dataset))
 
 
-def exportar_reporte_docx(datos, tipo_reporte, filtros):
+def exportar_reporte_docx(dataset, destino=None):
     """
-    Función wrapper para generar reportes en Word (DOCX).
+    Genera el reporte en Word (DOCX) a partir de un DatasetReporte.
     
     Args:
-        datos: Lista de diccionarios con los datos
-        tipo_reporte: 'ventas', 'clientes' o 'productos'
-        filtros: Diccionario con filtros aplicados
+        dataset: DatasetReporte ('ventas', 'clientes' o 'productos')
+        destino: Ruta o archivo donde escribir el DOCX (opcional). Las
+            tablas de detalle se generan en bloque (ver _agregar_tabla_docx),
+            así que los reportes anuales completos caben en el documento.
     
     Returns:
-        BytesIO con el DOCX generado
+        BytesIO con el DOCX generado (o ``destino`` si se indicó)
     """
+    from .dataset_reportes import productos_combinados
+
     exportador = ExportadorReportesWord()
-    
-    # Preparar estructura de datos
-    if tipo_reporte == 'productos':
-        # Obtener moneda de filtros
-        moneda = filtros.get('moneda', 'USD').upper()
-        
-        # Calcular resumen según moneda
-        total_productos = len(datos)
-        if moneda == 'USD':
-            ventas_totales = sum(d.get('total_ventas_usd', 0) for d in datos)
-            simbolo_moneda = '$'
-        elif moneda == 'BOB':
-            ventas_totales = sum(d.get('total_ventas_bob', 0) for d in datos)
-            simbolo_moneda = 'Bs.'
-        else:  # AMBAS
-            ventas_totales = sum(d.get('total_ventas_usd', 0) for d in datos)
-            simbolo_moneda = '$'
-        
-        productos_ordenados = sorted(datos, key=lambda x: x.get('total_ventas_usd', 0), reverse=True)
-        producto_mas_vendido = productos_ordenados[0].get('nombre', 'N/A') if productos_ordenados else 'N/A'
-        
-        datos_reporte = {
-            'tipo': tipo_reporte,
-            'productos': datos,  # WORD accede con nombres simples
-            'resumen': {
-                'total_productos': total_productos,
-                'ventas_totales': ventas_totales,
-                'producto_mas_vendido': producto_mas_vendido,
-                'simbolo_moneda': simbolo_moneda,
-                'moneda': moneda
-            },
-            'filtros': filtros,
-            'total_registros': len(datos),
-            'fecha_generacion': datetime.now().strftime('%d/%m/%Y %H:%M'),
-            'titulo': f'Reporte de {tipo_reporte.title()}',
-            'periodo': {
-                'inicio': filtros.get('fecha_inicio', 'N/A'),
-                'fin': filtros.get('fecha_fin', 'N/A')
-            }
+    filtros = dataset.filtros
+    comunes = {
+        'tipo': dataset.tipo,
+        'filtros': filtros,
+        'total_registros': dataset.total_registros,
+        'fecha_generacion': datetime.now().strftime('%d/%m/%Y %H:%M'),
+        'titulo': f'Reporte de {dataset.tipo.title()}',
+        'periodo': {
+            'inicio': filtros.get('fecha_inicio', 'N/A'),
+            'fin': filtros.get('fecha_fin', 'N/A')
         }
-        return exportador.generar_reporte_productos(datos_reporte)
+    }
     
-    elif tipo_reporte == 'ventas':
-        # Calcular resumen de ventas
-        total_ventas = sum(venta.get('monto', 0) for venta in datos)
-        total_transacciones = len(datos)
-        ticket_promedio = total_ventas / total_transacciones if total_transacciones > 0 else 0
-        
-        # Obtener moneda
-        moneda = filtros.get('moneda', 'BOB').upper()
-        simbolo_moneda = 'Bs.' if moneda == 'BOB' else '$'
-        
-        datos_reporte = {
-            'tipo': tipo_reporte,
-            'ventas': datos,  # El generador espera 'ventas', no 'datos'
-            'resumen': {
-                'total_ventas': total_ventas,
-                'total_transacciones': total_transacciones,
-                'ticket_promedio': ticket_promedio,
-                'simbolo_moneda': simbolo_moneda
-            },
-            'filtros': filtros,
-            'total_registros': len(datos),
-            'fecha_generacion': datetime.now().strftime('%d/%m/%Y %H:%M'),
-            'titulo': 'Reporte de Ventas',
-            'periodo': {
-                'inicio': filtros.get('fecha_inicio', 'N/A'),
-                'fin': filtros.get('fecha_fin', 'N/A')
-            }
-        }
-        return exportador.generar_reporte_ventas(datos_reporte)
+    if dataset.tipo == 'productos':
+        return exportador.generar_reporte_productos({
+            **comunes,
+            'productos': productos_combinados(dataset),  # WORD accede con nombres simples
+            'resumen': dataset.resumen,
+        }, destino=destino)
     
-    elif tipo_reporte == 'clientes':
-        # Obtener moneda de filtros
-        moneda = filtros.get('moneda', 'USD').upper()
-        
-        # Preparar clientes con moneda correcta
-        clientes_formateados = []
-        total_gastado_global = 0
-        total_reservas_global = 0
-        
-        for cliente in datos:
-            if moneda == 'BOB':
-                total_gastado = cliente.get('total_gastado_bob', 0)
-            else:
-                total_gastado = cliente.get('total_gastado_usd', 0)
-            
-            num_reservas = cliente.get('num_reservas', 0)
-            total_gastado_global += total_gastado
-            total_reservas_global += num_reservas
-            
-            clientes_formateados.append({
-                'cliente__nombre': cliente.get('nombre', 'N/A'),
-                'cliente__user__email': cliente.get('email', 'N/A'),
-                'total_gastado': total_gastado,
-                'cantidad_reservas': num_reservas,
-                'reservas_pagadas': cliente.get('reservas_pagadas', 0),
-                'ultima_compra': cliente.get('ultima_compra'),
-                'ticket_promedio': total_gastado / num_reservas if num_reservas > 0 else 0,
-                'tipo_cliente': cliente.get('tipo', 'N/A')
-            })
-        
-        # Calcular resumen
-        total_clientes = len(datos)
-        promedio_por_cliente = total_gastado_global / total_clientes if total_clientes > 0 else 0
-        
-        datos_reporte = {
-            'tipo': tipo_reporte,
-            'clientes': clientes_formateados,
-            'resumen': {
-                'total_clientes': total_clientes,
-                'total_reservas': total_reservas_global,
-                'ingresos_totales': total_gastado_global,
-                'promedio_por_cliente': promedio_por_cliente
-            },
-            'cantidad_clientes': total_clientes,
-            'filtros': filtros,
-            'total_registros': total_clientes,
-            'fecha_generacion': datetime.now().strftime('%d/%m/%Y %H:%M'),
-            'titulo': 'Reporte de Clientes',
-            'periodo': {
-                'inicio': filtros.get('fecha_inicio', 'N/A'),
-                'fin': filtros.get('fecha_fin', 'N/A')
-            }
-        }
-        return exportador.generar_reporte_clientes(datos_reporte)
+    if dataset.tipo == 'clientes':
+        return exportador.generar_reporte_clientes({
+            **comunes,
+            'clientes': dataset.registros('clientes', ALIAS_CLIENTES),
+            'resumen': dataset.resumen,
+            'cantidad_clientes': dataset.resumen['total_clientes'],
+        }, destino=destino)
     
+    resumen = dataset.resumen
+    return exportador.generar_reporte_ventas({
+        **comunes,
+        'ventas': dataset.registros('ventas'),
+        'resumen': {
+            'total_ventas': resumen['total_ventas'],
+            'total_transacciones': resumen['cantidad_reservas'],
+            'ticket_promedio': resumen['ticket_promedio'],
+            'simbolo_moneda': 'Bs.' if dataset.moneda == 'BOB' else '$'
+        },
+    }, destino=destino)
+
+
+# ============================================================================
+# 🗜️ BUNDLE: PDF + Excel + DOCX en paralelo
+# ============================================================================
+
+EXTENSIONES_BUNDLE = {'pdf': 'pdf', 'excel': 'xlsx', 'docx': 'docx'}
+
+_pool_bundle = None
+
+
+def _iniciar_proceso_bundle():
+    """Configura Django en cada proceso hijo del pool (necesario para deserializar el dataset)."""
+    import django
+    django.setup()
+
+
+def _obtener_pool_bundle():
+    """
+    Pool de procesos compartido (uno por formato). Los renderers de
+    reportlab/openpyxl/python-docx son CPU-bound, así que con hilos el GIL
+    los serializaría.
+
+    Los hijos se crean con ``spawn``: no heredan las conexiones de BD ni el
+    estado de los hilos del worker que atiende la request, así que el padre
+    no tiene que cerrar su conexión (ni perder su transacción o su
+    ``statement_timeout``) antes de crear el pool.
+    """
+    global _pool_bundle
+    if _pool_bundle is None:
+        _pool_bundle = ProcessPoolExecutor(
+            max_workers=len(EXTENSIONES_BUNDLE),
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_iniciar_proceso_bundle,
+        )
+    return _pool_bundle
+
+
+def _renderizar_formato(dataset, formato):
+    """Renderiza un formato y devuelve los bytes (se ejecuta en un proceso hijo)."""
+    if formato == 'pdf':
+        archivo = exportar_reporte_pdf(dataset)
+    elif formato == 'excel':
+        archivo = exportar_reporte_excel(dataset)
     else:
-        datos_reporte = {
-            'tipo': tipo_reporte,
-            'datos': datos,
-            'filtros': filtros,
-            'total_registros': len(datos),
-            'fecha_generacion': datetime.now().strftime('%d/%m/%Y %H:%M'),
-            'titulo': f'Reporte de {tipo_reporte.title()}',
-            'periodo': {
-                'inicio': filtros.get('fecha_inicio', 'N/A'),
-                'fin': filtros.get('fecha_fin', 'N/A')
-            }
-        }
-        return exportador.generar_reporte_ventas(datos_reporte)
+        archivo = exportar_reporte_docx(dataset)
+    return archivo.getvalue()
 
 
+def exportar_reporte_bundle(dataset, nombre_base=None):
+    """
+    Genera el mismo reporte en PDF, Excel y DOCX y los empaqueta en un ZIP.
+
+    El dataset se calcula una sola vez (en el proceso que atiende la request)
+    y los tres formatos se renderizan en paralelo, así que el tiempo total se
+    acerca al del renderer más lento. Si el pool no está disponible se
+    renderiza de forma secuencial.
+
+    Returns:
+        BytesIO con el ZIP generado
+    """
+    nombre_base = nombre_base or f"reporte_{dataset.tipo}_{datetime.now().strftime('%Y%m%d')}"
+    try:
+        pool = _obtener_pool_bundle()
+        futuros = {formato: pool.submit(_renderizar_formato, dataset, formato) for formato in EXTENSIONES_BUNDLE}
+        contenidos = {formato: futuro.result() for formato, futuro in futuros.items()}
+    except (BrokenProcessPool, OSError) as e:
+        global _pool_bundle
+        print(f"⚠️ Pool de bundle no disponible ({e}), renderizando en secuencia")
+        _pool_bundle = None
+        contenidos = {formato: _renderizar_formato(dataset, formato) for formato in EXTENSIONES_BUNDLE}
+
+    buffer = BytesIO()
+    # Los tres formatos ya vienen comprimidos: se almacenan sin recomprimir
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_STORED) as zf:
+        for formato, contenido in contenidos.items():
+            zf.writestr(f"{nombre_base}.{EXTENSIONES_BUNDLE[formato]}", contenido)
+    buffer.seek(0)
+    return buffer
@@ -4,10 +4,169 @@ Usa OpenAI GPT para interpretar lenguaje natural y extraer filtros estructurados
 """
 import re
 import json
+import calendar
+import hashlib
+import threading
+import time
+from collections import Counter
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 from openai import OpenAI
 from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .parser_comandos import AnalisisComando, analizar, sin_tildes
+
+
+MODELO_OPENAI = "gpt-4o-mini"
+
+# ============================================================================
+# 🧠 CACHÉ DE INTERPRETACIONES
+# ============================================================================
+# Los administradores repiten las mismas frases ("ventas de este mes en pdf").
+# La interpretación de la IA se guarda por prompt normalizado (minúsculas,
+# sin tildes, fechas en ISO). Si el comando tiene fechas relativas ("este
+# mes", "enero", "hoy") la clave incluye el día actual, porque el mismo
+# texto significa otro rango mañana.
+
+PREFIJO_CACHE_IA = 'ia_interpretacion'
+TTL_CACHE_IA = 24 * 60 * 60
+
+_MESES_REGEX = (
+    'enero|febrero|marzo|abril|mayo|junio|julio|agosto|septiembre|setiembre|'
+    'octubre|noviembre|diciembre'
+)
+_NUMERO_MES = {
+    'enero': 1, 'febrero': 2, 'marzo': 3, 'abril': 4, 'mayo': 5, 'junio': 6,
+    'julio': 7, 'agosto': 8, 'septiembre': 9, 'setiembre': 9, 'octubre': 10,
+    'noviembre': 11, 'diciembre': 12,
+}
+_RELATIVOS = re.compile(
+    r'\b(hoy|ayer|manana|este|esta|actual|pasad[oa]s?|ultim[oa]s?|anterior|proxim[oa]s?|'
+    r'semana|mes|trimestre|ano|' + _MESES_REGEX + r')\b'
+)
+
+
+def _fecha_iso(anio: int, mes: int, dia: int) -> Optional[str]:
+    if anio < 100:
+        anio += 2000
+    try:
+        return datetime(anio, mes, dia).strftime('%Y-%m-%d')
+    except ValueError:
+        return None
+
+
+def normalizar_prompt(texto: str) -> str:
+    """
+    Forma canónica de un comando: minúsculas, sin tildes ni signos de
+    puntuación, espacios colapsados y fechas explícitas en YYYY-MM-DD.
+    """
+    texto = sin_tildes(texto.lower())
+
+    # "1 de enero de 2025" / "1 enero 2025" -> 2025-01-01
+    def _fecha_textual(m):
+        return _fecha_iso(int(m.group(3)), _NUMERO_MES[m.group(2)], int(m.group(1))) or m.group(0)
+    texto = re.sub(
+        r'\b(\d{1,2})\s+(?:de\s+)?(' + _MESES_REGEX + r')\s+(?:de\s+|del\s+)?(\d{4})\b',
+        _fecha_textual, texto,
+    )
+
+    # 1/1/2025, 01-01-25, 1.1.2025 (día/mes/año) -> 2025-01-01
+    def _fecha_numerica(m):
+        return _fecha_iso(int(m.group(3)), int(m.group(2)), int(m.group(1))) or m.group(0)
+    texto = re.sub(r'\b(\d{1,2})[/.-](\d{1,2})[/.-](\d{4}|\d{2})\b', _fecha_numerica, texto)
+
+    texto = re.sub(r'[^\w\s-]', ' ', texto)
+    return re.sub(r'\s+', ' ', texto).strip()
+
+
+def clave_interpretacion(prompt: str, contexto: str = "reportes") -> str:
+    normalizado = normalizar_prompt(prompt)
+    partes = [MODELO_OPENAI, contexto or '', normalizado]
+    if _RELATIVOS.search(normalizado):
+        partes.append(timezone.localdate().isoformat())
+    huella = hashlib.sha1('|'.join(partes).encode()).hexdigest()
+    return f"{PREFIJO_CACHE_IA}:{huella}"
+
+
+# Los aciertos/fallos se cuentan en memoria de cada proceso y se vuelcan a la
+# caché compartida en bloque (un get_many + set_many) cada
+# VOLCADO_STATS_SEGUNDOS o VOLCADO_STATS_EVENTOS eventos, en lugar de dos
+# consultas a la tabla de caché por cada comando.
+VOLCADO_STATS_SEGUNDOS = 60
+VOLCADO_STATS_EVENTOS = 50
+
+_eventos_pendientes = Counter()
+_eventos_lock = threading.Lock()
+_ultimo_volcado = time.monotonic()
+
+
+def _clave_estadistica(evento: str) -> str:
+    return f"{PREFIJO_CACHE_IA}:stats:{evento}"
+
+
+def _volcar_eventos_cache():
+    """Suma los contadores pendientes de este proceso a los de la caché."""
+    global _ultimo_volcado
+    with _eventos_lock:
+        pendientes = dict(_eventos_pendientes)
+        _eventos_pendientes.clear()
+        _ultimo_volcado = time.monotonic()
+    if not pendientes:
+        return
+    claves = {evento: _clave_estadistica(evento) for evento in pendientes}
+    actuales = cache.get_many(list(claves.values()))
+    cache.set_many({clave: actuales.get(clave, 0) + pendientes[evento] for evento, clave in claves.items()}, None)
+
+
+def _registrar_evento_cache(evento: str):
+    with _eventos_lock:
+        _eventos_pendientes[evento] += 1
+        volcar = (sum(_eventos_pendientes.values()) >= VOLCADO_STATS_EVENTOS
+                  or time.monotonic() - _ultimo_volcado >= VOLCADO_STATS_SEGUNDOS)
+    if volcar:
+        _volcar_eventos_cache()
+
+
+def estadisticas_cache_ia() -> Dict[str, Any]:
+    """
+    Aciertos/fallos acumulados de la caché de interpretaciones.
+
+    Los números son aproximados: incluyen lo pendiente de este proceso pero
+    no lo que otros workers aún no volcaron, y dos volcados simultáneos
+    (leer y escribir no es atómico en ``DatabaseCache``) pueden perder
+    alguna suma. Sirven para seguir la tasa de aciertos, no como auditoría.
+    """
+    _volcar_eventos_cache()
+    totales = cache.get_many([_clave_estadistica('aciertos'), _clave_estadistica('fallos')])
+    aciertos = totales.get(_clave_estadistica('aciertos'), 0)
+    fallos = totales.get(_clave_estadistica('fallos'), 0)
+    total = aciertos + fallos
+    return {
+        'aciertos': aciertos,
+        'fallos': fallos,
+        'total': total,
+        'tasa_aciertos': round(aciertos / total * 100, 2) if total else 0.0,
+        'ttl_segundos': getattr(settings, 'IA_CACHE_TTL', TTL_CACHE_IA),
+    }
+
+
+_procesador = None
+_procesador_lock = threading.Lock()
+
+
+def obtener_procesador() -> 'ReportesIAProcessor':
+    """
+    Instancia única del procesador (y de su cliente OpenAI, que mantiene
+    el pool de conexiones HTTP) compartida entre requests.
+    """
+    global _procesador
+    if _procesador is None:
+        with _procesador_lock:
+            if _procesador is None:
+                _procesador = ReportesIAProcessor()
+    return _procesador
 
 
 class ReportesIAProcessor:
@@ -15,34 +174,7 @@ class ReportesIAProcessor:
     Procesa comandos en lenguaje natural para generar reportes usando IA.
     """
     
-    # Mapeo de departamentos (variantes)
-    DEPARTAMENTOS = {
-        'la paz': 'La Paz',
-        'lapaz': 'La Paz',
-        'paz': 'La Paz',
-        'santa cruz': 'Santa Cruz',
-        'santacruz': 'Santa Cruz',
-        'cruz': 'Santa Cruz',
-        'cochabamba': 'Cochabamba',
-        'cbba': 'Cochabamba',
-        'oruro': 'Oruro',
-        'potosi': 'Potosí',
-        'potosí': 'Potosí',
-        'tarija': 'Tarija',
-        'sucre': 'Sucre',
-        'chuquisaca': 'Chuquisaca',
-        'beni': 'Beni',
-        'pando': 'Pando',
-    }
-    
-    # Mapeo de meses
-    MESES = {
-        'enero': 1, 'febrero': 2, 'marzo': 3, 'abril': 4,
-        'mayo': 5, 'junio': 6, 'julio': 7, 'agosto': 8,
-        'septiembre': 9, 'octubre': 10, 'noviembre': 11, 'diciembre': 12,
-        'ene': 1, 'feb': 2, 'mar': 3, 'abr': 4, 'may': 5, 'jun': 6,
-        'jul': 7, 'ago': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dic': 12,
-    }
+    # Departamentos, meses, formatos y tipos de reporte: ver parser_comandos.PALABRAS
     
     def __init__(self):
         """Inicializa el procesador con cliente OpenAI."""
@@ -64,11 +196,21 @@ class ReportesIAProcessor:
         Returns:
             Diccionario con la interpretación y filtros extraídos
         """
-        # Intentar procesamiento con IA
+        # Intentar procesamiento con IA (primero la caché de interpretaciones)
         if self.client:
+            clave = clave_interpretacion(prompt, contexto)
+            en_cache = cache.get(clave)
+            if en_cache is not None:
+                _registrar_evento_cache('aciertos')
+                en_cache['desde_cache'] = True
+                return en_cache
+            _registrar_evento_cache('fallos')
+            
             try:
                 resultado = self._procesar_con_openai(prompt, contexto)
                 if resultado:
+                    cache.set(clave, resultado, getattr(settings, 'IA_CACHE_TTL', TTL_CACHE_IA))
+                    resultado['desde_cache'] = False
                     return resultado
             except Exception as e:
                 print(f"⚠️ Error en OpenAI, usando fallback: {e}")
@@ -147,7 +289,7 @@ La Paz, Santa Cruz, Cochabamba, Oruro, Potosí, Tarija, Sucre, Beni, Pando
         
         try:
             response = self.client.chat.completions.create(
-                model="gpt-4o-mini",  # Modelo más económico y rápido
+                model=MODELO_OPENAI,  # Modelo más económico y rápido
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": f"Contexto: {contexto}\nComando: {prompt}"}
@@ -176,7 +318,7 @@ La Paz, Santa Cruz, Cochabamba, Oruro, Potosí, Tarija, Sucre, Beni, Pando
         Procesamiento local básico sin IA (fallback).
         Usa regex y palabras clave simples.
         """
-        prompt_lower = prompt.lower()
+        analisis = analizar(prompt)
         
         resultado = {
             "interpretacion": f"Procesamiento local del comando: {prompt}",
@@ -188,47 +330,35 @@ La Paz, Santa Cruz, Cochabamba, Oruro, Potosí, Tarija, Sucre, Beni, Pando
             "confianza": 0.5  # Confianza media para procesamiento local
         }
         
-        # Detectar tipo de reporte
-        if any(word in prompt_lower for word in ['paquete', 'producto', 'tour']):
-            resultado['tipo_reporte'] = 'paquetes'
-        elif any(word in prompt_lower for word in ['venta', 'ingreso', 'ganancia']):
-            resultado['tipo_reporte'] = 'ventas'
-        elif any(word in prompt_lower for word in ['cliente', 'usuario', 'comprador']):
-            resultado['tipo_reporte'] = 'clientes'
-        else:
-            resultado['tipo_reporte'] = 'paquetes'  # Por defecto
+        # Detectar tipo de reporte (paquetes > ventas > clientes; por defecto paquetes)
+        resultado['tipo_reporte'] = analisis.primero(
+            'tipo_reporte', prioridad=['paquetes', 'ventas', 'clientes']
+        ) or 'paquetes'
         
         # Detectar formato
-        if 'excel' in prompt_lower or 'xlsx' in prompt_lower:
-            resultado['formato'] = 'excel'
-        elif 'word' in prompt_lower or 'docx' in prompt_lower:
-            resultado['formato'] = 'docx'
-        elif 'pdf' in prompt_lower:
-            resultado['formato'] = 'pdf'
+        resultado['formato'] = analisis.primero('formato', prioridad=['excel', 'docx', 'pdf']) or 'pdf'
         
-        # Detectar departamento
-        for key, value in self.DEPARTAMENTOS.items():
-            if key in prompt_lower:
-                resultado['filtros']['departamento'] = value
-                break
+        # Detectar departamento (el primero mencionado)
+        departamento = analisis.primero('departamento')
+        if departamento:
+            resultado['filtros']['departamento'] = departamento
         
         # Detectar moneda
-        if 'dólar' in prompt_lower or 'dolar' in prompt_lower or 'usd' in prompt_lower:
-            resultado['filtros']['moneda'] = 'USD'
-        elif 'boliviano' in prompt_lower or 'bob' in prompt_lower or 'bs' in prompt_lower:
-            resultado['filtros']['moneda'] = 'BOB'
+        moneda = analisis.primero('moneda', prioridad=['USD', 'BOB'])
+        if moneda:
+            resultado['filtros']['moneda'] = moneda
         
         # Detectar montos
-        monto_match = re.search(r'mayor(?:es)?\s+(?:a|de|que)\s+(\d+)', prompt_lower)
-        if monto_match:
-            resultado['filtros']['monto_minimo'] = int(monto_match.group(1))
+        monto_minimo = analisis.primero('monto_minimo')
+        if monto_minimo is not None:
+            resultado['filtros']['monto_minimo'] = int(monto_minimo)
         
-        monto_match = re.search(r'menor(?:es)?\s+(?:a|de|que)\s+(\d+)', prompt_lower)
-        if monto_match:
-            resultado['filtros']['monto_maximo'] = int(monto_match.group(1))
+        monto_maximo = analisis.primero('monto_maximo')
+        if monto_maximo is not None:
+            resultado['filtros']['monto_maximo'] = int(monto_maximo)
         
         # Detectar fechas simples (mes actual, mes pasado, etc.)
-        fechas = self._extraer_fechas_basicas(prompt_lower)
+        fechas = self._extraer_fechas_basicas(analisis)
         if fechas:
             resultado['filtros'].update(fechas)
         
@@ -251,20 +381,20 @@ La Paz, Santa Cruz, Cochabamba, Oruro, Potosí, Tarija, Sucre, Beni, Pando
         
         return resultado
     
-    def _extraer_fechas_basicas(self, prompt: str) -> Dict[str, str]:
+    def _extraer_fechas_basicas(self, analisis: AnalisisComando) -> Dict[str, str]:
         """
-        Extrae fechas básicas del prompt.
+        Extrae fechas básicas del comando ya analizado.
         """
         fechas = {}
         hoy = datetime.now()
         
         # Mes actual
-        if 'este mes' in prompt or 'mes actual' in prompt:
+        if analisis.contiene('rango', 'este_mes'):
             fechas['fecha_inicio'] = hoy.replace(day=1).strftime('%Y-%m-%d')
             fechas['fecha_fin'] = hoy.strftime('%Y-%m-%d')
         
         # Mes pasado
-        elif 'mes pasado' in prompt or 'último mes' in prompt:
+        elif analisis.contiene('rango', 'mes_pasado'):
             primer_dia_mes_actual = hoy.replace(day=1)
             ultimo_dia_mes_pasado = primer_dia_mes_actual - timedelta(days=1)
             primer_dia_mes_pasado = ultimo_dia_mes_pasado.replace(day=1)
@@ -272,24 +402,22 @@ La Paz, Santa Cruz, Cochabamba, Oruro, Potosí, Tarija, Sucre, Beni, Pando
             fechas['fecha_fin'] = ultimo_dia_mes_pasado.strftime('%Y-%m-%d')
         
         # Último trimestre
-        elif 'último trimestre' in prompt or 'trimestre' in prompt:
+        elif analisis.contiene('rango', 'trimestre'):
             fecha_inicio = hoy - timedelta(days=90)
             fechas['fecha_inicio'] = fecha_inicio.strftime('%Y-%m-%d')
             fechas['fecha_fin'] = hoy.strftime('%Y-%m-%d')
         
-        # Detectar mes específico
-        for mes_nombre, mes_num in self.MESES.items():
-            if mes_nombre in prompt:
-                año = hoy.year
-                if mes_num > hoy.month:
-                    año -= 1  # Si el mes es futuro, usar año pasado
-                
-                import calendar
-                ultimo_dia = calendar.monthrange(año, mes_num)[1]
-                
-                fechas['fecha_inicio'] = f"{año}-{mes_num:02d}-01"
-                fechas['fecha_fin'] = f"{año}-{mes_num:02d}-{ultimo_dia}"
-                break
+        # Mes específico (el primero mencionado)
+        mes_num = analisis.primero('mes')
+        if mes_num:
+            año = hoy.year
+            if mes_num > hoy.month:
+                año -= 1  # Si el mes es futuro, usar año pasado
+            
+            ultimo_dia = calendar.monthrange(año, mes_num)[1]
+            
+            fechas['fecha_inicio'] = f"{año}-{mes_num:02d}-01"
+            fechas['fecha_fin'] = f"{año}-{mes_num:02d}-{ultimo_dia}"
         
         return fechas
     
@@ -338,7 +466,7 @@ La Paz, Santa Cruz, Cochabamba, Oruro, Potosí, Tarija, Sucre, Beni, Pando
         if self.client:
             try:
                 response = self.client.chat.completions.create(
-                    model="gpt-4o-mini",
+                    model=MODELO_OPENAI,
                     messages=[
                         {
                             "role": "system",
@@ -0,0 +1,140 @@
+"""
+Benchmark de la entrega de campañas de notificaciones.
+
+Crea usuarios sintéticos con dispositivos FCM (prefijo ``benchcamp``), una
+campaña dirigida a ellos y mide ``ejecutar_campana_notificacion``: tiempo,
+consultas SQL y notificaciones por segundo. El push pasa por el stub
+``SIMULAR_FCM`` (se activa aquí junto con ``HABILITAR_SEÑAL_FCM``), así se
+mide el costo del pipeline sin red.
+
+Como referencia se mide también la entrega anterior (una notificación por
+usuario en su propio ``transaction.atomic`` más una consulta de tokens y un
+envío FCM por usuario, como hacía la señal) hasta ``--max-por-fila``
+usuarios, porque más allá tarda minutos.
+
+Uso:
+    python manage.py benchmark_campanas
+    python manage.py benchmark_campanas --usuarios 1000 10000 50000
+    python manage.py benchmark_campanas --usuarios 5000 --lote 500 --max-por-fila 0
+"""
+import logging
+import os
+import random
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import override_settings
+
+from condominio.models import CampanaNotificacion, FCMDevice, Notificacion, Usuario
+from condominio.tasks import TAMANO_LOTE_CAMPANA, ejecutar_campana_notificacion
+from core.notifications import enviar_tokens_push
+
+PREFIJO = 'benchcamp'
+TAMANO_LOTE_SIEMBRA = 5000
+
+
+def _sembrar(cantidad, proporcion_dispositivos, semilla=42):
+    """Usuarios con dispositivos y una campaña dirigida a ellos."""
+    rng = random.Random(semilla)
+    lote = int(time.time() * 1000) % 10 ** 8
+    users = User.objects.bulk_create(
+        [User(username=f'{PREFIJO}_{lote}_{i}', password='!') for i in range(cantidad)],
+        batch_size=TAMANO_LOTE_SIEMBRA,
+    )
+    perfiles = Usuario.objects.bulk_create(
+        [Usuario(user=u, nombre=f'Bench {i}') for i, u in enumerate(users)], batch_size=TAMANO_LOTE_SIEMBRA,
+    )
+    FCMDevice.objects.bulk_create([
+        FCMDevice(usuario=p, registration_id=f'{PREFIJO}-{lote}-{p.id}', tipo_dispositivo=rng.choice(['android', 'ios']))
+        for p in perfiles if rng.random() < proporcion_dispositivos
+    ], batch_size=TAMANO_LOTE_SIEMBRA)
+
+    campana = CampanaNotificacion.objects.create(
+        nombre=f'{PREFIJO} {cantidad}', titulo='Oferta de temporada', cuerpo='Descuentos en tours a Uyuni',
+        tipo_audiencia='USUARIOS', estado='BORRADOR',
+    )
+    destino = CampanaNotificacion.usuarios_objetivo.through
+    destino.objects.bulk_create(
+        [destino(campananotificacion_id=campana.id, usuario_id=p.id) for p in perfiles],
+        batch_size=TAMANO_LOTE_SIEMBRA,
+    )
+    return campana
+
+
+def _limpiar():
+    CampanaNotificacion.objects.filter(nombre__startswith=PREFIJO).delete()
+    User.objects.filter(username__startswith=f'{PREFIJO}_').delete()
+
+
+def _entrega_por_fila(campana):
+    """La entrega anterior: una notificación, una consulta de tokens y un envío por usuario."""
+    datos = {'titulo': campana.titulo, 'mensaje': campana.cuerpo, 'campana_id': str(campana.id)}
+    for usuario in campana.obtener_usuarios_objetivo():
+        with transaction.atomic():
+            notificacion = Notificacion.objects.create(usuario=usuario, tipo=campana.tipo_notificacion, datos=datos)
+        tokens = [
+            {'token': d.registration_id, 'tipo': d.tipo_dispositivo}
+            for d in FCMDevice.objects.filter(usuario=usuario, activo=True)
+        ]
+        if tokens:
+            enviar_tokens_push(tokens, campana.titulo, campana.cuerpo, {'notificacion_id': str(notificacion.id)})
+
+
+def _medir(funcion):
+    consultas = [0]
+
+    def contar(execute, sql, params, many, context):
+        consultas[0] += 1
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(contar):
+        t0 = time.perf_counter()
+        resultado = funcion()
+        return time.perf_counter() - t0, consultas[0], resultado
+
+
+class Command(BaseCommand):
+    help = 'Mide la entrega de campañas de notificaciones (bulk_create + multicast FCM simulado)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuarios', type=int, nargs='+', default=[1000, 10000],
+                            help='Cantidades de destinatarios a medir')
+        parser.add_argument('--lote', type=int, default=TAMANO_LOTE_CAMPANA, help='Usuarios por lote de entrega')
+        parser.add_argument('--dispositivos', type=float, default=0.8,
+                            help='Proporción de usuarios con un dispositivo FCM')
+        parser.add_argument('--max-por-fila', type=int, default=2000,
+                            help='Máximo de usuarios para medir la entrega anterior (0 = no medir)')
+
+    def handle(self, *args, **options):
+        os.environ['SIMULAR_FCM'] = '1'
+        os.environ['HABILITAR_SEÑAL_FCM'] = '1'
+        logging_fcm = logging.getLogger('core.notifications')
+        nivel_anterior = logging_fcm.level
+        logging_fcm.setLevel('WARNING')  # la simulación registra cada envío
+
+        self.stdout.write(f"📢 Entrega de campañas (lote {options['lote']}, FCM simulado)")
+        self.stdout.write(f"{'usuarios':>9} {'modo':>9} {'segundos':>9} {'consultas':>10} {'notif/s':>9} {'lotes FCM':>10}")
+        try:
+            for cantidad in options['usuarios']:
+                campana = _sembrar(cantidad, options['dispositivos'])
+                with override_settings(CAMPANA_TAMANO_LOTE=options['lote']):
+                    segundos, consultas, resultado = _medir(lambda: ejecutar_campana_notificacion(campana.id))
+                self.stdout.write(
+                    f"{cantidad:>9} {'lotes':>9} {segundos:>9.2f} {consultas:>10} "
+                    f"{resultado['total_enviados'] / segundos:>9.0f} {resultado['push']['lotes_fcm']:>10}"
+                )
+
+                if cantidad <= options['max_por_fila']:
+                    segundos, consultas, _ = _medir(lambda: _entrega_por_fila(campana))
+                    self.stdout.write(
+                        f"{cantidad:>9} {'por fila':>9} {segundos:>9.2f} {consultas:>10} {cantidad / segundos:>9.0f} "
+                        f"{'-':>10}"
+                    )
+                _limpiar()
+        finally:
+            _limpiar()
+            logging_fcm.setLevel(nivel_anterior)
+
+        self.stdout.write(self.style.SUCCESS('✅ Benchmark completado'))
@@ -0,0 +1,131 @@
+"""
+Benchmark de los endpoints de reportes a distintas escalas de datos.
+
+Para cada escala siembra un dataset determinista (1x ≈ 1.500 reservas,
+10x, 100x) con inserciones por lotes, mide cada endpoint de reportes y
+cada formato de exportación (latencia, consultas SQL, memoria) y escribe
+un JSON comparable entre commits. Por defecto todo corre dentro de una
+transacción que se revierte al terminar: la base queda como estaba.
+
+``config/settings.py`` apunta ``default`` a la base de producción y
+``--conservar`` deja allí los datos sembrados, así que el comando solo corre
+con ``DEBUG`` sobre una base descartable: SQLite o una base de pruebas
+confirmada con ``--base-descartable`` o ``BENCHMARK_BASE_DESCARTABLE=1``
+(ver ``exigir_base_descartable``). Nunca contra producción.
+
+Uso:
+    python manage.py benchmark_escala --settings=<settings con DATABASES de pruebas> --base-descartable
+    python manage.py benchmark_escala
+    python manage.py benchmark_escala --escalas 1x 10x 100x --repeticiones 5
+    python manage.py benchmark_escala --solo graficas reporte_ventas
+    python manage.py benchmark_escala --salida actual.json --comparar anterior.json
+    python manage.py benchmark_escala --escalas 10x --conservar   # deja los datos sembrados
+    python manage.py benchmark_escala --limpiar                    # borra un dataset conservado
+"""
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from condominio.benchmark_escala import (
+    ESCALAS,
+    PREFIJO,
+    comparar_resultados,
+    exigir_base_descartable,
+    guardar_resultados,
+    limpiar_dataset,
+    medir_endpoints,
+    sembrar_dataset,
+)
+from condominio.models import Usuario
+
+
+class _Revertir(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Siembra datasets 1x/10x/100x y mide latencia, consultas y memoria de cada reporte'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--escalas', nargs='+', choices=list(ESCALAS), default=['1x', '10x'],
+                            help='Escalas a medir (default: 1x 10x)')
+        parser.add_argument('--repeticiones', type=int, default=3, help='Mediciones por caso (default: 3)')
+        parser.add_argument('--solo', nargs='+', help='Prefijos de endpoints a medir (ej: graficas reporte_ventas)')
+        parser.add_argument('--semilla', type=int, default=42, help='Semilla del dataset (default: 42)')
+        parser.add_argument('--salida', default='benchmark_escala.json', help='Archivo JSON de resultados')
+        parser.add_argument('--comparar', help='Archivo JSON de una corrida anterior para comparar')
+        parser.add_argument('--conservar', action='store_true',
+                            help='No revierte: deja sembrada la escala medida (para EXPLAIN, pruebas manuales)')
+        parser.add_argument('--limpiar', action='store_true', help='Elimina un dataset conservado y termina')
+        parser.add_argument('--base-descartable', action='store_true',
+                            help='Confirma que la base configurada es de pruebas (requerido fuera de SQLite)')
+
+    def handle(self, *args, **options):
+        exigir_base_descartable(options['base_descartable'])
+        if options['limpiar']:
+            limpiar_dataset()
+            self.stdout.write(self.style.SUCCESS('🗑️ Dataset de benchmark eliminado'))
+            return
+        if options['conservar'] and len(options['escalas']) > 1:
+            raise CommandError('--conservar solo admite una escala')
+        if Usuario.objects.filter(user__username__startswith=f'{PREFIJO}_').exists():
+            raise CommandError('Ya hay un dataset de benchmark sembrado; elimínalo con --limpiar')
+
+        escalas = {}
+        for escala in options['escalas']:
+            escalas[escala] = self._medir_escala(escala, options)
+
+        guardar_resultados(options['salida'], escalas)
+        self.stdout.write(self.style.SUCCESS(f"\n💾 Resultados en {options['salida']}"))
+
+        if options['comparar']:
+            with open(options['comparar'], encoding='utf-8') as archivo:
+                anterior = json.load(archivo)
+            self._mostrar_comparacion(anterior, {'escalas': escalas})
+
+    def _medir_escala(self, escala, options):
+        datos = {}
+        try:
+            with transaction.atomic():
+                inicio = time.perf_counter()
+                datos['filas'] = sembrar_dataset(ESCALAS[escala], semilla=options['semilla'])
+                datos['siembra_seg'] = round(time.perf_counter() - inicio, 2)
+                self.stdout.write(self.style.NOTICE(
+                    f"\n🌱 {escala}: {datos['filas']['reservas']} reservas, "
+                    f"{datos['filas']['clientes']} clientes en {datos['siembra_seg']}s"
+                ))
+
+                datos['resultados'] = medir_endpoints(options['repeticiones'], options.get('solo'))
+                self._mostrar(datos['resultados'])
+
+                if not options['conservar']:
+                    raise _Revertir()
+        except _Revertir:
+            pass
+        return datos
+
+    def _mostrar(self, resultados):
+        self.stdout.write(
+            f"{'endpoint':<24} {'formato':<7} {'status':>6} {'ms':>9} {'max ms':>9} "
+            f"{'queries':>8} {'py MB':>7} {'RSS MB':>8}"
+        )
+        for r in resultados:
+            linea = (f"{r['endpoint']:<24} {r['formato'] or '-':<7} {r['status']:>6} {r['latencia_ms']:>9.1f} "
+                     f"{r['latencia_max_ms']:>9.1f} {r['consultas']:>8} {r['python_pico_mb']:>7.1f} {r['rss_max_mb']:>8.1f}")
+            self.stdout.write(self.style.ERROR(linea) if r['status'] >= 400 else linea)
+
+    def _mostrar_comparacion(self, anterior, actual):
+        filas = comparar_resultados(anterior, actual)
+        self.stdout.write(self.style.NOTICE(
+            f"\nComparación con commit {anterior.get('commit') or '?'} ({anterior.get('fecha', '?')})"
+        ))
+        for f in filas:
+            linea = (f"{f['escala']:<5} {f['endpoint']:<24} {f['formato'] or '-':<7} "
+                     f"{f['latencia_antes_ms']:>9.1f} → {f['latencia_ms']:>9.1f} ms ({f['variacion']:+.0%})  "
+                     f"queries {f['consultas_antes']} → {f['consultas']}")
+            self.stdout.write(self.style.WARNING(f"⚠️ {linea}") if f['regresion'] else f"   {linea}")
+        regresiones = sum(1 for f in filas if f['regresion'])
+        estilo = self.style.WARNING if regresiones else self.style.SUCCESS
+        self.stdout.write(estilo(f"\n{regresiones} regresiones en {len(filas)} casos comparados"))
@@ -0,0 +1,151 @@
+"""
+Benchmark antes/después de los índices compuestos y parciales de reservas y pagos.
+
+Siembra el dataset determinista de ``benchmark_escala`` y para cada índice
+ejecuta la consulta de la carga real que lo justifica dos veces: con el
+índice y después de eliminarlo. Muestra el tiempo de cada caso, el factor
+de mejora y si el plan (``QuerySet.explain``) usa el índice. Todo corre en
+una transacción que se revierte: la base y sus índices quedan como estaban.
+
+``DROP INDEX`` dentro de la transacción retiene un bloqueo ACCESS EXCLUSIVE
+sobre la tabla hasta el final de la corrida, así que el comando solo corre
+con ``DEBUG`` sobre una base descartable (SQLite o una base de pruebas
+confirmada; ver ``exigir_base_descartable``). Nunca contra producción.
+
+Uso:
+    python manage.py benchmark_indices
+    python manage.py benchmark_indices --escala 100x --repeticiones 10
+    python manage.py benchmark_indices --salida indices.json
+    python manage.py benchmark_indices --settings=<settings con DATABASES de pruebas> --base-descartable
+"""
+import json
+import statistics
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+
+from condominio.benchmark_escala import ESCALAS, exigir_base_descartable, metadatos, sembrar_dataset
+from condominio.models import Pago, Reserva, Usuario
+
+MUESTRA = 20
+_MES = (date(2025, 6, 1), date(2025, 6, 30))
+
+# (índice, modelo, descripción, consultas(muestra) -> [querysets])
+CASOS = [
+    ('reserva_estado_fecha_idx', Reserva, 'reservas pendientes del mes',
+     lambda m: [Reserva.objects.filter(estado='PENDIENTE', fecha__range=_MES).values('id', 'fecha', 'total')]),
+    ('reserva_cliente_fecha_idx', Reserva, 'historial de reservas del cliente',
+     lambda m: [Reserva.objects.filter(cliente_id=c).order_by('-fecha')[:20] for c in m['clientes']]),
+    ('reserva_paquete_fecha_idx', Reserva, 'ventas de un paquete en el año',
+     lambda m: [Reserva.objects.filter(paquete_id=p, fecha__gte=date(2025, 1, 1)).order_by()
+                .values('paquete_id').annotate(total=Sum('total')) for p in m['paquetes']]),
+    ('reserva_servicio_fecha_idx', Reserva, 'ventas de un servicio en el año',
+     lambda m: [Reserva.objects.filter(servicio_id=s, fecha__gte=date(2025, 1, 1)).order_by()
+                .values('servicio_id').annotate(total=Sum('total')) for s in m['servicios']]),
+    ('pago_confirmado_fecha_idx', Pago, 'cobros confirmados del mes',
+     lambda m: [Pago.objects.filter(estado='Confirmado', fecha_pago__range=_MES).order_by()
+                .values('fecha_pago').annotate(total=Sum('monto'))]),
+]
+
+
+class _Revertir(Exception):
+    pass
+
+
+def _muestra():
+    """Ids representativos (los clientes con más reservas, como en producción)."""
+    clientes = list(
+        Usuario.objects.filter(user__username__startswith='bench_')
+        .annotate(n=Count('reservas')).order_by('-n').values_list('id', flat=True)[:MUESTRA]
+    )
+    reservas = Reserva.objects.filter(cliente__user__username__startswith='bench_')
+    return {
+        'clientes': clientes,
+        'paquetes': list(reservas.exclude(paquete=None).values_list('paquete_id', flat=True).distinct()[:MUESTRA]),
+        'servicios': list(reservas.exclude(servicio=None).values_list('servicio_id', flat=True).distinct()[:MUESTRA]),
+    }
+
+
+def _analizar_tablas():
+    """Actualiza estadísticas del planificador tras la siembra."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            for modelo in (Reserva, Pago):
+                cursor.execute(f'ANALYZE {connection.ops.quote_name(modelo._meta.db_table)}')
+        elif connection.vendor == 'sqlite':
+            cursor.execute('ANALYZE')
+
+
+def _medir(consultas, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        for qs in consultas:
+            list(qs.all())  # .all(): clon sin caché de resultados
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return round(statistics.median(tiempos), 2)
+
+
+class Command(BaseCommand):
+    help = 'Mide cada índice compuesto/parcial con y sin él sobre el dataset de benchmark'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--escala', choices=list(ESCALAS), default='10x', help='Escala del dataset (default: 10x)')
+        parser.add_argument('--repeticiones', type=int, default=5, help='Mediciones por caso (default: 5)')
+        parser.add_argument('--salida', help='Archivo JSON donde guardar los resultados')
+        parser.add_argument('--base-descartable', action='store_true',
+                            help='Confirma que la base configurada es de pruebas (requerido fuera de SQLite)')
+
+    def handle(self, *args, **options):
+        exigir_base_descartable(options['base_descartable'])
+        resultados = []
+        try:
+            with transaction.atomic():
+                filas = sembrar_dataset(ESCALAS[options['escala']])
+                _analizar_tablas()
+                self.stdout.write(self.style.NOTICE(f"\n🌱 {options['escala']} ({connection.vendor}): {filas}"))
+
+                muestra = _muestra()
+                editor = connection.schema_editor(collect_sql=True)
+                for nombre, modelo, descripcion, construir in CASOS:
+                    indice = next(i for i in modelo._meta.indexes if i.name == nombre)
+                    consultas = construir(muestra)
+                    usa_indice = nombre in consultas[0].explain()
+                    con_indice = _medir(consultas, options['repeticiones'])
+
+                    with connection.cursor() as cursor:
+                        cursor.execute(f'DROP INDEX {connection.ops.quote_name(nombre)}')
+                        sin_indice = _medir(consultas, options['repeticiones'])
+                        cursor.execute(str(indice.create_sql(modelo, editor)))
+
+                    resultados.append({
+                        'indice': nombre,
+                        'consulta': descripcion,
+                        'consultas_por_medicion': len(consultas),
+                        'sin_indice_ms': sin_indice,
+                        'con_indice_ms': con_indice,
+                        'factor': round(sin_indice / con_indice, 1) if con_indice else None,
+                        'usa_indice': usa_indice,
+                    })
+                raise _Revertir()
+        except _Revertir:
+            pass
+
+        self._mostrar(resultados)
+        if options['salida']:
+            with open(options['salida'], 'w', encoding='utf-8') as archivo:
+                json.dump({**metadatos(), 'escala': options['escala'], 'filas': filas, 'resultados': resultados},
+                          archivo, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"💾 Resultados en {options['salida']}"))
+
+    def _mostrar(self, resultados):
+        self.stdout.write(
+            f"\n{'índice':<30} {'consulta':<36} {'sin ms':>9} {'con ms':>9} {'factor':>7} {'usa':>4}"
+        )
+        for r in resultados:
+            linea = (f"{r['indice']:<30} {r['consulta']:<36} {r['sin_indice_ms']:>9.2f} "
+                     f"{r['con_indice_ms']:>9.2f} {r['factor'] or 0:>6.1f}x {'sí' if r['usa_indice'] else 'no':>4}")
+            self.stdout.write(linea if r['usa_indice'] else self.style.WARNING(linea))
@@ -0,0 +1,78 @@
+"""
+Benchmark de los intérpretes locales de comandos (sin IA).
+
+Verifica primero la exactitud contra el corpus de referencia
+(``condominio/parser_corpus.json``) y luego mide cuántos comandos por
+segundo procesa cada etapa: el análisis léxico compilado
+(``parser_comandos.analizar``), ``ReportesIAProcessor._procesar_local`` e
+``InterpretadorComandosVoz.interpretar``.
+
+Uso:
+    python manage.py benchmark_parser_comandos
+    python manage.py benchmark_parser_comandos --iteraciones 2000
+    python manage.py benchmark_parser_comandos --corpus otro_corpus.json
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from condominio.ia_processor import obtener_procesador
+from condominio.parser_comandos import RUTA_CORPUS, analizar, cargar_corpus, evaluar_corpus
+from condominio.reportes import InterpretadorComandosVoz
+
+
+class Command(BaseCommand):
+    help = 'Mide exactitud y comandos por segundo de los intérpretes locales de comandos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iteraciones',
+            type=int,
+            default=500,
+            help='Veces que se recorre el corpus en la medición de velocidad (default: 500)',
+        )
+        parser.add_argument(
+            '--corpus',
+            default=RUTA_CORPUS,
+            help='Ruta del corpus JSON (default: condominio/parser_corpus.json)',
+        )
+
+    def handle(self, *args, **options):
+        corpus = cargar_corpus(options['corpus'])
+
+        # Exactitud
+        fallos = evaluar_corpus(corpus)
+        for parser in ('local', 'voz'):
+            casos = [c for c in corpus if c['parser'] == parser]
+            errores = [f for f in fallos if f['parser'] == parser]
+            if casos:
+                exactitud = (len(casos) - len(errores)) / len(casos) * 100
+                estilo = self.style.SUCCESS if not errores else self.style.WARNING
+                self.stdout.write(estilo(f"🎯 {parser:<6} {exactitud:6.1f}% ({len(casos) - len(errores)}/{len(casos)})"))
+        for fallo in fallos:
+            self.stdout.write(self.style.ERROR(f"   ❌ [{fallo['parser']}] {fallo['comando']}: {fallo['diferencias']}"))
+
+        # Velocidad
+        iteraciones = options['iteraciones']
+        comandos = [c['comando'] for c in corpus]
+        procesador = obtener_procesador()
+        etapas = [
+            ('analizar', analizar),
+            ('local', procesador._procesar_local),
+            ('voz', InterpretadorComandosVoz.interpretar),
+        ]
+
+        self.stdout.write(self.style.NOTICE(f"\n{'etapa':<10} {'comandos':>10} {'seg':>8} {'cmd/s':>10} {'µs/cmd':>8}"))
+        for nombre, funcion in etapas:
+            inicio = time.perf_counter()
+            for _ in range(iteraciones):
+                for comando in comandos:
+                    funcion(comando)
+            duracion = time.perf_counter() - inicio
+            total = iteraciones * len(comandos)
+            self.stdout.write(
+                f"{nombre:<10} {total:>10} {duracion:>8.2f} {total / duracion:>10.0f} {duracion / total * 1e6:>8.1f}"
+            )
+
+        if fallos:
+            self.stdout.write(self.style.WARNING(f"\n⚠️ {len(fallos)} casos del corpus no coinciden"))
@@ -0,0 +1,71 @@
+"""
+Benchmark del ajuste vectorizado de pronósticos de demanda.
+
+Genera series diarias sintéticas (Poisson con estacionalidad semanal y
+anual, sin tocar la base de datos) para miles de productos y mide cuánto
+tarda ``ajustar_pronosticos`` en ajustarlas todas y pronosticar el
+horizonte. También reporta el error absoluto medio contra la tasa real de
+los días pronosticados.
+
+Uso:
+    python manage.py benchmark_pronosticos
+    python manage.py benchmark_pronosticos --series 1000 5000 20000
+    python manage.py benchmark_pronosticos --series 5000 --repeticiones 5
+"""
+import statistics
+import time
+from datetime import date, timedelta
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from condominio.pronostico_demanda import HISTORIA_DIAS, HORIZONTE_DIAS, _calendario, ajustar_pronosticos
+
+INICIO = date(2024, 1, 1)
+SEMANA = np.array([0.8, 0.8, 0.9, 1.0, 1.2, 1.5, 1.3])
+ANUAL = np.array([1.1, 1.3, 0.8, 0.8, 0.9, 1.1, 1.4, 1.3, 0.9, 0.9, 1.0, 1.5])
+
+
+def series_sinteticas(cantidad, dias, horizonte, semilla=42):
+    """Tasas reales (cantidad × (dias + horizonte)) y conteos observados de la historia."""
+    rng = np.random.default_rng(semilla)
+    dia_semana, mes = _calendario(INICIO, dias + horizonte)
+    base = rng.gamma(shape=1.5, scale=2.0, size=(cantidad, 1))
+    amplitud = rng.uniform(0, 1, size=(cantidad, 1))
+    tasas = base * (1 + amplitud * (SEMANA[dia_semana] - 1)) * (1 + amplitud * (ANUAL[mes] - 1))
+    # Productos nuevos: parte de las series empieza a mitad de la historia
+    inicio = np.where(rng.uniform(size=cantidad) < 0.2, rng.integers(0, dias // 2, size=cantidad), 0)
+    tasas[np.arange(dias + horizonte) < inicio[:, None]] = 0
+    return tasas, rng.poisson(tasas[:, :dias]).astype(float)
+
+
+class Command(BaseCommand):
+    help = 'Mide el ajuste vectorizado de pronósticos de demanda con series sintéticas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--series', type=int, nargs='+', default=[1000, 5000, 10000],
+                            help='Cantidades de series a ajustar')
+        parser.add_argument('--dias', type=int, default=HISTORIA_DIAS, help='Días de historia por serie')
+        parser.add_argument('--horizonte', type=int, default=HORIZONTE_DIAS, help='Días a pronosticar')
+        parser.add_argument('--repeticiones', type=int, default=3)
+
+    def handle(self, *args, **options):
+        dias, horizonte = options['dias'], options['horizonte']
+        self.stdout.write(f"🔮 Ajuste de pronósticos: {dias} días de historia, horizonte de {horizonte} días")
+        self.stdout.write(f"{'series':>8} {'mediana (s)':>12} {'máx (s)':>9} {'series/s':>10} {'MAE':>7}")
+
+        for cantidad in options['series']:
+            tasas, observadas = series_sinteticas(cantidad, dias, horizonte)
+            tiempos = []
+            for _ in range(options['repeticiones']):
+                t0 = time.perf_counter()
+                demanda, _ = ajustar_pronosticos(observadas, INICIO, horizonte)
+                tiempos.append(time.perf_counter() - t0)
+            mediana = statistics.median(tiempos)
+            error = float(np.abs(demanda - tasas[:, dias:]).mean())
+            self.stdout.write(
+                f"{cantidad:>8} {mediana:>12.3f} {max(tiempos):>9.3f} {cantidad / mediana:>10.0f} {error:>7.3f}"
+            )
+
+        fin = INICIO + timedelta(days=dias - 1)
+        self.stdout.write(self.style.SUCCESS(f"✅ Benchmark completado (historia {INICIO} → {fin})"))
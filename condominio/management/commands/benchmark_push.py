@@ -0,0 +1,69 @@
+"""
+Benchmark del envío push concurrente contra un servidor FCM falso.
+
+Levanta ``ServidorFCMFalso`` dentro del proceso (o usa ``--url`` de uno
+levantado con ``manage.py servidor_fcm_falso``) y envía el mismo mensaje a
+``--tokens`` tokens sintéticos con ``EnviadorPush`` para cada nivel de
+``--concurrencia``. Reporta throughput, percentiles de latencia por mensaje
+(p50/p95/p99, incluyendo reintentos), latencia del lote más lento,
+reintentos y fallas finales. No toca la base de datos.
+
+Uso:
+    python manage.py benchmark_push
+    python manage.py benchmark_push --tokens 5000 --concurrencia 8 32 64
+    python manage.py benchmark_push --latencia-ms 80 --variacion-ms 60 --tasa-fallas 0.05
+    python manage.py benchmark_push --url http://127.0.0.1:8787
+"""
+from django.core.management.base import BaseCommand
+
+from core.envio_push import EnviadorPush, TransporteHTTP
+from core.fcm_falso import ServidorFCMFalso
+
+
+class Command(BaseCommand):
+    help = 'Mide throughput y latencia de cola del envío push con un servidor FCM falso'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tokens', type=int, default=2000)
+        parser.add_argument('--concurrencia', type=int, nargs='+', default=[1, 8, 32])
+        parser.add_argument('--reintentos', type=int, default=3)
+        parser.add_argument('--url', default='', help='Servidor FCM externo (por defecto uno falso en el proceso)')
+        parser.add_argument('--latencia-ms', type=float, default=30.0)
+        parser.add_argument('--variacion-ms', type=float, default=10.0)
+        parser.add_argument('--tasa-fallas', type=float, default=0.02)
+        parser.add_argument('--tasa-invalidos', type=float, default=0.01)
+
+    def handle(self, *args, **options):
+        servidor = None
+        url = options['url']
+        if not url:
+            servidor = ServidorFCMFalso(
+                latencia_ms=options['latencia_ms'], variacion_ms=options['variacion_ms'],
+                tasa_fallas=options['tasa_fallas'], tasa_invalidos=options['tasa_invalidos'], semilla=42,
+            ).iniciar()
+            url = servidor.url
+
+        tokens = [f'bench-{i}' for i in range(options['tokens'])]
+        self.stdout.write(f"📡 Envío push a {len(tokens)} tokens contra {url}")
+        self.stdout.write(
+            f"{'conc.':>6} {'segundos':>9} {'msg/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+            f"{'lote máx ms':>12} {'reintentos':>11} {'fallidos':>9}"
+        )
+        try:
+            for concurrencia in options['concurrencia']:
+                enviador = EnviadorPush(TransporteHTTP(url), concurrencia=concurrencia,
+                                        reintentos=options['reintentos'], pausa_base=0.05)
+                resultado = enviador.enviar(tokens, 'Benchmark', 'Mensaje de prueba', {'origen': 'benchmark'})
+                m = resultado['metricas']
+                lote_max = max(l['latencia_ms'] for l in resultado['lotes'])
+                self.stdout.write(
+                    f"{concurrencia:>6} {m['duracion_ms'] / 1000:>9.2f} {m['mensajes_por_segundo']:>8.0f} "
+                    f"{m['p50_ms']:>8.1f} {m['p95_ms']:>8.1f} {m['p99_ms']:>8.1f} {lote_max:>12.0f} "
+                    f"{m['reintentos']:>11} {resultado['failure']:>9}"
+                )
+        finally:
+            if servidor:
+                servidor.detener()
+                self.stdout.write(f"   Respuestas del servidor: {dict(servidor.respuestas)}")
+
+        self.stdout.write(self.style.SUCCESS('✅ Benchmark completado'))
@@ -0,0 +1,123 @@
+"""
+Benchmark de generación de DOCX para reportes grandes.
+
+Genera reportes de ventas en Word con datos sintéticos (sin tocar la base
+de datos) de distintos tamaños y mide tiempo y pico de memoria Python
+(tracemalloc). Las tablas generadas en bloque (``_agregar_tabla_docx``)
+deben crecer de forma lineal; como referencia se mide también el enfoque
+anterior (``table.add_row()`` con formato celda por celda) hasta
+``--max-add-row`` filas, porque más allá tarda minutos.
+
+Uso:
+    python manage.py benchmark_reportes_docx
+    python manage.py benchmark_reportes_docx --filas 1000 10000 50000
+    python manage.py benchmark_reportes_docx --filas 2000 5000 --max-add-row 0
+"""
+import os
+import tempfile
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from docx import Document
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls
+from docx.shared import Inches, Pt, RGBColor
+
+from condominio.export_utils import ExportadorReportesWord
+from condominio.management.commands.benchmark_reportes_pdf import _ventas_sinteticas
+
+ANCHOS = [Inches(1.8), Inches(2.2), Inches(1.0), Inches(1.2), Inches(1.0)]
+
+
+def _ventas_docx(cantidad):
+    return [
+        {'cliente': v['cliente'], 'producto': v['producto'], 'fecha': v['fecha'],
+         'monto': v['monto'], 'estado': v['estado']}
+        for v in _ventas_sinteticas(cantidad)
+    ]
+
+
+def _docx_add_row(ventas, destino):
+    """Referencia: tabla de detalle con add_row() y formato por celda (comportamiento anterior)."""
+    doc = Document()
+    tabla = doc.add_table(rows=1, cols=5)
+    tabla.style = 'Light Grid Accent 1'
+    for celda, encabezado in zip(tabla.rows[0].cells, ['Cliente', 'Producto', 'Fecha', 'Monto', 'Estado']):
+        celda.text = encabezado
+        celda._tc.get_or_add_tcPr().append(parse_xml(r'<w:shd {} w:fill="2980B9"/>'.format(nsdecls('w'))))
+        for run in celda.paragraphs[0].runs:
+            run.font.bold = True
+            run.font.color.rgb = RGBColor(255, 255, 255)
+            run.font.size = Pt(11)
+    for venta in ventas:
+        celdas = tabla.add_row().cells
+        celdas[0].text = venta['cliente']
+        celdas[1].text = venta['producto']
+        celdas[2].text = venta['fecha']
+        celdas[3].text = f"${venta['monto']:,.2f}"
+        celdas[4].text = venta['estado']
+        for celda in celdas:
+            for paragraph in celda.paragraphs:
+                for run in paragraph.runs:
+                    run.font.size = Pt(9)
+    for i, ancho in enumerate(ANCHOS):
+        for fila in tabla.rows:
+            fila.cells[i].width = ancho
+    doc.save(destino)
+
+
+def _docx_bloques(ventas, destino):
+    datos = {
+        'resumen': {'total_ventas': 0, 'total_transacciones': len(ventas), 'ticket_promedio': 0},
+        'ventas': ventas,
+        'filtros': {},
+    }
+    ExportadorReportesWord().generar_reporte_ventas(datos, destino=destino)
+
+
+class Command(BaseCommand):
+    help = 'Mide tiempo y memoria de la generación de DOCX en bloque vs. add_row()'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--filas',
+            nargs='+',
+            type=int,
+            default=[1000, 5000, 20000],
+            help='Cantidades de filas a medir (default: 1000 5000 20000)',
+        )
+        parser.add_argument(
+            '--max-add-row',
+            type=int,
+            default=5000,
+            help='Máximo de filas para medir la referencia add_row() (0 = no medirla)',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.NOTICE(
+            f"\n{'modo':<10} {'filas':>8} {'seg':>8} {'µs/fila':>9} {'pico MB':>9} {'DOCX KB':>9}"
+        ))
+        for filas in options['filas']:
+            ventas = _ventas_docx(filas)
+            modos = [('bloques', _docx_bloques)]
+            if filas <= options['max_add_row']:
+                modos.append(('add_row', _docx_add_row))
+            for nombre, funcion in modos:
+                fd, ruta = tempfile.mkstemp(suffix='.docx')
+                os.close(fd)
+                try:
+                    tracemalloc.start()
+                    inicio = time.perf_counter()
+                    funcion(ventas, ruta)
+                    duracion = time.perf_counter() - inicio
+                    _, pico = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                    tamano = os.path.getsize(ruta)
+                finally:
+                    os.remove(ruta)
+
+                self.stdout.write(
+                    f"{nombre:<10} {filas:>8} {duracion:>8.2f} {duracion / filas * 1e6:>9.1f} "
+                    f"{pico / 1024 / 1024:>9.1f} {tamano / 1024:>9.0f}"
+                )
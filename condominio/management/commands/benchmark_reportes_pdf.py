@@ -0,0 +1,119 @@
+"""
+Benchmark de generación de PDF para reportes grandes.
+
+Genera reportes de ventas con datos sintéticos (sin tocar la base de datos)
+de distintos tamaños y mide tiempo y pico de memoria Python (tracemalloc).
+El renderizado por bloques debe crecer de forma lineal en tiempo y mantener
+la memoria casi plana; con ``--tabla-unica`` se mide también el enfoque
+anterior (una sola Table con todas las filas) como referencia.
+
+Uso:
+    python manage.py benchmark_reportes_pdf
+    python manage.py benchmark_reportes_pdf --filas 1000 10000 50000
+    python manage.py benchmark_reportes_pdf --filas 1000 5000 --tabla-unica
+"""
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from reportlab.lib.pagesizes import letter
+from reportlab.platypus import SimpleDocTemplate, Table
+
+from condominio.export_utils import (
+    ExportadorReportesPDF,
+    TAMANO_BLOQUE_PDF,
+    _estilo_tabla_detalle,
+)
+
+
+def _ventas_sinteticas(cantidad, semilla=42):
+    rnd = random.Random(semilla)
+    inicio = date(2024, 1, 1)
+    estados = ['CONFIRMADA', 'PAGADA', 'COMPLETADA']
+    for i in range(cantidad):
+        yield {
+            'fecha': (inicio + timedelta(days=i % 365)).strftime('%d/%m/%Y'),
+            'cliente': f'Cliente {rnd.randint(1, 5000)}',
+            'producto': f'Paquete Turístico {rnd.randint(1, 300)}',
+            'tipo': rnd.choice(['Paquete', 'Servicio']),
+            'monto': round(rnd.uniform(100, 5000), 2),
+            'estado': rnd.choice(estados),
+        }
+
+
+def _pdf_tabla_unica(ventas, destino):
+    """Referencia: todas las filas en una sola Table (comportamiento anterior)."""
+    exportador = ExportadorReportesPDF(moneda='BOB')
+    data = [['Fecha', 'Cliente', 'Producto', 'Tipo', 'Monto', 'Estado']]
+    for v in ventas:
+        data.append([v['fecha'], v['cliente'], v['producto'], v['tipo'],
+                     exportador._formatear_valor(v['monto']), v['estado']])
+    doc = SimpleDocTemplate(destino, pagesize=letter)
+    tabla = Table(data, repeatRows=1, style=_estilo_tabla_detalle('#2980B9', columna_numerica=4))
+    doc.build([tabla])
+
+
+def _pdf_bloques(ventas, destino, tamano_bloque):
+    exportador = ExportadorReportesPDF(moneda='BOB', tamano_bloque=tamano_bloque)
+    reporte_data = {
+        'metricas_generales': {'cantidad_reservas': len(ventas)},
+        'ventas': ventas,
+    }
+    exportador.generar_reporte_ventas_general(reporte_data, destino=destino)
+
+
+class Command(BaseCommand):
+    help = 'Mide tiempo y memoria de la generación de PDF por bloques vs. tabla única'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--filas',
+            nargs='+',
+            type=int,
+            default=[1000, 5000, 20000],
+            help='Cantidades de filas a medir (default: 1000 5000 20000)',
+        )
+        parser.add_argument(
+            '--bloque',
+            type=int,
+            default=TAMANO_BLOQUE_PDF,
+            help=f'Filas por bloque (default: {TAMANO_BLOQUE_PDF})',
+        )
+        parser.add_argument(
+            '--tabla-unica',
+            action='store_true',
+            help='Mide también el enfoque de una sola tabla (lento con muchas filas)',
+        )
+
+    def handle(self, *args, **options):
+        modos = [('bloques', lambda v, d: _pdf_bloques(v, d, options['bloque']))]
+        if options['tabla_unica']:
+            modos.append(('tabla_unica', _pdf_tabla_unica))
+
+        self.stdout.write(self.style.NOTICE(
+            f"\n{'modo':<12} {'filas':>8} {'seg':>8} {'µs/fila':>9} {'pico MB':>9} {'PDF KB':>9}"
+        ))
+        for filas in options['filas']:
+            ventas = list(_ventas_sinteticas(filas))
+            for nombre, funcion in modos:
+                fd, ruta = tempfile.mkstemp(suffix='.pdf')
+                os.close(fd)
+                try:
+                    tracemalloc.start()
+                    inicio = time.perf_counter()
+                    funcion(ventas, ruta)
+                    duracion = time.perf_counter() - inicio
+                    _, pico = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                    tamano = os.path.getsize(ruta)
+                finally:
+                    os.remove(ruta)
+
+                self.stdout.write(
+                    f"{nombre:<12} {filas:>8} {duracion:>8.2f} {duracion / filas * 1e6:>9.1f} "
+                    f"{pico / 1024 / 1024:>9.1f} {tamano / 1024:>9.0f}"
+                )
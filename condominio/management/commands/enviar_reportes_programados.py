@@ -0,0 +1,30 @@
+"""
+Management command que genera y entrega los reportes programados vencidos.
+
+Renderiza una vez cada grupo de suscripciones idénticas, guarda el archivo
+en el almacenamiento de reportes y notifica a cada suscriptor. El scheduler
+lo ejecuta cada ``INTERVALO_REPORTES_PROGRAMADOS`` minutos; fuera de
+``REPORTES_PROGRAMADOS_HORARIO_VALLE`` los vencidos quedan diferidos.
+
+Uso:
+    python manage.py enviar_reportes_programados
+    python manage.py enviar_reportes_programados --forzar   # ignora el horario valle
+"""
+from django.core.management.base import BaseCommand
+
+from condominio.reportes_programados import procesar_pendientes
+
+
+class Command(BaseCommand):
+    help = 'Genera y entrega los reportes programados pendientes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--forzar', action='store_true', help='Renderiza aunque esté fuera del horario valle')
+
+    def handle(self, *args, **options):
+        resumen = procesar_pendientes(forzar=options['forzar'])
+        self.stdout.write(self.style.SUCCESS(
+            f"📬 {resumen['entregadas']} suscripciones entregadas "
+            f"({resumen['renders']} renders, {resumen['reutilizados']} reutilizados, {resumen['errores']} errores, "
+            f"{resumen['diferidas']} diferidas)"
+        ))
@@ -0,0 +1,68 @@
+"""
+Management command para exportar snapshots analíticos columnares.
+
+Genera archivos Parquet (o CSV.gz si pyarrow no está instalado) de reservas,
+pagos, servicios reservados, paquetes, servicios y usuarios para que los
+analistas trabajen sobre archivos y no sobre la API transaccional.
+
+Uso:
+    python manage.py exportar_snapshot_analitico
+    python manage.py exportar_snapshot_analitico --completo
+    python manage.py exportar_snapshot_analitico --datasets reservas pagos --lote 10000
+
+Ejemplo de crontab (incremental cada noche a las 03:00):
+    0 3 * * * cd /ruta/proyecto && python manage.py exportar_snapshot_analitico >> /var/log/snapshots.log 2>&1
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from condominio.snapshots import DATASETS, TAMANO_LOTE, exportar_snapshot
+
+
+class Command(BaseCommand):
+    help = 'Exporta reservas, pagos y dimensiones a archivos Parquet/Arrow (incremental por updated_at)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--datasets',
+            nargs='+',
+            choices=list(DATASETS.keys()),
+            help='Datasets a exportar (por defecto todos)',
+        )
+        parser.add_argument(
+            '--completo',
+            action='store_true',
+            help='Ignora las marcas de agua y exporta todas las filas',
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=TAMANO_LOTE,
+            help=f'Filas por lote leídas del cursor (default: {TAMANO_LOTE})',
+        )
+        parser.add_argument(
+            '--directorio',
+            type=str,
+            help='Carpeta destino (por defecto settings.SNAPSHOT_ANALITICO_DIR)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            resultado = exportar_snapshot(
+                datasets=options.get('datasets'),
+                incremental=not options['completo'],
+                directorio=options.get('directorio'),
+                tamano_lote=options['lote'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.NOTICE(
+            f"\n=== Snapshot analítico ({resultado['formato']}) en {resultado['directorio']} ===\n"
+        ))
+        for item in resultado['datasets']:
+            if item['archivo']:
+                self.stdout.write(self.style.SUCCESS(
+                    f"✓ {item['dataset']}: {item['filas']} filas → {item['archivo']}"
+                ))
+            else:
+                self.stdout.write(self.style.WARNING(f"· {item['dataset']}: sin cambios desde la última marca"))
@@ -6,6 +6,7 @@ from django.core.management.base import BaseCommand, CommandError
 from django.utils import timezone
 
 from condominio.models import Reserva, Pago, Usuario, Servicio, Paquete  # ajusta imports a tu proyecto
+from condominio.tasas_cambio import normalizar_montos
 
 
 class Command(BaseCommand):
@@ -112,4 +113,7 @@ class Command(BaseCommand):
 
         pagos_creados = Pago.objects.bulk_create(pagos_a_crear, batch_size=1000)
         self.stdout.write(self.style.SUCCESS(f"Se crearon {len(pagos_creados)} pagos."))
+
+        # bulk_create no pasa por save(): rellenar los montos normalizados BOB/USD
+        normalizar_montos()
         self.stdout.write(self.style.SUCCESS("✅ Datos ficticios generados correctamente."))
@@ -0,0 +1,43 @@
+"""
+Management command para rellenar los montos normalizados (BOB/USD).
+
+Completa ``total_bob``/``total_usd`` de reservas y ``monto_bob``/``monto_usd``
+de pagos con la tasa de ``TasaCambio`` vigente en la fecha de cada
+operación. Sin opciones solo procesa las filas pendientes (recién migradas o
+insertadas con ``bulk_create``); se ejecuta en cada despliegue después de
+``migrate``. Tras cargar o corregir tasas usar ``--todo`` (opcionalmente con
+``--desde`` para no recalcular el histórico completo).
+
+Uso:
+    python manage.py normalizar_montos
+    python manage.py normalizar_montos --todo --desde 2025-01-01
+    python manage.py normalizar_montos --lote 20000
+"""
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from condominio.tasas_cambio import TAMANO_LOTE, normalizar_montos
+
+
+class Command(BaseCommand):
+    help = 'Rellena los montos normalizados en BOB y USD de reservas y pagos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--todo', action='store_true', help='Recalcula también las filas ya normalizadas')
+        parser.add_argument('--desde', help='Solo operaciones desde esta fecha (YYYY-MM-DD)')
+        parser.add_argument('--lote', type=int, default=TAMANO_LOTE,
+                            help=f'Rango de ids por UPDATE (default: {TAMANO_LOTE})')
+
+    def handle(self, *args, **options):
+        desde = None
+        if options['desde']:
+            try:
+                desde = date.fromisoformat(options['desde'])
+            except ValueError:
+                raise CommandError('--desde debe tener formato YYYY-MM-DD')
+
+        resultado = normalizar_montos(todo=options['todo'], desde=desde, lote=options['lote'])
+        self.stdout.write(self.style.SUCCESS(
+            f"💱 {resultado['reservas']} reservas y {resultado['pagos']} pagos normalizados"
+        ))
@@ -0,0 +1,35 @@
+"""
+Management command para asignar departamento y ciudad canónicos.
+
+Empareja el texto libre de ``departamento``/``ciudad`` de servicios y
+paquetes con la tabla canónica (tildes, mayúsculas, espacios, abreviaturas
+y errores de tipeo; ver ubicaciones.py) y completa las FK que usan los
+filtros de reportes. Sin opciones solo procesa las filas pendientes (recién
+migradas o insertadas con ``bulk_create``); se ejecuta en cada despliegue
+después de ``migrate``. ``--todo`` vuelve a emparejar todas las filas, por
+ejemplo tras agregar alias o corregir nombres canónicos en el admin.
+
+Uso:
+    python manage.py normalizar_ubicaciones
+    python manage.py normalizar_ubicaciones --todo --umbral 0.85
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from condominio.ubicaciones import UMBRAL_SIMILITUD, normalizar_ubicaciones
+
+
+class Command(BaseCommand):
+    help = 'Asigna departamento y ciudad canónicos a servicios y paquetes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--todo', action='store_true', help='Vuelve a emparejar también las filas ya asignadas')
+        parser.add_argument('--umbral', type=float, default=UMBRAL_SIMILITUD,
+                            help=f'Similitud mínima para el emparejamiento aproximado (default: {UMBRAL_SIMILITUD})')
+
+    def handle(self, *args, **options):
+        if not 0 < options['umbral'] <= 1:
+            raise CommandError('--umbral debe estar entre 0 y 1')
+        resultado = normalizar_ubicaciones(todo=options['todo'], umbral=options['umbral'])
+        self.stdout.write(self.style.SUCCESS(
+            f"📍 {resultado['servicio']} servicios y {resultado['paquete']} paquetes con ubicación normalizada"
+        ))
@@ -0,0 +1,109 @@
+"""
+Management command para capturar y comparar planes de ejecución de los reportes.
+
+``--capturar`` recalcula los presets del precalentamiento con la captura de
+planes activa (EXPLAIN ANALYZE de cada consulta) y los guarda en
+``PlanConsulta`` bajo una misma corrida. Sin opciones, compara para cada
+reporte + filtros + consulta las dos capturas más recientes y marca cambios
+de plan, consultas más lentas y problemas nuevos (Seq Scan sobre tablas
+grandes, estimaciones de filas muy erradas).
+
+Uso:
+    python manage.py planes_consultas --capturar
+    python manage.py planes_consultas --capturar --solo este_mes
+    python manage.py planes_consultas
+    python manage.py planes_consultas --reporte graficas --factor-tiempo 2
+    python manage.py planes_consultas --problemas
+"""
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from condominio.models import PlanConsulta
+from condominio.planes_consulta import forzar_captura, ultimas_comparaciones
+from condominio.precalentamiento import precalentar
+
+
+class Command(BaseCommand):
+    help = 'Captura planes EXPLAIN de las consultas de reportes y detecta regresiones entre capturas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--capturar', action='store_true', help='Ejecuta los presets y guarda sus planes')
+        parser.add_argument('--solo', nargs='+', help='Prefijos de presets a capturar (ej: este_mes departamento:)')
+        parser.add_argument('--reporte', help='Compara solo este reporte (ej: graficas, ventas_por_cliente)')
+        parser.add_argument(
+            '--factor-tiempo',
+            type=float,
+            default=1.5,
+            help='Marca consultas cuyo tiempo creció al menos este factor (default: 1.5)',
+        )
+        parser.add_argument(
+            '--problemas',
+            action='store_true',
+            help='Lista los problemas de la última corrida en lugar de comparar',
+        )
+
+    def handle(self, *args, **options):
+        if options['capturar']:
+            self._capturar(options.get('solo'))
+        elif options['problemas']:
+            self._problemas()
+        else:
+            self._comparar(options.get('reporte'), options['factor_tiempo'])
+
+    def _capturar(self, solo):
+        if connection.vendor != 'postgresql':
+            self.stdout.write(self.style.WARNING(
+                f"⚠️ Motor {connection.vendor}: se guardan SQL y tiempos, sin planes EXPLAIN"
+            ))
+        corrida = timezone.now().strftime('manual-%Y%m%d-%H%M%S')
+        with forzar_captura(corrida):
+            resultados = precalentar(solo=solo)
+
+        errores = sum(1 for r in resultados if r['error'])
+        planes = PlanConsulta.objects.filter(corrida=corrida)
+        con_problemas = sum(1 for p in planes.only('problemas') if p.problemas)
+        self.stdout.write(self.style.SUCCESS(
+            f"🔬 Corrida {corrida}: {planes.count()} consultas capturadas, "
+            f"{con_problemas} con problemas ({errores} presets con error)"
+        ))
+
+    def _problemas(self):
+        ultima = PlanConsulta.objects.order_by('-creado').values_list('corrida', flat=True).first()
+        if not ultima:
+            self.stdout.write(self.style.WARNING('⚠️ No hay planes capturados'))
+            return
+        self.stdout.write(self.style.NOTICE(f"\nCorrida {ultima}"))
+        for plan in PlanConsulta.objects.filter(corrida=ultima).order_by('-duracion_ms'):
+            for problema in plan.problemas:
+                self.stdout.write(self.style.WARNING(
+                    f"{plan.reporte:<28} {plan.huella_consulta} {plan.duracion_ms:>9.1f} ms  {self._describir(problema)}"
+                ))
+
+    def _comparar(self, reporte, factor_tiempo):
+        cambios = ultimas_comparaciones(reporte=reporte, factor_tiempo=factor_tiempo)
+        if not cambios:
+            self.stdout.write(self.style.SUCCESS('✅ Sin regresiones entre las dos últimas capturas'))
+            return
+
+        for actual, alertas in cambios:
+            self.stdout.write(self.style.NOTICE(
+                f"\n{actual.reporte} [{actual.huella_consulta}] filtros={actual.filtros}"
+            ))
+            self.stdout.write(f"   {' '.join(actual.sql.split())[:160]}")
+            for alerta in alertas:
+                self.stdout.write(self.style.WARNING(f"   ⚠️ {self._describir(alerta)}"))
+        self.stdout.write(self.style.WARNING(f"\n⚠️ {len(cambios)} consultas con cambios"))
+
+    @staticmethod
+    def _describir(alerta):
+        tipo = alerta['tipo']
+        if tipo == 'plan_cambiado':
+            return f"plan cambiado: {' > '.join(alerta['antes'])}  →  {' > '.join(alerta['despues'])}"
+        if tipo == 'mas_lenta':
+            return f"más lenta: {alerta['antes_ms']} ms → {alerta['despues_ms']} ms"
+        prefijo = 'nuevo ' if alerta.get('nuevo') else ''
+        if alerta.get('filas') is not None:
+            return f"{prefijo}Seq Scan en {alerta['tabla']} ({alerta['filas']} filas leídas)"
+        return (f"{prefijo}estimación errada en {alerta['nodo']} {alerta.get('tabla') or ''}: "
+                f"{alerta['estimadas']} estimadas vs {alerta['reales']} reales")
@@ -0,0 +1,42 @@
+"""
+Management command para precalentar las cachés del dashboard y de los reportes.
+
+Calcula los presets comunes ("este mes", "mes pasado", "últimos 30 días",
+rango por defecto y cada departamento) y muestra el tiempo de cada consulta
+para detectar regresiones. El scheduler lo ejecuta a las horas definidas en
+``settings.PRECALENTAMIENTO_HORAS``.
+
+Uso:
+    python manage.py precalentar_caches
+    python manage.py precalentar_caches --solo este_mes departamento:
+"""
+from django.core.management.base import BaseCommand
+
+from condominio.precalentamiento import precalentar
+
+
+class Command(BaseCommand):
+    help = 'Precalienta la caché de gráficas y reportes para los filtros más usados'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--solo',
+            nargs='+',
+            help='Prefijos de presets a ejecutar (ej: este_mes departamento:)',
+        )
+
+    def handle(self, *args, **options):
+        resultados = precalentar(solo=options.get('solo'))
+
+        self.stdout.write(self.style.NOTICE(f"\n{'preset':<32} {'consulta':<32} {'seg':>8}"))
+        for fila in resultados:
+            linea = f"{fila['preset']:<32} {fila['consulta']:<32} {fila['segundos']:>8.3f}"
+            if fila['error']:
+                self.stdout.write(self.style.ERROR(f"{linea}  ❌ {fila['error']}"))
+            else:
+                self.stdout.write(linea)
+
+        total = sum(f['segundos'] for f in resultados)
+        errores = sum(1 for f in resultados if f['error'])
+        estilo = self.style.WARNING if errores else self.style.SUCCESS
+        self.stdout.write(estilo(f"\n🔥 {len(resultados)} consultas en {total:.2f}s ({errores} con error)"))
@@ -0,0 +1,41 @@
+"""
+Management command para recalcular los pronósticos de demanda.
+
+Ajusta las series diarias de reservas de todos los paquetes y servicios y
+reescribe ``PronosticoDemanda`` con los próximos días y los cupos
+sugeridos. El scheduler lo ejecuta cada noche.
+
+Uso:
+    python manage.py pronosticar_demanda
+    python manage.py pronosticar_demanda --horizonte 60
+    python manage.py pronosticar_demanda --hasta 2025-12-31
+"""
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from condominio.pronostico_demanda import HORIZONTE_DIAS, recalcular_pronosticos
+
+
+class Command(BaseCommand):
+    help = 'Recalcula el pronóstico de demanda diaria por paquete y servicio'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--horizonte', type=int, default=HORIZONTE_DIAS, help='Días a pronosticar')
+        parser.add_argument('--hasta', help='Último día de historia (YYYY-MM-DD, default: ayer)')
+
+    def handle(self, *args, **options):
+        hasta = None
+        if options['hasta']:
+            try:
+                hasta = datetime.strptime(options['hasta'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('--hasta debe tener formato YYYY-MM-DD')
+        if options['horizonte'] < 1:
+            raise CommandError('--horizonte debe ser positivo')
+
+        resumen = recalcular_pronosticos(hasta=hasta, horizonte=options['horizonte'])
+        self.stdout.write(self.style.SUCCESS(
+            f"🔮 {resumen['productos']} pronósticos desde {resumen['desde']} "
+            f"({resumen['horizonte_dias']} días, {resumen['sobre_capacidad']} sobre capacidad)"
+        ))
@@ -0,0 +1,28 @@
+"""
+Management command para reconciliar los contadores de cuotas de los planes.
+
+Los contadores de ``UsoPlanProveedor`` se mantienen con señales al crear y
+borrar servicios y reservas; las operaciones masivas (``bulk_create``,
+``QuerySet.delete``, cargas de datos) no disparan señales. Este comando
+recalcula servicios actuales y clientes potenciales del periodo vigente con
+``COUNT`` agrupados, fuera del camino de las peticiones.
+
+Uso:
+    python manage.py recalcular_cuotas
+    python manage.py recalcular_cuotas --proveedor 12 --proveedor 15
+"""
+from django.core.management.base import BaseCommand
+
+from condominio.cuotas import sincronizar_uso
+
+
+class Command(BaseCommand):
+    help = 'Recalcula los contadores de uso de cuotas de los proveedores con plan vigente'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--proveedor', type=int, action='append',
+                            help='Id de Usuario del proveedor (repetible; default: todos)')
+
+    def handle(self, *args, **options):
+        sincronizados = sincronizar_uso(options['proveedor'])
+        self.stdout.write(self.style.SUCCESS(f"🔁 {sincronizados} proveedores con contadores sincronizados"))
@@ -0,0 +1,40 @@
+"""
+Management command para recalcular las métricas precalculadas de proveedores.
+
+Reescribe ``MetricaProveedor`` (reservas, ingresos, cancelaciones y
+capacidad por proveedor, producto y mes). El scheduler lo ejecuta cada noche
+solo para los meses recientes; ``--completo`` reconstruye todo el histórico
+(primer despliegue o tras corregir datos viejos).
+
+Uso:
+    python manage.py recalcular_metricas_proveedores
+    python manage.py recalcular_metricas_proveedores --desde 2025-01
+    python manage.py recalcular_metricas_proveedores --completo
+"""
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from condominio.metricas_proveedor import recalcular_metricas
+
+
+class Command(BaseCommand):
+    help = 'Recalcula las métricas mensuales por proveedor y producto'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--completo', action='store_true', help='Reconstruye todo el histórico')
+        parser.add_argument('--desde', help='Primer mes a reconstruir (YYYY-MM)')
+
+    def handle(self, *args, **options):
+        desde = None
+        if options['desde']:
+            try:
+                desde = datetime.strptime(options['desde'], '%Y-%m').date()
+            except ValueError:
+                raise CommandError('--desde debe tener formato YYYY-MM')
+
+        resumen = recalcular_metricas(completo=options['completo'], desde=desde)
+        self.stdout.write(self.style.SUCCESS(
+            f"🏪 {resumen['filas']} filas de métricas para {resumen['proveedores']} proveedores "
+            f"(desde {resumen['desde'] or 'el inicio'})"
+        ))
@@ -0,0 +1,28 @@
+"""
+Management command para recalcular la segmentación RFM de clientes.
+
+Reconstruye la tabla ``SegmentoCliente`` (recencia, frecuencia, monto, tipo
+de cliente y segmento). El scheduler de campañas lo ejecuta cada noche;
+también puede lanzarse manualmente o desde el endpoint de administración.
+
+Uso:
+    python manage.py recalcular_segmentos_rfm
+"""
+from django.core.management.base import BaseCommand
+
+from condominio.segmentacion import recalcular_segmentos
+
+
+class Command(BaseCommand):
+    help = 'Recalcula los scores RFM y el segmento de cada cliente'
+
+    def handle(self, *args, **options):
+        resumen = recalcular_segmentos()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"🎯 {resumen['total_clientes']} clientes segmentados"
+        ))
+        for tipo, cantidad in sorted(resumen['por_tipo'].items()):
+            self.stdout.write(f"  · {tipo}: {cantidad}")
+        for segmento, cantidad in sorted(resumen['por_segmento'].items()):
+            self.stdout.write(f"  · {segmento}: {cantidad}")
@@ -5,7 +5,11 @@ Se ejecuta en background de forma continua.
 from django.core.management.base import BaseCommand
 import schedule
 import time
-from condominio.scheduler_campanas import ejecutar_campanas_job
+from condominio.scheduler_campanas import (
+    HORA_SEGMENTACION,
+    ejecutar_campanas_job,
+    programar_jobs_reportes,
+)
 
 
 class Command(BaseCommand):
@@ -18,8 +22,13 @@ class Command(BaseCommand):
         
         # Programar ejecución cada minuto
         schedule.every(1).minutes.do(ejecutar_campanas_job)
+        horas_precalentamiento = programar_jobs_reportes()
         
         self.stdout.write(self.style.SUCCESS("✅ Job programado: cada 1 minuto"))
+        self.stdout.write(self.style.SUCCESS(f"✅ Segmentos RFM programados: diario a las {HORA_SEGMENTACION}"))
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Precalentamiento de cachés: {', '.join(horas_precalentamiento) or 'desactivado'}"
+        ))
         self.stdout.write(self.style.SUCCESS("🔄 Iniciando loop infinito..."))
         
         # Loop infinito
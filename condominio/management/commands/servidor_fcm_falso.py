@@ -0,0 +1,46 @@
+"""
+Servidor FCM falso para pruebas de carga del envío push sin Firebase.
+
+Atiende FCM HTTP v1 (``/v1/projects/<proyecto>/messages:send``) con latencia
+y tasas de falla configurables (ver ``core/fcm_falso.py``). Para que la app
+envíe ahí, exportar ``FCM_URL_BASE`` con la URL que imprime (y sin
+``SIMULAR_FCM``).
+
+Uso:
+    python manage.py servidor_fcm_falso
+    python manage.py servidor_fcm_falso --puerto 8787 --latencia-ms 80 --variacion-ms 40
+    python manage.py servidor_fcm_falso --tasa-fallas 0.05 --tasa-invalidos 0.01 --reintentar-en 1
+"""
+from django.core.management.base import BaseCommand
+
+from core.fcm_falso import ServidorFCMFalso
+
+
+class Command(BaseCommand):
+    help = 'Levanta un servidor FCM v1 falso con latencia y fallas configurables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--puerto', type=int, default=8787)
+        parser.add_argument('--latencia-ms', type=float, default=30.0, help='Latencia fija por pedido')
+        parser.add_argument('--variacion-ms', type=float, default=10.0,
+                            help='Media de la cola exponencial que se suma a la latencia')
+        parser.add_argument('--tasa-fallas', type=float, default=0.0, help='Fracción de 503 UNAVAILABLE')
+        parser.add_argument('--tasa-invalidos', type=float, default=0.0, help='Fracción de 404 UNREGISTERED')
+        parser.add_argument('--reintentar-en', type=int, default=0, help='Retry-After (segundos) de los 503')
+
+    def handle(self, *args, **options):
+        servidor = ServidorFCMFalso(
+            host=options['host'], puerto=options['puerto'], latencia_ms=options['latencia_ms'],
+            variacion_ms=options['variacion_ms'], tasa_fallas=options['tasa_fallas'],
+            tasa_invalidos=options['tasa_invalidos'], reintentar_en=options['reintentar_en'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'📡 Servidor FCM falso en {servidor.url}'))
+        self.stdout.write(f'   export FCM_URL_BASE={servidor.url}  (Ctrl+C para detener)')
+        try:
+            servidor.servir()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            servidor.detener()
+            self.stdout.write(f"🛑 Servidor detenido. Respuestas: {dict(servidor.respuestas)}")
@@ -0,0 +1,248 @@
+"""
+Panel de métricas del proveedor (reservas, ingresos, ocupación, cancelaciones).
+
+``recalcular_metricas`` agrupa las reservas por proveedor, producto
+(servicio o paquete) y mes en dos consultas y reescribe la tabla
+``MetricaProveedor``. El job nocturno solo reconstruye los meses recientes
+(las reservas viejas ya no cambian); ``completo=True`` reconstruye todo.
+
+``metricas_de_proveedor`` lee únicamente esa tabla (filas producto × mes del
+proveedor), así que miles de proveedores pueden refrescar su panel sin
+recorrer ``Reserva``. Lo que cada proveedor ve depende de su plan vigente:
+
+- ``estadisticas_basicas``: resumen y serie mensual del total.
+- ``panel_metricas_avanzado``: además, desglose y serie por producto con
+  ocupación.
+"""
+import calendar
+import logging
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Max, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .dataset_reportes import ESTADOS_VENTA
+from .models import MetricaProveedor, Reserva, Suscripcion
+
+logger = logging.getLogger(__name__)
+
+TAMANO_LOTE = 2000
+MESES_RECIENTES = 2  # el job nocturno reconstruye el mes actual y el anterior
+MESES_POR_DEFECTO = 12
+
+NIVEL_BASICO = 'basico'
+NIVEL_AVANZADO = 'avanzado'
+
+# (campo de Reserva, campo de nombre, capacidad del producto en el mes)
+_PRODUCTOS = {
+    'servicio': ('servicio', 'servicio__titulo', lambda fila, mes: fila['capacidad_base'] * _dias_mes(mes)),
+    'paquete': ('paquete', 'paquete__nombre', lambda fila, mes: fila['capacidad_base']),
+}
+_CAPACIDAD = {'servicio': 'servicio__capacidad_max', 'paquete': 'paquete__cupos_disponibles'}
+
+
+def _dias_mes(mes):
+    return calendar.monthrange(mes.year, mes.month)[1]
+
+
+def primer_dia_mes(fecha):
+    return fecha.replace(day=1)
+
+
+def restar_meses(mes, cantidad):
+    indice = mes.year * 12 + mes.month - 1 - cantidad
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+# ============================================================================
+# 🔄 RECÁLCULO
+# ============================================================================
+
+def consulta_metricas(tipo_producto, desde=None):
+    """Reservas agrupadas por proveedor, producto y mes (una consulta por tipo)."""
+    campo, campo_nombre, _ = _PRODUCTOS[tipo_producto]
+    venta = Q(estado__in=ESTADOS_VENTA)
+    queryset = Reserva.objects.filter(**{f'{campo}__proveedor__isnull': False})
+    if desde:
+        queryset = queryset.filter(fecha__gte=desde)
+    return (
+        queryset.order_by()
+        .values(
+            proveedor_ref=F(f'{campo}__proveedor'),
+            producto_ref=F(f'{campo}_id'),
+            nombre=F(campo_nombre),
+            capacidad_base=F(_CAPACIDAD[tipo_producto]),
+            mes=TruncMonth('fecha'),
+        )
+        .annotate(
+            total_reservas=Count('id'),
+            vendidas=Count('id', filter=venta),
+            canceladas=Count('id', filter=Q(estado='CANCELADA')),
+            bob=Sum('total_bob', filter=venta),
+            usd=Sum('total_usd', filter=venta),
+        )
+    )
+
+
+def recalcular_metricas(completo=False, desde=None):
+    """
+    Reescribe ``MetricaProveedor`` desde el mes de ``desde`` (por defecto los
+    últimos ``MESES_RECIENTES`` meses) o completa. Retorna un resumen.
+    """
+    ahora = timezone.now()
+    if completo:
+        desde = None
+    else:
+        desde = primer_dia_mes(desde or restar_meses(timezone.localdate().replace(day=1), MESES_RECIENTES - 1))
+
+    filas = []
+    for tipo_producto, (_, _, capacidad) in _PRODUCTOS.items():
+        for fila in consulta_metricas(tipo_producto, desde).iterator(chunk_size=TAMANO_LOTE):
+            mes = fila['mes'].date() if hasattr(fila['mes'], 'date') else fila['mes']
+            filas.append(MetricaProveedor(
+                proveedor_id=fila['proveedor_ref'],
+                tipo_producto=tipo_producto,
+                producto_id=fila['producto_ref'],
+                producto_nombre=fila['nombre'][:255],
+                periodo=mes,
+                reservas=fila['total_reservas'],
+                reservas_vendidas=fila['vendidas'],
+                reservas_canceladas=fila['canceladas'],
+                ingresos_bob=fila['bob'] or Decimal('0'),
+                ingresos_usd=fila['usd'] or Decimal('0'),
+                capacidad=max(0, capacidad(fila, mes) or 0),
+                calculado_en=ahora,
+            ))
+
+    with transaction.atomic():
+        existentes = MetricaProveedor.objects.all()
+        if desde:
+            existentes = existentes.filter(periodo__gte=desde)
+        existentes.delete()
+        MetricaProveedor.objects.bulk_create(filas, batch_size=TAMANO_LOTE)
+
+    resumen = {
+        'filas': len(filas),
+        'proveedores': len({f.proveedor_id for f in filas}),
+        'desde': desde.strftime('%Y-%m') if desde else None,
+    }
+    logger.info(f"🏪 Métricas de proveedores recalculadas: {resumen}")
+    return resumen
+
+
+# ============================================================================
+# 🔐 PLAN DEL PROVEEDOR
+# ============================================================================
+
+def plan_vigente(usuario):
+    """Plan de la suscripción activa y vigente hoy del proveedor, o None."""
+    hoy = timezone.localdate()
+    suscripcion = (
+        Suscripcion.objects
+        .filter(proveedor__usuario=usuario, activa=True, plan__isnull=False,
+                fecha_inicio__lte=hoy, fecha_fin__gte=hoy)
+        .select_related('plan')
+        .order_by('-fecha_fin')
+        .first()
+    )
+    return suscripcion.plan if suscripcion else None
+
+
+def nivel_metricas(plan):
+    """Nivel del panel según los flags del plan (None: el plan no incluye métricas)."""
+    if plan is None:
+        return None
+    if plan.panel_metricas_avanzado:
+        return NIVEL_AVANZADO
+    if plan.estadisticas_basicas:
+        return NIVEL_BASICO
+    return None
+
+
+# ============================================================================
+# 📊 LECTURA DEL PANEL
+# ============================================================================
+
+def _acumulador():
+    return {'reservas': 0, 'reservas_vendidas': 0, 'reservas_canceladas': 0,
+            'ingresos_bob': Decimal('0'), 'ingresos_usd': Decimal('0'), 'capacidad': 0}
+
+
+def _sumar(acumulado, fila):
+    for clave in acumulado:
+        acumulado[clave] += fila[clave]
+
+
+def _formatear(acumulado, con_ocupacion=True):
+    resultado = {
+        'reservas': acumulado['reservas'],
+        'reservas_vendidas': acumulado['reservas_vendidas'],
+        'reservas_canceladas': acumulado['reservas_canceladas'],
+        'tasa_cancelacion': round(acumulado['reservas_canceladas'] / acumulado['reservas'] * 100, 2)
+        if acumulado['reservas'] else 0.0,
+        'ingresos_bob': float(acumulado['ingresos_bob']),
+        'ingresos_usd': float(acumulado['ingresos_usd']),
+    }
+    if con_ocupacion:
+        resultado['ocupacion'] = (
+            round(acumulado['reservas_vendidas'] / acumulado['capacidad'] * 100, 2)
+            if acumulado['capacidad'] else None
+        )
+    return resultado
+
+
+def metricas_de_proveedor(usuario, desde, hasta, nivel=NIVEL_AVANZADO):
+    """
+    Panel del proveedor entre los meses ``desde`` y ``hasta`` (fechas del
+    primer día del mes), leído de la tabla precalculada.
+    """
+    filas = list(
+        MetricaProveedor.objects
+        .filter(proveedor=usuario, periodo__gte=desde, periodo__lte=hasta)
+        .order_by('periodo', 'tipo_producto', 'producto_id')
+        .values('tipo_producto', 'producto_id', 'producto_nombre', 'periodo', 'reservas',
+                'reservas_vendidas', 'reservas_canceladas', 'ingresos_bob', 'ingresos_usd', 'capacidad')
+    )
+
+    total, por_mes, por_producto = _acumulador(), defaultdict(_acumulador), {}
+    for fila in filas:
+        _sumar(total, fila)
+        _sumar(por_mes[fila['periodo']], fila)
+        if nivel == NIVEL_AVANZADO:
+            clave = (fila['tipo_producto'], fila['producto_id'])
+            producto = por_producto.setdefault(clave, {
+                'nombre': fila['producto_nombre'], 'total': _acumulador(), 'serie': [],
+            })
+            _sumar(producto['total'], fila)
+            producto['serie'].append({
+                'periodo': fila['periodo'].strftime('%Y-%m'),
+                **_formatear(fila),
+            })
+
+    avanzado = nivel == NIVEL_AVANZADO
+    ultimo = MetricaProveedor.objects.filter(proveedor=usuario).aggregate(ultimo=Max('calculado_en'))['ultimo']
+    respuesta = {
+        'nivel': nivel,
+        'periodo': {'desde': desde.strftime('%Y-%m'), 'hasta': hasta.strftime('%Y-%m')},
+        'resumen': _formatear(total, con_ocupacion=avanzado),
+        'serie_mensual': [
+            {'periodo': mes.strftime('%Y-%m'), **_formatear(acumulado, con_ocupacion=avanzado)}
+            for mes, acumulado in sorted(por_mes.items())
+        ],
+        'calculado_en': ultimo.isoformat() if ultimo else None,
+    }
+    if avanzado:
+        respuesta['productos'] = sorted(
+            (
+                {'tipo': tipo, 'id': producto_id, 'nombre': datos['nombre'],
+                 **_formatear(datos['total']), 'serie': datos['serie']}
+                for (tipo, producto_id), datos in por_producto.items()
+            ),
+            key=lambda p: p['ingresos_bob'],
+            reverse=True,
+        )
+    return respuesta
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('condominio', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SegmentoCliente',
+            fields=[
+                ('usuario', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='segmento_rfm', serialize=False, to='condominio.usuario')),
+                ('ultima_compra', models.DateField()),
+                ('recencia_dias', models.PositiveIntegerField()),
+                ('frecuencia', models.PositiveIntegerField()),
+                ('monto_bob', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('r_score', models.PositiveSmallIntegerField()),
+                ('f_score', models.PositiveSmallIntegerField()),
+                ('m_score', models.PositiveSmallIntegerField()),
+                ('tipo_cliente', models.CharField(choices=[('nuevo', 'Nuevo'), ('recurrente', 'Recurrente'), ('vip', 'VIP')], max_length=20)),
+                ('segmento', models.CharField(choices=[('CAMPEON', 'Campeón'), ('LEAL', 'Leal'), ('PROMETEDOR', 'Prometedor'), ('NECESITA_ATENCION', 'Necesita atención'), ('EN_RIESGO', 'En riesgo'), ('HIBERNANDO', 'Hibernando')], max_length=20)),
+                ('calculado_en', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Segmento de Cliente',
+                'verbose_name_plural': 'Segmentos de Clientes',
+                'indexes': [models.Index(fields=['tipo_cliente'], name='segmento_tipo_idx'), models.Index(fields=['segmento'], name='segmento_rfm_idx')],
+            },
+        ),
+    ]
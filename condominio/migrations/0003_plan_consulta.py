@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('condominio', '0002_segmento_cliente'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlanConsulta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('corrida', models.CharField(db_index=True, max_length=40)),
+                ('reporte', models.CharField(max_length=80)),
+                ('filtros', models.JSONField(blank=True, default=dict)),
+                ('huella_filtros', models.CharField(max_length=20)),
+                ('huella_consulta', models.CharField(max_length=20)),
+                ('sql', models.TextField()),
+                ('duracion_ms', models.FloatField()),
+                ('plan', models.JSONField(blank=True, null=True)),
+                ('tiempo_ejecucion_ms', models.FloatField(blank=True, null=True)),
+                ('problemas', models.JSONField(blank=True, default=list)),
+                ('creado', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Plan de Consulta',
+                'verbose_name_plural': 'Planes de Consultas',
+                'ordering': ['-creado'],
+                'indexes': [models.Index(fields=['reporte', 'huella_filtros', 'huella_consulta', 'creado'], name='plan_consulta_clave_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:38
+
+from django.db import migrations, models
+
+from condominio.operaciones_migracion import AgregarIndiceConcurrente
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY no puede correr dentro de una transacción
+    atomic = False
+
+    dependencies = [
+        ('condominio', '0003_plan_consulta'),
+    ]
+
+    operations = [
+        AgregarIndiceConcurrente(
+            model_name='pago',
+            index=models.Index(condition=models.Q(('estado', 'Confirmado')), fields=['fecha_pago'], name='pago_confirmado_fecha_idx'),
+        ),
+        AgregarIndiceConcurrente(
+            model_name='reserva',
+            index=models.Index(fields=['estado', 'fecha'], name='reserva_estado_fecha_idx'),
+        ),
+        AgregarIndiceConcurrente(
+            model_name='reserva',
+            index=models.Index(fields=['cliente', 'fecha'], name='reserva_cliente_fecha_idx'),
+        ),
+        AgregarIndiceConcurrente(
+            model_name='reserva',
+            index=models.Index(condition=models.Q(('paquete__isnull', False)), fields=['paquete', 'fecha'], name='reserva_paquete_fecha_idx'),
+        ),
+        AgregarIndiceConcurrente(
+            model_name='reserva',
+            index=models.Index(condition=models.Q(('servicio__isnull', False)), fields=['servicio', 'fecha'], name='reserva_servicio_fecha_idx'),
+        ),
+    ]
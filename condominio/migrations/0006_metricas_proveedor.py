@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:50
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('condominio', '0005_montos_normalizados'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MetricaProveedor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo_producto', models.CharField(choices=[('servicio', 'Servicio'), ('paquete', 'Paquete')], max_length=10)),
+                ('producto_id', models.PositiveIntegerField()),
+                ('producto_nombre', models.CharField(max_length=255)),
+                ('periodo', models.DateField(help_text='Primer día del mes')),
+                ('reservas', models.PositiveIntegerField(default=0)),
+                ('reservas_vendidas', models.PositiveIntegerField(default=0)),
+                ('reservas_canceladas', models.PositiveIntegerField(default=0)),
+                ('ingresos_bob', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=14)),
+                ('ingresos_usd', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=14)),
+                ('capacidad', models.PositiveIntegerField(default=0, help_text='Cupos del producto en el mes')),
+                ('calculado_en', models.DateTimeField()),
+                ('proveedor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='metricas_proveedor', to='condominio.usuario')),
+            ],
+            options={
+                'verbose_name': 'Métrica de Proveedor',
+                'verbose_name_plural': 'Métricas de Proveedores',
+                'indexes': [models.Index(fields=['proveedor', 'periodo'], name='metrica_proveedor_periodo_idx')],
+                'constraints': [models.UniqueConstraint(fields=('proveedor', 'tipo_producto', 'producto_id', 'periodo'), name='metrica_proveedor_unica')],
+            },
+        ),
+    ]
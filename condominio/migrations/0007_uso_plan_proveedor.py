@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('condominio', '0006_metricas_proveedor'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UsoPlanProveedor',
+            fields=[
+                ('proveedor', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='uso_plan', serialize=False, to='condominio.usuario')),
+                ('servicios', models.PositiveIntegerField(default=0)),
+                ('clientes_potenciales', models.PositiveIntegerField(default=0)),
+                ('periodo_inicio', models.DateField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Uso de Plan',
+                'verbose_name_plural': 'Usos de Planes',
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('condominio', '0007_uso_plan_proveedor'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PronosticoDemanda',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo_producto', models.CharField(choices=[('servicio', 'Servicio'), ('paquete', 'Paquete')], max_length=10)),
+                ('producto_id', models.PositiveIntegerField()),
+                ('producto_nombre', models.CharField(max_length=255)),
+                ('desde', models.DateField(help_text='Primer día pronosticado')),
+                ('demanda', models.JSONField(default=list, help_text="Reservas esperadas por día desde 'desde'")),
+                ('limite_superior', models.JSONField(default=list, help_text='Percentil 90 aproximado por día')),
+                ('demanda_total', models.FloatField(default=0)),
+                ('capacidad', models.PositiveIntegerField(default=0, help_text='capacidad_max del servicio o cupos_disponibles del paquete')),
+                ('cupos_sugeridos', models.PositiveIntegerField(default=0)),
+                ('calculado_en', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Pronóstico de Demanda',
+                'verbose_name_plural': 'Pronósticos de Demanda',
+                'constraints': [models.UniqueConstraint(fields=('tipo_producto', 'producto_id'), name='pronostico_demanda_unico')],
+            },
+        ),
+    ]
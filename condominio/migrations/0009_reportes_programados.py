@@ -0,0 +1,62 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('condominio', '0008_pronostico_demanda'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notificacion',
+            name='tipo',
+            field=models.CharField(choices=[('ticket_nuevo', 'Ticket Nuevo'), ('ticket_respondido', 'Ticket Respondido'), ('ticket_cerrado', 'Ticket Cerrado'), ('reporte_programado', 'Reporte Programado')], max_length=50),
+        ),
+        migrations.CreateModel(
+            name='ReporteGenerado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo_reporte', models.CharField(max_length=20)),
+                ('formato', models.CharField(max_length=10)),
+                ('filtros', models.JSONField(blank=True, default=dict)),
+                ('huella', models.CharField(max_length=80)),
+                ('archivo', models.CharField(help_text='Nombre del archivo en el almacenamiento de reportes', max_length=255)),
+                ('tamano', models.PositiveIntegerField(default=0)),
+                ('duracion_ms', models.FloatField(default=0)),
+                ('generado_en', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Reporte Generado',
+                'verbose_name_plural': 'Reportes Generados',
+                'indexes': [models.Index(fields=['huella', 'generado_en'], name='reporte_generado_huella_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SuscripcionReporte',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True, null=True)),
+                ('tipo_reporte', models.CharField(choices=[('ventas', 'Ventas'), ('clientes', 'Clientes'), ('productos', 'Productos')], max_length=20)),
+                ('formato', models.CharField(choices=[('pdf', 'PDF'), ('excel', 'Excel'), ('docx', 'Word')], default='pdf', max_length=10)),
+                ('filtros', models.JSONField(blank=True, default=dict, help_text="Filtros del reporte; 'periodo' relativo (p. ej. semana_pasada)")),
+                ('programacion', models.CharField(default='0 6 * * 1', help_text='Cron: minuto hora día mes día_semana', max_length=100)),
+                ('activa', models.BooleanField(default=True)),
+                ('proxima_ejecucion', models.DateTimeField(blank=True, null=True)),
+                ('ultima_ejecucion', models.DateTimeField(blank=True, null=True)),
+                ('ultimo_error', models.TextField(blank=True, default='')),
+                ('ultimo_reporte', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='condominio.reportegenerado')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='suscripciones_reportes', to='condominio.usuario')),
+            ],
+            options={
+                'verbose_name': 'Suscripción a Reporte',
+                'verbose_name_plural': 'Suscripciones a Reportes',
+                'abstract': False,
+                'indexes': [models.Index(condition=models.Q(('activa', True)), fields=['proxima_ejecucion'], name='suscripcion_reporte_prox_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Los 9 departamentos de Bolivia: (nombre, clave normalizada como en ubicaciones.clave_ubicacion)
+DEPARTAMENTOS = [
+    ('Chuquisaca', 'chuquisaca'), ('La Paz', 'lapaz'), ('Cochabamba', 'cochabamba'), ('Oruro', 'oruro'),
+    ('Potosí', 'potosi'), ('Tarija', 'tarija'), ('Santa Cruz', 'santacruz'), ('Beni', 'beni'), ('Pando', 'pando'),
+]
+
+
+def cargar_departamentos(apps, schema_editor):
+    Departamento = apps.get_model('condominio', 'Departamento')
+    for nombre, clave in DEPARTAMENTOS:
+        Departamento.objects.get_or_create(clave=clave, defaults={'nombre': nombre})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('condominio', '0009_reportes_programados'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Ciudad',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=100)),
+                ('clave', models.CharField(help_text='Nombre sin tildes, espacios ni mayúsculas', max_length=100)),
+            ],
+            options={
+                'verbose_name_plural': 'Ciudades',
+                'ordering': ['nombre'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Departamento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=100, unique=True)),
+                ('clave', models.CharField(help_text='Nombre sin tildes, espacios ni mayúsculas', max_length=100, unique=True)),
+            ],
+            options={
+                'ordering': ['nombre'],
+            },
+        ),
+        migrations.AddField(
+            model_name='paquete',
+            name='ciudad_canonica',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='paquetes', to='condominio.ciudad'),
+        ),
+        migrations.AddField(
+            model_name='servicio',
+            name='ciudad_canonica',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='servicios', to='condominio.ciudad'),
+        ),
+        migrations.AddField(
+            model_name='ciudad',
+            name='departamento',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ciudades', to='condominio.departamento'),
+        ),
+        migrations.AddField(
+            model_name='paquete',
+            name='departamento_canonico',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='paquetes', to='condominio.departamento'),
+        ),
+        migrations.AddField(
+            model_name='servicio',
+            name='departamento_canonico',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='servicios', to='condominio.departamento'),
+        ),
+        migrations.AddConstraint(
+            model_name='ciudad',
+            constraint=models.UniqueConstraint(fields=('departamento', 'clave'), name='ciudad_departamento_clave_unica'),
+        ),
+        migrations.RunPython(cargar_departamentos, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('condominio', '0010_ubicaciones'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usoplanproveedor',
+            name='clientes_excedidos',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
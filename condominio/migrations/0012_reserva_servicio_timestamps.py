@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:56
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copiar_timestamps_de_reserva(apps, schema_editor):
+    """Las filas existentes heredan los timestamps de su reserva (la marca de agua que usaban los snapshots)."""
+    Reserva = apps.get_model('condominio', 'Reserva')
+    ReservaServicio = apps.get_model('condominio', 'ReservaServicio')
+    reserva = Reserva.objects.filter(pk=OuterRef('reserva_id'))
+    ReservaServicio.objects.update(
+        created_at=Subquery(reserva.values('created_at')[:1]),
+        updated_at=Subquery(reserva.values('updated_at')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('condominio', '0011_uso_plan_clientes_excedidos'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reservaservicio',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='reservaservicio',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, null=True),
+        ),
+        migrations.RunPython(copiar_timestamps_de_reserva, migrations.RunPython.noop),
+    ]
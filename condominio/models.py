@@ -88,6 +88,9 @@ class Reserva(TimeStampedModel):
     estado = models.CharField(max_length=20, choices=ESTADOS, default='PENDIENTE')
     total = models.DecimalField(max_digits=10, decimal_places=2)
     moneda = models.CharField(max_length=10, default='BOB')
+    # 💱 Total normalizado para reportes (condominio/tasas_cambio.py), calculado al guardar
+    total_bob = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True, editable=False)
+    total_usd = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True, editable=False)
     cliente = models.ForeignKey(Usuario, on_delete=models.CASCADE, related_name='reservas')
     cupon = models.ForeignKey(Cupon, on_delete=models.SET_NULL, null=True, blank=True, related_name='reservas')
     servicio = models.ForeignKey('Servicio', on_delete=models.CASCADE, related_name='reservas', null=True, blank=True)
@@ -99,6 +102,27 @@ class Reserva(TimeStampedModel):
     motivo_reprogramacion = models.CharField(max_length=255, blank=True, null=True)
     reprogramado_por = models.ForeignKey(Usuario, on_delete=models.SET_NULL, null=True, blank=True, related_name='reprogramaciones_realizadas')
 
+    class Meta(TimeStampedModel.Meta):
+        # Índices según los filtros de dashboards y reportes; ver manage.py benchmark_indices
+        indexes = [
+            models.Index(fields=['estado', 'fecha'], name='reserva_estado_fecha_idx'),
+            models.Index(fields=['cliente', 'fecha'], name='reserva_cliente_fecha_idx'),
+            models.Index(fields=['paquete', 'fecha'], name='reserva_paquete_fecha_idx',
+                         condition=models.Q(paquete__isnull=False)),
+            models.Index(fields=['servicio', 'fecha'], name='reserva_servicio_fecha_idx',
+                         condition=models.Q(servicio__isnull=False)),
+        ]
+
+    def save(self, *args, **kwargs):
+        from .tasas_cambio import convertir_montos
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'total', 'moneda', 'fecha'} & set(update_fields):
+            self.total_bob, self.total_usd = convertir_montos(self.total, self.moneda, self.fecha)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'total_bob', 'total_usd'}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"Reserva #{self.pk} - {self.cliente.nombre}"
 
@@ -156,7 +180,7 @@ class ReservaVisitante(TimeStampedModel):
 # ======================================
 # 🔗 RESERVA_SERVICIO (servicios múltiples por reserva)
 # ======================================
-class ReservaServicio(models.Model):
+class ReservaServicio(TimeStampedModel):
     reserva = models.ForeignKey(Reserva, on_delete=models.CASCADE, related_name='servicios_reservados')
     servicio = models.ForeignKey('Servicio', on_delete=models.CASCADE)
     fecha = models.DateField()
@@ -167,6 +191,48 @@ class ReservaServicio(models.Model):
         return f"{self.reserva} - {self.servicio.titulo} ({self.fecha})"
 
 
+# ======================================
+# 📍 UBICACIÓN (departamentos y ciudades canónicos)
+# ======================================
+def _asignar_ubicacion_al_guardar(instancia, kwargs):
+    """Resuelve la ubicación canónica de un servicio o paquete si cambió su texto."""
+    from .ubicaciones import asignar_ubicacion
+
+    update_fields = kwargs.get('update_fields')
+    if update_fields is None or {'departamento', 'ciudad'} & set(update_fields):
+        asignar_ubicacion(instancia)
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'departamento_canonico', 'ciudad_canonica'}
+
+
+class Departamento(models.Model):
+    """Departamento canónico; ``clave`` es el nombre normalizado (ver ubicaciones.py)."""
+    nombre = models.CharField(max_length=100, unique=True)
+    clave = models.CharField(max_length=100, unique=True, help_text="Nombre sin tildes, espacios ni mayúsculas")
+
+    class Meta:
+        ordering = ['nombre']
+
+    def __str__(self):
+        return self.nombre
+
+
+class Ciudad(models.Model):
+    departamento = models.ForeignKey(Departamento, on_delete=models.CASCADE, related_name='ciudades')
+    nombre = models.CharField(max_length=100)
+    clave = models.CharField(max_length=100, help_text="Nombre sin tildes, espacios ni mayúsculas")
+
+    class Meta:
+        ordering = ['nombre']
+        verbose_name_plural = "Ciudades"
+        constraints = [
+            models.UniqueConstraint(fields=['departamento', 'clave'], name='ciudad_departamento_clave_unica'),
+        ]
+
+    def __str__(self):
+        return f"{self.nombre} ({self.departamento})"
+
+
 # ======================================
 # 🏞️ SERVICIO
 # ======================================
@@ -218,6 +284,15 @@ class Servicio(TimeStampedModel):
         null=True,
         help_text="Ciudad donde se realiza el servicio"
     )
+    # Ubicación canónica para filtros y agrupaciones (se asigna al guardar, ver ubicaciones.py)
+    departamento_canonico = models.ForeignKey(Departamento, on_delete=models.SET_NULL, null=True, blank=True,
+                                              editable=False, related_name='servicios')
+    ciudad_canonica = models.ForeignKey(Ciudad, on_delete=models.SET_NULL, null=True, blank=True,
+                                        editable=False, related_name='servicios')
+
+    def save(self, *args, **kwargs):
+        _asignar_ubicacion_al_guardar(self, kwargs)
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return self.titulo
@@ -285,12 +360,20 @@ class Paquete(TimeStampedModel):
     departamento = models.CharField(max_length=100, blank=True, null=True)
     ciudad = models.CharField(max_length=100, blank=True, null=True)
     tipo_destino = models.CharField(max_length=50, blank=True, null=True, choices=TIPOS_DESTINO)
+    departamento_canonico = models.ForeignKey(Departamento, on_delete=models.SET_NULL, null=True, blank=True,
+                                              editable=False, related_name='paquetes')
+    ciudad_canonica = models.ForeignKey(Ciudad, on_delete=models.SET_NULL, null=True, blank=True,
+                                        editable=False, related_name='paquetes')
 
     class Meta(TimeStampedModel.Meta):
         ordering = ['-destacado', '-created_at']
         verbose_name = "Paquete Turístico"
         verbose_name_plural = "Paquetes Turísticos"
 
+    def save(self, *args, **kwargs):
+        _asignar_ubicacion_al_guardar(self, kwargs)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.nombre} ({self.duracion})"
     
@@ -405,6 +488,26 @@ class Pago(TimeStampedModel):
     estado = models.CharField(max_length=20, choices=ESTADOS)
     url_stripe = models.URLField(max_length=255, blank=True, null=True)
     reserva = models.ForeignKey(Reserva, on_delete=models.CASCADE, related_name='pagos')
+    # 💱 Monto normalizado (en la moneda de la reserva), calculado al guardar
+    monto_bob = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True, editable=False)
+    monto_usd = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True, editable=False)
+
+    class Meta(TimeStampedModel.Meta):
+        indexes = [
+            models.Index(fields=['fecha_pago'], name='pago_confirmado_fecha_idx',
+                         condition=models.Q(estado='Confirmado')),
+        ]
+
+    def save(self, *args, **kwargs):
+        from .tasas_cambio import convertir_montos
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'monto', 'fecha_pago', 'reserva'} & set(update_fields):
+            moneda = self.reserva.moneda if self.reserva_id else 'BOB'
+            self.monto_bob, self.monto_usd = convertir_montos(self.monto, moneda, self.fecha_pago)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'monto_bob', 'monto_usd'}
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"Pago {self.pk or 'Nuevo'} - {self.estado} - {self.monto}"
@@ -624,6 +727,7 @@ class Notificacion(TimeStampedModel):
         ('ticket_nuevo', 'Ticket Nuevo'),
         ('ticket_respondido', 'Ticket Respondido'),
         ('ticket_cerrado', 'Ticket Cerrado'),
+        ('reporte_programado', 'Reporte Programado'),
     ]
 
     usuario = models.ForeignKey(Usuario, on_delete=models.CASCADE, related_name='notificaciones')
@@ -902,6 +1006,16 @@ class CampanaNotificacion(models.Model):
             if 'min_viajes' in self.segmento_filtros:
                 usuarios = usuarios.filter(num_viajes__gte=self.segmento_filtros['min_viajes'])
             
+            # Segmentación RFM precalculada (ver condominio/segmentacion.py)
+            if 'tipo_cliente' in self.segmento_filtros:
+                usuarios = usuarios.filter(segmento_rfm__tipo_cliente=self.segmento_filtros['tipo_cliente'])
+            
+            if 'segmento' in self.segmento_filtros:
+                segmentos = self.segmento_filtros['segmento']
+                if isinstance(segmentos, str):
+                    segmentos = [segmentos]
+                usuarios = usuarios.filter(segmento_rfm__segmento__in=segmentos)
+            
             return usuarios
         
         elif self.tipo_audiencia == 'ROL':
@@ -990,3 +1104,273 @@ class Suscripcion(TimeStampedModel):
 
     def __str__(self):
         return f"{self.proveedor.nombre_empresa} - {self.plan.nombre} ({'Activa' if self.activa else 'Inactiva'})"
+
+
+# ======================================
+# 🎯 SEGMENTACIÓN DE CLIENTES (RFM)
+# ======================================
+class SegmentoCliente(models.Model):
+    """
+    Segmentación precalculada por cliente (recencia, frecuencia, monto).
+
+    La tabla la recalcula completa el job de condominio/segmentacion.py
+    (nocturno y bajo demanda). Reportes, campañas y dashboards filtran
+    haciendo join contra ella en lugar de recalcular el tipo de cliente.
+    """
+    TIPOS_CLIENTE = [
+        ('nuevo', 'Nuevo'),            # 1 compra
+        ('recurrente', 'Recurrente'),  # 2 a 5 compras
+        ('vip', 'VIP'),                # 6 o más compras
+    ]
+    SEGMENTOS = [
+        ('CAMPEON', 'Campeón'),
+        ('LEAL', 'Leal'),
+        ('PROMETEDOR', 'Prometedor'),
+        ('NECESITA_ATENCION', 'Necesita atención'),
+        ('EN_RIESGO', 'En riesgo'),
+        ('HIBERNANDO', 'Hibernando'),
+    ]
+
+    usuario = models.OneToOneField(Usuario, on_delete=models.CASCADE, primary_key=True, related_name='segmento_rfm')
+    ultima_compra = models.DateField()
+    recencia_dias = models.PositiveIntegerField()
+    frecuencia = models.PositiveIntegerField()
+    monto_bob = models.DecimalField(max_digits=14, decimal_places=2)
+    r_score = models.PositiveSmallIntegerField()
+    f_score = models.PositiveSmallIntegerField()
+    m_score = models.PositiveSmallIntegerField()
+    tipo_cliente = models.CharField(max_length=20, choices=TIPOS_CLIENTE)
+    segmento = models.CharField(max_length=20, choices=SEGMENTOS)
+    calculado_en = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Segmento de Cliente"
+        verbose_name_plural = "Segmentos de Clientes"
+        indexes = [
+            models.Index(fields=['tipo_cliente'], name='segmento_tipo_idx'),
+            models.Index(fields=['segmento'], name='segmento_rfm_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.usuario_id} - {self.tipo_cliente} / {self.segmento}"
+
+
+class UsoPlanProveedor(models.Model):
+    """
+    Contadores de uso del plan de un proveedor (una fila por proveedor).
+
+    Los mantiene condominio/cuotas.py con ``UPDATE`` condicionales al crear y
+    borrar servicios y reservas, así verificar la cuota no requiere ``COUNT``
+    sobre las tablas. ``clientes_potenciales`` (clientes distintos) y
+    ``clientes_excedidos`` (los recibidos por encima del límite del plan) se
+    reinician al empezar cada periodo de facturación (``periodo_inicio``).
+    """
+    proveedor = models.OneToOneField(Usuario, on_delete=models.CASCADE, primary_key=True, related_name='uso_plan')
+    servicios = models.PositiveIntegerField(default=0)
+    clientes_potenciales = models.PositiveIntegerField(default=0)
+    clientes_excedidos = models.PositiveIntegerField(default=0)
+    periodo_inicio = models.DateField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Uso de Plan"
+        verbose_name_plural = "Usos de Planes"
+
+    def __str__(self):
+        return f"{self.proveedor_id}: {self.servicios} servicios, {self.clientes_potenciales} clientes potenciales"
+
+
+class MetricaProveedor(models.Model):
+    """
+    Agregados mensuales precalculados por proveedor y producto.
+
+    Los reconstruye condominio/metricas_proveedor.py (job nocturno, solo los
+    meses recientes; ``manage.py recalcular_metricas_proveedores --completo``
+    para todo el histórico). El panel del proveedor lee solo esta tabla, nunca
+    ``Reserva``.
+    """
+    TIPOS_PRODUCTO = [
+        ('servicio', 'Servicio'),
+        ('paquete', 'Paquete'),
+    ]
+
+    proveedor = models.ForeignKey(Usuario, on_delete=models.CASCADE, related_name='metricas_proveedor')
+    tipo_producto = models.CharField(max_length=10, choices=TIPOS_PRODUCTO)
+    producto_id = models.PositiveIntegerField()
+    producto_nombre = models.CharField(max_length=255)
+    periodo = models.DateField(help_text="Primer día del mes")
+    reservas = models.PositiveIntegerField(default=0)
+    reservas_vendidas = models.PositiveIntegerField(default=0)
+    reservas_canceladas = models.PositiveIntegerField(default=0)
+    ingresos_bob = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0'))
+    ingresos_usd = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0'))
+    capacidad = models.PositiveIntegerField(default=0, help_text="Cupos del producto en el mes")
+    calculado_en = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Métrica de Proveedor"
+        verbose_name_plural = "Métricas de Proveedores"
+        constraints = [
+            models.UniqueConstraint(fields=['proveedor', 'tipo_producto', 'producto_id', 'periodo'],
+                                    name='metrica_proveedor_unica'),
+        ]
+        indexes = [
+            models.Index(fields=['proveedor', 'periodo'], name='metrica_proveedor_periodo_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.proveedor_id} - {self.producto_nombre} {self.periodo:%Y-%m}"
+
+
+class PronosticoDemanda(models.Model):
+    """
+    Pronóstico de reservas diarias de un paquete o servicio (una fila por
+    producto, con la serie de los próximos días en JSON).
+
+    Lo reescribe condominio/pronostico_demanda.py (job nocturno o
+    ``manage.py pronosticar_demanda``); el endpoint de pronósticos solo lee
+    esta tabla.
+    """
+    tipo_producto = models.CharField(max_length=10, choices=MetricaProveedor.TIPOS_PRODUCTO)
+    producto_id = models.PositiveIntegerField()
+    producto_nombre = models.CharField(max_length=255)
+    desde = models.DateField(help_text="Primer día pronosticado")
+    demanda = models.JSONField(default=list, help_text="Reservas esperadas por día desde 'desde'")
+    limite_superior = models.JSONField(default=list, help_text="Percentil 90 aproximado por día")
+    demanda_total = models.FloatField(default=0)
+    capacidad = models.PositiveIntegerField(default=0, help_text="capacidad_max del servicio o cupos_disponibles del paquete")
+    cupos_sugeridos = models.PositiveIntegerField(default=0)
+    calculado_en = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Pronóstico de Demanda"
+        verbose_name_plural = "Pronósticos de Demanda"
+        constraints = [
+            models.UniqueConstraint(fields=['tipo_producto', 'producto_id'], name='pronostico_demanda_unico'),
+        ]
+
+    def __str__(self):
+        return f"{self.tipo_producto} {self.producto_id} - {self.producto_nombre} desde {self.desde}"
+
+
+class ReporteGenerado(models.Model):
+    """
+    Archivo de un reporte programado ya renderizado.
+
+    Lo crea condominio/reportes_programados.py. Las suscripciones con el
+    mismo tipo, formato y filtros resueltos (``huella``) comparten la misma
+    fila y el mismo archivo en el almacenamiento.
+    """
+    tipo_reporte = models.CharField(max_length=20)
+    formato = models.CharField(max_length=10)
+    filtros = models.JSONField(default=dict, blank=True)
+    huella = models.CharField(max_length=80)
+    archivo = models.CharField(max_length=255, help_text="Nombre del archivo en el almacenamiento de reportes")
+    tamano = models.PositiveIntegerField(default=0)
+    duracion_ms = models.FloatField(default=0)
+    generado_en = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Reporte Generado"
+        verbose_name_plural = "Reportes Generados"
+        indexes = [
+            models.Index(fields=['huella', 'generado_en'], name='reporte_generado_huella_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.tipo_reporte}.{self.formato} {self.generado_en:%Y-%m-%d %H:%M}"
+
+
+class SuscripcionReporte(TimeStampedModel):
+    """
+    Suscripción de un usuario a un reporte (tipo, filtros y formato) que se
+    genera según ``programacion`` (expresión cron de 5 campos, hora local) y
+    se entrega como ``Notificacion`` con el enlace de descarga.
+    """
+    TIPOS_REPORTE = [
+        ('ventas', 'Ventas'),
+        ('clientes', 'Clientes'),
+        ('productos', 'Productos'),
+    ]
+    FORMATOS = [
+        ('pdf', 'PDF'),
+        ('excel', 'Excel'),
+        ('docx', 'Word'),
+    ]
+
+    usuario = models.ForeignKey(Usuario, on_delete=models.CASCADE, related_name='suscripciones_reportes')
+    tipo_reporte = models.CharField(max_length=20, choices=TIPOS_REPORTE)
+    formato = models.CharField(max_length=10, choices=FORMATOS, default='pdf')
+    filtros = models.JSONField(default=dict, blank=True, help_text="Filtros del reporte; 'periodo' relativo (p. ej. semana_pasada)")
+    programacion = models.CharField(max_length=100, default='0 6 * * 1', help_text="Cron: minuto hora día mes día_semana")
+    activa = models.BooleanField(default=True)
+    proxima_ejecucion = models.DateTimeField(null=True, blank=True)
+    ultima_ejecucion = models.DateTimeField(null=True, blank=True)
+    ultimo_reporte = models.ForeignKey(ReporteGenerado, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    ultimo_error = models.TextField(blank=True, default='')
+
+    class Meta(TimeStampedModel.Meta):
+        verbose_name = "Suscripción a Reporte"
+        verbose_name_plural = "Suscripciones a Reportes"
+        indexes = [
+            # Pendientes del worker: solo suscripciones activas
+            models.Index(fields=['proxima_ejecucion'], name='suscripcion_reporte_prox_idx',
+                         condition=models.Q(activa=True)),
+        ]
+
+    def __str__(self):
+        return f"{self.usuario_id} - {self.tipo_reporte}.{self.formato} ({self.programacion})"
+
+
+class TasaCambio(models.Model):
+    """
+    Tipo de cambio BOB por USD vigente desde ``fecha``.
+
+    Lo usa condominio/tasas_cambio.py para normalizar los montos de reservas
+    y pagos; para una fecha dada rige la última tasa cargada en o antes de
+    ella. Tras cargar o corregir tasas: ``manage.py normalizar_montos --todo``.
+    """
+    fecha = models.DateField(unique=True)
+    bob_por_usd = models.DecimalField(max_digits=10, decimal_places=4)
+    fuente = models.CharField(max_length=100, blank=True, default='')
+    creado = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Tasa de Cambio"
+        verbose_name_plural = "Tasas de Cambio"
+        ordering = ['-fecha']
+
+    def __str__(self):
+        return f"{self.fecha}: 1 USD = {self.bob_por_usd} BOB"
+
+
+class PlanConsulta(models.Model):
+    """
+    Plan de ejecución capturado de una consulta emitida por un reporte.
+
+    Lo escribe condominio/planes_consulta.py cuando la captura está activa
+    (``CAPTURA_PLANES_CONSULTA`` o ``manage.py planes_consultas --capturar``).
+    Cada fila queda identificada por reporte + huella de filtros + huella del
+    SQL, así dos capturas del mismo reporte se pueden comparar.
+    """
+    corrida = models.CharField(max_length=40, db_index=True)
+    reporte = models.CharField(max_length=80)
+    filtros = models.JSONField(default=dict, blank=True)
+    huella_filtros = models.CharField(max_length=20)
+    huella_consulta = models.CharField(max_length=20)
+    sql = models.TextField()
+    duracion_ms = models.FloatField()
+    plan = models.JSONField(null=True, blank=True)  # EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON); solo PostgreSQL
+    tiempo_ejecucion_ms = models.FloatField(null=True, blank=True)
+    problemas = models.JSONField(default=list, blank=True)
+    creado = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Plan de Consulta"
+        verbose_name_plural = "Planes de Consultas"
+        ordering = ['-creado']
+        indexes = [
+            models.Index(fields=['reporte', 'huella_filtros', 'huella_consulta', 'creado'], name='plan_consulta_clave_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.reporte} [{self.huella_consulta}] {self.duracion_ms:.1f} ms"
@@ -0,0 +1,25 @@
+"""
+Operaciones de migración reutilizables.
+
+``AgregarIndiceConcurrente`` crea el índice con ``CREATE INDEX CONCURRENTLY``
+en PostgreSQL (no bloquea escrituras sobre tablas grandes en producción) y
+con un ``CREATE INDEX`` normal en otros motores (SQLite en desarrollo y
+tests). La migración que la use debe declarar ``atomic = False``.
+"""
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db.migrations.operations import AddIndex
+
+
+class AgregarIndiceConcurrente(AddIndexConcurrently):
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+        else:
+            AddIndex.database_forwards(self, app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+        else:
+            AddIndex.database_backwards(self, app_label, schema_editor, from_state, to_state)
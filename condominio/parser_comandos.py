@@ -0,0 +1,267 @@
+"""
+Analizador léxico compilado para comandos de reportes en lenguaje natural.
+
+Lo usan los dos intérpretes locales (sin IA): ``ReportesIAProcessor._procesar_local``
+y ``InterpretadorComandosVoz``. En vez de decenas de ``re.search`` y de
+recorrer los diccionarios de departamentos/meses por cada comando, todas
+las palabras clave y las frases con números se combinan en UNA expresión
+regular que se compila al importar el módulo. Una sola pasada de
+``finditer`` sobre el texto normalizado (minúsculas, sin tildes) devuelve
+los hallazgos de cada categoría en orden de aparición.
+
+Reglas de coincidencia:
+- Las palabras clave "de prefijo" aceptan sufijos (paquete → paquetes,
+  venta → ventas, pagada → pagadas).
+- Las demás deben ser palabras completas, así "mayores" no se lee como
+  el mes "may" ni "subsidio" como la moneda "bs".
+- En una misma posición gana la frase más específica: "últimos 30 días" es
+  un rango de fechas y no un límite "últimos N".
+
+El corpus de referencia está en ``parser_corpus.json`` y el comando
+``benchmark_parser_comandos`` mide exactitud y comandos por segundo.
+"""
+import json
+import os
+import re
+import unicodedata
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+def sin_tildes(texto: str) -> str:
+    return ''.join(
+        c for c in unicodedata.normalize('NFKD', texto) if not unicodedata.combining(c)
+    )
+
+
+def normalizar_texto(texto: str) -> str:
+    """Minúsculas, sin tildes (ñ → n) y espacios colapsados."""
+    return re.sub(r'\s+', ' ', sin_tildes(texto.lower())).strip()
+
+
+# ============================================================================
+# 📚 VOCABULARIO
+# ============================================================================
+# categoría -> {palabra clave normalizada: valor}
+
+PREFIJOS: Dict[str, Dict[str, Any]] = {
+    'tipo_reporte': {
+        'paquete': 'paquetes', 'producto': 'paquetes', 'tour': 'paquetes',
+        'venta': 'ventas', 'ingreso': 'ventas', 'ganancia': 'ventas',
+        'cliente': 'clientes', 'usuario': 'clientes', 'comprador': 'clientes',
+    },
+    'tipo_producto': {'paquete': 'paquete', 'servicio': 'servicio'},
+    'estado': {
+        'pendiente': 'PENDIENTE', 'confirmada': 'CONFIRMADA', 'pagada': 'PAGADA',
+        'completada': 'COMPLETADA', 'cancelada': 'CANCELADA',
+    },
+    'moneda': {'dolar': 'USD', 'boliviano': 'BOB'},
+}
+
+PALABRAS: Dict[str, Dict[str, Any]] = {
+    'formato': {
+        'pdf': 'pdf', 'excel': 'excel', 'xlsx': 'excel', 'hoja de calculo': 'excel',
+        'word': 'docx', 'docx': 'docx',
+    },
+    'departamento': {
+        'la paz': 'La Paz', 'lapaz': 'La Paz', 'paz': 'La Paz',
+        'santa cruz': 'Santa Cruz', 'santacruz': 'Santa Cruz', 'cruz': 'Santa Cruz',
+        'cochabamba': 'Cochabamba', 'cbba': 'Cochabamba',
+        'oruro': 'Oruro', 'potosi': 'Potosí', 'tarija': 'Tarija', 'sucre': 'Sucre',
+        'chuquisaca': 'Chuquisaca', 'beni': 'Beni', 'pando': 'Pando',
+    },
+    'moneda': {'usd': 'USD', 'bob': 'BOB', 'bs': 'BOB'},
+    'mes': {
+        'enero': 1, 'febrero': 2, 'marzo': 3, 'abril': 4, 'mayo': 5, 'junio': 6,
+        'julio': 7, 'agosto': 8, 'septiembre': 9, 'setiembre': 9, 'octubre': 10,
+        'noviembre': 11, 'diciembre': 12,
+        'ene': 1, 'feb': 2, 'mar': 3, 'abr': 4, 'may': 5, 'jun': 6,
+        'jul': 7, 'ago': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dic': 12,
+    },
+    'rango': {
+        'hoy': 'hoy', 'hasta hoy': 'hasta_hoy', 'ayer': 'ayer',
+        'esta semana': 'esta_semana',
+        'semana pasada': 'semana_pasada', 'ultima semana': 'semana_pasada', 'semana anterior': 'semana_pasada',
+        'este mes': 'este_mes', 'mes actual': 'este_mes',
+        'mes pasado': 'mes_pasado', 'ultimo mes': 'mes_pasado', 'mes anterior': 'mes_pasado',
+        'ultimo trimestre': 'trimestre', 'trimestre': 'trimestre',
+        'este ano': 'este_anio', 'ano pasado': 'anio_pasado', 'ultimo ano': 'anio_pasado',
+    },
+}
+
+# Frases con número: (categoría, patrón con un grupo para el número)
+NUMERICAS: Sequence[Tuple[str, str]] = (
+    ('ultimos_dias', r'ultimos? (\d+) dias?'),
+    ('monto_minimo', r'(?:mayor(?:es)? (?:a|de|que)|mas de|superior(?:es)? a|sobre) (\d+)'),
+    ('monto_maximo', r'(?:menor(?:es)? (?:a|de|que)|menos de|inferior(?:es)? a|bajo) (\d+)'),
+    ('limite', r'(?:top|primer[oa]s?|mejores|ultim[oa]s?|solo|maximo) (\d+)'),
+)
+CONVERSORES_NUMERICOS = {
+    'ultimos_dias': int,
+    'monto_minimo': Decimal,
+    'monto_maximo': Decimal,
+    'limite': int,
+}
+
+
+def _indice(vocabulario: Dict[str, Dict[str, Any]]) -> Dict[str, List[Tuple[str, Any]]]:
+    """palabra clave -> [(categoría, valor), ...] (una palabra puede servir a varias categorías)."""
+    indice: Dict[str, List[Tuple[str, Any]]] = {}
+    for categoria, palabras in vocabulario.items():
+        for palabra, valor in palabras.items():
+            indice.setdefault(palabra, []).append((categoria, valor))
+    return indice
+
+
+def _alternativas(palabras) -> str:
+    # Las más largas primero: "la paz" antes que "paz", "marzo" antes que "mar"
+    return '|'.join(re.escape(p) for p in sorted(palabras, key=len, reverse=True))
+
+
+_INDICE_PALABRAS = _indice(PALABRAS)
+_INDICE_PREFIJOS = _indice(PREFIJOS)
+
+_PATRON = re.compile(
+    r'\b(?:'
+    + ''.join(f'(?P<{categoria}>{patron})\\b|' for categoria, patron in NUMERICAS)
+    + f'(?P<palabra>{_alternativas(_INDICE_PALABRAS)})\\b|'
+    + f'(?P<prefijo>{_alternativas(_INDICE_PREFIJOS)})\\w*'
+    + r')'
+)
+_GRUPOS_NUMERICOS = {categoria: _PATRON.groupindex[categoria] + 1 for categoria, _ in NUMERICAS}
+
+
+class AnalisisComando:
+    """Hallazgos de un comando: categoría -> valores en orden de aparición."""
+
+    __slots__ = ('texto', 'hallazgos')
+
+    def __init__(self, texto: str):
+        self.texto = texto
+        self.hallazgos: Dict[str, List[Any]] = {}
+
+    def agregar(self, categoria: str, valor: Any):
+        self.hallazgos.setdefault(categoria, []).append(valor)
+
+    def valores(self, categoria: str) -> List[Any]:
+        return self.hallazgos.get(categoria, [])
+
+    def contiene(self, categoria: str, valor: Any) -> bool:
+        return valor in self.hallazgos.get(categoria, ())
+
+    def primero(self, categoria: str, prioridad: Optional[Sequence[Any]] = None) -> Optional[Any]:
+        """
+        Primer valor encontrado de la categoría. Con ``prioridad`` se devuelve
+        el valor presente que aparezca antes en esa lista.
+        """
+        valores = self.hallazgos.get(categoria)
+        if not valores:
+            return None
+        if prioridad:
+            for candidato in prioridad:
+                if candidato in valores:
+                    return candidato
+            return None
+        return valores[0]
+
+    def __repr__(self):
+        return f"AnalisisComando({self.hallazgos!r})"
+
+
+def analizar(texto: str) -> AnalisisComando:
+    """Analiza un comando en una sola pasada de la expresión compilada."""
+    normalizado = normalizar_texto(texto)
+    analisis = AnalisisComando(normalizado)
+    for m in _PATRON.finditer(normalizado):
+        grupo = m.lastgroup
+        if grupo == 'palabra':
+            for categoria, valor in _INDICE_PALABRAS[m.group('palabra')]:
+                analisis.agregar(categoria, valor)
+        elif grupo == 'prefijo':
+            for categoria, valor in _INDICE_PREFIJOS[m.group('prefijo')]:
+                analisis.agregar(categoria, valor)
+        else:
+            numero = m.group(_GRUPOS_NUMERICOS[grupo])
+            analisis.agregar(grupo, CONVERSORES_NUMERICOS[grupo](numero))
+    return analisis
+
+
+# ============================================================================
+# 🧪 CORPUS DE REFERENCIA
+# ============================================================================
+# Cada caso indica el intérprete ("local" = ReportesIAProcessor._procesar_local,
+# "voz" = InterpretadorComandosVoz.interpretar), el comando y los campos
+# esperados. Solo se comparan los campos listados; ``null`` exige que el campo
+# NO se detecte. Las fechas relativas se comparan por mes y por cantidad de
+# días del rango, así el corpus no depende del día en que se ejecuta.
+
+RUTA_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'parser_corpus.json')
+
+
+def cargar_corpus(ruta: str = RUTA_CORPUS) -> List[Dict[str, Any]]:
+    with open(ruta, encoding='utf-8') as archivo:
+        return json.load(archivo)
+
+
+def _comparable(valor: Any) -> Any:
+    if isinstance(valor, Decimal):
+        return int(valor) if valor == valor.to_integral_value() else float(valor)
+    if isinstance(valor, datetime):
+        return valor.date().isoformat()
+    return valor
+
+
+def _campos_de_fechas(inicio: Optional[date], fin: Optional[date]) -> Dict[str, Any]:
+    if not inicio:
+        return {'mes': None, 'dias_rango': None}
+    return {
+        'mes': inicio.month,
+        'dias_rango': (fin - inicio).days if fin else None,
+    }
+
+
+def interpretar_caso(caso: Dict[str, Any]) -> Dict[str, Any]:
+    """Ejecuta el intérprete del caso y devuelve sus campos en forma comparable."""
+    if caso['parser'] == 'local':
+        from .ia_processor import obtener_procesador
+
+        # _procesar_local no usa el cliente OpenAI
+        resultado = obtener_procesador()._procesar_local(caso['comando'])
+        filtros = resultado['filtros']
+        campos = {
+            'tipo_reporte': resultado['tipo_reporte'],
+            'formato': resultado['formato'],
+            **{k: v for k, v in filtros.items() if not k.startswith('fecha_')},
+        }
+        inicio = filtros.get('fecha_inicio')
+        fin = filtros.get('fecha_fin')
+        campos.update(_campos_de_fechas(
+            date.fromisoformat(inicio) if inicio else None,
+            date.fromisoformat(fin) if fin else None,
+        ))
+        return campos
+
+    from .reportes import InterpretadorComandosVoz
+
+    filtros = InterpretadorComandosVoz.interpretar(caso['comando'])
+    campos = {k: _comparable(v) for k, v in filtros.items() if k != 'comando_original'}
+    inicio = filtros.get('fecha_inicio')
+    fin = filtros.get('fecha_fin')
+    campos.update(_campos_de_fechas(inicio.date() if inicio else None, fin.date() if fin else None))
+    return campos
+
+
+def evaluar_corpus(corpus: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Retorna los casos que no coinciden con lo esperado (lista vacía = 100 %)."""
+    fallos = []
+    for caso in corpus:
+        obtenido = interpretar_caso(caso)
+        diferencias = {
+            campo: {'esperado': esperado, 'obtenido': obtenido.get(campo)}
+            for campo, esperado in caso['esperado'].items()
+            if obtenido.get(campo) != esperado
+        }
+        if diferencias:
+            fallos.append({'comando': caso['comando'], 'parser': caso['parser'], 'diferencias': diferencias})
+    return fallos
@@ -0,0 +1,264 @@
+"""
+Captura de planes de ejecución de las consultas de los reportes.
+
+Modo opcional para diagnosticar regresiones: mientras un reporte se calcula
+(``cache_reportes.obtener_o_calcular``) se registran todas las consultas
+SELECT que emite con su tiempo; al terminar, cada una se vuelve a ejecutar
+con ``EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)`` y el plan se guarda en
+``PlanConsulta`` junto con los problemas detectados:
+
+- ``seq_scan``: recorrido secuencial que lee muchas filas de una tabla.
+- ``estimacion``: el planificador se equivocó en un factor grande entre
+  filas estimadas y reales (estadísticas desactualizadas, correlaciones).
+
+La captura se activa con ``CAPTURA_PLANES_CONSULTA=true`` (todas las
+consultas de reportes, costosa: ANALYZE ejecuta la consulta otra vez) o
+puntualmente con ``forzar_captura()``, que es lo que usa
+``manage.py planes_consultas --capturar``. En bases que no son PostgreSQL
+solo se guardan SQL y tiempos.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection, transaction
+
+logger = logging.getLogger(__name__)
+
+UMBRAL_FILAS_SEQ_SCAN = 10000
+FACTOR_ESTIMACION = 10
+MIN_FILAS_ESTIMACION = 100
+MIN_MS_REGRESION = 5
+
+_estado = threading.local()
+
+
+def _umbral_filas_seq_scan():
+    return getattr(settings, 'PLANES_UMBRAL_SEQ_SCAN', UMBRAL_FILAS_SEQ_SCAN)
+
+
+def captura_activa():
+    return bool(getattr(_estado, 'corrida', None) or getattr(settings, 'CAPTURA_PLANES_CONSULTA', False))
+
+
+@contextmanager
+def forzar_captura(corrida):
+    """Activa la captura en este hilo y agrupa los planes bajo ``corrida``."""
+    anterior = getattr(_estado, 'corrida', None)
+    _estado.corrida = corrida
+    try:
+        yield
+    finally:
+        _estado.corrida = anterior
+
+
+@contextmanager
+def etiquetar_captura(etiqueta):
+    """
+    Agrupa las capturas bajo un nombre estable (p. ej. el preset "este_mes")
+    en lugar de los filtros literales, cuyas fechas cambian de un día a otro.
+    """
+    anterior = getattr(_estado, 'etiqueta', None)
+    _estado.etiqueta = etiqueta
+    try:
+        yield
+    finally:
+        _estado.etiqueta = anterior
+
+
+def _corrida_actual():
+    return getattr(_estado, 'corrida', None) or time.strftime('auto-%Y%m%d-%H')
+
+
+def huella_sql(sql):
+    return hashlib.sha1(' '.join(sql.split()).encode()).hexdigest()[:20]
+
+
+def huella_filtros(filtros):
+    etiqueta = getattr(_estado, 'etiqueta', None)
+    base = f'etiqueta:{etiqueta}' if etiqueta else json.dumps(filtros, sort_keys=True, default=str)
+    return hashlib.sha1(base.encode()).hexdigest()[:20]
+
+
+# ============================================================================
+# 📥 CAPTURA
+# ============================================================================
+
+@contextmanager
+def capturar_planes(reporte, filtros):
+    """
+    Registra las consultas SELECT ejecutadas dentro del bloque y guarda sus
+    planes al salir. Sin captura activa no hace nada.
+    """
+    if not captura_activa():
+        yield
+        return
+
+    consultas = []
+
+    def registrar(execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            if not many and sql.lstrip()[:6].upper().startswith(('SELECT', 'WITH')):
+                consultas.append((sql, params, (time.perf_counter() - inicio) * 1000))
+
+    with connection.execute_wrapper(registrar):
+        yield
+
+    try:
+        guardar_planes(reporte, filtros, consultas)
+    except Exception as e:
+        logger.error(f"❌ No se pudieron guardar los planes de {reporte}: {e}")
+
+
+def explicar(sql, params):
+    """Plan JSON de ``EXPLAIN (ANALYZE, BUFFERS)`` o None si el motor no es PostgreSQL."""
+    if connection.vendor != 'postgresql':
+        return None
+    # Savepoint: si el EXPLAIN falla no deja abortada la transacción del reporte
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0] if isinstance(plan, list) else plan
+
+
+def guardar_planes(reporte, filtros, consultas):
+    from .models import PlanConsulta
+
+    corrida = _corrida_actual()
+    filtros_json = json.loads(json.dumps(filtros, default=str))
+    huella_de_filtros = huella_filtros(filtros)
+    vistas = set()
+    registros = []
+    for sql, params, duracion_ms in consultas:
+        huella = huella_sql(sql)
+        if huella in vistas:
+            continue
+        vistas.add(huella)
+        plan = explicar(sql, params)
+        registros.append(PlanConsulta(
+            corrida=corrida,
+            reporte=reporte,
+            filtros=filtros_json,
+            huella_filtros=huella_de_filtros,
+            huella_consulta=huella,
+            sql=sql,
+            duracion_ms=round(duracion_ms, 3),
+            plan=plan,
+            tiempo_ejecucion_ms=plan.get('Execution Time') if plan else None,
+            problemas=detectar_problemas(plan) if plan else [],
+        ))
+    PlanConsulta.objects.bulk_create(registros)
+    logger.info(f"🔬 {len(registros)} planes capturados para {reporte} ({corrida})")
+    return registros
+
+
+# ============================================================================
+# 🔎 ANÁLISIS DE PLANES
+# ============================================================================
+
+def recorrer_nodos(plan):
+    """Nodos del plan en preorden (acepta el objeto con 'Plan' o un nodo)."""
+    pendientes = [plan.get('Plan', plan)]
+    while pendientes:
+        nodo = pendientes.pop()
+        yield nodo
+        pendientes.extend(reversed(nodo.get('Plans', [])))
+
+
+def firma_plan(plan):
+    """Forma del plan: tipos de nodo e índices/tablas, sin costos ni tiempos."""
+    firma = []
+    for nodo in recorrer_nodos(plan):
+        detalle = nodo.get('Index Name') or nodo.get('Relation Name')
+        firma.append(f"{nodo['Node Type']}({detalle})" if detalle else nodo['Node Type'])
+    return firma
+
+
+def detectar_problemas(plan):
+    problemas = []
+    umbral = _umbral_filas_seq_scan()
+    for nodo in recorrer_nodos(plan):
+        loops = nodo.get('Actual Loops', 1) or 1
+        reales = nodo.get('Actual Rows', 0)
+        estimadas = nodo.get('Plan Rows', 0)
+
+        if nodo['Node Type'] == 'Seq Scan':
+            leidas = (reales + nodo.get('Rows Removed by Filter', 0)) * loops
+            if leidas >= umbral:
+                problemas.append({'tipo': 'seq_scan', 'tabla': nodo.get('Relation Name'), 'filas': leidas})
+
+        mayor, menor = max(reales, estimadas), max(min(reales, estimadas), 1)
+        if mayor >= MIN_FILAS_ESTIMACION and mayor / menor >= FACTOR_ESTIMACION:
+            problemas.append({
+                'tipo': 'estimacion',
+                'nodo': nodo['Node Type'],
+                'tabla': nodo.get('Relation Name'),
+                'estimadas': estimadas,
+                'reales': reales,
+            })
+    return problemas
+
+
+def comparar_planes(anterior, actual, factor_tiempo=1.5):
+    """
+    Compara dos ``PlanConsulta`` de la misma clave. Retorna la lista de
+    alertas (vacía si no hay cambios relevantes).
+    """
+    alertas = []
+    if anterior.plan and actual.plan and firma_plan(anterior.plan) != firma_plan(actual.plan):
+        alertas.append({
+            'tipo': 'plan_cambiado',
+            'antes': firma_plan(anterior.plan),
+            'despues': firma_plan(actual.plan),
+        })
+
+    tiempo_antes = anterior.tiempo_ejecucion_ms or anterior.duracion_ms
+    tiempo_despues = actual.tiempo_ejecucion_ms or actual.duracion_ms
+    if (tiempo_antes and tiempo_despues / tiempo_antes >= factor_tiempo
+            and tiempo_despues - tiempo_antes >= MIN_MS_REGRESION):
+        alertas.append({
+            'tipo': 'mas_lenta',
+            'antes_ms': round(tiempo_antes, 2),
+            'despues_ms': round(tiempo_despues, 2),
+        })
+
+    vistos = {json.dumps(p, sort_keys=True) for p in anterior.problemas}
+    for problema in actual.problemas:
+        if json.dumps(problema, sort_keys=True) not in vistos:
+            alertas.append({**problema, 'nuevo': True})
+    return alertas
+
+
+def ultimas_comparaciones(reporte=None, factor_tiempo=1.5):
+    """
+    Para cada reporte + filtros + consulta compara las dos capturas más
+    recientes. Retorna ``[(actual, alertas), ...]`` solo con las que cambiaron.
+    """
+    from .models import PlanConsulta
+
+    qs = PlanConsulta.objects.order_by('reporte', 'huella_filtros', 'huella_consulta', '-creado', '-id')
+    if reporte:
+        qs = qs.filter(reporte=reporte)
+
+    resultado = []
+    clave_previa, recientes = None, []
+    for registro in qs.iterator():
+        clave = (registro.reporte, registro.huella_filtros, registro.huella_consulta)
+        if clave != clave_previa:
+            clave_previa, recientes = clave, []
+        recientes.append(registro)
+        if len(recientes) == 2:
+            alertas = comparar_planes(recientes[1], recientes[0], factor_tiempo)
+            if alertas:
+                resultado.append((recientes[0], alertas))
+    return resultado
@@ -0,0 +1,114 @@
+"""
+Precalentamiento programado de las cachés del dashboard y de los reportes.
+
+Calcula fuera de horario pico los agregados de ``obtener_datos_graficas`` y
+de los reportes de ``GeneradorReportes`` para los filtros más usados
+("este mes", "mes pasado", "últimos 30 días", el rango por defecto del
+dashboard y cada departamento) y los deja en la caché compartida, así la
+primera persona que abre el dashboard en la mañana no espera las consultas
+en frío.
+
+Los rangos de fechas se obtienen con el mismo intérprete que usan los
+comandos de voz, de modo que las claves coinciden con las que se generan
+al pedir "ventas de este mes".
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+
+from .cache_reportes import obtener_o_calcular
+from .models import Departamento, Paquete, Servicio
+from .planes_consulta import etiquetar_captura
+from .reportes import GeneradorReportes, InterpretadorComandosVoz
+
+logger = logging.getLogger(__name__)
+
+RANGOS = {
+    'este_mes': 'este mes',
+    'mes_pasado': 'mes pasado',
+    'ultimos_30_dias': 'últimos 30 días',
+}
+
+
+def departamentos_activos():
+    """Departamentos canónicos con al menos un paquete o servicio."""
+    return list(
+        Departamento.objects
+        .filter(Exists(Paquete.objects.filter(departamento_canonico=OuterRef('pk'))) |
+                Exists(Servicio.objects.filter(departamento_canonico=OuterRef('pk'))))
+        .order_by('nombre').values_list('nombre', flat=True)
+    )
+
+
+def presets():
+    """
+    Lista de presets: {'nombre', 'rango' (datetimes o None), 'departamento'}.
+    ``rango=None`` es el rango por defecto del dashboard (último año).
+    """
+    lista = [{'nombre': 'por_defecto', 'rango': None, 'departamento': None}]
+    for nombre, frase in RANGOS.items():
+        lista.append({
+            'nombre': nombre,
+            'rango': InterpretadorComandosVoz.extraer_rango_fechas(frase),
+            'departamento': None,
+        })
+    for departamento in departamentos_activos():
+        lista.append({'nombre': f'departamento:{departamento}', 'rango': None, 'departamento': departamento})
+    return lista
+
+
+def _consultas_de_preset(preset):
+    """Genera (etiqueta, función) con cada consulta a precalentar para el preset."""
+    from .views_reportes import calcular_datos_graficas, normalizar_filtros_graficas
+
+    datos_graficas = {'departamento': preset['departamento']}
+    filtros_reporte = {}
+    if preset['rango']:
+        inicio, fin = preset['rango']
+        datos_graficas.update(fecha_inicio=inicio.date().isoformat(), fecha_fin=fin.date().isoformat())
+        filtros_reporte.update(fecha_inicio=inicio, fecha_fin=fin)
+    if preset['departamento']:
+        filtros_reporte['departamento'] = preset['departamento']
+
+    for moneda in getattr(settings, 'PRECALENTAMIENTO_MONEDAS', ['BOB']):
+        filtros = normalizar_filtros_graficas({**datos_graficas, 'moneda': moneda})
+        yield f'graficas_{moneda.lower()}', (
+            lambda f=filtros: obtener_o_calcular('graficas', f, lambda: calcular_datos_graficas(f), refrescar=True)
+        )
+
+    for nombre in GeneradorReportes.REPORTES_CACHEABLES:
+        yield nombre, (
+            lambda n=nombre: GeneradorReportes.reporte_cacheado(n, filtros_reporte, refrescar=True)
+        )
+
+
+def precalentar(solo=None):
+    """
+    Ejecuta todos los presets (o los cuyo nombre empieza con alguno de
+    ``solo``). Retorna una fila por consulta con su tiempo en segundos.
+    """
+    resultados = []
+    for preset in presets():
+        if solo and not any(preset['nombre'].startswith(prefijo) for prefijo in solo):
+            continue
+        for consulta, ejecutar in _consultas_de_preset(preset):
+            inicio = time.perf_counter()
+            error = None
+            try:
+                with etiquetar_captura(preset['nombre']):
+                    ejecutar()
+            except Exception as e:
+                error = str(e)
+                logger.error(f"❌ Precalentamiento {preset['nombre']}/{consulta}: {e}")
+            resultados.append({
+                'preset': preset['nombre'],
+                'consulta': consulta,
+                'segundos': round(time.perf_counter() - inicio, 3),
+                'error': error,
+            })
+
+    total = sum(r['segundos'] for r in resultados)
+    logger.info(f"🔥 Cachés precalentadas: {len(resultados)} consultas en {total:.2f}s")
+    return resultados
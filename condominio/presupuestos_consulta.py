@@ -0,0 +1,232 @@
+"""
+Presupuesto de consultas por endpoint.
+
+Una combinación patológica de filtros en un reporte o un ``search`` sobre
+las reservas puede tardar minutos y retener un worker y una conexión. Las
+vistas que declaran ``@presupuesto_consultas`` corren con un presupuesto
+(las demás no se miden):
+
+- ``tiempo_ms``: tiempo máximo de cada sentencia SQL. En PostgreSQL la base
+  cancela la sentencia (``SET statement_timeout`` durante la vista y
+  ``RESET`` al terminar). No se usa ``SET LOCAL``: exigiría envolver la vista
+  en una transacción, y los candados y entradas de la caché compartida
+  (``cache_reportes.py``) quedarían invisibles para los demás workers hasta
+  el commit. En otras bases la sentencia se mide al terminar.
+- ``consultas``: máximo de sentencias por pedido (corta los N+1 desbocados).
+- ``filas``: máximo de filas leídas por los SELECT del pedido (según el
+  ``rowcount`` del driver; SQLite no lo informa).
+
+Los límites salen de perfiles en ``settings.PRESUPUESTOS_CONSULTA``: sin
+perfil se usa ``api`` y los reportes declaran ``reportes``::
+
+    @presupuesto_consultas('reportes')
+    @api_view(['POST'])
+    def obtener_datos_graficas(request): ...
+
+    @presupuesto_consultas()
+    class ReservaViewSet(viewsets.ModelViewSet): ...
+
+Un límite en ``None`` o 0 no se controla. Al excederse, toda consulta
+posterior del pedido también falla y queda un registro en el log. Un GET
+responde 503 con un error estructurado aunque la vista atrape la excepción
+con su propio ``except Exception``. En otros métodos, si la vista igual
+respondió, se respeta su respuesta: sus escrituras pueden estar
+confirmadas y un 503 invitaría a repetirlas. El contenido de las
+respuestas en streaming se genera fuera del presupuesto.
+"""
+import logging
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DatabaseError, OperationalError, connection
+from django.http import JsonResponse
+
+logger = logging.getLogger(__name__)
+
+LIMITES = ('tiempo_ms', 'consultas', 'filas')
+PERFIL_POR_DEFECTO = 'api'
+PERFILES_POR_DEFECTO = {
+    'api': {'tiempo_ms': 5000, 'consultas': 500, 'filas': 100000},
+    'reportes': {'tiempo_ms': 60000, 'consultas': 2000, 'filas': 2000000},
+}
+METODOS_SEGUROS = ('GET', 'HEAD', 'OPTIONS')
+# SQLSTATE query_canceled: la sentencia superó statement_timeout
+CANCELADA_POR_TIEMPO = '57014'
+
+
+class PresupuestoExcedido(Exception):
+    def __init__(self, vista, limite, permitido, medido):
+        self.vista = vista
+        self.limite = limite
+        self.permitido = permitido
+        self.medido = medido
+        super().__init__(f"{vista}: {limite} {medido} supera el máximo {permitido}")
+
+
+def presupuesto_consultas(perfil=None, **limites):
+    """
+    Declara el presupuesto de una vista (función de ``@api_view``, va por
+    encima de ese decorador) o de una clase ``APIView``/``ViewSet``.
+    ``limites`` reemplaza valores sueltos del perfil.
+    """
+    desconocidos = set(limites) - set(LIMITES)
+    if desconocidos:
+        raise TypeError(f"Límites desconocidos: {', '.join(sorted(desconocidos))}")
+
+    def decorar(vista):
+        vista.presupuesto_consultas = {'perfil': perfil, **limites}
+        return vista
+    return decorar
+
+
+def resolver_presupuesto(declarado=None):
+    """Límites efectivos (``tiempo_ms``, ``consultas``, ``filas``) para una declaración."""
+    declarado = declarado or {}
+    perfiles = {**PERFILES_POR_DEFECTO, **getattr(settings, 'PRESUPUESTOS_CONSULTA', {})}
+    base = perfiles.get(declarado.get('perfil') or PERFIL_POR_DEFECTO, {})
+    return {limite: declarado.get(limite, base.get(limite)) or None for limite in LIMITES}
+
+
+# ============================================================================
+# 📏 MEDICIÓN
+# ============================================================================
+
+def _cancelada_por_tiempo(error):
+    causa = error.__cause__
+    return CANCELADA_POR_TIEMPO in (getattr(causa, 'pgcode', None), getattr(causa, 'sqlstate', None))
+
+
+class MedidorConsultas:
+    """``execute_wrapper`` que cuenta sentencias, filas y tiempo del pedido."""
+
+    def __init__(self, vista, presupuesto, tiempo_en_servidor=False):
+        self.vista = vista
+        self.presupuesto = presupuesto
+        self.tiempo_en_servidor = tiempo_en_servidor
+        self.consultas = 0
+        self.filas = 0
+        self.excedido = None
+
+    def _exceder(self, limite, medido):
+        self.excedido = PresupuestoExcedido(self.vista, limite, self.presupuesto[limite], medido)
+        return self.excedido
+
+    def __call__(self, execute, sql, params, many, context):
+        if self.excedido:
+            # Un except de la vista no habilita a seguir consultando
+            raise self.excedido
+
+        maximo_consultas = self.presupuesto['consultas']
+        if maximo_consultas and self.consultas >= maximo_consultas:
+            raise self._exceder('consultas', self.consultas + 1)
+        self.consultas += 1
+
+        inicio = time.perf_counter()
+        try:
+            resultado = execute(sql, params, many, context)
+        except OperationalError as e:
+            if _cancelada_por_tiempo(e):
+                raise self._exceder('tiempo_ms', round((time.perf_counter() - inicio) * 1000)) from e
+            raise
+        ms = (time.perf_counter() - inicio) * 1000
+
+        maximo_ms = self.presupuesto['tiempo_ms']
+        if maximo_ms and not self.tiempo_en_servidor and ms > maximo_ms:
+            raise self._exceder('tiempo_ms', round(ms))
+
+        maximo_filas = self.presupuesto['filas']
+        filas = getattr(context['cursor'], 'rowcount', -1)
+        if maximo_filas and filas > 0 and sql.lstrip()[:6].upper().startswith(('SELECT', 'WITH')):
+            self.filas += filas
+            if self.filas > maximo_filas:
+                raise self._exceder('filas', self.filas)
+        return resultado
+
+
+@contextmanager
+def _tiempo_maximo_sentencias(tiempo_ms):
+    """``statement_timeout`` de la sesión mientras corre la vista."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'SET statement_timeout = {int(tiempo_ms)}')
+    try:
+        yield
+    finally:
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('RESET statement_timeout')
+        except DatabaseError:
+            # Dentro de una transacción fallida el rollback ya revierte el SET;
+            # en autocommit la conexión quedó inservible y no se reutiliza
+            if not connection.in_atomic_block:
+                connection.close()
+
+
+# ============================================================================
+# 🧱 MIDDLEWARE
+# ============================================================================
+
+def respuesta_presupuesto_excedido(request, error, medidor):
+    logger.warning(
+        f"⛔ Presupuesto de consultas excedido: {request.method} {request.path} ({error})",
+        extra={
+            'vista': error.vista, 'limite': error.limite, 'permitido': error.permitido, 'medido': error.medido,
+            'consultas': medidor.consultas, 'filas': medidor.filas,
+        },
+    )
+    return JsonResponse({
+        'success': False,
+        'error': 'El pedido excedió el presupuesto de consultas del endpoint',
+        'detalle': f"{error}. Acote los filtros (fechas, ubicación, búsqueda) e intente nuevamente",
+        'presupuesto': {'limite': error.limite, 'permitido': error.permitido, 'medido': error.medido},
+    }, status=503)
+
+
+class PresupuestoConsultasMiddleware:
+    """
+    Ejecuta bajo su presupuesto las vistas que lo declaran. Va al final de
+    ``MIDDLEWARE``: llama a la vista desde ``process_view``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not getattr(settings, 'PRESUPUESTOS_CONSULTA_ACTIVOS', True):
+            return None
+        clase = getattr(view_func, 'cls', None)
+        declarado = getattr(view_func, 'presupuesto_consultas', None) or getattr(clase, 'presupuesto_consultas', None)
+        if declarado is None:
+            return None
+
+        presupuesto = resolver_presupuesto(declarado)
+        en_servidor = bool(presupuesto['tiempo_ms']) and connection.vendor == 'postgresql'
+        vista = getattr(clase, '__name__', None) or getattr(view_func, '__name__', 'vista')
+        medidor = MedidorConsultas(vista, presupuesto, tiempo_en_servidor=en_servidor)
+
+        def ejecutar_vista():
+            with connection.execute_wrapper(medidor):
+                return view_func(request, *view_args, **view_kwargs)
+
+        try:
+            if en_servidor:
+                # SET/RESET van fuera del medidor: no cuentan para el presupuesto
+                # y el RESET corre aunque el presupuesto ya se haya excedido
+                with _tiempo_maximo_sentencias(presupuesto['tiempo_ms']):
+                    response = ejecutar_vista()
+            else:
+                response = ejecutar_vista()
+        except PresupuestoExcedido as e:
+            return respuesta_presupuesto_excedido(request, e, medidor)
+        if medidor.excedido:
+            # La vista atrapó el error con su propio except y respondió otra cosa
+            if request.method in METODOS_SEGUROS:
+                return respuesta_presupuesto_excedido(request, medidor.excedido, medidor)
+            logger.warning(
+                f"⛔ Presupuesto de consultas excedido: {request.method} {request.path} ({medidor.excedido}); "
+                f"se conserva la respuesta {getattr(response, 'status_code', '?')} de la vista"
+            )
+        return response
@@ -0,0 +1,203 @@
+"""
+Pronóstico de demanda diaria por paquete y servicio.
+
+``series_diarias`` trae en una sola consulta las reservas vendidas por
+producto y día de la historia reciente y las arma como una matriz
+series × días. ``ajustar_pronosticos`` ajusta todas las series a la vez con
+operaciones matriciales de NumPy (sin bucles por producto):
+
+- factores estacionales por día de la semana y por mes, encogidos hacia 1
+  cuando la serie tiene pocos días observados (``PRIOR_SEMANA``,
+  ``PRIOR_MES``);
+- nivel con suavizado exponencial sobre la serie desestacionalizada;
+- pronóstico = nivel × factor de semana × factor de mes, y un límite
+  superior aproximado (percentil 90, varianza de Poisson).
+
+``recalcular_pronosticos`` reescribe ``PronosticoDemanda`` con los próximos
+``HORIZONTE_DIAS`` días y los cupos sugeridos de cada producto. El endpoint
+de pronósticos solo lee esa tabla.
+"""
+import logging
+from datetime import timedelta
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .dataset_reportes import ESTADOS_VENTA
+from .models import Paquete, PronosticoDemanda, Reserva, Servicio
+
+logger = logging.getLogger(__name__)
+
+HORIZONTE_DIAS = 90
+HISTORIA_DIAS = 728  # 104 semanas: dos ciclos anuales completos
+ALFA_NIVEL = 0.03  # suavizado del nivel (vida media ≈ 23 días)
+PRIOR_SEMANA = 4  # días "virtuales" con factor 1 por día de la semana
+PRIOR_MES = 30  # ídem por mes
+Z_LIMITE = 1.2816  # percentil 90 de la normal
+TAMANO_LOTE = 2000
+
+# (modelo, campo de nombre, campo de capacidad)
+_PRODUCTOS = {
+    'paquete': (Paquete, 'nombre', 'cupos_disponibles'),
+    'servicio': (Servicio, 'titulo', 'capacidad_max'),
+}
+
+
+# ============================================================================
+# 📥 SERIES
+# ============================================================================
+
+def series_diarias(hasta, dias=HISTORIA_DIAS):
+    """
+    Reservas vendidas por producto y día hasta ``hasta`` (inclusive), en una
+    consulta. Retorna ``(claves, matriz)``: ``claves[i]`` es
+    ``(tipo_producto, producto_id)`` de la fila ``i`` y la columna ``j`` es
+    el día ``hasta - dias + 1 + j``. Una reserva con paquete cuenta para el
+    paquete.
+    """
+    inicio = hasta - timedelta(days=dias - 1)
+    filas = (
+        Reserva.objects
+        .filter(estado__in=ESTADOS_VENTA, fecha__gte=inicio, fecha__lte=hasta)
+        .exclude(paquete__isnull=True, servicio__isnull=True)
+        .order_by()
+        .values_list('paquete_id', 'servicio_id', 'fecha')
+        .annotate(n=Count('id'))
+    )
+    indices, claves, posiciones, columnas, valores = {}, [], [], [], []
+    for paquete_id, servicio_id, fecha, n in filas.iterator(chunk_size=TAMANO_LOTE):
+        clave = ('paquete', paquete_id) if paquete_id else ('servicio', servicio_id)
+        if clave not in indices:
+            indices[clave] = len(claves)
+            claves.append(clave)
+        posiciones.append(indices[clave])
+        columnas.append((fecha - inicio).days)
+        valores.append(n)
+
+    matriz = np.zeros((len(claves), dias))
+    np.add.at(matriz, (posiciones, columnas), valores)
+    return claves, matriz
+
+
+# ============================================================================
+# 📈 MODELO
+# ============================================================================
+
+def _calendario(inicio, dias):
+    """Día de la semana (lunes=0) y mes (enero=0) de cada día desde ``inicio``."""
+    fechas = np.datetime64(inicio, 'D') + np.arange(dias)
+    dia_semana = (fechas.astype('int64') + 3) % 7  # 1970-01-01 fue jueves
+    mes = fechas.astype('datetime64[M]').astype('int64') % 12
+    return dia_semana, mes
+
+
+def _factores(observado, activos, indice, periodos, media, prior):
+    """Factor estacional de cada serie por periodo, encogido hacia 1 con ``prior`` días."""
+    una_columna = np.eye(periodos)[indice]
+    sumas = observado @ una_columna
+    cuentas = activos @ una_columna
+    base = np.where(media > 0, media, 1.0)[:, None]
+    return (sumas + prior * base) / (cuentas + prior) / base
+
+
+def ajustar_pronosticos(matriz, inicio, horizonte=HORIZONTE_DIAS):
+    """
+    Ajusta todas las series de ``matriz`` (series × días, el primer día es
+    ``inicio``) y pronostica los ``horizonte`` días siguientes. Retorna
+    ``(demanda, limite_superior)``, matrices series × horizonte.
+    """
+    series, dias = matriz.shape
+    if not series:
+        return np.zeros((0, horizonte)), np.zeros((0, horizonte))
+    dia_semana, mes = _calendario(inicio, dias + horizonte)
+
+    # Antes de la primera reserva el producto no existía: esos días no cuentan
+    activos = (np.arange(dias) >= np.argmax(matriz > 0, axis=1)[:, None]).astype(float)
+    observado = matriz * activos
+    media = observado.sum(axis=1) / np.maximum(activos.sum(axis=1), 1)
+
+    factor_semana = _factores(observado, activos, dia_semana[:dias], 7, media, PRIOR_SEMANA)
+    factor_mes = _factores(observado, activos, mes[:dias], 12, media, PRIOR_MES)
+    estacional = factor_semana[:, dia_semana] * factor_mes[:, mes]
+
+    pesos = activos * (1 - ALFA_NIVEL) ** np.arange(dias - 1, -1, -1)
+    nivel = (pesos * observado / estacional[:, :dias]).sum(axis=1) / np.maximum(pesos.sum(axis=1), 1e-12)
+
+    demanda = nivel[:, None] * estacional[:, dias:]
+    return demanda, demanda + Z_LIMITE * np.sqrt(demanda)
+
+
+def cupos_sugeridos(tipos, demanda, limite):
+    """
+    Servicios (capacidad diaria): el mayor límite superior diario. Paquetes
+    (cupos totales): el percentil 90 aproximado de la demanda del horizonte.
+    """
+    total = demanda.sum(axis=1)
+    por_paquete = total + Z_LIMITE * np.sqrt(total)
+    por_servicio = limite.max(axis=1, initial=0)
+    return np.ceil(np.where(np.asarray(tipos) == 'paquete', por_paquete, por_servicio)).astype(int)
+
+
+# ============================================================================
+# 🔄 RECÁLCULO
+# ============================================================================
+
+def _productos(claves):
+    """Nombre y capacidad de cada producto (una consulta por tipo)."""
+    datos = {}
+    for tipo, (modelo, campo_nombre, campo_capacidad) in _PRODUCTOS.items():
+        ids = [producto_id for t, producto_id in claves if t == tipo]
+        for producto_id, nombre, capacidad in modelo.objects.filter(id__in=ids).values_list(
+            'id', campo_nombre, campo_capacidad
+        ):
+            datos[(tipo, producto_id)] = (nombre, capacidad)
+    return datos
+
+
+def recalcular_pronosticos(hasta=None, horizonte=HORIZONTE_DIAS):
+    """
+    Reescribe ``PronosticoDemanda`` con la historia hasta ``hasta`` (por
+    defecto ayer) y los ``horizonte`` días siguientes. Retorna un resumen.
+    """
+    hasta = hasta or timezone.localdate() - timedelta(days=1)
+    claves, matriz = series_diarias(hasta)
+    demanda, limite = ajustar_pronosticos(matriz, hasta - timedelta(days=matriz.shape[1] - 1), horizonte)
+    sugeridos = cupos_sugeridos([tipo for tipo, _ in claves], demanda, limite)
+    totales = demanda.sum(axis=1)
+    productos = _productos(claves)
+
+    ahora = timezone.now()
+    desde = hasta + timedelta(days=1)
+    demanda, limite = np.round(demanda, 3).tolist(), np.round(limite, 3).tolist()
+    filas = [
+        PronosticoDemanda(
+            tipo_producto=tipo,
+            producto_id=producto_id,
+            producto_nombre=productos[(tipo, producto_id)][0][:255],
+            desde=desde,
+            demanda=demanda[i],
+            limite_superior=limite[i],
+            demanda_total=round(float(totales[i]), 2),
+            capacidad=max(0, productos[(tipo, producto_id)][1] or 0),
+            cupos_sugeridos=int(sugeridos[i]),
+            calculado_en=ahora,
+        )
+        for i, (tipo, producto_id) in enumerate(claves)
+        if (tipo, producto_id) in productos
+    ]
+
+    with transaction.atomic():
+        PronosticoDemanda.objects.all().delete()
+        PronosticoDemanda.objects.bulk_create(filas, batch_size=TAMANO_LOTE)
+
+    resumen = {
+        'productos': len(filas),
+        'desde': desde.isoformat(),
+        'horizonte_dias': horizonte,
+        'sobre_capacidad': sum(1 for f in filas if f.cupos_sugeridos > f.capacidad),
+    }
+    logger.info(f"🔮 Pronósticos de demanda recalculados: {resumen}")
+    return resumen
+
@@ -10,120 +10,123 @@ from typing import Dict, List, Any, Optional, Union
 import re
 
 from .models import Reserva, Pago, Usuario, Servicio, Paquete, Visitante
+from .cache_reportes import obtener_o_calcular
+from .ubicaciones import filtro_ubicacion
+from .parser_comandos import PALABRAS, AnalisisComando, analizar, normalizar_texto
 
 
 class InterpretadorComandosVoz:
     """
     Interpreta comandos de voz (texto) y extrae filtros para reportes.
     Ejemplo: "quiero un reporte desde el 1/1/2025 hasta el 30/1/2025 solo con los clientes que compraron paquetes mayores a 1000 bs"
+    
+    Las palabras clave y frases con números se detectan con el analizador
+    compilado de ``parser_comandos`` (una pasada por comando).
     """
     
+    PATRON_FECHA_NUMERICA = re.compile(r'(\d{1,2})[/-](\d{1,2})[/-](\d{4})')
+    PATRON_FECHA_NUMERICA_COMPLETA = re.compile(r'\d{1,2}[/-]\d{1,2}[/-]\d{4}')
+    PATRON_FECHA_TEXTO = re.compile(r'(\d{1,2})\s+de\s+(\w+)\s+de\s+(\d{4})', re.IGNORECASE)
+    # El fin toma el resto del texto: parsear_fecha busca la fecha dentro ("hasta el 30/1/2025 ...")
+    PATRON_RANGO = re.compile(r'desde\s+(.+?)\s+hasta\s+(.+)', re.IGNORECASE)
+    
     @staticmethod
     def parsear_fecha(texto: str) -> Optional[datetime]:
         """Extrae y convierte fechas en diferentes formatos."""
         # Formatos comunes: 1/1/2025, 01-01-2025, 1 de enero de 2025
-        patrones = [
-            r'(\d{1,2})[/-](\d{1,2})[/-](\d{4})',  # 1/1/2025 o 1-1-2025
-            r'(\d{1,2})\s+de\s+(\w+)\s+de\s+(\d{4})',  # 1 de enero de 2025
-        ]
-        
-        meses_texto = {
-            'enero': 1, 'febrero': 2, 'marzo': 3, 'abril': 4,
-            'mayo': 5, 'junio': 6, 'julio': 7, 'agosto': 8,
-            'septiembre': 9, 'octubre': 10, 'noviembre': 11, 'diciembre': 12
-        }
-        
-        for patron in patrones:
-            match = re.search(patron, texto, re.IGNORECASE)
-            if match:
+        match = InterpretadorComandosVoz.PATRON_FECHA_NUMERICA.search(texto)
+        if match:
+            try:
+                dia, mes, año = match.groups()
+                return datetime(int(año), int(mes), int(dia))
+            except (ValueError, TypeError):
+                pass
+        
+        match = InterpretadorComandosVoz.PATRON_FECHA_TEXTO.search(texto)
+        if match:
+            dia, mes_nombre, año = match.groups()
+            mes = PALABRAS['mes'].get(normalizar_texto(mes_nombre))
+            if mes:
                 try:
-                    if '/' in patron or '-' in patron:
-                        dia, mes, año = match.groups()
-                        return datetime(int(año), int(mes), int(dia))
-                    else:
-                        dia, mes_nombre, año = match.groups()
-                        mes = meses_texto.get(mes_nombre.lower())
-                        if mes:
-                            return datetime(int(año), mes, int(dia))
+                    return datetime(int(año), mes, int(dia))
                 except (ValueError, TypeError):
-                    continue
+                    pass
         return None
     
     @staticmethod
-    def extraer_rango_fechas(texto: str) -> tuple:
+    def extraer_rango_fechas(texto: str, analisis: Optional[AnalisisComando] = None) -> tuple:
         """Extrae fecha_inicio y fecha_fin del comando con soporte para fechas relativas."""
         fecha_inicio = None
         fecha_fin = None
-        texto_lower = texto.lower()
         hoy = timezone.now().date()
+        analisis = analisis or analizar(texto)
+        rangos = analisis.valores('rango')
         
-        # HOY
-        if 'hoy' in texto_lower:
+        # HOY ("hasta hoy" es el fin de un rango "desde ... hasta hoy", no un rango)
+        if 'hoy' in rangos:
             return datetime.combine(hoy, datetime.min.time()), datetime.combine(hoy, datetime.max.time())
         
         # AYER
-        if 'ayer' in texto_lower:
+        if 'ayer' in rangos:
             ayer = hoy - timedelta(days=1)
             return datetime.combine(ayer, datetime.min.time()), datetime.combine(ayer, datetime.max.time())
         
         # ÚLTIMOS N DÍAS
-        match_ultimos_dias = re.search(r'últimos?\s+(\d+)\s+días?', texto_lower)
-        if match_ultimos_dias:
-            dias = int(match_ultimos_dias.group(1))
+        dias = analisis.primero('ultimos_dias')
+        if dias:
             fecha_inicio = datetime.combine(hoy - timedelta(days=dias), datetime.min.time())
             fecha_fin = datetime.combine(hoy, datetime.max.time())
             return fecha_inicio, fecha_fin
         
         # ESTA SEMANA (lunes a hoy)
-        if re.search(r'esta\s+semana', texto_lower):
+        if 'esta_semana' in rangos:
             inicio_semana = hoy - timedelta(days=hoy.weekday())
             return datetime.combine(inicio_semana, datetime.min.time()), datetime.combine(hoy, datetime.max.time())
         
         # SEMANA PASADA / ÚLTIMA SEMANA
-        if re.search(r'(semana\s+pasada|última\s+semana|semana\s+anterior)', texto_lower):
+        if 'semana_pasada' in rangos:
             fin_semana_pasada = hoy - timedelta(days=hoy.weekday() + 1)
             inicio_semana_pasada = fin_semana_pasada - timedelta(days=6)
             return datetime.combine(inicio_semana_pasada, datetime.min.time()), datetime.combine(fin_semana_pasada, datetime.max.time())
         
         # ESTE MES (primer día del mes a hoy)
-        if re.search(r'este\s+mes', texto_lower):
+        if 'este_mes' in rangos:
             inicio_mes = hoy.replace(day=1)
             return datetime.combine(inicio_mes, datetime.min.time()), datetime.combine(hoy, datetime.max.time())
         
         # MES PASADO / ÚLTIMO MES / MES ANTERIOR
-        if re.search(r'(mes\s+pasado|último\s+mes|mes\s+anterior)', texto_lower):
+        if 'mes_pasado' in rangos:
             primer_dia_mes_actual = hoy.replace(day=1)
             ultimo_dia_mes_pasado = primer_dia_mes_actual - timedelta(days=1)
             primer_dia_mes_pasado = ultimo_dia_mes_pasado.replace(day=1)
             return datetime.combine(primer_dia_mes_pasado, datetime.min.time()), datetime.combine(ultimo_dia_mes_pasado, datetime.max.time())
         
         # ESTE AÑO
-        if re.search(r'este\s+año', texto_lower):
+        if 'este_anio' in rangos:
             inicio_año = hoy.replace(month=1, day=1)
             return datetime.combine(inicio_año, datetime.min.time()), datetime.combine(hoy, datetime.max.time())
         
         # AÑO PASADO / ÚLTIMO AÑO
-        if re.search(r'(año\s+pasado|último\s+año)', texto_lower):
+        if 'anio_pasado' in rangos:
             año_pasado = hoy.year - 1
             inicio_año_pasado = hoy.replace(year=año_pasado, month=1, day=1)
             fin_año_pasado = hoy.replace(year=año_pasado, month=12, day=31)
             return datetime.combine(inicio_año_pasado, datetime.min.time()), datetime.combine(fin_año_pasado, datetime.max.time())
         
         # Buscar "desde ... hasta ..."
-        match_rango = re.search(
-            r'desde\s+(.+?)\s+hasta\s+(.+?)(?:\s+|$)',
-            texto,
-            re.IGNORECASE
-        )
+        match_rango = InterpretadorComandosVoz.PATRON_RANGO.search(texto)
         
         if match_rango:
             fecha_inicio_texto, fecha_fin_texto = match_rango.groups()
             fecha_inicio = InterpretadorComandosVoz.parsear_fecha(fecha_inicio_texto)
-            fecha_fin = InterpretadorComandosVoz.parsear_fecha(fecha_fin_texto)
+            if 'hasta_hoy' in rangos:
+                fecha_fin = datetime.combine(hoy, datetime.max.time())
+            else:
+                fecha_fin = InterpretadorComandosVoz.parsear_fecha(fecha_fin_texto)
         
         # Si no hay rango explícito, buscar fechas individuales
         if not fecha_inicio:
-            fechas = re.findall(r'\d{1,2}[/-]\d{1,2}[/-]\d{4}', texto)
+            fechas = InterpretadorComandosVoz.PATRON_FECHA_NUMERICA_COMPLETA.findall(texto)
             if len(fechas) >= 2:
                 fecha_inicio = InterpretadorComandosVoz.parsear_fecha(fechas[0])
                 fecha_fin = InterpretadorComandosVoz.parsear_fecha(fechas[1])
@@ -134,105 +137,37 @@ class InterpretadorComandosVoz:
         return fecha_inicio, fecha_fin
     
     @staticmethod
-    def extraer_monto_minimo(texto: str) -> Optional[Decimal]:
-        """Extrae monto mínimo del comando."""
-        # Buscar "mayores a 1000", "más de 1000", "superiores a 1000"
-        patrones = [
-            r'mayor(?:es)?\s+(?:a|que)\s+(\d+)',
-            r'm[áa]s\s+de\s+(\d+)',
-            r'superior(?:es)?\s+a\s+(\d+)',
-            r'sobre\s+(\d+)',
-        ]
-        
-        for patron in patrones:
-            match = re.search(patron, texto, re.IGNORECASE)
-            if match:
-                try:
-                    return Decimal(match.group(1))
-                except (ValueError, TypeError):
-                    continue
-        return None
+    def extraer_monto_minimo(texto: str, analisis: Optional[AnalisisComando] = None) -> Optional[Decimal]:
+        """Extrae monto mínimo del comando ("mayores a 1000", "más de 1000", "sobre 1000")."""
+        return (analisis or analizar(texto)).primero('monto_minimo')
     
     @staticmethod
-    def extraer_monto_maximo(texto: str) -> Optional[Decimal]:
-        """Extrae monto máximo del comando."""
-        # Buscar "menores a 500", "menos de 500", "inferiores a 500"
-        patrones = [
-            r'menor(?:es)?\s+(?:a|que)\s+(\d+)',
-            r'menos\s+de\s+(\d+)',
-            r'inferior(?:es)?\s+a\s+(\d+)',
-            r'bajo\s+(\d+)',
-        ]
-        
-        for patron in patrones:
-            match = re.search(patron, texto, re.IGNORECASE)
-            if match:
-                try:
-                    return Decimal(match.group(1))
-                except (ValueError, TypeError):
-                    continue
-        return None
+    def extraer_monto_maximo(texto: str, analisis: Optional[AnalisisComando] = None) -> Optional[Decimal]:
+        """Extrae monto máximo del comando ("menores a 500", "menos de 500", "bajo 500")."""
+        return (analisis or analizar(texto)).primero('monto_maximo')
     
     @staticmethod
-    def extraer_tipo_producto(texto: str) -> Optional[str]:
+    def extraer_tipo_producto(texto: str, analisis: Optional[AnalisisComando] = None) -> Optional[str]:
         """Identifica si se buscan paquetes, servicios o ambos."""
-        texto_lower = texto.lower()
-        
-        if 'paquete' in texto_lower and 'servicio' not in texto_lower:
-            return 'paquete'
-        elif 'servicio' in texto_lower and 'paquete' not in texto_lower:
-            return 'servicio'
+        tipos = set((analisis or analizar(texto)).valores('tipo_producto'))
+        if len(tipos) == 1:
+            return tipos.pop()
         return None  # Ambos
     
     @staticmethod
-    def extraer_estado(texto: str) -> Optional[str]:
-        """Extrae estado de reserva si se menciona."""
-        texto_lower = texto.lower()
-        
-        estados_map = {
-            'pendiente': 'PENDIENTE',
-            'confirmada': 'CONFIRMADA',
-            'pagada': 'PAGADA',
-            'completada': 'COMPLETADA',
-            'cancelada': 'CANCELADA',
-        }
-        
-        for clave, valor in estados_map.items():
-            if clave in texto_lower:
-                return valor
-        return None
+    def extraer_estado(texto: str, analisis: Optional[AnalisisComando] = None) -> Optional[str]:
+        """Extrae estado de reserva si se menciona (el primero)."""
+        return (analisis or analizar(texto)).primero('estado')
     
     @staticmethod
-    def extraer_limite(texto: str) -> Optional[int]:
-        """Extrae límite de resultados del comando."""
-        # Buscar "top N", "primeros N", "mejores N", "últimos N"
-        patrones = [
-            r'top\s+(\d+)',
-            r'primeros?\s+(\d+)',
-            r'mejores\s+(\d+)',
-            r'últimos?\s+(\d+)',
-            r'solo\s+(\d+)',
-            r'máximo\s+(\d+)',
-        ]
-        
-        for patron in patrones:
-            match = re.search(patron, texto, re.IGNORECASE)
-            if match:
-                return int(match.group(1))
-        
-        return None
+    def extraer_limite(texto: str, analisis: Optional[AnalisisComando] = None) -> Optional[int]:
+        """Extrae límite de resultados ("top N", "primeros N", "mejores N", "solo N")."""
+        return (analisis or analizar(texto)).primero('limite')
     
     @staticmethod
-    def extraer_formato(texto: str) -> str:
+    def extraer_formato(texto: str, analisis: Optional[AnalisisComando] = None) -> str:
         """Detecta formato deseado del reporte."""
-        texto_lower = texto.lower()
-        
-        if any(word in texto_lower for word in ['pdf', 'en pdf', 'formato pdf']):
-            return 'pdf'
-        if any(word in texto_lower for word in ['excel', 'xlsx', 'en excel', 'formato excel', 'hoja de cálculo']):
-            return 'excel'
-        
-        return 'json'
+        return (analisis or analizar(texto)).primero('formato', prioridad=['pdf', 'excel']) or 'json'
     
     @classmethod
     def interpretar(cls, comando_voz: str) -> Dict[str, Any]:
@@ -253,40 +188,41 @@ class InterpretadorComandosVoz:
         }
         """
         filtros: Dict[str, Union[str, datetime, Decimal, int]] = {'comando_original': comando_voz}
+        analisis = analizar(comando_voz)
         
         # Extraer rango de fechas
-        fecha_inicio, fecha_fin = cls.extraer_rango_fechas(comando_voz)
+        fecha_inicio, fecha_fin = cls.extraer_rango_fechas(comando_voz, analisis)
         if fecha_inicio:
             filtros['fecha_inicio'] = fecha_inicio
         if fecha_fin:
             filtros['fecha_fin'] = fecha_fin
         
         # Extraer montos
-        monto_min = cls.extraer_monto_minimo(comando_voz)
+        monto_min = cls.extraer_monto_minimo(comando_voz, analisis)
         if monto_min:
             filtros['monto_minimo'] = monto_min  # type: ignore
         
-        monto_max = cls.extraer_monto_maximo(comando_voz)
+        monto_max = cls.extraer_monto_maximo(comando_voz, analisis)
         if monto_max:
             filtros['monto_maximo'] = monto_max  # type: ignore
         
         # Extraer tipo de producto
-        tipo = cls.extraer_tipo_producto(comando_voz)
+        tipo = cls.extraer_tipo_producto(comando_voz, analisis)
         if tipo:
             filtros['tipo_producto'] = tipo
         
         # Extraer estado
-        estado = cls.extraer_estado(comando_voz)
+        estado = cls.extraer_estado(comando_voz, analisis)
         if estado:
             filtros['estado'] = estado
         
         # Extraer límite
-        limite = cls.extraer_limite(comando_voz)
+        limite = cls.extraer_limite(comando_voz, analisis)
         if limite:
             filtros['limite'] = limite
         
         # Extraer formato
-        formato = cls.extraer_formato(comando_voz)
+        formato = cls.extraer_formato(comando_voz, analisis)
         filtros['formato'] = formato
         
         return filtros
@@ -334,10 +270,11 @@ class GeneradorReportes:
                 q_filters &= Q(fecha__month__in=meses[trimestre])
         
         # ============ FILTROS DE MONTO ============
+        # Montos en Bs sobre el total normalizado (reservas en USD incluidas)
         if 'monto_minimo' in filtros:
-            q_filters &= Q(total__gte=filtros['monto_minimo'])
+            q_filters &= Q(total_bob__gte=filtros['monto_minimo'])
         if 'monto_maximo' in filtros:
-            q_filters &= Q(total__lte=filtros['monto_maximo'])
+            q_filters &= Q(total_bob__lte=filtros['monto_maximo'])
         
         # ============ FILTROS DE PRODUCTO ============
         # Filtro por tipo de producto
@@ -347,15 +284,8 @@ class GeneradorReportes:
             elif filtros['tipo_producto'] == 'servicio':
                 q_filters &= Q(servicio__isnull=False)
         
-        # Filtro por departamento (NUEVO)
-        if 'departamento' in filtros:
-            dept = filtros['departamento']
-            q_filters &= (Q(paquete__departamento=dept) | Q(servicio__departamento=dept))
-        
-        # Filtro por ciudad (NUEVO)
-        if 'ciudad' in filtros:
-            ciudad = filtros['ciudad']
-            q_filters &= (Q(paquete__ciudad__icontains=ciudad) | Q(servicio__ciudad__icontains=ciudad))
+        # Filtro por departamento y ciudad (FK canónicas, ver ubicaciones.py)
+        q_filters &= filtro_ubicacion(filtros, 'paquete__', 'servicio__')
         
         # Filtro por tipo de destino (NUEVO)
         if 'tipo_destino' in filtros:
@@ -392,26 +322,11 @@ class GeneradorReportes:
         if 'cliente_id' in filtros:
             q_filters &= Q(cliente_id=filtros['cliente_id'])
         
-        # Filtro por tipo de cliente (NUEVO - basado en cantidad de reservas)
-        if 'tipo_cliente' in filtros:
-            if filtros['tipo_cliente'] == 'nuevo':
-                # Clientes con 1-2 reservas
-                clientes_nuevos = Usuario.objects.annotate(
-                    num_reservas=Count('reservas')
-                ).filter(num_reservas__lte=2).values_list('id', flat=True)
-                q_filters &= Q(cliente_id__in=clientes_nuevos)
-            elif filtros['tipo_cliente'] == 'recurrente':
-                # Clientes con 3-5 reservas
-                clientes_recurrentes = Usuario.objects.annotate(
-                    num_reservas=Count('reservas')
-                ).filter(num_reservas__gte=3, num_reservas__lte=5).values_list('id', flat=True)
-                q_filters &= Q(cliente_id__in=clientes_recurrentes)
-            elif filtros['tipo_cliente'] == 'vip':
-                # Clientes con 6+ reservas
-                clientes_vip = Usuario.objects.annotate(
-                    num_reservas=Count('reservas')
-                ).filter(num_reservas__gte=6).values_list('id', flat=True)
-                q_filters &= Q(cliente_id__in=clientes_vip)
+        # Filtro por tipo de cliente (tabla precalculada de segmentos RFM)
+        if filtros.get('tipo_cliente') in ('nuevo', 'recurrente', 'vip'):
+            q_filters &= Q(cliente__segmento_rfm__tipo_cliente=filtros['tipo_cliente'])
+        if filtros.get('segmento'):
+            q_filters &= Q(cliente__segmento_rfm__segmento=filtros['segmento'])
         
         # ============ FILTROS DE CAMPAÑA ============
         # Filtro por campaña/promoción
@@ -436,19 +351,19 @@ class GeneradorReportes:
         
         # Métricas agregadas
         metricas = reservas.aggregate(
-            total_ventas=Sum('total'),
+            total_ventas=Sum('total_bob'),
             cantidad_reservas=Count('id'),
-            ticket_promedio=Avg('total'),
-            total_pagado=Sum('total', filter=Q(estado__in=['PAGADA', 'COMPLETADA']))
+            ticket_promedio=Avg('total_bob'),
+            total_pagado=Sum('total_bob', filter=Q(estado__in=['PAGADA', 'COMPLETADA']))
         )
         
         # Ventas por producto
         ventas_paquetes = reservas.filter(paquete__isnull=False).aggregate(
-            total=Sum('total'),
+            total=Sum('total_bob'),
             cantidad=Count('id')
         )
         ventas_servicios = reservas.filter(servicio__isnull=False).aggregate(
-            total=Sum('total'),
+            total=Sum('total_bob'),
             cantidad=Count('id')
         )
         
@@ -457,7 +372,7 @@ class GeneradorReportes:
             reservas.filter(paquete__isnull=False)
             .values('paquete__nombre', 'paquete__id')
             .annotate(
-                total_ventas=Sum('total'),
+                total_ventas=Sum('total_bob'),
                 cantidad=Count('id')
             )
             .order_by('-total_ventas')[:limite]
@@ -467,7 +382,7 @@ class GeneradorReportes:
             reservas.filter(servicio__isnull=False)
             .values('servicio__titulo', 'servicio__id')
             .annotate(
-                total_ventas=Sum('total'),
+                total_ventas=Sum('total_bob'),
                 cantidad=Count('id')
             )
             .order_by('-total_ventas')[:limite]
@@ -477,7 +392,7 @@ class GeneradorReportes:
         top_clientes = (
             reservas.values('cliente__nombre', 'cliente__id')
             .annotate(
-                total_gastado=Sum('total'),
+                total_gastado=Sum('total_bob'),
                 cantidad_reservas=Count('id')
             )
             .order_by('-total_gastado')[:limite * 2]  # Doble para clientes
@@ -511,11 +426,11 @@ class GeneradorReportes:
         clientes_data = (
             reservas.values('cliente__id', 'cliente__nombre', 'cliente__user__email')
             .annotate(
-                total_gastado=Sum('total'),
+                total_gastado=Sum('total_bob'),
                 cantidad_reservas=Count('id'),
                 reservas_pagadas=Count('id', filter=Q(estado__in=['PAGADA', 'COMPLETADA'])),
                 reservas_canceladas=Count('id', filter=Q(estado='CANCELADA')),
-                ticket_promedio=Avg('total'),
+                ticket_promedio=Avg('total_bob'),
                 ultima_compra=Max('fecha')
             )
             .order_by('-total_gastado')
@@ -549,14 +464,15 @@ class GeneradorReportes:
                 'paquete__es_personalizado'
             )
             .annotate(
-                ventas_totales_bob=Sum('total'),
+                ventas_totales_bob=Sum('total_bob'),
+                ventas_totales_usd=Sum('total_usd'),
                 cantidad_vendida=Count('id'),
                 tasa_conversion=Count('id', filter=Q(estado__in=['PAGADA', 'COMPLETADA'])) * 100.0 / Count('id')
             )
             .order_by('-ventas_totales_bob')
         )
         
-        # Convertir ventas a USD (dividir por 6.96) y agregar ambas monedas
+        # Ventas en ambas monedas (montos normalizados); precios de catálogo a BOB
         paquetes_lista = []
         for p in paquetes:
             paquetes_lista.append({
@@ -566,7 +482,7 @@ class GeneradorReportes:
                 'paquete__precio_base_bob': float(p['paquete__precio_base']) * 6.96,
                 'paquete__es_personalizado': p['paquete__es_personalizado'],
                 'ventas_totales_bob': float(p['ventas_totales_bob'] or 0),
-                'ventas_totales_usd': float(p['ventas_totales_bob'] or 0) / 6.96,
+                'ventas_totales_usd': float(p['ventas_totales_usd'] or 0),
                 'cantidad_vendida': p['cantidad_vendida'],
                 'tasa_conversion': float(p['tasa_conversion']),
             })
@@ -582,14 +498,15 @@ class GeneradorReportes:
                 'servicio__categoria__nombre'
             )
             .annotate(
-                ventas_totales_bob=Sum('total'),
+                ventas_totales_bob=Sum('total_bob'),
+                ventas_totales_usd=Sum('total_usd'),
                 cantidad_vendida=Count('id'),
                 tasa_conversion=Count('id', filter=Q(estado__in=['PAGADA', 'COMPLETADA'])) * 100.0 / Count('id')
             )
             .order_by('-ventas_totales_bob')
         )
         
-        # Convertir ventas a USD y agregar ambas monedas
+        # Ventas en ambas monedas (montos normalizados)
         servicios_lista = []
         for s in servicios:
             servicios_lista.append({
@@ -599,7 +516,7 @@ class GeneradorReportes:
                 'servicio__precio_bob': float(s['servicio__precio_usd']) * 6.96,
                 'servicio__categoria__nombre': s['servicio__categoria__nombre'],
                 'ventas_totales_bob': float(s['ventas_totales_bob'] or 0),
-                'ventas_totales_usd': float(s['ventas_totales_bob'] or 0) / 6.96,
+                'ventas_totales_usd': float(s['ventas_totales_usd'] or 0),
                 'cantidad_vendida': s['cantidad_vendida'],
                 'tasa_conversion': float(s['tasa_conversion']),
             })
@@ -619,6 +536,23 @@ class GeneradorReportes:
             }
         }
     
+    # Reportes que pasan por la caché compartida (y que se precalientan)
+    REPORTES_CACHEABLES = ('reporte_ventas_general', 'reporte_clientes_detallado', 'reporte_productos_rendimiento')
+    # Llaves de filtros que no cambian el resultado y no forman parte de la clave
+    FILTROS_SIN_EFECTO = ('comando_original', 'formato')
+    
+    @staticmethod
+    def reporte_cacheado(nombre: str, filtros: Dict[str, Any], refrescar: bool = False) -> Dict[str, Any]:
+        """
+        Ejecuta el reporte ``nombre`` pasando por la caché compartida.
+        """
+        if nombre not in GeneradorReportes.REPORTES_CACHEABLES:
+            raise ValueError(f"Reporte no cacheable: {nombre}")
+        generador = getattr(GeneradorReportes, nombre)
+        clave = {k: v for k, v in filtros.items() if k not in GeneradorReportes.FILTROS_SIN_EFECTO}
+        resultado, _ = obtener_o_calcular(nombre, clave, lambda: generador(filtros), refrescar=refrescar)
+        return {**resultado, 'filtros_aplicados': filtros}
+    
     @staticmethod
     def reporte_por_comando_voz(comando: str) -> Dict[str, Any]:
         """
@@ -632,5 +566,5 @@ class GeneradorReportes:
         # Interpretar comando
         filtros = InterpretadorComandosVoz.interpretar(comando)
         
-        # Generar reporte general
-        return GeneradorReportes.reporte_ventas_general(filtros)
+        # Generar reporte general (precalentado para los rangos comunes)
+        return GeneradorReportes.reporte_cacheado('reporte_ventas_general', filtros)
@@ -0,0 +1,361 @@
+"""
+Reportes programados: suscripciones que se renderizan fuera de horario pico.
+
+Cada ``SuscripcionReporte`` define el reporte (ventas, clientes o
+productos), sus filtros, el formato y una programación estilo cron de 5
+campos (``minuto hora día mes día_semana``, hora local). El job del
+scheduler llama a ``procesar_pendientes`` cada pocos minutos:
+
+1. Toma las suscripciones vencidas y las reclama con un ``UPDATE``
+   condicional sobre ``proxima_ejecucion`` (si hay más de un proceso con
+   scheduler, cada suscripción se procesa una sola vez).
+2. Resuelve los filtros (el ``periodo`` relativo, p. ej. ``semana_pasada``,
+   se convierte en fechas con el mismo intérprete de los comandos de voz) y
+   agrupa las suscripciones idénticas: tipo + formato + filtros resueltos.
+3. Renderiza una vez por grupo (o reutiliza un ``ReporteGenerado`` idéntico
+   de los últimos ``REPORTES_PROGRAMADOS_REUSO_MINUTOS``), guarda el archivo
+   en el almacenamiento de reportes y crea una ``Notificacion`` por
+   suscriptor con el enlace de descarga.
+
+Los renders solo corren dentro del horario valle
+(``REPORTES_PROGRAMADOS_HORARIO_VALLE``, p. ej. ``00:00-06:00``): una
+suscripción que vence en horario pico queda pendiente hasta que abre la
+ventana. Con el ajuste vacío se procesa a cualquier hora.
+
+El almacenamiento es local (``REPORTES_PROGRAMADOS_DIR``) salvo que
+``REPORTES_PROGRAMADOS_STORAGE`` indique un alias de ``STORAGES`` (S3, GCS,
+etc.). La descarga pasa siempre por el endpoint autenticado.
+"""
+import logging
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, storages
+from django.urls import reverse
+from django.utils import timezone
+
+from .cache_reportes import clave_cache
+from .dataset_reportes import dataset_clientes, dataset_productos, dataset_ventas
+from .export_utils import EXTENSIONES_BUNDLE, exportar_reporte_docx, exportar_reporte_excel, exportar_reporte_pdf
+from .models import Notificacion, ReporteGenerado, SuscripcionReporte
+from .reportes import InterpretadorComandosVoz
+
+logger = logging.getLogger(__name__)
+
+# Filtros aceptados por tipo de reporte (los mismos que aplican sus datasets)
+FILTROS = {
+    'ventas': ('departamento', 'departamento_id', 'moneda', 'monto_minimo', 'monto_maximo'),
+    'clientes': ('tipo_cliente', 'moneda', 'departamento', 'ciudad', 'departamento_id', 'ciudad_id'),
+    'productos': ('tipo_producto', 'moneda', 'departamento', 'ciudad', 'departamento_id', 'ciudad_id'),
+}
+MONEDA_POR_DEFECTO = {'ventas': 'BOB', 'clientes': 'USD', 'productos': 'USD'}
+_DATASETS = {'ventas': dataset_ventas, 'clientes': dataset_clientes, 'productos': dataset_productos}
+
+# Periodo relativo → frase del intérprete de fechas (ver reportes.py)
+PERIODOS = {
+    'ayer': 'ayer',
+    'semana_pasada': 'semana pasada',
+    'este_mes': 'este mes',
+    'mes_pasado': 'mes pasado',
+    'ultimos_7_dias': 'últimos 7 días',
+    'ultimos_30_dias': 'últimos 30 días',
+    'anio_pasado': 'año pasado',
+}
+
+# Filtros numéricos (en la moneda del reporte)
+FILTROS_MONTO = ('monto_minimo', 'monto_maximo')
+
+# (mínimo, máximo) de cada campo cron; día de la semana 0 = domingo (7 también)
+_CAMPOS_CRON = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+_DIAS_BUSQUEDA = 366 * 5
+
+
+class ProgramacionInvalida(ValueError):
+    """Expresión cron mal formada o que nunca ocurre."""
+
+
+# ============================================================================
+# 🕒 PROGRAMACIÓN (CRON)
+# ============================================================================
+
+def _campo_cron(texto, minimo, maximo):
+    valores = set()
+    for parte in texto.split(','):
+        rango, _, paso = parte.partition('/')
+        paso = int(paso) if paso else 1
+        if rango == '*':
+            inicio, fin = minimo, maximo
+        elif '-' in rango:
+            inicio, fin = (int(v) for v in rango.split('-', 1))
+        else:
+            inicio = int(rango)
+            fin = maximo if paso > 1 else inicio
+        if paso < 1 or not minimo <= inicio <= fin <= maximo:
+            raise ValueError(parte)
+        valores.update(range(inicio, fin + 1, paso))
+    return valores
+
+
+def parsear_programacion(expresion):
+    """
+    Retorna ``(minutos, horas, dias, meses, dias_semana)`` como conjuntos.
+    Lanza ``ProgramacionInvalida`` si la expresión no es válida.
+    """
+    partes = (expresion or '').split()
+    if len(partes) != 5:
+        raise ProgramacionInvalida('La programación debe tener 5 campos: minuto hora día mes día_semana')
+    try:
+        campos = [_campo_cron(parte, *limites) for parte, limites in zip(partes, _CAMPOS_CRON)]
+    except ValueError as e:
+        raise ProgramacionInvalida(f'Campo de programación inválido: {e}')
+    campos[4] = {d % 7 for d in campos[4]}
+    return campos
+
+
+def proxima_ejecucion(expresion, desde):
+    """
+    Primer minuto posterior a ``desde`` que cumple la expresión (hora local).
+    Como en cron, si día del mes y día de la semana están restringidos basta
+    con que se cumpla uno de los dos.
+    """
+    minutos, horas, dias, meses, dias_semana = parsear_programacion(expresion)
+    partes = expresion.split()
+    ambos_dias = partes[2] != '*' and partes[4] != '*'
+    horarios = sorted((h, m) for h in horas for m in minutos)
+
+    actual = timezone.localtime(desde).replace(second=0, microsecond=0) + timedelta(minutes=1)
+    for _ in range(_DIAS_BUSQUEDA):
+        fecha = actual.date()
+        dia_semana = (fecha.weekday() + 1) % 7
+        if ambos_dias:
+            dia_valido = fecha.day in dias or dia_semana in dias_semana
+        else:
+            dia_valido = fecha.day in dias and dia_semana in dias_semana
+        if fecha.month in meses and dia_valido:
+            for hora, minuto in horarios:
+                if (hora, minuto) >= (actual.hour, actual.minute):
+                    return actual.replace(hour=hora, minute=minuto)
+        actual = timezone.make_aware(datetime.combine(fecha + timedelta(days=1), datetime.min.time()))
+    raise ProgramacionInvalida('La programación no ocurre en los próximos 5 años')
+
+
+def horario_valle():
+    """``(inicio, fin)`` de ``REPORTES_PROGRAMADOS_HORARIO_VALLE`` (``"HH:MM-HH:MM"``), o None sin restricción."""
+    texto = getattr(settings, 'REPORTES_PROGRAMADOS_HORARIO_VALLE', '')
+    if not texto:
+        return None
+    inicio, fin = (datetime.strptime(hora.strip(), '%H:%M').time() for hora in texto.split('-', 1))
+    return inicio, fin
+
+
+def en_horario_valle(momento):
+    """True si ``momento`` (hora local) cae en el horario valle; admite ventanas que cruzan medianoche."""
+    ventana = horario_valle()
+    if ventana is None:
+        return True
+    inicio, fin = ventana
+    hora = timezone.localtime(momento).time()
+    if inicio <= fin:
+        return inicio <= hora < fin
+    return hora >= inicio or hora < fin
+
+
+# ============================================================================
+# 🧾 VALIDACIÓN Y FILTROS
+# ============================================================================
+
+def validar_suscripcion(tipo_reporte, formato, programacion, filtros):
+    """Lanza ``ValueError`` con un mensaje para el usuario si algo no es válido."""
+    if tipo_reporte not in FILTROS:
+        raise ValueError(f"tipo_reporte debe ser uno de: {', '.join(FILTROS)}")
+    if formato not in EXTENSIONES_BUNDLE:
+        raise ValueError(f"formato debe ser uno de: {', '.join(EXTENSIONES_BUNDLE)}")
+    parsear_programacion(programacion)
+    if not isinstance(filtros, dict):
+        raise ValueError('filtros debe ser un objeto')
+    permitidos = set(FILTROS[tipo_reporte]) | {'periodo', 'fecha_inicio', 'fecha_fin'}
+    desconocidos = sorted(set(filtros) - permitidos)
+    if desconocidos:
+        raise ValueError(f"Filtros no soportados para {tipo_reporte}: {', '.join(desconocidos)}")
+    if filtros.get('periodo') and filtros['periodo'] not in PERIODOS:
+        raise ValueError(f"periodo debe ser uno de: {', '.join(PERIODOS)}")
+    montos = {}
+    for clave in FILTROS_MONTO:
+        if filtros.get(clave) in (None, ''):
+            continue
+        try:
+            montos[clave] = Decimal(str(filtros[clave]))
+        except InvalidOperation:
+            raise ValueError(f"{clave} debe ser un número")
+        if not montos[clave].is_finite() or montos[clave] < 0:
+            raise ValueError(f"{clave} debe ser un número positivo")
+    if len(montos) == 2 and montos['monto_minimo'] > montos['monto_maximo']:
+        raise ValueError('monto_minimo no puede ser mayor que monto_maximo')
+
+
+def resolver_filtros(tipo_reporte, filtros):
+    """Filtros concretos para esta ejecución (periodo relativo → fechas)."""
+    resueltos = {
+        clave: valor for clave, valor in (filtros or {}).items()
+        if clave in FILTROS[tipo_reporte] and valor not in (None, '')
+    }
+    resueltos.setdefault('moneda', MONEDA_POR_DEFECTO[tipo_reporte])
+    periodo = (filtros or {}).get('periodo')
+    if periodo:
+        inicio, fin = InterpretadorComandosVoz.extraer_rango_fechas(PERIODOS[periodo])
+        resueltos['fecha_inicio'], resueltos['fecha_fin'] = inicio.date().isoformat(), fin.date().isoformat()
+    else:
+        for clave in ('fecha_inicio', 'fecha_fin'):
+            if (filtros or {}).get(clave):
+                resueltos[clave] = filtros[clave]
+    return resueltos
+
+
+# ============================================================================
+# 🖨️ RENDER Y ALMACENAMIENTO
+# ============================================================================
+
+def almacenamiento():
+    """Storage de los reportes: alias configurado en STORAGES o carpeta local."""
+    alias = getattr(settings, 'REPORTES_PROGRAMADOS_STORAGE', '')
+    if alias:
+        return storages[alias]
+    return FileSystemStorage(location=getattr(settings, 'REPORTES_PROGRAMADOS_DIR', 'reportes_programados'))
+
+
+def renderizar(tipo_reporte, formato, filtros):
+    """Renderiza el reporte a un archivo temporal (abierto, al inicio)."""
+    dataset = _DATASETS[tipo_reporte](dict(filtros))
+    if formato == 'pdf':
+        return exportar_reporte_pdf(dataset, destino=tempfile.TemporaryFile())
+    if formato == 'docx':
+        return exportar_reporte_docx(dataset, destino=tempfile.TemporaryFile())
+    return exportar_reporte_excel(dataset)
+
+
+def _obtener_o_renderizar(tipo_reporte, formato, filtros, huella, ahora):
+    """Retorna ``(reporte, reutilizado)``."""
+    ventana = ahora - timedelta(minutes=getattr(settings, 'REPORTES_PROGRAMADOS_REUSO_MINUTOS', 60))
+    existente = ReporteGenerado.objects.filter(huella=huella, generado_en__gte=ventana).order_by('-generado_en').first()
+    if existente:
+        return existente, True
+
+    inicio = time.perf_counter()
+    archivo = renderizar(tipo_reporte, formato, filtros)
+    nombre = (
+        f"{tipo_reporte}/{timezone.localtime(ahora):%Y%m%d_%H%M}_"
+        f"{huella.rsplit(':', 1)[-1]}.{EXTENSIONES_BUNDLE[formato]}"
+    )
+    try:
+        storage = almacenamiento()
+        nombre = storage.save(nombre, File(archivo))
+        tamano = storage.size(nombre)
+    finally:
+        archivo.close()
+    reporte = ReporteGenerado.objects.create(
+        tipo_reporte=tipo_reporte, formato=formato, filtros=filtros, huella=huella,
+        archivo=nombre, tamano=tamano, duracion_ms=round((time.perf_counter() - inicio) * 1000, 1),
+    )
+    return reporte, False
+
+
+def _notificar(suscripcion, reporte, filtros):
+    titulo = f"Reporte de {suscripcion.tipo_reporte} listo"
+    periodo = f"{filtros.get('fecha_inicio', 'inicio')} a {filtros.get('fecha_fin', 'hoy')}"
+    Notificacion.objects.create(
+        usuario=suscripcion.usuario,
+        tipo='reporte_programado',
+        datos={
+            'titulo': titulo,
+            'mensaje': f"Tu reporte {suscripcion.formato.upper()} ({periodo}) está disponible",
+            'suscripcion_id': suscripcion.id,
+            'reporte_id': reporte.id,
+            'url': reverse('descargar-reporte-programado', args=[reporte.id]),
+        },
+    )
+
+
+# ============================================================================
+# ⚙️ PROCESAMIENTO
+# ============================================================================
+
+def _reclamar(suscripcion, ahora):
+    """Avanza ``proxima_ejecucion`` solo si nadie la tomó antes. Retorna True si se reclamó."""
+    try:
+        siguiente = proxima_ejecucion(suscripcion.programacion, ahora)
+    except ProgramacionInvalida as e:
+        SuscripcionReporte.objects.filter(pk=suscripcion.pk).update(activa=False, ultimo_error=str(e))
+        return False
+    return bool(
+        SuscripcionReporte.objects
+        .filter(pk=suscripcion.pk, proxima_ejecucion=suscripcion.proxima_ejecucion)
+        .update(proxima_ejecucion=siguiente, ultima_ejecucion=ahora)
+    )
+
+
+def programar_nuevas(ahora=None):
+    """Calcula ``proxima_ejecucion`` de las suscripciones activas que no la tienen (p. ej. creadas en el admin)."""
+    ahora = ahora or timezone.now()
+    for suscripcion in SuscripcionReporte.objects.filter(activa=True, proxima_ejecucion__isnull=True):
+        try:
+            siguiente = proxima_ejecucion(suscripcion.programacion, ahora)
+        except ProgramacionInvalida as e:
+            SuscripcionReporte.objects.filter(pk=suscripcion.pk).update(activa=False, ultimo_error=str(e))
+            continue
+        SuscripcionReporte.objects.filter(pk=suscripcion.pk).update(proxima_ejecucion=siguiente)
+
+
+def procesar_pendientes(ahora=None, forzar=False):
+    """
+    Genera y entrega las suscripciones vencidas. Fuera del horario valle no
+    renderiza (salvo ``forzar``): las cuenta como diferidas. Retorna un
+    resumen con suscripciones entregadas, renders, reutilizados, errores y
+    diferidas.
+    """
+    ahora = ahora or timezone.now()
+    programar_nuevas(ahora)
+    pendientes = (
+        SuscripcionReporte.objects
+        .filter(activa=True, proxima_ejecucion__lte=ahora)
+        .select_related('usuario')
+        .order_by('proxima_ejecucion')
+    )
+    resumen = {'entregadas': 0, 'renders': 0, 'reutilizados': 0, 'errores': 0, 'diferidas': 0}
+    if not forzar and not en_horario_valle(ahora):
+        # Siguen vencidas: se toman en la primera revisión dentro del horario valle
+        resumen['diferidas'] = pendientes.count()
+        return resumen
+
+    grupos = defaultdict(list)
+    for suscripcion in pendientes:
+        if not _reclamar(suscripcion, ahora):
+            continue
+        filtros = resolver_filtros(suscripcion.tipo_reporte, suscripcion.filtros)
+        huella = clave_cache(f'programado_{suscripcion.tipo_reporte}_{suscripcion.formato}', filtros)
+        grupos[huella].append((suscripcion, filtros))
+
+    for huella, miembros in grupos.items():
+        primera, filtros = miembros[0]
+        ids = [s.id for s, _ in miembros]
+        try:
+            reporte, reutilizado = _obtener_o_renderizar(primera.tipo_reporte, primera.formato, filtros, huella, ahora)
+        except Exception as e:
+            logger.error(f"❌ Error al generar reporte programado {primera.tipo_reporte}.{primera.formato}: {e}")
+            SuscripcionReporte.objects.filter(pk__in=ids).update(ultimo_error=str(e)[:1000])
+            resumen['errores'] += len(ids)
+            continue
+
+        resumen['reutilizados' if reutilizado else 'renders'] += 1
+        for suscripcion, _ in miembros:
+            _notificar(suscripcion, reporte, filtros)
+        SuscripcionReporte.objects.filter(pk__in=ids).update(ultimo_reporte=reporte, ultimo_error='')
+        resumen['entregadas'] += len(ids)
+
+    if grupos:
+        logger.info(f"📬 Reportes programados: {resumen}")
+    return resumen
@@ -8,6 +8,7 @@ import schedule
 import time
 import threading
 from datetime import datetime
+from django.conf import settings
 from django.core.management import call_command
 import logging
 
@@ -17,6 +18,17 @@ logger = logging.getLogger(__name__)
 _scheduler_started = False
 _scheduler_thread = None
 
+# Hora (local) del recálculo nocturno de segmentos RFM
+HORA_SEGMENTACION = "02:00"
+# Hora (local) del recálculo nocturno de métricas de proveedores
+HORA_METRICAS_PROVEEDORES = "02:30"
+# Hora (local) del recálculo nocturno de pronósticos de demanda
+HORA_PRONOSTICOS = "03:00"
+# Hora (local) de la reconciliación nocturna de cuotas de planes
+HORA_CUOTAS = "03:30"
+# Minutos entre revisiones de reportes programados vencidos
+INTERVALO_REPORTES_PROGRAMADOS = 5
+
 
 def ejecutar_campanas_job():
     """
@@ -32,6 +44,94 @@ def ejecutar_campanas_job():
         logger.error(f"❌ Error al ejecutar campañas programadas: {e}")
 
 
+def recalcular_segmentos_job():
+    """
+    Job nocturno que reconstruye la tabla de segmentos RFM de clientes.
+    """
+    try:
+        logger.info(f"🎯 [{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Recalculando segmentos de clientes...")
+        call_command('recalcular_segmentos_rfm', verbosity=0)
+    except Exception as e:
+        logger.error(f"❌ Error al recalcular segmentos de clientes: {e}")
+
+
+def recalcular_metricas_proveedores_job():
+    """
+    Job nocturno que reconstruye las métricas de los meses recientes de
+    cada proveedor.
+    """
+    try:
+        logger.info(f"🏪 [{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Recalculando métricas de proveedores...")
+        call_command('recalcular_metricas_proveedores', verbosity=0)
+    except Exception as e:
+        logger.error(f"❌ Error al recalcular métricas de proveedores: {e}")
+
+
+def pronosticar_demanda_job():
+    """
+    Job nocturno que recalcula los pronósticos de demanda de paquetes y
+    servicios.
+    """
+    try:
+        logger.info(f"🔮 [{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Recalculando pronósticos de demanda...")
+        call_command('pronosticar_demanda', verbosity=0)
+    except Exception as e:
+        logger.error(f"❌ Error al recalcular pronósticos de demanda: {e}")
+
+
+def sincronizar_cuotas_job():
+    """
+    Job nocturno que reconcilia los contadores de cuotas de los planes
+    (deriva de operaciones masivas y de INSERT fallidos).
+    """
+    try:
+        logger.info(f"🔁 [{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Sincronizando cuotas de planes...")
+        call_command('recalcular_cuotas', verbosity=0)
+    except Exception as e:
+        logger.error(f"❌ Error al sincronizar cuotas de planes: {e}")
+
+
+def enviar_reportes_programados_job():
+    """
+    Job periódico que genera y entrega los reportes programados vencidos.
+    """
+    try:
+        call_command('enviar_reportes_programados', verbosity=0)
+    except Exception as e:
+        logger.error(f"❌ Error al enviar reportes programados: {e}")
+
+
+def precalentar_caches_job():
+    """
+    Job fuera de horario pico que recalcula los presets del dashboard y de
+    los reportes en la caché compartida.
+    """
+    try:
+        logger.info(f"🔥 [{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Precalentando cachés de reportes...")
+        call_command('precalentar_caches', verbosity=0)
+    except Exception as e:
+        logger.error(f"❌ Error al precalentar cachés de reportes: {e}")
+
+
+def programar_jobs_reportes():
+    """
+    Programa los jobs diarios de analítica (segmentación RFM, métricas de
+    proveedores, pronósticos de demanda, cuotas de planes y precalentamiento
+    de cachés) y la
+    revisión periódica de reportes programados. Retorna las horas del
+    precalentamiento.
+    """
+    schedule.every().day.at(HORA_SEGMENTACION).do(recalcular_segmentos_job)
+    schedule.every().day.at(HORA_METRICAS_PROVEEDORES).do(recalcular_metricas_proveedores_job)
+    schedule.every().day.at(HORA_PRONOSTICOS).do(pronosticar_demanda_job)
+    schedule.every().day.at(HORA_CUOTAS).do(sincronizar_cuotas_job)
+    schedule.every(INTERVALO_REPORTES_PROGRAMADOS).minutes.do(enviar_reportes_programados_job)
+    horas = getattr(settings, 'PRECALENTAMIENTO_HORAS', [])
+    for hora in horas:
+        schedule.every().day.at(hora).do(precalentar_caches_job)
+    return horas
+
+
 def run_scheduler():
     """
     Ejecuta el scheduler en un loop infinito.
@@ -65,9 +165,16 @@ def start_campaign_scheduler():
     try:
         # Programar el job para que se ejecute cada minuto
         schedule.every(1).minutes.do(ejecutar_campanas_job)
+        # Segmentación RFM y precalentamiento de cachés: diarios
+        horas_precalentamiento = programar_jobs_reportes()
         
         print("🤖 Programador de campañas iniciado")
         print(f"🕒 Intervalo: Cada 1 minuto")
+        print(f"🎯 Segmentos de clientes: diario a las {HORA_SEGMENTACION}")
+        print(f"🏪 Métricas de proveedores: diario a las {HORA_METRICAS_PROVEEDORES}")
+        print(f"🔮 Pronósticos de demanda: diario a las {HORA_PRONOSTICOS}")
+        print(f"📬 Reportes programados: cada {INTERVALO_REPORTES_PROGRAMADOS} minutos")
+        print(f"🔥 Precalentamiento de cachés: {', '.join(horas_precalentamiento) or 'desactivado'}")
         print(f"📅 Verificando campañas programadas automáticamente...")
         
         # Iniciar el scheduler en un thread separado
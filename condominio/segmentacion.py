@@ -0,0 +1,141 @@
+"""
+Segmentación RFM de clientes (recencia, frecuencia, monto).
+
+``recalcular_segmentos`` reconstruye la tabla ``SegmentoCliente`` completa
+con un solo ``INSERT … SELECT``: la consulta agrupada del ORM calcula por
+cliente la última compra, la cantidad de compras y el monto en BOB, las
+funciones de ventana ``CUME_DIST`` dan la posición relativa de cada cliente
+(los empates reciben el mismo score) y la clasificación son ``CASE`` en el
+mismo SQL. Ninguna fila pasa por Python. La tabla se reemplaza dentro de
+una transacción, así que los lectores nunca ven un estado a medias.
+
+Umbrales de tipo de cliente (únicos para todo el sistema):
+    nuevo       → 1 compra
+    recurrente  → 2 a 5 compras
+    vip         → 6 o más compras
+"""
+import logging
+
+from django.db import connection, transaction
+from django.db.models import Count, F, Max, Sum, Window
+from django.db.models.functions import CumeDist
+from django.utils import timezone
+
+from .dataset_reportes import ESTADOS_VENTA
+from .models import Reserva, SegmentoCliente
+
+logger = logging.getLogger(__name__)
+
+
+def _score_sql(columna):
+    """Distribución acumulada (0, 1] → score 1..5 (equivale a ceil(dist * 5))."""
+    return (
+        f"CASE WHEN {columna} <= 0.2 THEN 1 WHEN {columna} <= 0.4 THEN 2 WHEN {columna} <= 0.6 THEN 3 "
+        f"WHEN {columna} <= 0.8 THEN 4 ELSE 5 END"
+    )
+
+
+TIPO_CLIENTE_SQL = (
+    "CASE WHEN frecuencia >= 6 THEN 'vip' WHEN frecuencia >= 2 THEN 'recurrente' ELSE 'nuevo' END"
+)
+
+SEGMENTO_SQL = (
+    "CASE WHEN r_score >= 4 AND f_score >= 4 THEN 'CAMPEON' "
+    "WHEN r_score >= 3 AND f_score >= 3 THEN 'LEAL' "
+    "WHEN r_score >= 4 THEN 'PROMETEDOR' "
+    "WHEN r_score <= 2 AND f_score >= 3 THEN 'EN_RIESGO' "
+    "WHEN r_score <= 2 THEN 'HIBERNANDO' "
+    "ELSE 'NECESITA_ATENCION' END"
+)
+
+
+def _dias_desde_sql(vendor):
+    """Días entre ``ultima_compra`` y la fecha del parámetro."""
+    if vendor == 'postgresql':
+        return "(%s::date - ultima_compra)"
+    return "CAST(julianday(%s) - julianday(ultima_compra) AS INTEGER)"
+
+
+def consulta_rfm():
+    """Agregados y posiciones relativas por cliente, calculados en la base de datos."""
+    return (
+        Reserva.objects
+        .filter(estado__in=ESTADOS_VENTA)
+        .order_by()
+        .values('cliente_id')
+        .annotate(
+            ultima_compra=Max('fecha'),
+            frecuencia=Count('id'),
+            monto_bob=Sum('total_bob'),
+        )
+        .annotate(
+            r_dist=Window(CumeDist(), order_by=F('ultima_compra').asc()),
+            f_dist=Window(CumeDist(), order_by=F('frecuencia').asc()),
+            m_dist=Window(CumeDist(), order_by=F('monto_bob').asc()),
+        )
+    )
+
+
+def sql_insertar_segmentos(vendor):
+    """``INSERT … SELECT`` de la tabla de segmentos sobre ``consulta_rfm``."""
+    rfm_sql, rfm_params = consulta_rfm().query.sql_with_params()
+    campos = {f.attname: f.column for f in SegmentoCliente._meta.concrete_fields}
+    columnas = ', '.join(connection.ops.quote_name(campos[c]) for c in (
+        'usuario_id', 'ultima_compra', 'recencia_dias', 'frecuencia', 'monto_bob',
+        'r_score', 'f_score', 'm_score', 'tipo_cliente', 'segmento', 'calculado_en',
+    ))
+    sql = f"""
+        INSERT INTO {connection.ops.quote_name(SegmentoCliente._meta.db_table)} ({columnas})
+        SELECT
+            cliente_id, ultima_compra, CASE WHEN dias < 0 THEN 0 ELSE dias END, frecuencia, monto_bob,
+            r_score, f_score, m_score, {TIPO_CLIENTE_SQL}, {SEGMENTO_SQL}, %s
+        FROM (
+            SELECT
+                cliente_id, ultima_compra, frecuencia,
+                ROUND(COALESCE(monto_bob, 0), 2) AS monto_bob,
+                {_dias_desde_sql(vendor)} AS dias,
+                {_score_sql('r_dist')} AS r_score,
+                {_score_sql('f_dist')} AS f_score,
+                {_score_sql('m_dist')} AS m_score
+            FROM ({rfm_sql}) rfm
+        ) scores
+    """
+    return sql, rfm_params
+
+
+def recalcular_segmentos():
+    """
+    Reconstruye la tabla de segmentos. Retorna un resumen con el total de
+    clientes y la cantidad por tipo y por segmento.
+    """
+    sql, rfm_params = sql_insertar_segmentos(connection.vendor)
+    params = (
+        connection.ops.adapt_datetimefield_value(timezone.now()),
+        connection.ops.adapt_datefield_value(timezone.localdate()),
+        *rfm_params,
+    )
+    with transaction.atomic(), connection.cursor() as cursor:
+        SegmentoCliente.objects.all().delete()
+        cursor.execute(sql, params)
+
+    resumen = resumen_segmentos()
+    logger.info(f"🎯 Segmentos RFM recalculados: {resumen['total_clientes']} clientes")
+    return resumen
+
+
+def resumen_segmentos():
+    """Conteo de clientes por tipo y por segmento (desde la tabla precalculada)."""
+    por_tipo = dict(
+        SegmentoCliente.objects.order_by().values_list('tipo_cliente').annotate(n=Count('usuario'))
+    )
+    por_segmento = dict(
+        SegmentoCliente.objects.order_by().values_list('segmento').annotate(n=Count('usuario'))
+    )
+    ultimo = SegmentoCliente.objects.aggregate(ultimo=Max('calculado_en'))['ultimo']
+    return {
+        'total_clientes': sum(por_tipo.values()),
+        'por_tipo': por_tipo,
+        'por_segmento': por_segmento,
+        'calculado_en': ultimo.isoformat() if ultimo else None,
+    }
+
@@ -24,7 +24,9 @@ from .models import (
     ReservaServicio,
     FCMDevice,
     CampanaNotificacion,
-    Plan
+    Plan,
+    Departamento,
+    Ciudad,
     # Proveedor, Suscripcion - MODELOS REMOVIDOS POR MIGRACION 0009
 )
 class UsuarioSerializer(serializers.ModelSerializer):
@@ -142,6 +144,23 @@ class CategoriaSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "created_at"]
 
 
+# =====================================================
+# 📍 UBICACIÓN
+# =====================================================
+class CiudadSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Ciudad
+        fields = ["id", "nombre"]
+
+
+class DepartamentoSerializer(serializers.ModelSerializer):
+    ciudades = CiudadSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Departamento
+        fields = ["id", "nombre", "ciudades"]
+
+
 # =====================================================
 # 🧍 USUARIO
 # =====================================================
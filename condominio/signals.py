@@ -10,6 +10,9 @@ logger = logging.getLogger(__name__)
 
 # Código existente para cargar fixtures está comentado; se mantiene.
 
+# Contadores de cuotas de planes de proveedores (siempre activos)
+import condominio.signals_cuotas  # noqa: F401,E402
+
 # Importar señales FCM condicionalmente para evitar envíos automáticos por defecto.
 # La variable de entorno en español 'HABILITAR_SEÑAL_FCM' controla esto.
 fcm_var = os.getenv('HABILITAR_SEÑAL_FCM', '').strip().strip('"').strip("'").lower()
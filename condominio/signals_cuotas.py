@@ -0,0 +1,70 @@
+"""
+Señales que mantienen los contadores de cuotas de planes (ver cuotas.py).
+
+Los servicios consumen la cuota en ``pre_save``: si se excedió, la fila no
+llega a crearse. Dentro de una transacción (admin) un INSERT fallido
+revierte también el incremento; fuera de ella el contador puede quedar una
+unidad arriba hasta la reconciliación nocturna.
+
+Las reservas se cuentan en ``post_save`` una vez confirmada la transacción
+(``on_commit``): una reserva revertida no suma, y la cuota de clientes nunca
+hace fallar al cliente ni a los scripts de carga.
+"""
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .cuotas import RECURSO_SERVICIOS, consumir, invalidar_plan, liberar, registrar_cliente_potencial, sincronizar_uso
+from .models import Plan, Proveedor, Reserva, Servicio, Suscripcion
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(pre_save, sender=Servicio)
+def servicio_consumir_cuota(sender, instance, raw=False, **kwargs):
+    if instance._state.adding and not raw:
+        consumir(instance.proveedor_id, RECURSO_SERVICIOS)
+
+
+@receiver(post_delete, sender=Servicio)
+def servicio_liberar_cuota(sender, instance, **kwargs):
+    liberar(instance.proveedor_id, RECURSO_SERVICIOS)
+
+
+@receiver(post_save, sender=Reserva)
+def reserva_registrar_cliente(sender, instance, created, raw=False, **kwargs):
+    """El cliente de una reserva nueva es un cliente potencial del proveedor del producto."""
+    if not created or raw:
+        return
+    producto = instance.servicio if instance.servicio_id else instance.paquete if instance.paquete_id else None
+    if producto is None or not producto.proveedor_id:
+        return
+    transaction.on_commit(
+        lambda: registrar_cliente_potencial(producto.proveedor_id, instance.cliente_id, instance.pk),
+        robust=True,
+    )
+
+
+@receiver(post_save, sender=Suscripcion)
+def suscripcion_actualizar_cuotas(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    usuario_id = instance.proveedor.usuario_id
+    invalidar_plan(usuario_id)
+    try:
+        sincronizar_uso([usuario_id])
+    except Exception as e:
+        logger.error(f"❌ No se pudieron sincronizar las cuotas del proveedor {usuario_id}: {e}")
+
+
+@receiver(post_delete, sender=Suscripcion)
+def suscripcion_eliminada_invalidar(sender, instance, **kwargs):
+    invalidar_plan(Proveedor.objects.filter(pk=instance.proveedor_id).values_list('usuario_id', flat=True).first())
+
+
+@receiver(post_save, sender=Plan)
+def plan_invalidar_cuotas(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidar_plan(*Suscripcion.objects.filter(plan=instance).values_list('proveedor__usuario_id', flat=True))
@@ -0,0 +1,366 @@
+"""
+Snapshots analíticos columnares (Parquet/Arrow).
+
+Exporta las tablas de hechos y dimensiones que usan los analistas
+(reservas, pagos, servicios reservados, paquetes, servicios y usuarios)
+a archivos tipados y comprimidos, leyendo la base de datos con cursores
+del lado del servidor (``QuerySet.iterator``) y escribiendo por lotes.
+
+Soporta corridas incrementales: por cada dataset se guarda una marca de
+agua (``updated_at`` máximo exportado) y la siguiente corrida lee las filas
+modificadas después de esa marca menos ``SNAPSHOT_SOLAPE_SEGUNDOS``. El
+solape recoge las filas cuyo ``updated_at`` quedó antes de la marca pero
+se confirmaron después (transacciones largas, relojes de distintos
+workers). A cambio, una fila puede aparecer en más de un archivo
+incremental: los consumidores deduplican por ``id`` quedándose con el
+``updated_at`` mayor.
+
+Si ``pyarrow`` no está instalado se escribe CSV comprimido con gzip como
+respaldo, con las mismas columnas.
+"""
+import csv
+import gzip
+import json
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Reserva, Pago, ReservaServicio, Paquete, Servicio, Usuario
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - depende del entorno
+    pa = None
+    pq = None
+
+
+SNAPSHOT_DIR = Path(getattr(settings, 'SNAPSHOT_ANALITICO_DIR', Path(settings.BASE_DIR) / 'snapshots'))
+ARCHIVO_MARCAS = '_marcas_agua.json'
+TAMANO_LOTE = 5000
+SOLAPE_POR_DEFECTO = 300
+
+
+# ============================================================================
+# 📐 DEFINICIÓN DE DATASETS
+# ============================================================================
+# Cada columna: (nombre_columna, lookup_orm, tipo)
+# Tipos soportados: int, str, decimal, date, datetime, bool
+
+DATASETS = {
+    'reservas': {
+        'modelo': Reserva,
+        'marca_agua': 'updated_at',
+        'columnas': [
+            ('id', 'id', 'int'),
+            ('fecha', 'fecha', 'date'),
+            ('fecha_inicio', 'fecha_inicio', 'datetime'),
+            ('fecha_fin', 'fecha_fin', 'datetime'),
+            ('estado', 'estado', 'str'),
+            ('total', 'total', 'decimal'),
+            ('moneda', 'moneda', 'str'),
+            ('cliente_id', 'cliente_id', 'int'),
+            ('cupon_id', 'cupon_id', 'int'),
+            ('servicio_id', 'servicio_id', 'int'),
+            ('paquete_id', 'paquete_id', 'int'),
+            ('numero_reprogramaciones', 'numero_reprogramaciones', 'int'),
+            ('created_at', 'created_at', 'datetime'),
+            ('updated_at', 'updated_at', 'datetime'),
+        ],
+    },
+    'pagos': {
+        'modelo': Pago,
+        'marca_agua': 'updated_at',
+        'columnas': [
+            ('id', 'id', 'int'),
+            ('reserva_id', 'reserva_id', 'int'),
+            ('monto', 'monto', 'decimal'),
+            ('metodo', 'metodo', 'str'),
+            ('estado', 'estado', 'str'),
+            ('fecha_pago', 'fecha_pago', 'date'),
+            ('created_at', 'created_at', 'datetime'),
+            ('updated_at', 'updated_at', 'datetime'),
+        ],
+    },
+    'reserva_servicios': {
+        'modelo': ReservaServicio,
+        'marca_agua': 'updated_at',
+        'columnas': [
+            ('id', 'id', 'int'),
+            ('reserva_id', 'reserva_id', 'int'),
+            ('servicio_id', 'servicio_id', 'int'),
+            ('fecha', 'fecha', 'date'),
+            ('fecha_inicio', 'fecha_inicio', 'datetime'),
+            ('fecha_fin', 'fecha_fin', 'datetime'),
+            ('created_at', 'created_at', 'datetime'),
+            ('updated_at', 'updated_at', 'datetime'),
+        ],
+    },
+    'paquetes': {
+        'modelo': Paquete,
+        'marca_agua': 'updated_at',
+        'columnas': [
+            ('id', 'id', 'int'),
+            ('nombre', 'nombre', 'str'),
+            ('es_personalizado', 'es_personalizado', 'bool'),
+            ('proveedor_id', 'proveedor_id', 'int'),
+            ('precio_base', 'precio_base', 'decimal'),
+            ('precio_bob', 'precio_bob', 'decimal'),
+            ('cupos_disponibles', 'cupos_disponibles', 'int'),
+            ('cupos_ocupados', 'cupos_ocupados', 'int'),
+            ('fecha_inicio', 'fecha_inicio', 'date'),
+            ('fecha_fin', 'fecha_fin', 'date'),
+            ('estado', 'estado', 'str'),
+            ('destacado', 'destacado', 'bool'),
+            ('campania_id', 'campania_id', 'int'),
+            ('departamento', 'departamento', 'str'),
+            ('ciudad', 'ciudad', 'str'),
+            ('departamento_id', 'departamento_canonico_id', 'int'),
+            ('ciudad_id', 'ciudad_canonica_id', 'int'),
+            ('tipo_destino', 'tipo_destino', 'str'),
+            ('created_at', 'created_at', 'datetime'),
+            ('updated_at', 'updated_at', 'datetime'),
+        ],
+    },
+    'servicios': {
+        'modelo': Servicio,
+        'marca_agua': 'updated_at',
+        'columnas': [
+            ('id', 'id', 'int'),
+            ('titulo', 'titulo', 'str'),
+            ('estado', 'estado', 'str'),
+            ('categoria_id', 'categoria_id', 'int'),
+            ('proveedor_id', 'proveedor_id', 'int'),
+            ('capacidad_max', 'capacidad_max', 'int'),
+            ('precio_usd', 'precio_usd', 'decimal'),
+            ('departamento', 'departamento', 'str'),
+            ('ciudad', 'ciudad', 'str'),
+            ('departamento_id', 'departamento_canonico_id', 'int'),
+            ('ciudad_id', 'ciudad_canonica_id', 'int'),
+            ('created_at', 'created_at', 'datetime'),
+            ('updated_at', 'updated_at', 'datetime'),
+        ],
+    },
+    'usuarios': {
+        # Sin datos personales (documento, teléfono, email): solo atributos analíticos.
+        'modelo': Usuario,
+        'marca_agua': 'updated_at',
+        'columnas': [
+            ('id', 'id', 'int'),
+            ('rol', 'rol__nombre', 'str'),
+            ('num_viajes', 'num_viajes', 'int'),
+            ('genero', 'genero', 'str'),
+            ('pais', 'pais', 'str'),
+            ('fecha_nacimiento', 'fecha_nacimiento', 'date'),
+            ('created_at', 'created_at', 'datetime'),
+            ('updated_at', 'updated_at', 'datetime'),
+        ],
+    },
+}
+
+
+def _tipo_arrow(tipo):
+    return {
+        'int': pa.int64(),
+        'str': pa.string(),
+        'decimal': pa.decimal128(14, 2),
+        'date': pa.date32(),
+        'datetime': pa.timestamp('us', tz='UTC'),
+        'bool': pa.bool_(),
+    }[tipo]
+
+
+# ============================================================================
+# 💧 MARCAS DE AGUA
+# ============================================================================
+
+def leer_marcas_agua(directorio=None):
+    ruta = Path(directorio or SNAPSHOT_DIR) / ARCHIVO_MARCAS
+    if not ruta.exists():
+        return {}
+    with open(ruta, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def guardar_marcas_agua(marcas, directorio=None):
+    ruta = Path(directorio or SNAPSHOT_DIR) / ARCHIVO_MARCAS
+    tmp = ruta.with_suffix('.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(marcas, f, indent=2)
+    os.replace(tmp, ruta)
+
+
+# ============================================================================
+# ✍️ ESCRITORES
+# ============================================================================
+
+class _EscritorParquet:
+    extension = 'parquet'
+
+    def __init__(self, ruta, columnas):
+        self.nombres = [c[0] for c in columnas]
+        self.schema = pa.schema([(nombre, _tipo_arrow(tipo)) for nombre, _, tipo in columnas])
+        self.writer = pq.ParquetWriter(str(ruta), self.schema, compression='zstd')
+
+    def escribir_lote(self, filas):
+        columnas = list(zip(*filas))
+        batch = pa.RecordBatch.from_arrays(
+            [pa.array(col, type=campo.type) for col, campo in zip(columnas, self.schema)],
+            schema=self.schema,
+        )
+        self.writer.write_batch(batch)
+
+    def cerrar(self):
+        self.writer.close()
+
+
+class _EscritorCSVGzip:
+    extension = 'csv.gz'
+
+    def __init__(self, ruta, columnas):
+        self.archivo = gzip.open(ruta, 'wt', encoding='utf-8', newline='')
+        self.writer = csv.writer(self.archivo)
+        self.writer.writerow([c[0] for c in columnas])
+
+    def escribir_lote(self, filas):
+        self.writer.writerows(
+            [
+                ['' if v is None else (v.isoformat() if hasattr(v, 'isoformat') else v) for v in fila]
+                for fila in filas
+            ]
+        )
+
+    def cerrar(self):
+        self.archivo.close()
+
+
+def formato_disponible():
+    return 'parquet' if pa is not None else 'csv.gz'
+
+
+# ============================================================================
+# 📤 EXPORTACIÓN
+# ============================================================================
+
+def exportar_dataset(nombre, desde=None, directorio=None, tamano_lote=TAMANO_LOTE, sello=None):
+    """
+    Exporta un dataset a un archivo columnar.
+
+    Args:
+        nombre: clave en DATASETS
+        desde: datetime; si se indica, solo filas con marca de agua posterior
+        directorio: carpeta destino (por defecto SNAPSHOT_DIR)
+        tamano_lote: filas por lote leídas del cursor y escritas al archivo
+        sello: sufijo de nombre de archivo (por defecto, timestamp actual)
+
+    Returns:
+        dict con dataset, archivo, filas y marca_agua (ISO o None)
+    """
+    definicion = DATASETS[nombre]
+    directorio = Path(directorio or SNAPSHOT_DIR)
+    directorio.mkdir(parents=True, exist_ok=True)
+
+    columnas = definicion['columnas']
+    lookups = [c[1] for c in columnas]
+    campo_marca = definicion['marca_agua']
+    indice_marca = lookups.index(campo_marca)
+
+    qs = definicion['modelo'].objects.all()
+    if desde is not None:
+        qs = qs.filter(**{f'{campo_marca}__gt': desde})
+    qs = qs.order_by('pk').values_list(*lookups)
+
+    clase_escritor = _EscritorParquet if pa is not None else _EscritorCSVGzip
+    sello = sello or timezone.now().strftime('%Y%m%d_%H%M%S')
+    modo = 'incremental' if desde is not None else 'completo'
+    ruta = directorio / f'{nombre}_{modo}_{sello}.{clase_escritor.extension}'
+
+    escritor = clase_escritor(ruta, columnas)
+    total = 0
+    marca_max = None
+    lote = []
+    try:
+        for fila in qs.iterator(chunk_size=tamano_lote):
+            lote.append(fila)
+            marca = fila[indice_marca]
+            if marca is not None and (marca_max is None or marca > marca_max):
+                marca_max = marca
+            if len(lote) >= tamano_lote:
+                escritor.escribir_lote(lote)
+                total += len(lote)
+                lote = []
+        if lote:
+            escritor.escribir_lote(lote)
+            total += len(lote)
+    finally:
+        escritor.cerrar()
+
+    # Un incremental vacío no aporta nada: se elimina el archivo
+    if total == 0 and desde is not None:
+        ruta.unlink(missing_ok=True)
+        ruta = None
+
+    return {
+        'dataset': nombre,
+        'archivo': ruta.name if ruta else None,
+        'filas': total,
+        'marca_agua': marca_max.isoformat() if marca_max else None,
+    }
+
+
+def exportar_snapshot(datasets=None, incremental=True, directorio=None, tamano_lote=TAMANO_LOTE):
+    """
+    Exporta varios datasets y actualiza las marcas de agua.
+
+    Con ``incremental=True`` cada dataset parte de su última marca guardada
+    menos el solape (``SNAPSHOT_SOLAPE_SEGUNDOS``); si no existe marca, se
+    hace una exportación completa. La marca nunca retrocede.
+    """
+    datasets = datasets or list(DATASETS.keys())
+    desconocidos = [d for d in datasets if d not in DATASETS]
+    if desconocidos:
+        raise ValueError(f"Datasets desconocidos: {', '.join(desconocidos)}")
+
+    directorio = Path(directorio or SNAPSHOT_DIR)
+    directorio.mkdir(parents=True, exist_ok=True)
+    marcas = leer_marcas_agua(directorio)
+    sello = timezone.now().strftime('%Y%m%d_%H%M%S')
+    solape = timedelta(seconds=getattr(settings, 'SNAPSHOT_SOLAPE_SEGUNDOS', SOLAPE_POR_DEFECTO))
+
+    resultados = []
+    for nombre in datasets:
+        marca = parse_datetime(marcas[nombre]) if marcas.get(nombre) else None
+        desde = marca - solape if incremental and marca else None
+        resultado = exportar_dataset(nombre, desde=desde, directorio=directorio, tamano_lote=tamano_lote, sello=sello)
+        # Lo releído dentro del solape no debe hacer retroceder la marca
+        if resultado['marca_agua'] and (marca is None or parse_datetime(resultado['marca_agua']) > marca):
+            marcas[nombre] = resultado['marca_agua']
+        resultados.append(resultado)
+
+    guardar_marcas_agua(marcas, directorio)
+    return {
+        'formato': formato_disponible(),
+        'directorio': str(directorio),
+        'generado': datetime.now().isoformat(),
+        'datasets': resultados,
+    }
+
+
+def listar_snapshots(directorio=None):
+    directorio = Path(directorio or SNAPSHOT_DIR)
+    if not directorio.exists():
+        return []
+    archivos = []
+    for ruta in sorted(directorio.iterdir(), key=lambda p: p.stat().st_mtime, reverse=True):
+        if ruta.name == ARCHIVO_MARCAS or not ruta.is_file():
+            continue
+        archivos.append({
+            'nombre': ruta.name,
+            'tamano_bytes': ruta.stat().st_size,
+            'modificado': datetime.fromtimestamp(ruta.stat().st_mtime).isoformat(),
+        })
+    return archivos
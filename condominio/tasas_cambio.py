@@ -0,0 +1,132 @@
+"""
+Montos normalizados a BOB y USD para los reportes.
+
+Cada ``Reserva`` guarda ``total_bob`` y ``total_usd`` (y cada ``Pago``
+``monto_bob`` y ``monto_usd``) calculados al escribir, con la tasa vigente
+en la fecha de la operación según la tabla ``TasaCambio``. Así los
+agregados de reportes son un ``SUM`` directo sobre una sola moneda, sin
+``CASE`` por fila ni conversiones en Python.
+
+- ``Reserva.save`` / ``Pago.save`` rellenan las columnas al guardar.
+- Las inserciones masivas (``bulk_create``) y los cambios de tasas se
+  corrigen con ``manage.py normalizar_montos``, que actualiza por lotes
+  de ids con un ``UPDATE`` en la base de datos.
+
+Sin tasas cargadas se usa ``TASA_POR_DEFECTO`` (1 USD = 6.96 BOB).
+"""
+import logging
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db.models import Case, DecimalField, Exists, F, Max, Min, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Round
+
+logger = logging.getLogger(__name__)
+
+TASA_POR_DEFECTO = Decimal('6.96')  # 1 USD = 6.96 BOB
+TAMANO_LOTE = 5000
+
+_CENTAVOS = Decimal('0.01')
+_DECIMAL = DecimalField(max_digits=12, decimal_places=2)
+_TASA = DecimalField(max_digits=10, decimal_places=4)
+
+
+def campo_monto(moneda, prefijo='', campo='total'):
+    """Nombre de la columna normalizada: ``campo_monto('USD', 'reservas__')`` → ``reservas__total_usd``."""
+    return f"{prefijo}{campo}_{'usd' if moneda == 'USD' else 'bob'}"
+
+
+# ============================================================================
+# 🐍 CONVERSIÓN EN PYTHON (al guardar)
+# ============================================================================
+
+def tasa_para(fecha):
+    """BOB por USD vigente en ``fecha``: la última tasa cargada en o antes de esa fecha."""
+    from .models import TasaCambio
+
+    if fecha is None:
+        return TASA_POR_DEFECTO
+    tasa = (
+        TasaCambio.objects.filter(fecha__lte=fecha)
+        .order_by('-fecha')
+        .values_list('bob_por_usd', flat=True)
+        .first()
+    )
+    return tasa or TASA_POR_DEFECTO
+
+
+def convertir_montos(monto, moneda, fecha=None, tasa=None):
+    """Retorna ``(monto_bob, monto_usd)``. Todo lo que no es USD se trata como BOB."""
+    if monto is None:
+        return None, None
+    monto = Decimal(str(monto))
+    tasa = tasa or tasa_para(fecha)
+    if moneda == 'USD':
+        return (monto * tasa).quantize(_CENTAVOS, ROUND_HALF_UP), monto.quantize(_CENTAVOS, ROUND_HALF_UP)
+    return monto.quantize(_CENTAVOS, ROUND_HALF_UP), (monto / tasa).quantize(_CENTAVOS, ROUND_HALF_UP)
+
+
+# ============================================================================
+# 🗄️ CONVERSIÓN EN LA BASE DE DATOS (backfill)
+# ============================================================================
+
+def _tasa_sql(campo_fecha):
+    from .models import TasaCambio
+
+    vigente = (
+        TasaCambio.objects.filter(fecha__lte=OuterRef(campo_fecha))
+        .order_by('-fecha')
+        .values('bob_por_usd')[:1]
+    )
+    return Coalesce(Subquery(vigente, output_field=_TASA), Value(TASA_POR_DEFECTO), output_field=_TASA)
+
+
+def _montos_sql(campo_monto_origen, es_usd, campo_fecha):
+    """Expresiones ``(bob, usd)`` para un ``UPDATE`` con la tasa de ``campo_fecha``."""
+    tasa = _tasa_sql(campo_fecha)
+    monto = F(campo_monto_origen)
+    bob = Case(When(es_usd, then=Round(monto * tasa, 2)), default=monto, output_field=_DECIMAL)
+    usd = Case(When(es_usd, then=monto), default=Round(monto / tasa, 2), output_field=_DECIMAL)
+    return bob, usd
+
+
+def _actualizar_por_lotes(queryset, valores, lote):
+    """``UPDATE`` por rangos de id para no bloquear la tabla completa en una sola sentencia."""
+    limites = queryset.aggregate(minimo=Min('pk'), maximo=Max('pk'))
+    if limites['minimo'] is None:
+        return 0
+    actualizadas = 0
+    for inicio in range(limites['minimo'], limites['maximo'] + 1, lote):
+        actualizadas += queryset.filter(pk__gte=inicio, pk__lt=inicio + lote).update(**valores)
+    return actualizadas
+
+
+def normalizar_montos(todo=False, desde=None, lote=TAMANO_LOTE):
+    """
+    Rellena las columnas normalizadas de reservas y pagos.
+
+    Por defecto solo las filas pendientes (columna en NULL, p. ej. creadas
+    con ``bulk_create``); ``todo=True`` recalcula todas (tras cargar o
+    corregir tasas) y ``desde`` limita a operaciones desde esa fecha.
+    Retorna ``{'reservas': n, 'pagos': n}``.
+    """
+    from .models import Pago, Reserva
+
+    reservas = Reserva.objects.exclude(total=None)
+    pagos = Pago.objects.exclude(monto=None)
+    if not todo:
+        reservas = reservas.filter(total_bob=None)
+        pagos = pagos.filter(monto_bob=None)
+    if desde:
+        reservas = reservas.filter(fecha__gte=desde)
+        pagos = pagos.filter(fecha_pago__gte=desde)
+
+    total_bob, total_usd = _montos_sql('total', Q(moneda='USD'), 'fecha')
+    reserva_usd = Exists(Reserva.objects.filter(pk=OuterRef('reserva_id'), moneda='USD'))
+    monto_bob, monto_usd = _montos_sql('monto', reserva_usd, 'fecha_pago')
+
+    resultado = {
+        'reservas': _actualizar_por_lotes(reservas, {'total_bob': total_bob, 'total_usd': total_usd}, lote),
+        'pagos': _actualizar_por_lotes(pagos, {'monto_bob': monto_bob, 'monto_usd': monto_usd}, lote),
+    }
+    logger.info(f"💱 Montos normalizados: {resultado}")
+    return resultado
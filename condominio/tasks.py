@@ -5,11 +5,42 @@ Este módulo contiene la lógica de negocio para ejecutar campañas de notificac
 separada de la API para facilitar su uso tanto en endpoints como en schedulers.
 """
 import logging
+import os
+import time
+from django.conf import settings
 from django.utils import timezone
 from django.db import transaction
 
 logger = logging.getLogger(__name__)
 
+# Usuarios por lote de entrega (un bulk_create y una consulta de tokens por lote)
+TAMANO_LOTE_CAMPANA = 1000
+
+
+def _push_habilitado():
+    """Mismo interruptor que la señal FCM de Notificacion (ver signals.py)."""
+    valor = os.getenv('HABILITAR_SEÑAL_FCM', '').strip().strip('"').strip("'").lower()
+    return valor in ('1', 'true', 'si', 'yes')
+
+
+def _ids_en_lotes(usuarios, tamano):
+    """Ids de ``usuarios`` en lotes ordenados (paginación por clave, sin OFFSET)."""
+    ids = usuarios.order_by('id').values_list('id', flat=True)
+    ultimo = 0
+    while True:
+        lote = list(ids.filter(id__gt=ultimo)[:tamano])
+        if not lote:
+            return
+        yield lote
+        ultimo = lote[-1]
+
+
+def _contenido_push(datos, tipo):
+    """Título, cuerpo y data del push, con el mismo formato que la señal FCM."""
+    titulo = datos.get('titulo') or 'Nueva notificación'
+    cuerpo = datos.get('mensaje') or datos.get('body') or f'Tienes una notificación de tipo: {tipo}'
+    return titulo, cuerpo, {k: str(v) for k, v in datos.items()}
+
 
 def ejecutar_campana_notificacion(campana_id, ejecutor_id=None):
     """
@@ -17,9 +48,11 @@ def ejecutar_campana_notificacion(campana_id, ejecutor_id=None):
     
     Esta función:
     1. Verifica que la campaña exista y pueda ejecutarse
-    2. Obtiene la lista de usuarios objetivo según la segmentación
-    3. Crea una notificación individual por cada usuario (dispara signals FCM automáticamente)
-    4. Actualiza métricas y estado de la campaña
+    2. Recorre los ids de los usuarios objetivo en lotes de ``CAMPANA_TAMANO_LOTE``
+    3. Por lote: crea las notificaciones con un ``bulk_create``, obtiene los tokens
+       FCM activos con una sola consulta y los envía en lotes multicast de hasta 500
+       (si la señal FCM está habilitada; ``bulk_create`` no dispara la señal)
+    4. Actualiza métricas y estado de la campaña (detalle del push en ``resultado``)
     
     Args:
         campana_id (int): ID de la campaña a ejecutar
@@ -32,7 +65,8 @@ def ejecutar_campana_notificacion(campana_id, ejecutor_id=None):
             - total_errores (int): Número de errores
             - mensaje (str): Mensaje descriptivo del resultado
     """
-    from .models import CampanaNotificacion, Notificacion, Usuario
+    from .models import CampanaNotificacion, FCMDevice, Notificacion
+    from core.notifications import enviar_multicast_push
     
     try:
         campana = CampanaNotificacion.objects.get(id=campana_id)
@@ -67,6 +101,7 @@ def ejecutar_campana_notificacion(campana_id, ejecutor_id=None):
         }
     
     logger.info(f'Iniciando ejecución de campaña {campana_id}: {campana.nombre}')
+    inicio = time.perf_counter()
     
     # Marcar como en curso
     campana.estado = 'EN_CURSO'
@@ -81,6 +116,10 @@ def ejecutar_campana_notificacion(campana_id, ejecutor_id=None):
     total_enviados = 0
     total_errores = 0
     errores_detalle = []
+    push = {
+        'habilitado': _push_habilitado(), 'tokens': 0, 'exitosos': 0, 'fallidos': 0, 'invalidos': 0,
+        'lotes_fcm': 0, 'reintentos': 0, 'p95_ms': 0.0,
+    }
     
     # Preparar datos de la notificación
     datos_notificacion = {
@@ -94,34 +133,46 @@ def ejecutar_campana_notificacion(campana_id, ejecutor_id=None):
     if campana.datos_extra:
         datos_notificacion.update(campana.datos_extra)
     
-    # Crear notificaciones individualmente
-    # Cada creación dispara automáticamente el signal que envía FCM
-    for usuario in usuarios:
+    # El push es el mismo para todos: va por multicast, sin notificacion_id por usuario
+    titulo, cuerpo, datos_push = _contenido_push(datos_notificacion, campana.tipo_notificacion)
+    tamano_lote = getattr(settings, 'CAMPANA_TAMANO_LOTE', TAMANO_LOTE_CAMPANA)
+    
+    for numero, ids in enumerate(_ids_en_lotes(usuarios, tamano_lote), start=1):
         try:
-            # Usar transaction.atomic para asegurar integridad
             with transaction.atomic():
-                Notificacion.objects.create(
-                    usuario=usuario,
-                    tipo=campana.tipo_notificacion,
-                    datos=datos_notificacion,
-                    leida=False
-                )
-            total_enviados += 1
-            
-            # Log cada 50 usuarios para monitoreo
-            if total_enviados % 50 == 0:
-                logger.info(f'Campaña {campana_id}: {total_enviados}/{total_usuarios} notificaciones enviadas')
-                
+                Notificacion.objects.bulk_create([
+                    Notificacion(usuario_id=usuario_id, tipo=campana.tipo_notificacion,
+                                 datos=datos_notificacion, leida=False)
+                    for usuario_id in ids
+                ])
+            total_enviados += len(ids)
         except Exception as e:
-            total_errores += 1
-            error_msg = f'Usuario {usuario.id} ({usuario.nombre}): {str(e)}'
-            errores_detalle.append(error_msg)
-            logger.exception(f'Error enviando notificación a usuario {usuario.id} en campaña {campana_id}: {e}')
+            total_errores += len(ids)
+            errores_detalle.append(f'Lote {numero} ({len(ids)} usuarios desde id {ids[0]}): {str(e)}')
+            logger.exception(f'Error creando notificaciones del lote {numero} en campaña {campana_id}: {e}')
             
-            # Si hay muchos errores consecutivos, considerar detener
+            # Si ningún lote se pudo crear, no tiene sentido seguir
             if total_errores > 100 and total_enviados == 0:
                 logger.error(f'Campaña {campana_id}: Demasiados errores, deteniendo ejecución')
                 break
+            continue
+        
+        if push['habilitado']:
+            tokens = list(
+                FCMDevice.objects.filter(usuario_id__in=ids, activo=True).values_list('registration_id', flat=True)
+            )
+            if tokens:
+                envio = enviar_multicast_push(tokens, titulo, cuerpo, datos_push)
+                push['tokens'] += len(tokens)
+                push['exitosos'] += envio['success']
+                push['fallidos'] += envio['failure']
+                push['invalidos'] += envio['invalidos']
+                push['lotes_fcm'] += envio['lotes']
+                if 'metricas' in envio:
+                    push['reintentos'] += envio['metricas']['reintentos']
+                    push['p95_ms'] = max(push['p95_ms'], envio['metricas']['p95_ms'])
+        
+        logger.info(f'Campaña {campana_id}: {total_enviados}/{total_usuarios} notificaciones creadas (lote {numero})')
     
     # Actualizar métricas y estado final
     campana.estado = 'COMPLETADA'
@@ -129,6 +180,11 @@ def ejecutar_campana_notificacion(campana_id, ejecutor_id=None):
     campana.total_enviados = total_enviados
     campana.total_errores = total_errores
     campana.total_destinatarios = total_usuarios  # Actualizar con el valor real
+    campana.resultado = {
+        'push': push,
+        'duracion_segundos': round(time.perf_counter() - inicio, 2),
+        'errores': errores_detalle[:10],
+    }
     
     if ejecutor_id:
         try:
@@ -142,7 +198,7 @@ def ejecutar_campana_notificacion(campana_id, ejecutor_id=None):
     logger.info(
         f'Campaña {campana_id} ({campana.nombre}) completada: '
         f'{total_enviados} enviados exitosamente, '
-        f'{total_errores} errores de {total_usuarios} usuarios objetivo'
+        f'{total_errores} errores de {total_usuarios} usuarios objetivo; push: {push}'
     )
     
     if errores_detalle and len(errores_detalle) <= 10:
@@ -153,6 +209,7 @@ def ejecutar_campana_notificacion(campana_id, ejecutor_id=None):
         'total_enviados': total_enviados,
         'total_errores': total_errores,
         'total_destinatarios': total_usuarios,
+        'push': push,
         'mensaje': f'Campaña ejecutada: {total_enviados} enviados, {total_errores} errores'
     }
 
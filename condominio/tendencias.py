@@ -0,0 +1,205 @@
+"""
+Series de tendencia para el dashboard con comparación contra el periodo
+anterior y contra el mismo periodo del año pasado (YoY).
+
+En PostgreSQL cada serie es una sola consulta: la agregación por periodo
+(``date_trunc``) se construye con el ORM —así hereda los filtros del
+queryset recibido— y se envuelve en SQL que rellena los huecos con
+``generate_series``, obtiene el periodo anterior con ``LAG`` y el valor
+del año pasado con un join sobre la misma serie. El rango se extiende un
+año hacia atrás para que el primer punto también tenga comparación.
+
+En otros motores (SQLite en desarrollo/tests) se ejecuta la misma
+agregación con el ORM y el relleno y las comparaciones se hacen en Python.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.db.models import Count, Sum
+from django.db.models.functions import Trunc
+
+from .dataset_reportes import _monto_en
+
+GRANULARIDADES = {
+    'day': 'day', 'dia': 'day', 'diaria': 'day',
+    'week': 'week', 'semana': 'week', 'semanal': 'week',
+    'month': 'month', 'mes': 'month', 'mensual': 'month',
+}
+METRICAS = ('ventas', 'reservas', 'clientes')
+MAX_PUNTOS = 800
+
+
+def normalizar_granularidad(valor):
+    granularidad = GRANULARIDADES.get((valor or 'month').lower())
+    if granularidad is None:
+        raise ValueError(f"Granularidad no soportada: {valor} (use day, week o month)")
+    return granularidad
+
+
+def _truncar(fecha, granularidad):
+    if granularidad == 'month':
+        return fecha.replace(day=1)
+    if granularidad == 'week':
+        return fecha - timedelta(days=fecha.weekday())
+    return fecha
+
+
+def _siguiente(fecha, granularidad):
+    if granularidad == 'month':
+        return date(fecha.year + fecha.month // 12, fecha.month % 12 + 1, 1)
+    return fecha + timedelta(days=7 if granularidad == 'week' else 1)
+
+
+def _hace_un_anio(fecha):
+    try:
+        return fecha.replace(year=fecha.year - 1)
+    except ValueError:  # 29 de febrero
+        return fecha.replace(year=fecha.year - 1, day=28)
+
+
+def contar_puntos(desde, hasta, granularidad):
+    inicio, fin = _truncar(desde, granularidad), _truncar(hasta, granularidad)
+    if granularidad == 'month':
+        return (fin.year - inicio.year) * 12 + fin.month - inicio.month + 1
+    return (fin - inicio).days // (7 if granularidad == 'week' else 1) + 1
+
+
+def _agregado(metrica, moneda):
+    if metrica == 'ventas':
+        return Sum(_monto_en(moneda, prefijo=''))
+    if metrica == 'clientes':
+        return Count('cliente', distinct=True)
+    return Count('id')
+
+
+def _crecimiento(actual, referencia):
+    if not referencia:
+        return None
+    return round((actual - referencia) / referencia * 100, 2)
+
+
+def _consulta_por_periodo(queryset, metrica, granularidad, desde, hasta, moneda):
+    return (
+        queryset
+        .filter(fecha__gte=desde, fecha__lte=hasta)
+        .order_by()
+        .annotate(periodo=Trunc('fecha', granularidad))
+        .values('periodo')
+        .annotate(valor=_agregado(metrica, moneda))
+    )
+
+
+def _serie_postgres(base, granularidad, desde, desde_extendido, hasta):
+    sql, params = base.query.sql_with_params()
+    consulta = f"""
+        WITH base AS ({sql}),
+        serie AS (
+            SELECT g::date AS periodo, COALESCE(b.valor, 0) AS valor
+            FROM generate_series(
+                date_trunc(%s, %s::timestamp), %s::timestamp, ('1 ' || %s)::interval
+            ) AS g
+            LEFT JOIN base b ON b.periodo = g::date
+        ),
+        comparada AS (
+            SELECT
+                s.periodo,
+                s.valor,
+                LAG(s.valor) OVER (ORDER BY s.periodo) AS anterior,
+                a.valor AS anio_anterior
+            FROM serie s
+            LEFT JOIN serie a
+                ON a.periodo = date_trunc(%s, s.periodo - interval '1 year')::date
+        )
+        SELECT
+            periodo,
+            valor,
+            anterior,
+            anio_anterior,
+            ROUND(((valor - anterior) * 100.0 / NULLIF(anterior, 0))::numeric, 2),
+            ROUND(((valor - anio_anterior) * 100.0 / NULLIF(anio_anterior, 0))::numeric, 2)
+        FROM comparada
+        WHERE periodo >= date_trunc(%s, %s::timestamp)::date
+        ORDER BY periodo
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(consulta, (
+            *params,
+            granularidad, desde_extendido, hasta, granularidad,
+            granularidad,
+            granularidad, desde,
+        ))
+        return cursor.fetchall()
+
+
+def _serie_python(base, granularidad, desde, desde_extendido, hasta):
+    valores = {}
+    for fila in base:
+        periodo = fila['periodo']
+        valores[periodo.date() if hasattr(periodo, 'date') else periodo] = fila['valor'] or 0
+
+    filas = []
+    periodo = _truncar(desde_extendido, granularidad)
+    inicio = _truncar(desde, granularidad)
+    anterior = None
+    while periodo <= hasta:
+        valor = valores.get(periodo, 0)
+        if periodo >= inicio:
+            anio_anterior = valores.get(_truncar(_hace_un_anio(periodo), granularidad), 0)
+            filas.append((
+                periodo, valor, anterior, anio_anterior,
+                _crecimiento(valor, anterior), _crecimiento(valor, anio_anterior),
+            ))
+        anterior = valor
+        periodo = _siguiente(periodo, granularidad)
+    return filas
+
+
+def serie_tendencia(queryset, metrica, granularidad, desde, hasta, moneda='BOB'):
+    """
+    Serie de ``metrica`` ('ventas', 'reservas' o 'clientes') sobre las
+    reservas de ``queryset`` entre ``desde`` y ``hasta`` (fechas).
+
+    Retorna {'puntos': [...], 'resumen': {...}}. Cada punto trae el valor
+    del periodo, el del periodo anterior, el del mismo periodo del año
+    pasado y los crecimientos porcentuales (None si la base es 0).
+    """
+    if metrica not in METRICAS:
+        raise ValueError(f"Métrica no soportada: {metrica}")
+    granularidad = normalizar_granularidad(granularidad)
+    desde_extendido = _hace_un_anio(_truncar(desde, granularidad))
+
+    base = _consulta_por_periodo(queryset, metrica, granularidad, desde_extendido, hasta, moneda)
+    if connection.vendor == 'postgresql':
+        filas = _serie_postgres(base, granularidad, desde, desde_extendido, hasta)
+    else:
+        filas = _serie_python(base, granularidad, desde, desde_extendido, hasta)
+
+    def _numero(valor):
+        if valor is None:
+            return None
+        return float(round(valor, 2)) if isinstance(valor, (Decimal, float)) else valor
+
+    puntos = [
+        {
+            'periodo': periodo.isoformat() if hasattr(periodo, 'isoformat') else str(periodo),
+            'valor': _numero(valor),
+            'periodo_anterior': _numero(anterior),
+            'anio_anterior': _numero(anio_anterior),
+            'crecimiento': _numero(crecimiento),
+            'crecimiento_anual': _numero(crecimiento_anual),
+        }
+        for periodo, valor, anterior, anio_anterior, crecimiento, crecimiento_anual in filas
+    ]
+    total = sum(p['valor'] or 0 for p in puntos)
+    total_anio_anterior = sum(p['anio_anterior'] or 0 for p in puntos)
+    return {
+        'metrica': metrica,
+        'granularidad': granularidad,
+        'puntos': puntos,
+        'resumen': {
+            'total': _numero(total),
+            'total_anio_anterior': _numero(total_anio_anterior),
+            'crecimiento_anual': _crecimiento(total, total_anio_anterior),
+        },
+    }
@@ -0,0 +1,60 @@
+import os
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import Sum
+from django.test import TestCase, override_settings
+
+from .benchmark_escala import comparar_resultados, exigir_base_descartable, limpiar_dataset, sembrar_dataset, volumen
+from .models import Reserva
+
+
+class BenchmarkEscalaTests(TestCase):
+    def test_dataset_determinista(self):
+        conteo = sembrar_dataset(1, semilla=7)
+        self.assertEqual(conteo['reservas'], volumen(1)['reservas'])
+        total = Reserva.objects.aggregate(s=Sum('total'))['s']
+
+        limpiar_dataset()
+        self.assertFalse(Reserva.objects.exists())
+        sembrar_dataset(1, semilla=7)
+        self.assertEqual(Reserva.objects.aggregate(s=Sum('total'))['s'], total)
+
+    def test_comparacion_marca_regresiones(self):
+        def corrida(ms, consultas):
+            fila = {'endpoint': 'graficas', 'formato': None, 'latencia_ms': ms, 'consultas': consultas}
+            return {'escalas': {'10x': {'resultados': [fila]}}}
+
+        self.assertFalse(comparar_resultados(corrida(100, 5), corrida(110, 5))[0]['regresion'])
+        self.assertTrue(comparar_resultados(corrida(100, 5), corrida(150, 5))[0]['regresion'])
+        self.assertTrue(comparar_resultados(corrida(100, 5), corrida(90, 6))[0]['regresion'])
+
+    def test_casos_de_indices_existen(self):
+        from .management.commands.benchmark_indices import CASOS
+
+        for nombre, modelo, _, _ in CASOS:
+            self.assertIn(nombre, [i.name for i in modelo._meta.indexes])
+
+    def test_solo_corre_con_debug_sobre_base_descartable(self):
+        sin_confirmar = mock.patch.dict(os.environ, {'BENCHMARK_BASE_DESCARTABLE': ''})
+        confirmada_por_entorno = mock.patch.dict(os.environ, {'BENCHMARK_BASE_DESCARTABLE': '1'})
+        with override_settings(DEBUG=True), sin_confirmar:
+            with mock.patch.object(connection, 'vendor', 'sqlite'):
+                exigir_base_descartable()
+            with mock.patch.object(connection, 'vendor', 'postgresql'):
+                with self.assertRaises(CommandError):
+                    exigir_base_descartable()
+                exigir_base_descartable(confirmada=True)
+                with confirmada_por_entorno:
+                    exigir_base_descartable()
+        # El runner de tests corre con DEBUG=False: ni confirmando la base se permite
+        with confirmada_por_entorno, mock.patch.object(connection, 'vendor', 'sqlite'):
+            with self.assertRaises(CommandError):
+                exigir_base_descartable(confirmada=True)
+            with self.assertRaises(CommandError):
+                call_command('benchmark_indices', '--escala', '1x')
+            with self.assertRaises(CommandError):
+                call_command('benchmark_escala', '--escalas', '1x', '--conservar', '--base-descartable')
+            with self.assertRaises(CommandError):
+                call_command('benchmark_escala', '--limpiar')
@@ -0,0 +1,74 @@
+import threading
+import time
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from .cache_reportes import EntradaCache, _tomar_candado, clave_cache, obtener_o_calcular
+
+CACHE_MEMORIA = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'coalescencia'}}
+
+
+@override_settings(CACHES=CACHE_MEMORIA)
+class CoalescenciaTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_pedidos_concurrentes_calculan_una_vez(self):
+        liberar = threading.Event()
+        llamadas = []
+
+        def calcular():
+            llamadas.append(1)
+            liberar.wait(5)
+            return {'total': 42}
+
+        resultados = []
+
+        def pedir():
+            resultados.append(obtener_o_calcular('graficas', {'mes': 3}, calcular))
+
+        hilos = [threading.Thread(target=pedir) for _ in range(5)]
+        for hilo in hilos:
+            hilo.start()
+        time.sleep(0.2)
+        liberar.set()
+        for hilo in hilos:
+            hilo.join(10)
+
+        self.assertEqual(len(llamadas), 1)
+        self.assertEqual([r for r, _ in resultados], [{'total': 42}] * 5)
+        self.assertEqual(sorted(desde_cache for _, desde_cache in resultados), [False] + [True] * 4)
+
+    def test_entrada_vencida_se_sirve_mientras_otro_recalcula(self):
+        clave = clave_cache('cubo', {})
+        cache.set(clave, EntradaCache('anterior', time.time() - 100, time.time() - 1), 600)
+
+        # Otro pedido tiene el candado: se responde con la entrada vencida sin calcular
+        token = _tomar_candado(clave)
+        self.assertIsNotNone(token)
+        self.assertEqual(obtener_o_calcular('cubo', {}, lambda: self.fail('no debía calcular')), ('anterior', True))
+
+        # Sin candado, el pedido revalida la entrada
+        cache.delete(f'{clave}:candado')
+        self.assertEqual(obtener_o_calcular('cubo', {}, lambda: 'nuevo'), ('nuevo', False))
+        self.assertEqual(obtener_o_calcular('cubo', {}, lambda: 'otro'), ('nuevo', True))
+
+    def test_error_suelta_el_candado(self):
+        def fallar():
+            raise RuntimeError('base caída')
+
+        with self.assertRaises(RuntimeError):
+            obtener_o_calcular('ventas', {}, fallar)
+        self.assertIsNone(cache.get(f"{clave_cache('ventas', {})}:candado"))
+        self.assertEqual(obtener_o_calcular('ventas', {}, lambda: 1), (1, False))
+
+    @override_settings(COALESCENCIA_CANDADO_TTL=1)
+    def test_espera_hasta_que_vence_el_candado(self):
+        # Un pedido tomó el candado y murió sin soltarlo: nadie calcula hasta que vence
+        clave = clave_cache('clientes', {})
+        self.assertIsNotNone(_tomar_candado(clave))
+        inicio = time.time()
+        with self.assertLogs('condominio.cache_reportes', 'WARNING'):
+            self.assertEqual(obtener_o_calcular('clientes', {}, lambda: 7), (7, False))
+        self.assertGreaterEqual(time.time() - inicio, 0.9)
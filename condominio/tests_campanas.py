@@ -0,0 +1,55 @@
+import os
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from core.notifications import enviar_multicast_push
+
+from .models import CampanaNotificacion, FCMDevice, Notificacion, Usuario
+from .tasks import ejecutar_campana_notificacion
+
+
+@override_settings(CAMPANA_TAMANO_LOTE=3)
+class EntregaCampanaTests(TestCase):
+    def setUp(self):
+        self.usuarios = [
+            Usuario.objects.create(user=User.objects.create_user(username=f'u{i}', password='x'), nombre=f'U{i}')
+            for i in range(7)
+        ]
+        for usuario in self.usuarios[:5]:
+            FCMDevice.objects.create(usuario=usuario, registration_id=f'token-{usuario.id}')
+        FCMDevice.objects.filter(usuario=self.usuarios[0]).update(activo=False)
+        self.campana = CampanaNotificacion.objects.create(
+            nombre='Invierno', titulo='Oferta', cuerpo='Tours a Uyuni', tipo_audiencia='USUARIOS',
+        )
+        self.campana.usuarios_objetivo.set(self.usuarios[:6])
+
+    @mock.patch.dict(os.environ, {'SIMULAR_FCM': '1', 'HABILITAR_SEÑAL_FCM': '1'})
+    def test_entrega_por_lotes(self):
+        with CaptureQueriesContext(connection) as consultas:
+            resultado = ejecutar_campana_notificacion(self.campana.id)
+
+        self.assertEqual((resultado['total_enviados'], resultado['total_errores']), (6, 0))
+        self.assertEqual(Notificacion.objects.filter(datos__campana_id=str(self.campana.id)).count(), 6)
+        # 4 tokens activos entre los 6 destinatarios, un multicast por lote de usuarios
+        self.assertEqual((resultado['push']['exitosos'], resultado['push']['lotes_fcm']), (4, 2))
+        # Consultas por lote (ids + bulk_create + tokens), no por usuario
+        self.assertLess(len(consultas), 20)
+
+        self.campana.refresh_from_db()
+        self.assertEqual(self.campana.estado, 'COMPLETADA')
+        self.assertEqual(self.campana.resultado['push']['tokens'], 4)
+
+    @mock.patch.dict(os.environ, {'SIMULAR_FCM': '1', 'HABILITAR_SEÑAL_FCM': ''})
+    def test_sin_senal_fcm_no_hay_push(self):
+        resultado = ejecutar_campana_notificacion(self.campana.id)
+        self.assertEqual(resultado['total_enviados'], 6)
+        self.assertEqual(resultado['push']['lotes_fcm'], 0)
+
+    @mock.patch.dict(os.environ, {'SIMULAR_FCM': '1'})
+    def test_multicast_en_lotes_de_500(self):
+        resultado = enviar_multicast_push([f't{i}' for i in range(1201)] + [''], 'T', 'C')
+        self.assertEqual((resultado['success'], resultado['lotes']), (1201, 3))
@@ -0,0 +1,39 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from .models import Usuario, Reserva
+from .cohortes import calcular_retencion
+
+
+class CohortesRetencionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        for nombre, fechas in {
+            'ana': [date(2025, 1, 5), date(2025, 2, 10), date(2025, 2, 20)],
+            'beto': [date(2025, 1, 20)],
+            'caro': [date(2025, 2, 1), date(2025, 4, 1)],
+        }.items():
+            cliente = Usuario.objects.create(user=User.objects.create_user(username=nombre, password='x'), nombre=nombre)
+            for fecha in fechas:
+                Reserva.objects.create(fecha=fecha, estado='PAGADA', total=Decimal('10.00'), cliente=cliente)
+
+    def test_matriz_de_retencion(self):
+        resultado = calcular_retencion(hasta='2025-02', meses=3)
+        enero, febrero = resultado['cohortes']
+        self.assertEqual((enero['cohorte'], enero['tamano']), ('2025-01', 2))
+        self.assertEqual([p['clientes'] for p in enero['retencion']], [2, 1, 0, 0])
+        self.assertEqual(enero['retencion'][1]['porcentaje'], 50.0)
+        self.assertEqual([p['clientes'] for p in febrero['retencion']], [1, 0, 1, 0])
+
+    def test_endpoint_cachea_por_dia(self):
+        client = APIClient()
+        primero = client.get('/api/reportes/cohortes/', {'meses': 2})
+        self.assertEqual(primero.status_code, 200)
+        self.assertFalse(primero.data['desde_cache'])
+        self.assertTrue(client.get('/api/reportes/cohortes/', {'meses': 2}).data['desde_cache'])
+        self.assertEqual(client.get('/api/reportes/cohortes/', {'desde': 'enero'}).status_code, 400)
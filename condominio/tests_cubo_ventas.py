@@ -0,0 +1,55 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from .cubo_ventas import CuboDemasiadoGrande, calcular_cubo, conjuntos_agrupacion
+from .models import Paquete, Reserva, Servicio, Usuario
+
+
+class CuboVentasTests(TestCase):
+    def setUp(self):
+        cliente = Usuario.objects.create(user=User.objects.create_user(username='c', password='x'), nombre='C')
+        servicio = Servicio.objects.create(titulo='Tour', descripcion='-', duracion='1 día', capacidad_max=5,
+                                           punto_encuentro='-', departamento='Potosí')
+        paquete = Paquete.objects.create(nombre='Andino', descripcion='-', duracion='3 días',
+                                         precio_base=Decimal('300'), fecha_inicio=date(2025, 1, 1),
+                                         fecha_fin=date(2025, 12, 31), punto_salida='La Paz', departamento='La Paz')
+        for fecha, total, moneda, producto in [
+            (date(2025, 1, 5), '100.00', 'BOB', {'servicio': servicio}),
+            (date(2025, 1, 9), '10.00', 'USD', {'servicio': servicio}),
+            (date(2025, 2, 3), '200.00', 'BOB', {'paquete': paquete}),
+        ]:
+            Reserva.objects.create(fecha=fecha, estado='PAGADA', total=Decimal(total), moneda=moneda,
+                                   cliente=cliente, **producto)
+        Reserva.objects.create(fecha=date(2025, 2, 4), estado='CANCELADA', total=Decimal('999'),
+                               cliente=cliente, paquete=paquete)
+
+    def test_rollup_con_subtotales_en_una_consulta(self):
+        with self.assertNumQueries(1):
+            cubo = calcular_cubo(['departamento', 'mes'], ['reservas', 'ventas_bob'], 'rollup')
+        filas = {(f['departamento'], f['mes']): f for f in cubo['filas']}
+        self.assertEqual(filas[('Potosí', '2025-01')]['reservas'], 2)
+        self.assertAlmostEqual(filas[('Potosí', '2025-01')]['ventas_bob'], 169.6)
+        self.assertEqual(filas[('Potosí', None)]['agrupado_por'], ['departamento'])
+        total = filas[(None, None)]
+        self.assertTrue(total['subtotal'])
+        self.assertEqual(total['reservas'], 3)  # la cancelada queda fuera por defecto
+        self.assertAlmostEqual(total['ventas_bob'], 369.6)
+
+    def test_cubo_y_limite_de_cardinalidad(self):
+        self.assertEqual(len(conjuntos_agrupacion(['a', 'b'], 'cubo')), 4)
+        cubo = calcular_cubo(['tipo_producto', 'moneda'], ['reservas'], 'cubo')
+        self.assertIn({'tipo_producto': None, 'moneda': 'USD', 'reservas': 1,
+                       'agrupado_por': ['moneda'], 'subtotal': True}, cubo['filas'])
+        with override_settings(CUBO_MAX_FILAS=2), self.assertRaises(CuboDemasiadoGrande):
+            calcular_cubo(['tipo_producto', 'moneda'], ['reservas'], 'cubo')
+
+    def test_endpoint_valida_lista_blanca(self):
+        client = APIClient()
+        resp = client.get('/api/reportes/cubo/', {'dimensiones': 'departamento,estado', 'estados': 'PAGADA,CANCELADA'})
+        self.assertEqual(resp.status_code, 200, resp.data)
+        self.assertEqual(resp.data['filas'][-1]['reservas'], 4)
+        self.assertEqual(client.get('/api/reportes/cubo/', {'dimensiones': 'cliente__user__password'}).status_code, 400)
@@ -0,0 +1,100 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .cuotas import RECURSO_CLIENTES, CuotaExcedida, consumir, periodo_facturacion, sincronizar_uso, uso_plan
+from .models import Categoria, Plan, Proveedor, Reserva, Servicio, Suscripcion, UsoPlanProveedor, Usuario
+
+
+class CuotasPlanTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username='prov', password='x')
+        self.proveedor = Usuario.objects.create(user=user, nombre='Proveedor')
+        self.cliente = Usuario.objects.create(user=User.objects.create_user(username='c', password='x'), nombre='C')
+        self.plan = Plan.objects.create(nombre='Básico', precio=Decimal('5'), max_servicios=1,
+                                        max_clientes_potenciales=2)
+        hoy = timezone.localdate()
+        Suscripcion.objects.create(proveedor=Proveedor.objects.create(usuario=self.proveedor, nombre_empresa='P'),
+                                   plan=self.plan, fecha_inicio=hoy, fecha_fin=hoy + timedelta(days=30))
+
+    def _servicio(self, titulo='Tour'):
+        return Servicio.objects.create(titulo=titulo, descripcion='-', duracion='1 día', capacidad_max=5,
+                                       punto_encuentro='-', proveedor=self.proveedor)
+
+    def test_limite_de_servicios_se_libera_al_borrar(self):
+        servicio = self._servicio()
+        with self.assertRaises(CuotaExcedida):
+            self._servicio('Otro')
+        self.assertEqual(Servicio.objects.count(), 1)
+
+        servicio.delete()
+        self._servicio('Otro')
+        self.assertEqual(uso_plan(self.proveedor.id)['servicios'], {'usado': 1, 'limite': 1})
+
+        resp = APIClient().post('/api/servicios/', {
+            'titulo': 'Extra', 'descripcion': '-', 'duracion': '1 día', 'capacidad_max': 5,
+            'punto_encuentro': '-', 'proveedor_id': self.proveedor.id,
+            'categoria_id': Categoria.objects.create(nombre='Tours').id,
+        }, format='json')
+        self.assertEqual(resp.status_code, 403)
+        self.assertEqual(resp.data['recurso'], 'servicios')
+
+    def test_clientes_potenciales_por_periodo_sin_count(self):
+        servicio = self._servicio()
+        with self.captureOnCommitCallbacks(execute=True):
+            Reserva.objects.create(fecha=date(2025, 5, 1), total=Decimal('10'), cliente=self.cliente, servicio=servicio)
+        # Con el plan en caché, verificar e incrementar es un solo UPDATE (más la lectura de caché)
+        with self.assertNumQueries(2):
+            consumir(self.proveedor.id, RECURSO_CLIENTES)
+        with self.assertRaises(CuotaExcedida):
+            consumir(self.proveedor.id, RECURSO_CLIENTES)
+
+        # Al empezar otro periodo el contador se reinicia en el mismo UPDATE
+        UsoPlanProveedor.objects.update(periodo_inicio=date(2000, 1, 1))
+        otro = Usuario.objects.create(user=User.objects.create_user(username='c2', password='x'), nombre='C2')
+        with self.captureOnCommitCallbacks(execute=True):
+            Reserva.objects.create(fecha=date(2025, 5, 2), total=Decimal('10'), cliente=otro, servicio=servicio)
+        self.assertEqual(UsoPlanProveedor.objects.get().clientes_potenciales, 1)
+
+    def test_reservas_pasado_el_limite_marcan_al_proveedor(self):
+        servicio = self._servicio()
+        clientes = [self.cliente] + [
+            Usuario.objects.create(user=User.objects.create_user(username=f'c{i}', password='x'), nombre=f'C{i}')
+            for i in range(2)
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            for cliente in clientes + [self.cliente]:
+                Reserva.objects.create(fecha=date(2025, 5, 1), total=Decimal('10'), cliente=cliente, servicio=servicio)
+
+        # Ninguna reserva se rechaza; el cliente repetido cuenta una sola vez
+        self.assertEqual(Reserva.objects.count(), 4)
+        uso = uso_plan(self.proveedor.id)['clientes_potenciales']
+        self.assertEqual((uso['usado'], uso['excedidos']), (2, 1))
+
+        # La reconciliación llega a los mismos números con COUNT DISTINCT
+        UsoPlanProveedor.objects.update(clientes_potenciales=0, clientes_excedidos=0)
+        sincronizar_uso([self.proveedor.id])
+        uso = uso_plan(self.proveedor.id)['clientes_potenciales']
+        self.assertEqual((uso['usado'], uso['excedidos']), (3, 1))
+
+    def test_reserva_revertida_no_consume_cuota(self):
+        servicio = self._servicio()
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    Reserva.objects.create(fecha=date(2025, 5, 1), total=Decimal('10'), cliente=self.cliente,
+                                           servicio=servicio)
+                    raise RuntimeError('falla posterior')
+            except RuntimeError:
+                pass
+        self.assertEqual(uso_plan(self.proveedor.id)['clientes_potenciales']['usado'], 0)
+
+    def test_periodo_mensual_desde_fecha_inicio(self):
+        self.assertEqual(periodo_facturacion(date(2025, 1, 31), date(2025, 3, 15)), date(2025, 2, 28))
+        self.assertEqual(periodo_facturacion(date(2025, 1, 10), date(2025, 3, 10)), date(2025, 3, 10))
+        self.assertEqual(periodo_facturacion(date(2025, 1, 10), date(2025, 1, 12)), date(2025, 1, 10))
@@ -0,0 +1,120 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from .models import Usuario, Reserva, Servicio, Paquete, Categoria
+from .dataset_reportes import dataset_ventas, dataset_clientes, dataset_productos
+from .segmentacion import recalcular_segmentos
+
+
+class DatasetReportesTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username='cliente', email='cli@example.com', password='x')
+        self.cliente = Usuario.objects.create(user=user, nombre='Cliente Uno')
+        categoria = Categoria.objects.create(nombre='Aventura')
+        self.servicio = Servicio.objects.create(
+            titulo='Tour Salar', descripcion='-', duracion='1 día', capacidad_max=10,
+            punto_encuentro='Plaza', categoria=categoria, precio_usd=Decimal('100.00'),
+            departamento='Potosí',
+        )
+        self.paquete = Paquete.objects.create(
+            nombre='Paquete Andino', descripcion='-', duracion='3 días', precio_base=Decimal('300.00'),
+            fecha_inicio=date(2025, 1, 1), fecha_fin=date(2025, 12, 31), punto_salida='La Paz',
+            departamento='La Paz',
+        )
+        Reserva.objects.create(fecha=date(2025, 3, 1), estado='PAGADA', total=Decimal('696.00'),
+                               moneda='BOB', cliente=self.cliente, servicio=self.servicio)
+        Reserva.objects.create(fecha=date(2025, 3, 5), estado='CONFIRMADA', total=Decimal('300.00'),
+                               moneda='USD', cliente=self.cliente, paquete=self.paquete)
+        Reserva.objects.create(fecha=date(2025, 3, 6), estado='CANCELADA', total=Decimal('50.00'),
+                               moneda='USD', cliente=self.cliente, paquete=self.paquete)
+
+    def test_resumenes_calculados_en_bd(self):
+        ventas = dataset_ventas({'moneda': 'BOB'})
+        self.assertEqual(ventas.resumen['cantidad_reservas'], 2)
+        self.assertAlmostEqual(ventas.resumen['total_ventas'], 696.0 + 300 * 6.96)  # USD normalizado a BOB
+        self.assertEqual(sorted(ventas.seccion('ventas').columnas['tipo']), ['Paquete', 'Servicio'])
+        # Rango de montos sobre el total en la moneda del reporte (300 USD = 2088 BOB)
+        ventas = dataset_ventas({'moneda': 'BOB', 'monto_minimo': 1000, 'monto_maximo': '5000'})
+        self.assertEqual(ventas.seccion('ventas').columnas['tipo'], ['Paquete'])
+
+        clientes = dataset_clientes({'moneda': 'USD'})
+        self.assertEqual(clientes.resumen['total_clientes'], 1)
+        self.assertAlmostEqual(clientes.resumen['ingresos_totales'], 400.0)
+        self.assertEqual(clientes.seccion('clientes').columnas['tipo'], ['Sin segmento'])
+
+        # El tipo sale del segmento RFM aunque el rango solo incluya una de sus reservas
+        recalcular_segmentos()
+        clientes = dataset_clientes({'moneda': 'USD', 'fecha_fin': date(2025, 3, 1)})
+        self.assertEqual(clientes.seccion('clientes').columnas['num_reservas'], [1])
+        self.assertEqual(clientes.seccion('clientes').columnas['tipo'], ['Recurrente'])
+
+        productos = dataset_productos({'moneda': 'USD'})
+        self.assertEqual(len(productos.seccion('paquetes')), 1)
+        self.assertEqual(len(productos.seccion('servicios')), 1)
+        self.assertEqual(productos.resumen['producto_mas_vendido'], 'Paquete Andino')
+        self.assertAlmostEqual(productos.seccion('paquetes').columnas['tasa_conversion'][0], 50.0)
+        self.assertEqual(productos.seccion('paquetes').columnas['categoria'][0], 'Paquete Turístico')
+
+    def test_endpoints_en_todos_los_formatos(self):
+        client = APIClient()
+        for reporte in ('ventas', 'clientes', 'productos'):
+            for formato in ('pdf', 'excel', 'docx'):
+                resp = client.get(f'/api/reportes/{reporte}/', {'formato': formato})
+                self.assertEqual(resp.status_code, 200, f'{reporte}/{formato}: {getattr(resp, "data", "")}')
+
+    def test_bundle_zip_con_tres_formatos(self):
+        import io
+        import zipfile
+        from unittest import mock
+        from django.db import connections
+        from . import export_utils
+
+        # Crear el pool no debe cerrar la conexión (ni la transacción) de la request
+        if export_utils._pool_bundle is not None:
+            export_utils._pool_bundle.shutdown()
+            export_utils._pool_bundle = None
+        with mock.patch.object(connections, 'close_all', wraps=connections.close_all) as cerrar:
+            resp = APIClient().get('/api/reportes/ventas/', {'formato': 'zip'})
+        self.assertEqual(resp.status_code, 200)
+        cerrar.assert_not_called()
+        nombres = zipfile.ZipFile(io.BytesIO(resp.content)).namelist()
+        self.assertEqual(sorted(n.rsplit('.', 1)[1] for n in nombres), ['docx', 'pdf', 'xlsx'])
+
+    def test_tabla_docx_en_bloque(self):
+        from docx import Document
+        from .export_utils import ExportadorReportesWord
+
+        ventas = [{'cliente': f'Cliente <{i}> & Cía', 'producto': 'Tour', 'fecha': '01/01/2025',
+                   'monto': 10.5, 'estado': 'PAGADA'} for i in range(1201)]
+        archivo = ExportadorReportesWord().generar_reporte_ventas(
+            {'resumen': {'simbolo_moneda': 'Bs.'}, 'ventas': ventas, 'filtros': {}}
+        )
+        tabla = Document(archivo).tables[-1]
+        self.assertEqual(len(tabla.rows), 1202)
+        fila = tabla.rows[1201].cells
+        self.assertEqual([c.text for c in fila], ['Cliente <1200> & Cía', 'Tour', '01/01/2025', 'Bs.10.50', 'PAGADA'])
+        self.assertEqual(fila[0].paragraphs[0].style.name, 'Celda Reporte 9')
+
+    def test_tabla_pdf_en_bloques(self):
+        from unittest import mock
+        from .export_utils import TAMANO_BLOQUE_PDF, ExportadorReportesPDF, LongTable
+
+        total = 2 * TAMANO_BLOQUE_PDF + 101
+        clientes = [{'cliente__nombre': f'Cliente {i}', 'cliente__user__email': f'c{i}@test.com',
+                     'total_gastado': Decimal('10.50'), 'cantidad_reservas': 1,
+                     'ticket_promedio': Decimal('10.50'), 'ultima_compra': date(2025, 1, 1)} for i in range(total)]
+        with mock.patch('condominio.export_utils.LongTable', wraps=LongTable) as espia:
+            archivo = ExportadorReportesPDF().generar_reporte_clientes(
+                {'resumen': {}, 'cantidad_clientes': total, 'clientes': clientes}
+            )
+
+        # Un bloque por cada TAMANO_BLOQUE_PDF filas, cada uno con el encabezado repetido
+        filas = [len(llamada.args[0]) - 1 for llamada in espia.call_args_list]
+        self.assertEqual(filas, [TAMANO_BLOQUE_PDF, TAMANO_BLOQUE_PDF, 101])
+        contenido = archivo.getvalue()
+        self.assertTrue(contenido.startswith(b'%PDF'))
+        self.assertIn(b'%%EOF', contenido[-1024:])
@@ -0,0 +1,68 @@
+import json
+from types import SimpleNamespace
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from . import ia_processor
+
+from .ia_processor import ReportesIAProcessor, clave_interpretacion, estadisticas_cache_ia, normalizar_prompt
+
+
+class _ClienteFalso:
+    """Cliente con la misma forma que OpenAI que cuenta las llamadas."""
+
+    def __init__(self):
+        self.llamadas = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        self.llamadas += 1
+        contenido = json.dumps({'accion': 'generar_reporte', 'tipo_reporte': 'ventas', 'formato': 'pdf',
+                                'filtros': {'departamento': 'La Paz'}, 'confianza': 0.9})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=contenido))])
+
+
+class CacheInterpretacionesTests(TestCase):
+    def setUp(self):
+        ia_processor._volcar_eventos_cache()  # vacía lo pendiente y reinicia el intervalo de volcado
+        cache.clear()
+
+    def test_normalizacion(self):
+        self.assertEqual(normalizar_prompt('  Ventas de La PAZ, desde el 1/2/2025 hasta 28-02-25!  '),
+                         'ventas de la paz desde el 2025-02-01 hasta 2025-02-28')
+        self.assertEqual(normalizar_prompt('Clientes del 5 de marzo de 2025'), 'clientes del 2025-03-05')
+        self.assertEqual(clave_interpretacion('Clientes de Potosí'), clave_interpretacion('clientes de potosi.'))
+
+    def test_comando_repetido_no_llama_a_la_ia(self):
+        processor = ReportesIAProcessor()
+        processor.client = _ClienteFalso()
+
+        primero = processor.procesar_comando('Ventas de La Paz en PDF')
+        segundo = processor.procesar_comando('ventas de la paz en pdf')
+        self.assertFalse(primero['desde_cache'])
+        self.assertTrue(segundo['desde_cache'])
+        self.assertEqual(segundo['filtros'], {'departamento': 'La Paz'})
+        self.assertEqual(processor.client.llamadas, 1)
+        self.assertEqual(estadisticas_cache_ia()['tasa_aciertos'], 50.0)
+
+    def test_estadisticas_se_vuelcan_en_bloque(self):
+        processor = ReportesIAProcessor()
+        processor.client = _ClienteFalso()
+        clave_aciertos = f'{ia_processor.PREFIJO_CACHE_IA}:stats:aciertos'
+
+        for _ in range(3):
+            processor.procesar_comando('clientes de potosi en excel')
+        # Aún en memoria del proceso: ninguna escritura por comando
+        self.assertIsNone(cache.get(clave_aciertos))
+        self.assertEqual(ia_processor._eventos_pendientes, {'fallos': 1, 'aciertos': 2})
+
+        stats = estadisticas_cache_ia()
+        self.assertEqual((stats['aciertos'], stats['fallos']), (2, 1))
+        self.assertEqual(cache.get(clave_aciertos), 2)
+        self.assertFalse(ia_processor._eventos_pendientes)
+
+        # Al llegar a VOLCADO_STATS_EVENTOS pendientes se vuelca sin esperar
+        ia_processor._eventos_pendientes['aciertos'] = ia_processor.VOLCADO_STATS_EVENTOS - 1
+        processor.procesar_comando('clientes de potosi en excel')
+        self.assertEqual(cache.get(clave_aciertos), 2 + ia_processor.VOLCADO_STATS_EVENTOS)
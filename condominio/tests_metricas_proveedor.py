@@ -0,0 +1,65 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .metricas_proveedor import recalcular_metricas
+from .models import MetricaProveedor, Plan, Proveedor, Reserva, Servicio, Suscripcion, Usuario
+
+
+class MetricasProveedorTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='proveedor', password='x')
+        self.proveedor = Usuario.objects.create(user=self.user, nombre='Turismo Andino')
+        cliente = Usuario.objects.create(user=User.objects.create_user(username='cli', password='x'), nombre='Cli')
+        self.servicio = Servicio.objects.create(
+            titulo='Tour Uyuni', descripcion='-', duracion='1 día', capacidad_max=2,
+            punto_encuentro='Plaza', proveedor=self.proveedor, precio_usd=Decimal('50.00'),
+        )
+        self.mes = timezone.localdate().replace(day=1)
+        for estado in ('PAGADA', 'CONFIRMADA', 'CANCELADA'):
+            Reserva.objects.create(fecha=self.mes, estado=estado, total=Decimal('100.00'), moneda='USD',
+                                   cliente=cliente, servicio=self.servicio)
+
+        self.plan = Plan.objects.create(nombre='Pro', precio=Decimal('10'), panel_metricas_avanzado=True)
+        Suscripcion.objects.create(
+            proveedor=Proveedor.objects.create(usuario=self.proveedor, nombre_empresa='Turismo Andino'),
+            plan=self.plan, fecha_inicio=self.mes, fecha_fin=self.mes + timedelta(days=60),
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_recalculo_y_panel_avanzado(self):
+        self.assertEqual(recalcular_metricas()['filas'], 1)
+        fila = MetricaProveedor.objects.get()
+        self.assertEqual((fila.reservas, fila.reservas_vendidas, fila.reservas_canceladas), (3, 2, 1))
+        self.assertEqual(fila.ingresos_usd, Decimal('200.00'))
+
+        resp = self.client.get('/api/reportes/proveedor/metricas/')
+        self.assertEqual(resp.status_code, 200, resp.data)
+        self.assertEqual(resp.data['nivel'], 'avanzado')
+        self.assertAlmostEqual(resp.data['resumen']['tasa_cancelacion'], 33.33)
+        producto = resp.data['productos'][0]
+        self.assertEqual(producto['nombre'], 'Tour Uyuni')
+        self.assertEqual(producto['ocupacion'], round(2 / fila.capacidad * 100, 2))
+
+        # El recálculo de meses recientes no duplica filas
+        recalcular_metricas()
+        self.assertEqual(MetricaProveedor.objects.count(), 1)
+
+    def test_panel_segun_plan(self):
+        recalcular_metricas()
+        Plan.objects.filter(pk=self.plan.pk).update(panel_metricas_avanzado=False)
+        resp = self.client.get('/api/reportes/proveedor/metricas/')
+        self.assertEqual(resp.data['nivel'], 'basico')
+        self.assertNotIn('productos', resp.data)
+
+        Plan.objects.filter(pk=self.plan.pk).update(estadisticas_basicas=False)
+        self.assertEqual(self.client.get('/api/reportes/proveedor/metricas/').status_code, 403)
+
+        Suscripcion.objects.update(fecha_fin=date(2000, 1, 1), plan=self.plan)
+        Plan.objects.filter(pk=self.plan.pk).update(panel_metricas_avanzado=True)
+        self.assertEqual(self.client.get('/api/reportes/proveedor/metricas/').status_code, 403)
@@ -0,0 +1,20 @@
+from django.test import SimpleTestCase
+
+from .parser_comandos import analizar, cargar_corpus, evaluar_corpus
+
+
+class ParserComandosTests(SimpleTestCase):
+    def test_corpus_de_referencia(self):
+        corpus = cargar_corpus()
+        self.assertEqual(evaluar_corpus(corpus), [])
+
+    def test_palabras_completas(self):
+        analisis = analizar('paquetes mayores a 500 con subsidio')
+        self.assertEqual(analisis.valores('mes'), [])
+        self.assertEqual(analisis.valores('moneda'), [])
+        self.assertEqual(analisis.primero('monto_minimo'), 500)
+
+    def test_ultimos_dias_no_es_limite(self):
+        analisis = analizar('ventas de los últimos 30 días')
+        self.assertEqual(analisis.primero('ultimos_dias'), 30)
+        self.assertIsNone(analisis.primero('limite'))
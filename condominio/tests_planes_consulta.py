@@ -0,0 +1,61 @@
+from types import SimpleNamespace
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from .cache_reportes import obtener_o_calcular
+from .models import PlanConsulta, Usuario
+from .planes_consulta import comparar_planes, detectar_problemas, firma_plan, forzar_captura
+
+
+def _plan(nodo_hijo, tiempo=10.0):
+    return {
+        'Plan': {
+            'Node Type': 'Aggregate', 'Plan Rows': 1, 'Actual Rows': 1, 'Actual Loops': 1,
+            'Plans': [nodo_hijo],
+        },
+        'Execution Time': tiempo,
+    }
+
+
+SEQ_SCAN = {
+    'Node Type': 'Seq Scan', 'Relation Name': 'condominio_reserva',
+    'Plan Rows': 50, 'Actual Rows': 40000, 'Actual Loops': 1, 'Rows Removed by Filter': 2000,
+}
+INDEX_SCAN = {
+    'Node Type': 'Index Scan', 'Relation Name': 'condominio_reserva', 'Index Name': 'reserva_fecha_idx',
+    'Plan Rows': 900, 'Actual Rows': 1000, 'Actual Loops': 1,
+}
+
+
+class PlanesConsultaTests(TestCase):
+    def test_detecta_seq_scan_y_estimacion(self):
+        problemas = detectar_problemas(_plan(SEQ_SCAN))
+        self.assertIn({'tipo': 'seq_scan', 'tabla': 'condominio_reserva', 'filas': 42000}, problemas)
+        self.assertTrue(any(p['tipo'] == 'estimacion' and p['reales'] == 40000 for p in problemas))
+        self.assertEqual(detectar_problemas(_plan(INDEX_SCAN)), [])
+
+    def test_compara_capturas(self):
+        antes = SimpleNamespace(plan=_plan(INDEX_SCAN, 10.0), tiempo_ejecucion_ms=10.0, duracion_ms=12.0, problemas=[])
+        plan_nuevo = _plan(SEQ_SCAN, 80.0)
+        despues = SimpleNamespace(plan=plan_nuevo, tiempo_ejecucion_ms=80.0, duracion_ms=85.0,
+                                  problemas=detectar_problemas(plan_nuevo))
+
+        alertas = comparar_planes(antes, despues)
+        self.assertEqual([a['tipo'] for a in alertas[:2]], ['plan_cambiado', 'mas_lenta'])
+        self.assertIn({'tipo': 'seq_scan', 'tabla': 'condominio_reserva', 'filas': 42000, 'nuevo': True}, alertas)
+        self.assertEqual(firma_plan(plan_nuevo), ['Aggregate', 'Seq Scan(condominio_reserva)'])
+        self.assertEqual(comparar_planes(antes, antes), [])
+
+    def test_captura_consultas_del_calculo(self):
+        cache.clear()
+        calcular = lambda: Usuario.objects.count()
+
+        obtener_o_calcular('prueba_planes', {'a': 1}, calcular)
+        self.assertFalse(PlanConsulta.objects.exists())
+
+        with forzar_captura('corrida-test'):
+            obtener_o_calcular('prueba_planes', {'a': 1}, calcular, refrescar=True)
+        plan = PlanConsulta.objects.get()
+        self.assertEqual((plan.corrida, plan.reporte, plan.filtros), ('corrida-test', 'prueba_planes', {'a': 1}))
+        self.assertIn('COUNT', plan.sql.upper())
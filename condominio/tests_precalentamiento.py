@@ -0,0 +1,43 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from .models import Usuario, Reserva, Paquete
+from .precalentamiento import precalentar
+from .reportes import GeneradorReportes
+
+
+class PrecalentamientoTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        cliente = Usuario.objects.create(user=User.objects.create_user(username='p', password='x'), nombre='P')
+        paquete = Paquete.objects.create(
+            nombre='Paquete Andino', descripcion='-', duracion='3 días', precio_base=Decimal('300.00'),
+            fecha_inicio=date(2025, 1, 1), fecha_fin=date(2025, 12, 31), punto_salida='La Paz',
+            departamento='La Paz',
+        )
+        Reserva.objects.create(fecha=date.today(), estado='PAGADA', total=Decimal('300.00'),
+                               cliente=cliente, paquete=paquete)
+
+    def test_presets_quedan_en_cache(self):
+        resultados = precalentar()
+        presets = {r['preset'] for r in resultados}
+        self.assertTrue({'por_defecto', 'este_mes', 'mes_pasado', 'ultimos_30_dias', 'departamento:La Paz'} <= presets)
+        self.assertEqual([r for r in resultados if r['error']], [])
+
+        client = APIClient()
+        resp = client.post('/api/reportes/graficas/', {}, format='json')
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.data['desde_cache'])
+        resp = client.post('/api/reportes/graficas/', {'departamento': 'La Paz'}, format='json')
+        self.assertTrue(resp.data['desde_cache'])
+
+    def test_comando_de_voz_usa_reporte_precalentado(self):
+        precalentar(solo=['este_mes'])
+        reporte = GeneradorReportes.reporte_por_comando_voz('ventas de este mes en pdf')
+        self.assertEqual(reporte['metricas_generales']['cantidad_reservas'], 1)
+        self.assertEqual(reporte['filtros_aplicados']['formato'], 'pdf')
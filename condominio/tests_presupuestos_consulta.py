@@ -0,0 +1,109 @@
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.backends.utils import CursorWrapper
+from django.http import JsonResponse
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from .models import Reserva, Servicio, Usuario
+from .presupuestos_consulta import PresupuestoConsultasMiddleware, presupuesto_consultas, resolver_presupuesto
+
+
+class PresupuestoConsultasTests(TestCase):
+    def setUp(self):
+        cliente = Usuario.objects.create(user=User.objects.create_user(username='c', password='x'), nombre='Ana')
+        servicio = Servicio.objects.create(titulo='Tour', descripcion='-', duracion='1 día', capacidad_max=5,
+                                           punto_encuentro='-', departamento='La Paz')
+        for _ in range(3):
+            Reserva.objects.create(fecha=date(2025, 3, 1), estado='PAGADA', total=Decimal('100'), moneda='BOB',
+                                   cliente=cliente, servicio=servicio)
+        self.client = APIClient()
+
+    def test_resolver_perfiles_y_declaraciones(self):
+        with override_settings(PRESUPUESTOS_CONSULTA={'api': {'tiempo_ms': 100, 'consultas': 0, 'filas': 10}}):
+            self.assertEqual(resolver_presupuesto(), {'tiempo_ms': 100, 'consultas': None, 'filas': 10})
+            self.assertEqual(resolver_presupuesto({'perfil': None, 'filas': 5})['filas'], 5)
+            self.assertEqual(resolver_presupuesto({'perfil': 'reportes'})['consultas'], 2000)
+        with self.assertRaises(TypeError):
+            presupuesto_consultas(segundos=3)
+
+    def test_busqueda_que_excede_responde_503(self):
+        self.assertEqual(self.client.get('/api/reservas/', {'search': 'ana'}).status_code, 200)
+
+        with override_settings(PRESUPUESTOS_CONSULTA={'api': {'consultas': 1}}), \
+                self.assertLogs('condominio.presupuestos_consulta', 'WARNING') as logs:
+            resp = self.client.get('/api/reservas/', {'search': 'ana'})
+        self.assertEqual(resp.status_code, 503)
+        self.assertFalse(resp.json()['success'])
+        self.assertEqual(resp.json()['presupuesto'], {'limite': 'consultas', 'permitido': 1, 'medido': 2})
+        self.assertIn('ReservaViewSet', logs.output[0])
+
+    def test_reportes_declaran_su_propio_perfil(self):
+        perfiles = {'api': {'consultas': 1}, 'reportes': {'consultas': 200}}
+        with override_settings(PRESUPUESTOS_CONSULTA=perfiles):
+            self.assertEqual(self.client.get('/api/reportes/cubo/', {'dimensiones': 'departamento'}).status_code, 200)
+
+        # La vista atrapa la excepción con su except genérico: igual se responde el presupuesto
+        perfiles['reportes'] = {'consultas': 1}
+        with override_settings(PRESUPUESTOS_CONSULTA=perfiles), self.assertLogs('condominio.presupuestos_consulta'):
+            resp = self.client.get('/api/reportes/cubo/', {'dimensiones': 'departamento', 'refrescar': 'true'})
+        self.assertEqual(resp.status_code, 503)
+        self.assertEqual(resp.json()['presupuesto']['limite'], 'consultas')
+
+    def test_vistas_sin_declaracion_no_se_miden(self):
+        with override_settings(PRESUPUESTOS_CONSULTA={'api': {'consultas': 1}}):
+            self.assertEqual(self.client.get('/api/servicios/').status_code, 200)
+
+    def test_escritura_que_ya_respondio_conserva_su_respuesta(self):
+        @presupuesto_consultas(consultas=1)
+        def vista(request):
+            try:
+                list(Reserva.objects.all())
+                list(Servicio.objects.all())
+            except Exception:
+                pass
+            # Tras el exceso ninguna consulta pasa, aunque la vista lo atrape
+            with self.assertRaises(Exception):
+                Reserva.objects.count()
+            return JsonResponse({'success': True})
+
+        middleware = PresupuestoConsultasMiddleware(lambda request: None)
+        fabrica = RequestFactory()
+        with self.assertLogs('condominio.presupuestos_consulta', 'WARNING') as logs:
+            post = middleware.process_view(fabrica.post('/x/'), vista, (), {})
+            get = middleware.process_view(fabrica.get('/x/'), vista, (), {})
+        self.assertEqual(post.status_code, 200)
+        self.assertEqual(get.status_code, 503)
+        self.assertTrue(any('se conserva la respuesta 200' in linea for linea in logs.output))
+
+    def test_statement_timeout_fuera_del_presupuesto(self):
+        @presupuesto_consultas(consultas=1, tiempo_ms=2000)
+        def vista(request):
+            try:
+                list(Reserva.objects.all())
+                list(Servicio.objects.all())
+            except Exception:
+                pass
+            return JsonResponse({'success': True})
+
+        sesion = []
+        ejecutar = CursorWrapper._execute
+
+        def simular_postgresql(cursor, sql, params, *args):
+            # Debajo de los execute_wrapper: se registra la sesión sin depender del motor de pruebas
+            if 'statement_timeout' in sql:
+                return sesion.append(sql)
+            return ejecutar(cursor, sql, params, *args)
+
+        middleware = PresupuestoConsultasMiddleware(lambda request: None)
+        with mock.patch.object(connection, 'vendor', 'postgresql'), \
+                mock.patch.object(CursorWrapper, '_execute', simular_postgresql), \
+                self.assertLogs('condominio.presupuestos_consulta', 'WARNING'):
+            post = middleware.process_view(RequestFactory().post('/x/'), vista, (), {})
+        # El SET no consume la única consulta permitida y el RESET corre tras el exceso
+        self.assertEqual(post.status_code, 200)
+        self.assertEqual(sesion, ['SET statement_timeout = 2000', 'RESET statement_timeout'])
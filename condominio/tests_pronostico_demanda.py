@@ -0,0 +1,54 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from .models import PronosticoDemanda, Reserva, Servicio, Usuario
+from .pronostico_demanda import ajustar_pronosticos, recalcular_pronosticos
+
+
+class PronosticoDemandaTests(TestCase):
+    def test_ajuste_vectorizado_captura_estacionalidad_semanal(self):
+        inicio = date(2024, 1, 1)  # lunes
+        semana = np.array([2, 2, 2, 2, 2, 6, 6], dtype=float)
+        matriz = np.vstack([np.tile(semana, 52), np.tile(semana, 52) * 3, np.zeros(364)])
+        matriz[2, 300:] = np.tile(semana, 10)[:64]  # producto nuevo
+
+        demanda, limite = ajustar_pronosticos(matriz, inicio, horizonte=14)
+        self.assertEqual(demanda.shape, (3, 14))
+        self.assertTrue((limite >= demanda).all())
+        # El horizonte empieza el lunes 2024-12-30: sábado y domingo en las columnas 5 y 6
+        self.assertGreater(demanda[0, 5] / demanda[0, 0], 2.5)
+        np.testing.assert_allclose(demanda[1], demanda[0] * 3)
+        self.assertAlmostEqual(demanda[2, 0], demanda[0, 0], delta=0.6)
+
+    def test_recalculo_y_endpoint(self):
+        cliente = Usuario.objects.create(user=User.objects.create_user(username='cli', password='x'), nombre='Cli')
+        servicio = Servicio.objects.create(
+            titulo='Tour Uyuni', descripcion='-', duracion='1 día', capacidad_max=2,
+            punto_encuentro='Plaza', precio_usd=Decimal('50.00'),
+        )
+        hasta = date(2025, 6, 30)
+        Reserva.objects.bulk_create([
+            Reserva(fecha=hasta - timedelta(days=d), estado='PAGADA', total=Decimal('10'), cliente=cliente, servicio=servicio)
+            for d in range(56) for _ in range(3)
+        ])
+
+        with self.assertNumQueries(6):  # serie, nombres (sin paquetes no consulta), savepoint, borrado, inserción
+            resumen = recalcular_pronosticos(hasta=hasta)
+        self.assertEqual((resumen['productos'], resumen['sobre_capacidad']), (1, 1))
+        pronostico = PronosticoDemanda.objects.get()
+        self.assertEqual((len(pronostico.demanda), pronostico.desde), (90, date(2025, 7, 1)))
+        self.assertAlmostEqual(pronostico.demanda[0], 3, delta=0.5)
+        self.assertGreater(pronostico.cupos_sugeridos, pronostico.capacidad)
+
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username='ops', password='x', is_staff=True))
+        listado = client.get('/api/reportes/pronosticos/', {'sobre_capacidad': '1'})
+        self.assertEqual(listado.data['productos'][0]['producto_nombre'], 'Tour Uyuni')
+        detalle = client.get('/api/reportes/pronosticos/', {'tipo': 'servicio', 'producto_id': servicio.id})
+        self.assertEqual(detalle.data['serie'][0]['fecha'], '2025-07-01')
+        self.assertEqual(client.get('/api/reportes/pronosticos/', {'producto_id': 1}).status_code, 400)
@@ -0,0 +1,142 @@
+import shutil
+import tempfile
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import Notificacion, ReporteGenerado, Reserva, Servicio, SuscripcionReporte, Usuario
+from .reportes_programados import (
+    ProgramacionInvalida, en_horario_valle, parsear_programacion, procesar_pendientes, proxima_ejecucion,
+    resolver_filtros, validar_suscripcion,
+)
+
+
+class ProgramacionCronTests(TestCase):
+    def test_proxima_ejecucion(self):
+        # Miércoles 2025-03-05 10:00 hora local
+        desde = timezone.make_aware(datetime(2025, 3, 5, 10, 0))
+        lunes = timezone.localtime(proxima_ejecucion('0 6 * * 1', desde))
+        self.assertEqual((lunes.date(), lunes.hour, lunes.minute), (date(2025, 3, 10), 6, 0))
+
+        cada_15 = timezone.localtime(proxima_ejecucion('*/15 * * * *', desde))
+        self.assertEqual((cada_15.hour, cada_15.minute), (10, 15))
+
+        # Día del mes o día de la semana (como cron): el día 7 es viernes, antes que el lunes 10
+        dia_7 = timezone.localtime(proxima_ejecucion('30 8 7 * 1', desde))
+        self.assertEqual(dia_7.date(), date(2025, 3, 7))
+
+        for invalida in ('0 6 * *', '61 6 * * *', '0 6 31 2 *'):
+            with self.assertRaises(ProgramacionInvalida):
+                proxima_ejecucion(invalida, desde)
+        self.assertEqual(parsear_programacion('0 0 * * 7')[4], {0})
+
+    def test_periodo_relativo(self):
+        filtros = resolver_filtros('ventas', {'periodo': 'ultimos_7_dias', 'departamento': 'La Paz'})
+        fin = date.fromisoformat(filtros['fecha_fin'])
+        self.assertEqual(fin - date.fromisoformat(filtros['fecha_inicio']), timedelta(days=7))
+        self.assertEqual((filtros['departamento'], filtros['moneda']), ('La Paz', 'BOB'))
+
+    def test_montos_validados(self):
+        validar_suscripcion('ventas', 'pdf', '0 6 * * 1', {'monto_minimo': '100', 'monto_maximo': 500})
+        for filtros in ({'monto_minimo': 'mucho'}, {'monto_maximo': -1}, {'monto_minimo': 500, 'monto_maximo': 100}):
+            with self.assertRaises(ValueError):
+                validar_suscripcion('ventas', 'pdf', '0 6 * * 1', filtros)
+        with self.assertRaises(ValueError):
+            validar_suscripcion('clientes', 'pdf', '0 6 * * 1', {'monto_minimo': 100})
+
+    def test_horario_valle(self):
+        a_las = lambda hora: timezone.make_aware(datetime(2025, 3, 5, hora, 30))
+        with override_settings(REPORTES_PROGRAMADOS_HORARIO_VALLE='00:00-06:00'):
+            self.assertTrue(en_horario_valle(a_las(5)))
+            self.assertFalse(en_horario_valle(a_las(6)))
+        with override_settings(REPORTES_PROGRAMADOS_HORARIO_VALLE='22:00-04:00'):
+            self.assertTrue(en_horario_valle(a_las(23)) and en_horario_valle(a_las(1)))
+            self.assertFalse(en_horario_valle(a_las(12)))
+        with override_settings(REPORTES_PROGRAMADOS_HORARIO_VALLE=''):
+            self.assertTrue(en_horario_valle(a_las(12)))
+
+
+class ReportesProgramadosTests(TestCase):
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directorio, ignore_errors=True)
+        ajustes = override_settings(REPORTES_PROGRAMADOS_DIR=self.directorio, REPORTES_PROGRAMADOS_STORAGE='',
+                                    REPORTES_PROGRAMADOS_HORARIO_VALLE='')
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+        self.usuarios = [
+            Usuario.objects.create(user=User.objects.create_user(username=f'u{i}', password='x'), nombre=f'U{i}')
+            for i in range(3)
+        ]
+        servicio = Servicio.objects.create(
+            titulo='Tour Uyuni', descripcion='-', duracion='1 día', capacidad_max=10,
+            punto_encuentro='Plaza', proveedor=self.usuarios[0], precio_usd=Decimal('50.00'),
+        )
+        Reserva.objects.create(fecha=timezone.localdate(), estado='PAGADA', total=Decimal('100.00'),
+                               moneda='BOB', cliente=self.usuarios[0], servicio=servicio)
+        self.ahora = timezone.now()
+        vencida = self.ahora - timedelta(minutes=1)
+        for usuario in self.usuarios[:2]:
+            SuscripcionReporte.objects.create(usuario=usuario, tipo_reporte='ventas', formato='excel',
+                                              filtros={'periodo': 'este_mes'}, proxima_ejecucion=vencida)
+
+    def test_suscripciones_identicas_comparten_render(self):
+        resumen = procesar_pendientes(self.ahora)
+        self.assertEqual((resumen['entregadas'], resumen['renders']), (2, 1))
+        reporte = ReporteGenerado.objects.get()
+        self.assertEqual(Notificacion.objects.filter(tipo='reporte_programado', datos__reporte_id=reporte.id).count(), 2)
+        self.assertFalse(SuscripcionReporte.objects.filter(proxima_ejecucion__lte=self.ahora).exists())
+
+        # Nada vencido: no se vuelve a entregar
+        self.assertEqual(procesar_pendientes(self.ahora)['entregadas'], 0)
+
+        # Dentro de la ventana de reuso un render idéntico no se repite
+        SuscripcionReporte.objects.update(proxima_ejecucion=self.ahora)
+        resumen = procesar_pendientes(self.ahora + timedelta(minutes=5))
+        self.assertEqual((resumen['renders'], resumen['reutilizados']), (0, 1))
+        self.assertEqual(ReporteGenerado.objects.count(), 1)
+
+    def test_fuera_del_horario_valle_se_difiere(self):
+        # La ventana de una hora que empieza dentro de dos horas no incluye ``ahora``
+        apertura = timezone.localtime(self.ahora) + timedelta(hours=2)
+        ventana = f"{apertura:%H}:00-{apertura + timedelta(hours=1):%H}:00"
+        with override_settings(REPORTES_PROGRAMADOS_HORARIO_VALLE=ventana):
+            resumen = procesar_pendientes(self.ahora)
+            self.assertEqual((resumen['diferidas'], resumen['renders']), (2, 0))
+            self.assertFalse(ReporteGenerado.objects.exists())
+
+            resumen = procesar_pendientes(apertura.replace(minute=5))
+            self.assertEqual((resumen['entregadas'], resumen['diferidas']), (2, 0))
+
+    def test_descarga_solo_para_destinatarios(self):
+        procesar_pendientes(self.ahora)
+        url = Notificacion.objects.filter(usuario=self.usuarios[0]).get().datos['url']
+        client = APIClient()
+
+        client.force_authenticate(self.usuarios[0].user)
+        resp = client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(b''.join(resp.streaming_content).startswith(b'PK'))
+
+        client.force_authenticate(self.usuarios[2].user)
+        self.assertEqual(client.get(url).status_code, 404)
+
+    def test_crear_suscripcion(self):
+        client = APIClient()
+        client.force_authenticate(self.usuarios[2].user)
+        resp = client.post('/api/reportes/suscripciones/', {
+            'tipo_reporte': 'productos', 'formato': 'pdf', 'programacion': '0 7 1 * *',
+            'filtros': {'periodo': 'mes_pasado'},
+        }, format='json')
+        self.assertEqual(resp.status_code, 201, resp.data)
+        self.assertEqual(timezone.localtime(resp.data['suscripcion']['proxima_ejecucion']).day, 1)
+
+        resp = client.post('/api/reportes/suscripciones/', {
+            'tipo_reporte': 'ventas', 'filtros': {'periodo': 'siempre'},
+        }, format='json')
+        self.assertEqual(resp.status_code, 400)
@@ -0,0 +1,58 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from .models import Usuario, Reserva, SegmentoCliente, CampanaNotificacion
+from .reportes import GeneradorReportes
+from .segmentacion import recalcular_segmentos
+
+
+class SegmentacionRFMTests(TestCase):
+    def _cliente(self, nombre, compras, hace_dias):
+        user = User.objects.create_user(username=nombre, password='x')
+        cliente = Usuario.objects.create(user=user, nombre=nombre)
+        hoy = timezone.localdate()
+        for i in range(compras):
+            Reserva.objects.create(fecha=hoy - timedelta(days=hace_dias + i), estado='PAGADA',
+                                   total=Decimal('100.00'), moneda='USD', cliente=cliente)
+        return cliente
+
+    def setUp(self):
+        self.nuevo = self._cliente('nuevo', 1, 400)
+        self.recurrente = self._cliente('recurrente', 3, 30)
+        self.vip = self._cliente('vip', 7, 1)
+
+    def test_recalcula_tipos_y_segmentos(self):
+        resumen = recalcular_segmentos()
+        self.assertEqual(resumen['total_clientes'], 3)
+        self.assertEqual(resumen['por_tipo'], {'nuevo': 1, 'recurrente': 1, 'vip': 1})
+
+        vip = SegmentoCliente.objects.get(usuario=self.vip)
+        self.assertEqual((vip.r_score, vip.f_score), (5, 5))
+        self.assertEqual(vip.segmento, 'CAMPEON')
+        self.assertEqual(vip.monto_bob, Decimal('4872.00'))
+        self.assertEqual(SegmentoCliente.objects.get(usuario=self.nuevo).segmento, 'HIBERNANDO')
+        recurrente = SegmentoCliente.objects.get(usuario=self.recurrente)
+        self.assertEqual((recurrente.r_score, recurrente.f_score, recurrente.recencia_dias), (4, 4, 30))
+        self.assertEqual((recurrente.tipo_cliente, recurrente.segmento), ('recurrente', 'CAMPEON'))
+
+        # Recalcular reemplaza la tabla sin duplicar filas, con un solo INSERT … SELECT
+        with CaptureQueriesContext(connection) as consultas:
+            recalcular_segmentos()
+        inserts = [q['sql'] for q in consultas.captured_queries if q['sql'].lstrip().upper().startswith('INSERT')]
+        self.assertEqual(len(inserts), 1)
+        self.assertIn('CUME_DIST', inserts[0])
+        self.assertEqual(SegmentoCliente.objects.count(), 3)
+
+    def test_filtros_por_join(self):
+        recalcular_segmentos()
+        reservas = GeneradorReportes.aplicar_filtros(Reserva.objects.all(), {'tipo_cliente': 'vip'})
+        self.assertEqual(set(reservas.values_list('cliente_id', flat=True)), {self.vip.id})
+
+        campana = CampanaNotificacion(tipo_audiencia='SEGMENTO', segmento_filtros={'tipo_cliente': 'recurrente'})
+        self.assertEqual(list(campana.obtener_usuarios_objetivo()), [self.recurrente])
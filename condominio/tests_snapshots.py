@@ -0,0 +1,68 @@
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Usuario, Reserva, ReservaServicio, Servicio
+from .snapshots import exportar_snapshot, leer_marcas_agua
+
+
+class SnapshotAnaliticoTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username='analista', password='x')
+        self.cliente = Usuario.objects.create(user=user, nombre='Cliente')
+        Reserva.objects.create(fecha=date(2025, 1, 10), total=Decimal('100.00'), cliente=self.cliente)
+        self.directorio = tempfile.mkdtemp()
+
+    @override_settings(SNAPSHOT_SOLAPE_SEGUNDOS=300)
+    def test_incremental_solo_exporta_cambios(self):
+        Reserva.objects.create(fecha=date(2025, 1, 11), total=Decimal('70.00'), cliente=self.cliente)
+        for horas, reserva in zip((2, 1), Reserva.objects.order_by('pk')):
+            Reserva.objects.filter(pk=reserva.pk).update(updated_at=timezone.now() - timedelta(hours=horas))
+        primero = exportar_snapshot(datasets=['reservas'], directorio=self.directorio)
+        self.assertEqual(primero['datasets'][0]['filas'], 2)
+        marca = leer_marcas_agua(self.directorio)['reservas']
+
+        # Sin cambios solo se relee lo que cae en el solape de la marca (la última reserva)
+        segundo = exportar_snapshot(datasets=['reservas'], directorio=self.directorio)
+        self.assertEqual(segundo['datasets'][0]['filas'], 1)
+
+        Reserva.objects.create(fecha=date(2025, 2, 1), total=Decimal('50.00'), cliente=self.cliente)
+        tercero = exportar_snapshot(datasets=['reservas'], directorio=self.directorio)
+        self.assertEqual(tercero['datasets'][0]['filas'], 2)  # la nueva y la del solape
+        self.assertTrue((Path(self.directorio) / tercero['datasets'][0]['archivo']).exists())
+        self.assertGreater(leer_marcas_agua(self.directorio)['reservas'], marca)
+
+    @override_settings(SNAPSHOT_SOLAPE_SEGUNDOS=300)
+    def test_solape_recoge_filas_confirmadas_tarde(self):
+        exportar_snapshot(datasets=['reservas'], directorio=self.directorio)
+        marca = parse_datetime(leer_marcas_agua(self.directorio)['reservas'])
+
+        # Fila con updated_at anterior a la marca, confirmada después de la corrida
+        tardia = Reserva.objects.create(fecha=date(2025, 2, 1), total=Decimal('50.00'), cliente=self.cliente)
+        Reserva.objects.filter(pk=tardia.pk).update(updated_at=marca - timedelta(seconds=30))
+        resultado = exportar_snapshot(datasets=['reservas'], directorio=self.directorio)['datasets'][0]
+        self.assertEqual(resultado['filas'], 2)  # la tardía y la ya exportada dentro del solape
+        # La marca no retrocede
+        self.assertEqual(parse_datetime(leer_marcas_agua(self.directorio)['reservas']), marca)
+
+    def test_servicios_reservados_con_marca_propia(self):
+        servicio = Servicio.objects.create(titulo='Tour', descripcion='-', duracion='1 día', capacidad_max=5,
+                                           punto_encuentro='-')
+        detalle = ReservaServicio.objects.create(reserva=Reserva.objects.get(), servicio=servicio, fecha=date(2025, 1, 10))
+        ReservaServicio.objects.filter(pk=detalle.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+        exportar_snapshot(datasets=['reserva_servicios'], directorio=self.directorio)
+
+        # Cambiar la reserva ya no reexporta su detalle; cambiar el detalle sí
+        exportar = lambda: exportar_snapshot(datasets=['reserva_servicios'], directorio=self.directorio)['datasets'][0]
+        Reserva.objects.get().save()
+        with override_settings(SNAPSHOT_SOLAPE_SEGUNDOS=0):
+            self.assertEqual(exportar()['filas'], 0)
+            detalle.fecha = date(2025, 1, 11)
+            detalle.save()
+            self.assertEqual(exportar()['filas'], 1)
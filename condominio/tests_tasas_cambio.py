@@ -0,0 +1,53 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from .dataset_reportes import dataset_ventas
+from .models import Pago, Reserva, TasaCambio, Usuario
+from .tasas_cambio import normalizar_montos
+
+
+class MontosNormalizadosTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username='cliente_fx', password='x')
+        self.cliente = Usuario.objects.create(user=user, nombre='Cliente FX')
+        TasaCambio.objects.create(fecha=date(2025, 1, 1), bob_por_usd=Decimal('6.96'))
+        TasaCambio.objects.create(fecha=date(2025, 6, 1), bob_por_usd=Decimal('7.00'))
+
+    def _reserva(self, fecha, total, moneda):
+        return Reserva.objects.create(fecha=fecha, estado='PAGADA', total=Decimal(total),
+                                      moneda=moneda, cliente=self.cliente)
+
+    def test_save_usa_tasa_vigente_en_la_fecha(self):
+        antes = self._reserva(date(2025, 3, 10), '100.00', 'USD')
+        despues = self._reserva(date(2025, 7, 10), '100.00', 'USD')
+        bob = self._reserva(date(2025, 7, 10), '700.00', 'BOB')
+
+        self.assertEqual((antes.total_bob, antes.total_usd), (Decimal('696.00'), Decimal('100.00')))
+        self.assertEqual((despues.total_bob, despues.total_usd), (Decimal('700.00'), Decimal('100.00')))
+        self.assertEqual((bob.total_bob, bob.total_usd), (Decimal('700.00'), Decimal('100.00')))
+
+        pago = Pago.objects.create(monto=Decimal('100.00'), metodo='Tarjeta', fecha_pago=date(2025, 3, 10),
+                                   estado='Confirmado', reserva=antes)
+        self.assertEqual(pago.monto_bob, Decimal('696.00'))
+
+        resumen = dataset_ventas({'moneda': 'BOB'}).resumen
+        self.assertEqual(resumen['total_ventas'], 2096.0)
+
+    def test_backfill_masivo_y_recalculo(self):
+        Reserva.objects.bulk_create([
+            Reserva(fecha=date(2025, 3, 10), estado='PAGADA', total=Decimal('10.00'), moneda='USD', cliente=self.cliente),
+            Reserva(fecha=date(2025, 7, 10), estado='PAGADA', total=Decimal('70.00'), moneda='BOB', cliente=self.cliente),
+        ])
+        self.assertEqual(normalizar_montos(lote=1), {'reservas': 2, 'pagos': 0})
+        self.assertEqual(
+            sorted(Reserva.objects.values_list('total_bob', 'total_usd')),
+            [(Decimal('69.60'), Decimal('10.00')), (Decimal('70.00'), Decimal('10.00'))],
+        )
+        # Sin pendientes no toca nada; --todo recalcula tras corregir una tasa
+        self.assertEqual(normalizar_montos()['reservas'], 0)
+        TasaCambio.objects.filter(fecha=date(2025, 1, 1)).update(bob_por_usd=Decimal('7.00'))
+        normalizar_montos(todo=True)
+        self.assertTrue(Reserva.objects.filter(total_bob=Decimal('70.00'), moneda='USD').exists())
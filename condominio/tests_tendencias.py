@@ -0,0 +1,35 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from .models import Usuario, Reserva
+from .tendencias import serie_tendencia
+
+
+class TendenciasTests(TestCase):
+    def setUp(self):
+        cliente = Usuario.objects.create(user=User.objects.create_user(username='t', password='x'), nombre='T')
+        for fecha, total in [(date(2024, 3, 10), '50.00'), (date(2025, 1, 15), '100.00'),
+                             (date(2025, 3, 2), '150.00'), (date(2025, 3, 20), '50.00')]:
+            Reserva.objects.create(fecha=fecha, estado='PAGADA', total=Decimal(total), moneda='BOB', cliente=cliente)
+
+    def test_serie_mensual_con_huecos_y_yoy(self):
+        serie = serie_tendencia(Reserva.objects.all(), 'ventas', 'month', date(2025, 1, 1), date(2025, 3, 31))
+        self.assertEqual([p['periodo'] for p in serie['puntos']], ['2025-01-01', '2025-02-01', '2025-03-01'])
+        self.assertEqual([p['valor'] for p in serie['puntos']], [100.0, 0, 200.0])
+        marzo = serie['puntos'][2]
+        self.assertIsNone(marzo['crecimiento'])  # febrero sin ventas
+        self.assertEqual((marzo['anio_anterior'], marzo['crecimiento_anual']), (50.0, 300.0))
+        self.assertEqual(serie['resumen']['total'], 300.0)
+
+    def test_endpoint_semanal(self):
+        resp = APIClient().get('/api/reportes/tendencias/', {
+            'granularidad': 'week', 'metricas': 'reservas,clientes',
+            'fecha_inicio': '2025-03-01', 'fecha_fin': '2025-03-31',
+        })
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data['series']['reservas']['resumen']['total'], 2)
+        self.assertEqual(APIClient().get('/api/reportes/tendencias/', {'granularidad': 'hora'}).status_code, 400)
@@ -0,0 +1,68 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from .cubo_ventas import calcular_cubo
+from .dataset_reportes import dataset_ventas
+from .models import Ciudad, Departamento, Paquete, Reserva, Servicio, Usuario
+from .ubicaciones import clave_ubicacion, filtro_ubicacion, normalizar_ubicaciones
+
+
+def _servicio(**kwargs):
+    return Servicio(titulo='Tour', descripcion='-', duracion='1 día', capacidad_max=5, punto_encuentro='-', **kwargs)
+
+
+class UbicacionesTests(TestCase):
+    def setUp(self):
+        self.la_paz = Departamento.objects.get(nombre='La Paz')
+
+    def test_variantes_de_escritura_al_guardar(self):
+        variantes = ['La Paz', 'la paz', 'LaPaz', 'Dpto. La Paz', 'LPZ', ' La  Páz ']
+        servicios = [_servicio(departamento=texto, ciudad='El Alto') for texto in variantes]
+        for servicio in servicios:
+            servicio.save()
+        paquete = Paquete.objects.create(nombre='Andino', descripcion='-', duracion='3 días', precio_base=Decimal('300'),
+                                         fecha_inicio=date(2025, 1, 1), fecha_fin=date(2025, 12, 31),
+                                         punto_salida='-', departamento='la  paz', ciudad='el alto')
+        self.assertEqual({s.departamento_canonico_id for s in servicios}, {self.la_paz.id})
+        self.assertEqual(paquete.departamento_canonico_id, self.la_paz.id)
+        self.assertEqual(Ciudad.objects.filter(departamento=self.la_paz).count(), 1)
+        self.assertEqual(paquete.ciudad_canonica.nombre, 'El Alto')
+
+        # Errores de tipeo por similitud; un texto desconocido crea su departamento
+        self.assertEqual(_guardar(departamento='Cochabamaba').departamento_canonico.nombre, 'Cochabamba')
+        self.assertEqual(_guardar(departamento='Santa Cruz de la Sierra').departamento_canonico.nombre, 'Santa Cruz')
+        self.assertEqual(_guardar(departamento='CUSCO').departamento_canonico.clave, clave_ubicacion('Cusco'))
+
+    def test_normalizacion_masiva_y_filtros_por_id(self):
+        Servicio.objects.bulk_create([
+            _servicio(departamento='POTOSI', ciudad='Uyuni'),
+            _servicio(departamento='Potosí', ciudad='uyuni '),
+            _servicio(departamento='La Paz', ciudad='Copacabana'),
+        ])
+        self.assertFalse(Servicio.objects.filter(departamento_canonico__isnull=False).exists())
+        self.assertEqual(normalizar_ubicaciones()['servicio'], 3)
+        self.assertEqual(normalizar_ubicaciones()['servicio'], 0)
+        self.assertEqual(Ciudad.objects.filter(clave='uyuni').count(), 1)
+
+        cliente = Usuario.objects.create(user=User.objects.create_user(username='c', password='x'), nombre='C')
+        for servicio in Servicio.objects.all():
+            Reserva.objects.create(fecha=date(2025, 3, 1), estado='PAGADA', total=Decimal('100'), moneda='BOB',
+                                   cliente=cliente, servicio=servicio)
+
+        self.assertEqual(len(dataset_ventas({'departamento': 'potosi'})), 2)
+        self.assertEqual(len(dataset_ventas({'departamento': 'Lima'})), 0)
+        self.assertEqual(Servicio.objects.filter(filtro_ubicacion({'ciudad': 'UYUNI'})).count(), 2)
+        self.assertEqual(Servicio.objects.filter(filtro_ubicacion({'departamento_id': self.la_paz.id})).count(), 1)
+
+        # Las variantes se agrupan en un solo departamento
+        filas = calcular_cubo(['departamento'], ['reservas'], 'ninguno')['filas']
+        self.assertEqual({f['departamento']: f['reservas'] for f in filas}, {'Potosí': 2, 'La Paz': 1})
+
+
+def _guardar(**kwargs):
+    servicio = _servicio(**kwargs)
+    servicio.save()
+    return servicio
@@ -0,0 +1,275 @@
+"""
+Dimensión de ubicación: departamentos y ciudades canónicos.
+
+``Servicio`` y ``Paquete`` conservan el texto libre de ``departamento`` y
+``ciudad`` (lo que escribe el proveedor) y además apuntan a
+``departamento_canonico`` / ``ciudad_canonica``. Los filtros y agrupaciones
+de reportes usan esas FK enteras (indexadas) en lugar de ``icontains``
+sobre texto, y las variantes de escritura ("La Paz", "la paz", "LaPaz",
+"Dpto. La Paz") cuentan como un solo departamento.
+
+Emparejamiento de un texto con la tabla canónica (``emparejar``):
+
+1. clave normalizada (sin tildes, mayúsculas, espacios ni puntuación) igual
+   a una clave o alias conocido;
+2. la clave contiene (o está contenida en) una sola clave conocida;
+3. la clave más parecida con ``difflib`` por encima de ``UMBRAL_SIMILITUD``.
+
+- ``Servicio.save`` / ``Paquete.save`` asignan las FK al guardar (un texto
+  sin coincidencia crea el departamento o la ciudad).
+- Las filas existentes y las inserciones masivas se completan con
+  ``manage.py normalizar_ubicaciones``: resuelve cada par distinto
+  (departamento, ciudad) una vez y actualiza sus filas con un ``UPDATE``.
+"""
+import difflib
+import logging
+import re
+import unicodedata
+
+from django.db.models import Count, Q
+
+from .models import Ciudad, Departamento, Paquete, Servicio
+
+logger = logging.getLogger(__name__)
+
+UMBRAL_SIMILITUD = 0.8
+LARGO_MINIMO_CONTENIDO = 3
+
+DEPARTAMENTOS_BOLIVIA = [
+    'Chuquisaca', 'La Paz', 'Cochabamba', 'Oruro', 'Potosí', 'Tarija', 'Santa Cruz', 'Beni', 'Pando',
+]
+# Abreviaturas y nombres alternativos frecuentes (clave normalizada → nombre canónico)
+ALIAS_DEPARTAMENTOS = {
+    'lpz': 'La Paz',
+    'scz': 'Santa Cruz',
+    'santacruzdelasierra': 'Santa Cruz',
+    'cbba': 'Cochabamba',
+    'chuq': 'Chuquisaca',
+    'tja': 'Tarija',
+    'pts': 'Potosí',
+}
+_PREFIJOS_DEPARTAMENTO = re.compile(r'^(departamento|depto|dpto)(de)?')
+
+
+def clave_ubicacion(texto):
+    """Clave de comparación: sin tildes, en minúsculas y solo letras y dígitos."""
+    sin_tildes = unicodedata.normalize('NFKD', texto or '').encode('ascii', 'ignore').decode()
+    return re.sub(r'[^a-z0-9]', '', sin_tildes.lower())
+
+
+def nombre_limpio(texto):
+    """Nombre para mostrar de un lugar nuevo: espacios colapsados y capitalización si viene todo igual."""
+    nombre = ' '.join((texto or '').split())
+    return nombre.title() if nombre.islower() or nombre.isupper() else nombre
+
+
+def emparejar(clave, candidatos, umbral=UMBRAL_SIMILITUD):
+    """Clave de ``candidatos`` que corresponde a ``clave`` (ver docstring del módulo) o None."""
+    if not clave:
+        return None
+    if clave in candidatos:
+        return clave
+    if len(clave) >= LARGO_MINIMO_CONTENIDO:
+        contenidas = [c for c in candidatos if len(c) >= LARGO_MINIMO_CONTENIDO and (c in clave or clave in c)]
+        if len(contenidas) == 1:
+            return contenidas[0]
+    parecidas = difflib.get_close_matches(clave, list(candidatos), n=1, cutoff=umbral)
+    return parecidas[0] if parecidas else None
+
+
+# ============================================================================
+# 🗂️ ÍNDICE EN MEMORIA
+# ============================================================================
+
+class IndiceUbicaciones:
+    """
+    Departamentos y ciudades canónicos en memoria, para resolver muchos
+    textos con pocas consultas. Con ``crear=True`` los textos sin
+    coincidencia se agregan a la tabla canónica.
+    """
+
+    def __init__(self, crear=False, umbral=UMBRAL_SIMILITUD):
+        self.crear = crear
+        self.umbral = umbral
+        self.departamentos = dict(Departamento.objects.values_list('clave', 'id'))
+        self.alias = {
+            alias: self.departamentos[clave_ubicacion(nombre)]
+            for alias, nombre in ALIAS_DEPARTAMENTOS.items() if clave_ubicacion(nombre) in self.departamentos
+        }
+        self._ciudades = {}
+        self._todas_ciudades = None
+
+    def departamento(self, texto):
+        """Id del departamento de ``texto`` (None si no hay coincidencia y no se crea)."""
+        clave = _PREFIJOS_DEPARTAMENTO.sub('', clave_ubicacion(texto)) or clave_ubicacion(texto)
+        if not clave:
+            return None
+        if clave in self.alias:
+            return self.alias[clave]
+        encontrada = emparejar(clave, self.departamentos, self.umbral)
+        if encontrada:
+            return self.departamentos[encontrada]
+        if not self.crear:
+            return None
+        departamento, creado = Departamento.objects.get_or_create(clave=clave, defaults={'nombre': nombre_limpio(texto)})
+        if creado:
+            logger.info(f"📍 Departamento nuevo: {departamento.nombre}")
+        self.departamentos[clave] = departamento.id
+        return departamento.id
+
+    def ciudades(self, departamento_id):
+        if departamento_id not in self._ciudades:
+            self._ciudades[departamento_id] = dict(
+                Ciudad.objects.filter(departamento_id=departamento_id).values_list('clave', 'id')
+            )
+        return self._ciudades[departamento_id]
+
+    def ciudad(self, departamento_id, texto):
+        """
+        ``(departamento_id, ciudad_id)`` de ``texto``. Sin departamento se
+        busca entre todas las ciudades y, si la coincidencia es única, se
+        completa también el departamento.
+        """
+        clave = clave_ubicacion(texto)
+        if not clave:
+            return departamento_id, None
+        if departamento_id is None:
+            ids = self.ids_ciudad(texto)
+            if len(ids) != 1:
+                return None, None
+            return Ciudad.objects.filter(pk=ids[0]).values_list('departamento_id', flat=True).get(), ids[0]
+
+        candidatas = self.ciudades(departamento_id)
+        encontrada = emparejar(clave, candidatas, self.umbral)
+        if encontrada:
+            return departamento_id, candidatas[encontrada]
+        if not self.crear:
+            return departamento_id, None
+        ciudad, creada = Ciudad.objects.get_or_create(
+            departamento_id=departamento_id, clave=clave, defaults={'nombre': nombre_limpio(texto)}
+        )
+        if creada:
+            logger.info(f"📍 Ciudad nueva: {ciudad.nombre} (departamento {departamento_id})")
+        candidatas[clave] = ciudad.id
+        return departamento_id, ciudad.id
+
+    def ids_ciudad(self, texto, departamento_ids=None):
+        """Ids de las ciudades con la clave que mejor corresponde a ``texto`` (puede repetirse entre departamentos)."""
+        if departamento_ids is not None:
+            por_clave = {}
+            for departamento_id in departamento_ids:
+                for clave, ciudad_id in self.ciudades(departamento_id).items():
+                    por_clave.setdefault(clave, []).append(ciudad_id)
+        else:
+            if self._todas_ciudades is None:
+                self._todas_ciudades = {}
+                for clave, ciudad_id in Ciudad.objects.values_list('clave', 'id'):
+                    self._todas_ciudades.setdefault(clave, []).append(ciudad_id)
+            por_clave = self._todas_ciudades
+        encontrada = emparejar(clave_ubicacion(texto), por_clave, self.umbral)
+        return por_clave[encontrada] if encontrada else []
+
+
+def asignar_ubicacion(instancia, indice=None):
+    """Completa ``departamento_canonico`` y ``ciudad_canonica`` desde el texto libre."""
+    if not instancia.departamento and not instancia.ciudad:
+        instancia.departamento_canonico_id = instancia.ciudad_canonica_id = None
+        return
+    indice = indice or IndiceUbicaciones(crear=True)
+    departamento_id = indice.departamento(instancia.departamento) if instancia.departamento else None
+    departamento_id, ciudad_id = indice.ciudad(departamento_id, instancia.ciudad) if instancia.ciudad else (departamento_id, None)
+    instancia.departamento_canonico_id = departamento_id
+    instancia.ciudad_canonica_id = ciudad_id
+
+
+# ============================================================================
+# 🔎 FILTROS
+# ============================================================================
+
+def parametros_ubicacion(datos):
+    """``departamento_id``/``ciudad_id`` presentes en los parámetros de un pedido, como enteros."""
+    ids = {}
+    for campo in ('departamento_id', 'ciudad_id'):
+        if datos.get(campo):
+            try:
+                ids[campo] = int(datos[campo])
+            except (TypeError, ValueError):
+                raise ValueError(f'{campo} debe ser un número entero')
+    return ids
+
+
+def ids_filtro(filtros):
+    """
+    ``(departamento_ids, ciudad_ids)`` pedidos en ``filtros``: None si no se
+    filtra por ese nivel y lista vacía si el texto no corresponde a ningún
+    lugar. Acepta ``departamento_id``/``ciudad_id`` o el texto
+    ``departamento``/``ciudad``.
+    """
+    indice = None
+    departamento_ids = ciudad_ids = None
+    if filtros.get('departamento_id'):
+        departamento_ids = [int(filtros['departamento_id'])]
+    elif filtros.get('departamento'):
+        indice = IndiceUbicaciones()
+        departamento_id = indice.departamento(filtros['departamento'])
+        departamento_ids = [departamento_id] if departamento_id else []
+    if filtros.get('ciudad_id'):
+        ciudad_ids = [int(filtros['ciudad_id'])]
+    elif filtros.get('ciudad'):
+        indice = indice or IndiceUbicaciones()
+        ciudad_ids = indice.ids_ciudad(filtros['ciudad'], departamento_ids)
+    return departamento_ids, ciudad_ids
+
+
+def filtro_ubicacion(filtros, *prefijos):
+    """
+    ``Q`` sobre las FK canónicas para los filtros de ubicación. Con varios
+    prefijos (p. ej. ``'paquete__'`` y ``'servicio__'``) basta con que
+    coincida uno. Sin filtros de ubicación retorna ``Q()``.
+    """
+    departamento_ids, ciudad_ids = ids_filtro(filtros)
+    if departamento_ids is None and ciudad_ids is None:
+        return Q()
+    prefijos = prefijos or ('',)
+    condicion = Q(pk__in=[])
+    for prefijo in prefijos:
+        rama = Q()
+        if departamento_ids is not None:
+            rama &= Q(**{f'{prefijo}departamento_canonico_id__in': departamento_ids})
+        if ciudad_ids is not None:
+            rama &= Q(**{f'{prefijo}ciudad_canonica_id__in': ciudad_ids})
+        condicion |= rama
+    return condicion
+
+
+# ============================================================================
+# 🔁 NORMALIZACIÓN (filas existentes e inserciones masivas)
+# ============================================================================
+
+def normalizar_ubicaciones(todo=False, umbral=UMBRAL_SIMILITUD):
+    """
+    Asigna las FK canónicas a servicios y paquetes. Sin ``todo`` solo procesa
+    filas con texto y sin FK. Los pares se resuelven de más a menos
+    frecuente, así la escritura más usada queda como nombre canónico de las
+    ciudades nuevas. Retorna filas actualizadas por modelo.
+    """
+    indice = IndiceUbicaciones(crear=True, umbral=umbral)
+    resultado = {}
+    for modelo in (Servicio, Paquete):
+        queryset = modelo.objects.all()
+        if not todo:
+            queryset = queryset.filter(
+                (Q(departamento_canonico__isnull=True) & ~Q(departamento__isnull=True) & ~Q(departamento=''))
+                | (Q(ciudad_canonica__isnull=True) & ~Q(ciudad__isnull=True) & ~Q(ciudad=''))
+            )
+        pares = queryset.order_by().values_list('departamento', 'ciudad').annotate(n=Count('id')).order_by('-n')
+        actualizadas = 0
+        for departamento, ciudad, _ in list(pares):
+            departamento_id = indice.departamento(departamento) if departamento else None
+            departamento_id, ciudad_id = indice.ciudad(departamento_id, ciudad) if ciudad else (departamento_id, None)
+            actualizadas += queryset.filter(departamento=departamento, ciudad=ciudad).update(
+                departamento_canonico_id=departamento_id, ciudad_canonica_id=ciudad_id,
+            )
+        resultado[modelo._meta.model_name] = actualizadas
+    logger.info(f"📍 Ubicaciones normalizadas: {resultado}")
+    return resultado
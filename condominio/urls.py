@@ -9,17 +9,29 @@ from .api import (
     HistorialReprogramacionViewSet, ConfiguracionGlobalReprogramacionViewSet,
     ReprogramacionViewSet, TicketViewSet, TicketMessageViewSet, NotificacionViewSet,
     PerfilUsuarioViewSet, SoportePanelViewSet, FCMDeviceViewSet, CampanaNotificacionViewSet, ReservaMultiServicioView,
-    PlanViewSet
+    PlanViewSet, DepartamentoViewSet
 )
 from .api import BitacoraViewSet
 
 # 🎤📊 Importar endpoints de reportes avanzados (CU19 y CU20)
 from .views_reportes import (
     procesar_comando_ia,
+    estadisticas_ia,
     obtener_datos_graficas,
     generar_reporte_ventas,
     generar_reporte_clientes,
-    generar_reporte_productos
+    generar_reporte_productos,
+    snapshots_analiticos,
+    descargar_snapshot_analitico,
+    segmentos_clientes,
+    cohortes_retencion,
+    tendencias_dashboard,
+    metricas_proveedor,
+    cubo_ventas,
+    pronosticos_demanda,
+    suscripciones_reportes,
+    suscripcion_reporte_detalle,
+    descargar_reporte_programado,
 )
 
 router = routers.DefaultRouter()
@@ -50,6 +62,7 @@ router.register(r'soporte-panel', SoportePanelViewSet, basename='soporte-panel')
 router.register(r'proveedores', ProveedorViewSet, basename='proveedores')
 router.register(r'suscripciones', SuscripcionViewSet, basename='suscripciones')
 router.register(r'planes', PlanViewSet, basename='planes')
+router.register(r'departamentos', DepartamentoViewSet, basename='departamentos')
 
 
 urlpatterns = router.urls + [
@@ -57,6 +70,7 @@ urlpatterns = router.urls + [
     
     # 🎤 CU19: Reportes Avanzados con Comandos de Voz + IA
     path('reportes/ia/procesar/', procesar_comando_ia, name='procesar-comando-ia'),
+    path('reportes/ia/estadisticas/', estadisticas_ia, name='estadisticas-ia'),
     
     # 📊 CU20: API de Gráficas Interactivas
     path('reportes/graficas/', obtener_datos_graficas, name='obtener-datos-graficas'),
@@ -66,6 +80,34 @@ urlpatterns = router.urls + [
     path('reportes/ventas/', generar_reporte_ventas, name='generar-reporte-ventas'),
     path('reportes/clientes/', generar_reporte_clientes, name='generar-reporte-clientes'),
     path('reportes/productos/', generar_reporte_productos, name='generar-reporte-productos'),
+
+    # 🗄️ Snapshots analíticos (Parquet/Arrow) para analistas
+    path('reportes/snapshots/', snapshots_analiticos, name='snapshots-analiticos'),
+    path('reportes/snapshots/<str:nombre>/', descargar_snapshot_analitico, name='descargar-snapshot-analitico'),
+
+    # 🎯 Segmentación RFM de clientes
+    path('reportes/segmentos/', segmentos_clientes, name='segmentos-clientes'),
+
+    # 📈 Cohortes y retención de clientes
+    path('reportes/cohortes/', cohortes_retencion, name='cohortes-retencion'),
+
+    # 📉 Tendencias con comparación vs. periodo anterior y año anterior
+    path('reportes/tendencias/', tendencias_dashboard, name='tendencias-dashboard'),
+
+    # 🧊 Cubo de ventas: dimensiones × medidas con subtotales (GROUPING SETS)
+    path('reportes/cubo/', cubo_ventas, name='cubo-ventas'),
+
+    # 🏪 Panel de métricas del proveedor (según su plan)
+    path('reportes/proveedor/metricas/', metricas_proveedor, name='metricas-proveedor'),
+
+    # 🔮 Pronóstico de demanda por paquete y servicio (tabla precalculada)
+    path('reportes/pronosticos/', pronosticos_demanda, name='pronosticos-demanda'),
+
+    # 📬 Reportes programados: suscripciones y descarga de lo entregado
+    path('reportes/suscripciones/', suscripciones_reportes, name='suscripciones-reportes'),
+    path('reportes/suscripciones/<int:suscripcion_id>/', suscripcion_reporte_detalle, name='suscripcion-reporte-detalle'),
+    path('reportes/programados/<int:reporte_id>/descargar/', descargar_reporte_programado,
+         name='descargar-reporte-programado'),
     # Aceptar con o sin barra final para evitar 404 en POST sin slash
     path('reservas-multiservicio/', ReservaMultiServicioView.as_view(), name='reserva-multiservicio'),
     re_path(r'^reservas-multiservicio/?$', ReservaMultiServicioView.as_view()),
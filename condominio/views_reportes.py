@@ -6,27 +6,38 @@ CU20 - API de Gráficas Interactivas
 Implementado: v2.3.0
 """
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
 from rest_framework import status
 from django.db.models import Sum, Count, Avg, Q, F, Max, Min, Case, When, DecimalField, Value
 from django.utils import timezone
-from django.http import HttpResponse, JsonResponse
+from django.http import HttpResponse, JsonResponse, FileResponse, Http404
 from datetime import datetime, timedelta
 from decimal import Decimal
 from typing import Dict, List, Any, Optional
 import json
+import tempfile
 
-from .models import Reserva, Pago, Usuario, Servicio, Paquete, Visitante
-from .ia_processor import ReportesIAProcessor
+from .models import (
+    Reserva, Pago, Usuario, Servicio, Paquete, Visitante, SegmentoCliente, PronosticoDemanda,
+    SuscripcionReporte, ReporteGenerado, Notificacion, Departamento,
+)
+from .ia_processor import obtener_procesador, estadisticas_cache_ia
 from .reportes import InterpretadorComandosVoz
-from .export_utils import exportar_reporte_pdf, exportar_reporte_excel, exportar_reporte_docx
+from .export_utils import exportar_reporte_pdf, exportar_reporte_excel, exportar_reporte_docx, exportar_reporte_bundle
+from .dataset_reportes import dataset_ventas, dataset_clientes, dataset_productos
+from .tendencias import serie_tendencia
+from .tasas_cambio import campo_monto, tasa_para
+from .cache_reportes import obtener_o_calcular
+from .ubicaciones import filtro_ubicacion, parametros_ubicacion
+from .presupuestos_consulta import presupuesto_consultas
 
 
 # ============================================================================
 # 🎤 ENDPOINT: Procesar Comando de Voz con IA
 # ============================================================================
 
+@presupuesto_consultas('reportes')
 @api_view(['POST'])
 @permission_classes([])
 def procesar_comando_ia(request):
@@ -57,7 +68,8 @@ def procesar_comando_ia(request):
         },
         "respuesta_texto": "Generaré un reporte de ventas de Santa Cruz del mes pasado en Excel",
         "confianza": 0.95,
-        "usando_ia": true
+        "usando_ia": true,
+        "desde_cache": false
     }
     
     Versión: 2.3.0
@@ -79,9 +91,10 @@ def procesar_comando_ia(request):
         
         contexto = request.data.get('contexto', 'reportes')
         
-        # Procesar con IA
-        processor = ReportesIAProcessor()
+        # Procesar con IA (procesador único; repite comandos desde la caché)
+        processor = obtener_procesador()
         resultado = processor.procesar_comando(comando, contexto)
+        resultado.setdefault('desde_cache', False)
         
         # Agregar información adicional
         usando_ia = processor.client is not None
@@ -109,10 +122,22 @@ def procesar_comando_ia(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def estadisticas_ia(request):
+    """
+    GET /api/reportes/ia/estadisticas/
+
+    Tasa de aciertos de la caché de interpretaciones de la IA.
+    """
+    return Response({'success': True, **estadisticas_cache_ia()})
+
+
 # ============================================================================
 # 📊 ENDPOINT: Obtener Datos para Gráficas Interactivas
 # ============================================================================
 
+@presupuesto_consultas('reportes')
 @api_view(['POST'])
 def obtener_datos_graficas(request):
     """
@@ -169,7 +194,8 @@ def obtener_datos_graficas(request):
             {"tipo": "recurrente", "cantidad": 67, "porcentaje": 42.9}
         ],
         "tendencia_mensual": [
-            {"mes": "2025-01", "ventas": 12500, "reservas": 28, "crecimiento": 15.3},
+            {"mes": "2025-01", "ventas": 12500, "reservas": 28, "crecimiento": 15.3,
+             "ventas_anio_anterior": 10400, "crecimiento_anual": 20.2},
             ...
         ]
     }
@@ -177,333 +203,12 @@ def obtener_datos_graficas(request):
     Versión: 2.3.0
     """
     try:
-        # Extraer filtros del request
-        filtros = request.data
-        
-        fecha_inicio = filtros.get('fecha_inicio')
-        fecha_fin = filtros.get('fecha_fin')
-        departamento = filtros.get('departamento')
-        moneda = filtros.get('moneda', 'BOB')
-        tipo_cliente = filtros.get('tipo_cliente')
-        
-        # Validar moneda
-        if moneda not in ['BOB', 'USD']:
-            moneda = 'BOB'
-        
-        # Tasa de conversión BOB -> USD
-        TASA_CAMBIO = Decimal('6.96')
-        
-        # Query base de reservas
-        queryset = Reserva.objects.filter(
-            estado__in=['CONFIRMADA', 'COMPLETADA', 'PAGADA']
-        )
-        
-        # Aplicar filtro de fechas
-        if fecha_inicio:
-            try:
-                fecha_inicio_dt = datetime.strptime(fecha_inicio, '%Y-%m-%d').date()
-                queryset = queryset.filter(fecha__gte=fecha_inicio_dt)
-            except ValueError:
-                pass
-        else:
-            # Por defecto: último año
-            fecha_inicio_dt = (timezone.now() - timedelta(days=365)).date()
-            queryset = queryset.filter(fecha__gte=fecha_inicio_dt)
-            fecha_inicio = fecha_inicio_dt.strftime('%Y-%m-%d')
-        
-        if fecha_fin:
-            try:
-                fecha_fin_dt = datetime.strptime(fecha_fin, '%Y-%m-%d').date()
-                queryset = queryset.filter(fecha__lte=fecha_fin_dt)
-            except ValueError:
-                pass
-        else:
-            fecha_fin_dt = timezone.now().date()
-            fecha_fin = fecha_fin_dt.strftime('%Y-%m-%d')
-        
-        # Aplicar filtro de departamento
-        if departamento:
-            queryset = queryset.filter(
-                Q(paquete__departamento__iexact=departamento) |
-                Q(servicio__departamento__iexact=departamento)
-            )
-        
-        # Aplicar filtro de tipo de cliente
-        if tipo_cliente:
-            if tipo_cliente == 'nuevo':
-                # Clientes con solo 1 reserva
-                queryset = queryset.annotate(
-                    num_reservas=Count('usuario__reserva')
-                ).filter(num_reservas=1)
-            elif tipo_cliente == 'recurrente':
-                # Clientes con 2-5 reservas
-                queryset = queryset.annotate(
-                    num_reservas=Count('usuario__reserva')
-                ).filter(num_reservas__gte=2, num_reservas__lte=5)
-            elif tipo_cliente == 'vip':
-                # Clientes con 6+ reservas
-                queryset = queryset.annotate(
-                    num_reservas=Count('usuario__reserva')
-                ).filter(num_reservas__gte=6)
-        
-        # ========== MÉTRICAS PRINCIPALES ==========
-        
-        metricas_query = queryset.aggregate(
-            total_ventas=Sum('total'),
-            total_reservas=Count('id'),
-            promedio_venta=Avg('total'),
-            total_clientes=Count('usuario', distinct=True)
-        )
-        
-        total_ventas = metricas_query['total_ventas'] or Decimal('0')
-        total_reservas = metricas_query['total_reservas'] or 0
-        promedio_venta = metricas_query['promedio_venta'] or Decimal('0')
-        total_clientes = metricas_query['total_clientes'] or 0
-        
-        # Convertir a moneda solicitada
-        if moneda == 'USD':
-            total_ventas = total_ventas / TASA_CAMBIO
-            promedio_venta = promedio_venta / TASA_CAMBIO
-        
-        # Calcular tasa de conversión (reservas confirmadas / total clientes)
-        tasa_conversion = (total_reservas / total_clientes * 100) if total_clientes > 0 else 0
-        
-        metricas = {
-            'total_ventas': float(round(total_ventas, 2)),
-            'total_reservas': total_reservas,
-            'promedio_venta': float(round(promedio_venta, 2)),
-            'total_clientes': total_clientes,
-            'tasa_conversion': round(tasa_conversion, 2)
-        }
-        
-        # ========== VENTAS POR MES ==========
-        
-        ventas_mes = queryset.values('fecha__year', 'fecha__month').annotate(
-            total=Sum('total'),
-            cantidad=Count('id')
-        ).order_by('fecha__year', 'fecha__month')
-        
-        meses_nombres = {
-            1: 'Enero', 2: 'Febrero', 3: 'Marzo', 4: 'Abril',
-            5: 'Mayo', 6: 'Junio', 7: 'Julio', 8: 'Agosto',
-            9: 'Septiembre', 10: 'Octubre', 11: 'Noviembre', 12: 'Diciembre'
-        }
-        
-        ventas_por_mes = []
-        for item in ventas_mes:
-            año = item['fecha__year']
-            mes = item['fecha__month']
-            total = item['total'] or Decimal('0')
-            
-            if moneda == 'USD':
-                total = total / TASA_CAMBIO
-            
-            ventas_por_mes.append({
-                'mes': f"{año}-{mes:02d}",
-                'mes_nombre': f"{meses_nombres[mes]} {año}",
-                'total': float(round(total, 2)),
-                'cantidad': item['cantidad']
-            })
-        
-        # ========== VENTAS POR DEPARTAMENTO ==========
-        
-        # Ventas de paquetes por departamento
-        ventas_paquetes_dept = queryset.filter(
-            paquete__isnull=False
-        ).values('paquete__departamento').annotate(
-            total=Sum('total')
-        )
-        
-        # Ventas de servicios por departamento
-        ventas_servicios_dept = queryset.filter(
-            servicio__isnull=False
-        ).values('servicio__departamento').annotate(
-            total=Sum('total')
+        filtros = normalizar_filtros_graficas(request.data)
+        respuesta, desde_cache = obtener_o_calcular(
+            'graficas', filtros, lambda: calcular_datos_graficas(filtros),
+            refrescar=bool(request.data.get('refrescar')),
         )
-        
-        # Combinar ambos
-        departamentos_dict = {}
-        
-        for item in ventas_paquetes_dept:
-            dept = item['paquete__departamento'] or 'Sin especificar'
-            departamentos_dict[dept] = departamentos_dict.get(dept, Decimal('0')) + (item['total'] or Decimal('0'))
-        
-        for item in ventas_servicios_dept:
-            dept = item['servicio__departamento'] or 'Sin especificar'
-            departamentos_dict[dept] = departamentos_dict.get(dept, Decimal('0')) + (item['total'] or Decimal('0'))
-        
-        # Convertir a lista y calcular porcentajes
-        ventas_por_departamento = []
-        total_general = sum(departamentos_dict.values())
-        
-        for dept, total in sorted(departamentos_dict.items(), key=lambda x: x[1], reverse=True):
-            if moneda == 'USD':
-                total = total / TASA_CAMBIO
-            
-            porcentaje = (total / total_general * 100) if total_general > 0 else 0
-            
-            ventas_por_departamento.append({
-                'departamento': dept,
-                'total': float(round(total, 2)),
-                'porcentaje': round(porcentaje, 2)
-            })
-        
-        # ========== PRODUCTOS MÁS VENDIDOS ==========
-        
-        # Paquetes más vendidos
-        paquetes_vendidos = queryset.filter(paquete__isnull=False).values(
-            'paquete__id', 'paquete__nombre'
-        ).annotate(
-            total_ventas=Sum('total'),
-            cantidad_vendida=Count('id'),
-            promedio=Avg('total')
-        ).order_by('-total_ventas')[:10]
-        
-        # Servicios más vendidos
-        servicios_vendidos = queryset.filter(servicio__isnull=False).values(
-            'servicio__id', 'servicio__nombre'
-        ).annotate(
-            total_ventas=Sum('total'),
-            cantidad_vendida=Count('id'),
-            promedio=Avg('total')
-        ).order_by('-total_ventas')[:10]
-        
-        productos_mas_vendidos = []
-        
-        for item in paquetes_vendidos:
-            total = item['total_ventas'] or Decimal('0')
-            promedio = item['promedio'] or Decimal('0')
-            
-            if moneda == 'USD':
-                total = total / TASA_CAMBIO
-                promedio = promedio / TASA_CAMBIO
-            
-            productos_mas_vendidos.append({
-                'id': item['paquete__id'],
-                'nombre': item['paquete__nombre'],
-                'tipo': 'paquete',
-                'total_ventas': float(round(total, 2)),
-                'cantidad_vendida': item['cantidad_vendida'],
-                'promedio': float(round(promedio, 2))
-            })
-        
-        for item in servicios_vendidos:
-            total = item['total_ventas'] or Decimal('0')
-            promedio = item['promedio'] or Decimal('0')
-            
-            if moneda == 'USD':
-                total = total / TASA_CAMBIO
-                promedio = promedio / TASA_CAMBIO
-            
-            productos_mas_vendidos.append({
-                'id': item['servicio__id'],
-                'nombre': item['servicio__nombre'],
-                'tipo': 'servicio',
-                'total_ventas': float(round(total, 2)),
-                'cantidad_vendida': item['cantidad_vendida'],
-                'promedio': float(round(promedio, 2))
-            })
-        
-        # Ordenar por total_ventas y tomar top 10
-        productos_mas_vendidos = sorted(
-            productos_mas_vendidos,
-            key=lambda x: x['total_ventas'],
-            reverse=True
-        )[:10]
-        
-        # ========== TIPOS DE CLIENTE ==========
-        
-        # Clasificar clientes por número de reservas
-        clientes_con_reservas = Usuario.objects.annotate(
-            num_reservas=Count('reservas', filter=Q(
-                reservas__fecha__gte=fecha_inicio_dt,
-                reservas__fecha__lte=fecha_fin_dt,
-                reservas__estado__in=['CONFIRMADA', 'COMPLETADA', 'PAGADA']
-            ))
-        ).filter(num_reservas__gt=0)
-        
-        nuevos = clientes_con_reservas.filter(num_reservas=1).count()
-        recurrentes = clientes_con_reservas.filter(num_reservas__gte=2, num_reservas__lte=5).count()
-        vip = clientes_con_reservas.filter(num_reservas__gte=6).count()
-        
-        total_clasificados = nuevos + recurrentes + vip
-        
-        tipos_cliente = []
-        if total_clasificados > 0:
-            tipos_cliente = [
-                {
-                    'tipo': 'nuevo',
-                    'cantidad': nuevos,
-                    'porcentaje': round(nuevos / total_clasificados * 100, 2)
-                },
-                {
-                    'tipo': 'recurrente',
-                    'cantidad': recurrentes,
-                    'porcentaje': round(recurrentes / total_clasificados * 100, 2)
-                },
-                {
-                    'tipo': 'vip',
-                    'cantidad': vip,
-                    'porcentaje': round(vip / total_clasificados * 100, 2)
-                }
-            ]
-        
-        # ========== TENDENCIA MENSUAL ==========
-        
-        tendencia_mensual = []
-        ventas_mes_lista = list(ventas_mes)
-        
-        for i, item in enumerate(ventas_mes_lista):
-            año = item['fecha__year']
-            mes = item['fecha__month']
-            total = item['total'] or Decimal('0')
-            cantidad = item['cantidad']
-            
-            if moneda == 'USD':
-                total = total / TASA_CAMBIO
-            
-            # Calcular crecimiento respecto al mes anterior
-            crecimiento = 0.0
-            if i > 0:
-                total_anterior = ventas_mes_lista[i-1]['total'] or Decimal('0')
-                if total_anterior > 0:
-                    if moneda == 'USD':
-                        total_anterior = total_anterior / TASA_CAMBIO
-                    crecimiento = ((total - total_anterior) / total_anterior * 100)
-            
-            tendencia_mensual.append({
-                'mes': f"{año}-{mes:02d}",
-                'mes_nombre': f"{meses_nombres[mes]} {año}",
-                'ventas': float(round(total, 2)),
-                'reservas': cantidad,
-                'crecimiento': round(crecimiento, 2)
-            })
-        
-        # ========== RESPUESTA FINAL ==========
-        
-        respuesta = {
-            'success': True,
-            'moneda': moneda,
-            'tasa_cambio': float(TASA_CAMBIO) if moneda == 'USD' else None,
-            'periodo': {
-                'fecha_inicio': fecha_inicio,
-                'fecha_fin': fecha_fin
-            },
-            'filtros_aplicados': {
-                'departamento': departamento,
-                'tipo_cliente': tipo_cliente
-            },
-            'metricas': metricas,
-            'ventas_por_mes': ventas_por_mes,
-            'ventas_por_departamento': ventas_por_departamento,
-            'productos_mas_vendidos': productos_mas_vendidos,
-            'tipos_cliente': tipos_cliente,
-            'tendencia_mensual': tendencia_mensual
-        }
-        
-        print(f"✅ Datos de gráficas generados: {total_reservas} reservas, {moneda}")
-        
-        return Response(respuesta, status=status.HTTP_200_OK)
+        return Response({**respuesta, 'desde_cache': desde_cache}, status=status.HTTP_200_OK)
         
     except Exception as e:
         print(f"❌ Error en obtener_datos_graficas: {e}")
@@ -516,10 +221,336 @@ def obtener_datos_graficas(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+def normalizar_filtros_graficas(datos) -> Dict[str, Any]:
+    """
+    Filtros de las gráficas con valores por defecto resueltos (último año,
+    moneda BOB). Dos pedidos equivalentes producen el mismo dict y por lo
+    tanto la misma clave de caché.
+    """
+    hoy = timezone.localdate()
+
+    def _fecha(valor, defecto):
+        try:
+            return datetime.strptime(valor, '%Y-%m-%d').date().isoformat()
+        except (TypeError, ValueError):
+            return defecto.isoformat()
+
+    moneda = datos.get('moneda', 'BOB')
+    return {
+        'fecha_inicio': _fecha(datos.get('fecha_inicio'), hoy - timedelta(days=365)),
+        'fecha_fin': _fecha(datos.get('fecha_fin'), hoy),
+        'departamento': datos.get('departamento') or None,
+        'departamento_id': parametros_ubicacion(datos).get('departamento_id'),
+        'moneda': moneda if moneda in ('BOB', 'USD') else 'BOB',
+        'tipo_cliente': datos.get('tipo_cliente') or None,
+    }
+
+
+def calcular_datos_graficas(filtros: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Calcula todas las series del dashboard para filtros ya normalizados
+    (ver ``normalizar_filtros_graficas``). Sin caché: la usa la vista y el
+    precalentamiento programado.
+    """
+    fecha_inicio = filtros.get('fecha_inicio')
+    fecha_fin = filtros.get('fecha_fin')
+    moneda = filtros.get('moneda', 'BOB')
+    tipo_cliente = filtros.get('tipo_cliente')
+
+    # Validar moneda
+    if moneda not in ['BOB', 'USD']:
+        moneda = 'BOB'
+
+    # Montos normalizados a la moneda solicitada al guardar (tasas_cambio)
+    campo = campo_monto(moneda)
+
+    # Query base de reservas
+    queryset = Reserva.objects.filter(
+        estado__in=['CONFIRMADA', 'COMPLETADA', 'PAGADA']
+    )
+
+    # Aplicar filtro de departamento (FK canónica, ver ubicaciones.py)
+    queryset = queryset.filter(filtro_ubicacion(filtros, 'paquete__', 'servicio__'))
+
+    # Aplicar filtro de tipo de cliente (tabla precalculada de segmentos RFM)
+    if tipo_cliente in ('nuevo', 'recurrente', 'vip'):
+        queryset = queryset.filter(cliente__segmento_rfm__tipo_cliente=tipo_cliente)
+
+    # Las series de tendencia comparan contra el año anterior: necesitan
+    # el queryset con todos los filtros excepto el rango de fechas
+    queryset_tendencia = queryset
+
+    # Aplicar filtro de fechas
+    if fecha_inicio:
+        try:
+            fecha_inicio_dt = datetime.strptime(fecha_inicio, '%Y-%m-%d').date()
+            queryset = queryset.filter(fecha__gte=fecha_inicio_dt)
+        except ValueError:
+            pass
+    else:
+        # Por defecto: último año
+        fecha_inicio_dt = (timezone.now() - timedelta(days=365)).date()
+        queryset = queryset.filter(fecha__gte=fecha_inicio_dt)
+        fecha_inicio = fecha_inicio_dt.strftime('%Y-%m-%d')
+
+    if fecha_fin:
+        try:
+            fecha_fin_dt = datetime.strptime(fecha_fin, '%Y-%m-%d').date()
+            queryset = queryset.filter(fecha__lte=fecha_fin_dt)
+        except ValueError:
+            pass
+    else:
+        fecha_fin_dt = timezone.now().date()
+        fecha_fin = fecha_fin_dt.strftime('%Y-%m-%d')
+
+    # ========== MÉTRICAS PRINCIPALES ==========
+
+    metricas_query = queryset.aggregate(
+        total_ventas=Sum(campo),
+        total_reservas=Count('id'),
+        promedio_venta=Avg(campo),
+        total_clientes=Count('cliente', distinct=True)
+    )
+
+    total_ventas = metricas_query['total_ventas'] or Decimal('0')
+    total_reservas = metricas_query['total_reservas'] or 0
+    promedio_venta = metricas_query['promedio_venta'] or Decimal('0')
+    total_clientes = metricas_query['total_clientes'] or 0
+
+    # Calcular tasa de conversión (reservas confirmadas / total clientes)
+    tasa_conversion = (total_reservas / total_clientes * 100) if total_clientes > 0 else 0
+
+    metricas = {
+        'total_ventas': float(round(total_ventas, 2)),
+        'total_reservas': total_reservas,
+        'promedio_venta': float(round(promedio_venta, 2)),
+        'total_clientes': total_clientes,
+        'tasa_conversion': round(tasa_conversion, 2)
+    }
+
+    # ========== VENTAS POR MES ==========
+
+    ventas_mes = queryset.values('fecha__year', 'fecha__month').annotate(
+        total=Sum(campo),
+        cantidad=Count('id')
+    ).order_by('fecha__year', 'fecha__month')
+
+    meses_nombres = {
+        1: 'Enero', 2: 'Febrero', 3: 'Marzo', 4: 'Abril',
+        5: 'Mayo', 6: 'Junio', 7: 'Julio', 8: 'Agosto',
+        9: 'Septiembre', 10: 'Octubre', 11: 'Noviembre', 12: 'Diciembre'
+    }
+
+    ventas_por_mes = []
+    for item in ventas_mes:
+        año = item['fecha__year']
+        mes = item['fecha__month']
+        total = item['total'] or Decimal('0')
+        ventas_por_mes.append({
+            'mes': f"{año}-{mes:02d}",
+            'mes_nombre': f"{meses_nombres[mes]} {año}",
+            'total': float(round(total, 2)),
+            'cantidad': item['cantidad']
+        })
+
+    # ========== VENTAS POR DEPARTAMENTO ==========
+
+    # Ventas de paquetes y de servicios agrupadas por id de departamento canónico
+    ventas_paquetes_dept = queryset.filter(
+        paquete__isnull=False
+    ).values_list('paquete__departamento_canonico_id').annotate(
+        total=Sum(campo)
+    ).order_by()
+
+    ventas_servicios_dept = queryset.filter(
+        servicio__isnull=False
+    ).values_list('servicio__departamento_canonico_id').annotate(
+        total=Sum(campo)
+    ).order_by()
+
+    # Combinar ambos
+    totales_dept = {}
+    for dept_id, total in [*ventas_paquetes_dept, *ventas_servicios_dept]:
+        totales_dept[dept_id] = totales_dept.get(dept_id, Decimal('0')) + (total or Decimal('0'))
+
+    nombres_dept = dict(Departamento.objects.filter(id__in=[d for d in totales_dept if d]).values_list('id', 'nombre'))
+    departamentos_dict = {}
+    for dept_id, total in totales_dept.items():
+        dept = nombres_dept.get(dept_id, 'Sin especificar')
+        departamentos_dict[dept] = departamentos_dict.get(dept, Decimal('0')) + total
+
+    # Convertir a lista y calcular porcentajes
+    ventas_por_departamento = []
+    total_general = sum(departamentos_dict.values())
+
+    for dept, total in sorted(departamentos_dict.items(), key=lambda x: x[1], reverse=True):
+        porcentaje = (total / total_general * 100) if total_general > 0 else 0
+    
+        ventas_por_departamento.append({
+            'departamento': dept,
+            'total': float(round(total, 2)),
+            'porcentaje': round(porcentaje, 2)
+        })
+
+    # ========== PRODUCTOS MÁS VENDIDOS ==========
+
+    # Paquetes más vendidos
+    paquetes_vendidos = queryset.filter(paquete__isnull=False).values(
+        'paquete__id', 'paquete__nombre'
+    ).annotate(
+        total_ventas=Sum(campo),
+        cantidad_vendida=Count('id'),
+        promedio=Avg(campo)
+    ).order_by('-total_ventas')[:10]
+
+    # Servicios más vendidos
+    servicios_vendidos = queryset.filter(servicio__isnull=False).values(
+        'servicio__id', 'servicio__titulo'
+    ).annotate(
+        total_ventas=Sum(campo),
+        cantidad_vendida=Count('id'),
+        promedio=Avg(campo)
+    ).order_by('-total_ventas')[:10]
+
+    productos_mas_vendidos = []
+
+    for item in paquetes_vendidos:
+        total = item['total_ventas'] or Decimal('0')
+        promedio = item['promedio'] or Decimal('0')
+        productos_mas_vendidos.append({
+            'id': item['paquete__id'],
+            'nombre': item['paquete__nombre'],
+            'tipo': 'paquete',
+            'total_ventas': float(round(total, 2)),
+            'cantidad_vendida': item['cantidad_vendida'],
+            'promedio': float(round(promedio, 2))
+        })
+
+    for item in servicios_vendidos:
+        total = item['total_ventas'] or Decimal('0')
+        promedio = item['promedio'] or Decimal('0')
+        productos_mas_vendidos.append({
+            'id': item['servicio__id'],
+            'nombre': item['servicio__titulo'],
+            'tipo': 'servicio',
+            'total_ventas': float(round(total, 2)),
+            'cantidad_vendida': item['cantidad_vendida'],
+            'promedio': float(round(promedio, 2))
+        })
+
+    # Ordenar por total_ventas y tomar top 10
+    productos_mas_vendidos = sorted(
+        productos_mas_vendidos,
+        key=lambda x: x['total_ventas'],
+        reverse=True
+    )[:10]
+
+    # ========== TIPOS DE CLIENTE ==========
+
+    # Clientes activos en el periodo, clasificados por la tabla de segmentos RFM
+    conteo_tipos = dict(
+        SegmentoCliente.objects.filter(
+            usuario__reservas__fecha__gte=fecha_inicio_dt,
+            usuario__reservas__fecha__lte=fecha_fin_dt,
+            usuario__reservas__estado__in=['CONFIRMADA', 'COMPLETADA', 'PAGADA'],
+        )
+        .order_by()
+        .values_list('tipo_cliente')
+        .annotate(cantidad=Count('usuario', distinct=True))
+    )
+    nuevos = conteo_tipos.get('nuevo', 0)
+    recurrentes = conteo_tipos.get('recurrente', 0)
+    vip = conteo_tipos.get('vip', 0)
+
+    total_clasificados = nuevos + recurrentes + vip
+
+    tipos_cliente = []
+    if total_clasificados > 0:
+        tipos_cliente = [
+            {
+                'tipo': 'nuevo',
+                'cantidad': nuevos,
+                'porcentaje': round(nuevos / total_clasificados * 100, 2)
+            },
+            {
+                'tipo': 'recurrente',
+                'cantidad': recurrentes,
+                'porcentaje': round(recurrentes / total_clasificados * 100, 2)
+            },
+            {
+                'tipo': 'vip',
+                'cantidad': vip,
+                'porcentaje': round(vip / total_clasificados * 100, 2)
+            }
+        ]
+
+    # ========== TENDENCIA MENSUAL ==========
+
+    # Series calculadas en la base de datos (relleno de meses vacíos,
+    # crecimiento vs. mes anterior y vs. el mismo mes del año pasado)
+    serie_ventas = serie_tendencia(queryset_tendencia, 'ventas', 'month', fecha_inicio_dt, fecha_fin_dt, moneda)
+    serie_reservas = serie_tendencia(queryset_tendencia, 'reservas', 'month', fecha_inicio_dt, fecha_fin_dt, moneda)
+
+    tendencia_mensual = []
+    for punto_ventas, punto_reservas in zip(serie_ventas['puntos'], serie_reservas['puntos']):
+        año, mes = int(punto_ventas['periodo'][:4]), int(punto_ventas['periodo'][5:7])
+        tendencia_mensual.append({
+            'mes': f"{año}-{mes:02d}",
+            'mes_nombre': f"{meses_nombres[mes]} {año}",
+            'ventas': punto_ventas['valor'],
+            'reservas': punto_reservas['valor'],
+            'crecimiento': punto_ventas['crecimiento'] or 0.0,
+            'ventas_anio_anterior': punto_ventas['anio_anterior'],
+            'crecimiento_anual': punto_ventas['crecimiento_anual'],
+        })
+
+    # ========== RESPUESTA FINAL ==========
+
+    respuesta = {
+        'success': True,
+        'moneda': moneda,
+        'tasa_cambio': float(tasa_para(fecha_fin_dt)) if moneda == 'USD' else None,
+        'periodo': {
+            'fecha_inicio': fecha_inicio,
+            'fecha_fin': fecha_fin
+        },
+        'filtros_aplicados': {
+            'departamento': filtros.get('departamento'),
+            'tipo_cliente': tipo_cliente
+        },
+        'metricas': metricas,
+        'ventas_por_mes': ventas_por_mes,
+        'ventas_por_departamento': ventas_por_departamento,
+        'productos_mas_vendidos': productos_mas_vendidos,
+        'tipos_cliente': tipos_cliente,
+        'tendencia_mensual': tendencia_mensual
+    }
+
+    print(f"✅ Datos de gráficas generados: {total_reservas} reservas, {moneda}")
+
+    return respuesta
+
+
+
 # ============================================================================
 # 📄 ENDPOINTS: Generar Reportes Descargables
 # ============================================================================
 
+def _dataset_compartido(tipo, filtros, calcular):
+    """
+    Dataset del reporte pasando por la caché compartida con un TTL corto
+    (``REPORTES_DATASET_TTL``): descargas idénticas simultáneas consultan la
+    base una sola vez; cada una renderiza su archivo.
+    """
+    from django.conf import settings
+
+    dataset, _ = obtener_o_calcular(
+        f'dataset_{tipo}', filtros, calcular, ttl=getattr(settings, 'REPORTES_DATASET_TTL', 120), stale=0,
+    )
+    return dataset
+
+
+@presupuesto_consultas('reportes')
 @api_view(['GET'])
 def generar_reporte_ventas(request):
     """
@@ -528,10 +559,11 @@ def generar_reporte_ventas(request):
     Genera y descarga reporte de ventas en formato PDF, Excel o DOCX.
     
     Query Parameters:
-        - formato: pdf | excel | docx (default: pdf)
+        - formato: pdf | excel | docx | zip (default: pdf; zip incluye los tres)
         - fecha_inicio: YYYY-MM-DD
         - fecha_fin: YYYY-MM-DD
-        - departamento: string
+        - departamento: string (se empareja con el departamento canónico)
+        - departamento_id: id de departamento canónico
         - moneda: BOB | USD (default: BOB)
         - monto_minimo: número
         - monto_maximo: número
@@ -556,6 +588,7 @@ def generar_reporte_ventas(request):
             'fecha_fin': fecha_fin,
             'departamento': departamento,
             'moneda': moneda,
+            **parametros_ubicacion(request.GET),
         }
         
         if monto_minimo:
@@ -563,58 +596,47 @@ def generar_reporte_ventas(request):
         if monto_maximo:
             filtros['monto_maximo'] = float(monto_maximo)
         
-        # Query de reservas
-        queryset = Reserva.objects.filter(
-            estado__in=['CONFIRMADA', 'COMPLETADA', 'PAGADA']
-        ).select_related('cliente', 'paquete', 'servicio')
-        
-        # Aplicar filtros
-        if fecha_inicio:
-            queryset = queryset.filter(fecha__gte=fecha_inicio)
-        if fecha_fin:
-            queryset = queryset.filter(fecha__lte=fecha_fin)
-        if departamento:
-            queryset = queryset.filter(
-                Q(paquete__departamento__iexact=departamento) |
-                Q(servicio__departamento__iexact=departamento)
-            )
-        
-        # Preparar datos
-        datos = []
-        for reserva in queryset:
-            datos.append({
-                'fecha': reserva.fecha.strftime('%d/%m/%Y'),
-                'cliente': reserva.cliente.nombre if reserva.cliente else 'N/A',
-                'producto': reserva.paquete.nombre if reserva.paquete else (reserva.servicio.titulo if reserva.servicio else 'N/A'),
-                'tipo': 'Paquete' if reserva.paquete else 'Servicio',
-                'monto': float(reserva.total),
-                'estado': reserva.estado
-            })
+        # Filas y métricas calculadas en la base de datos (un solo dataset para los 3 formatos)
+        dataset = _dataset_compartido('ventas', filtros, lambda: dataset_ventas(filtros))
         
-        print(f"📊 Reporte Ventas - Total reservas encontradas: {queryset.count()}")
-        print(f"📊 Reporte Ventas - Datos preparados: {len(datos)} registros")
+        print(f"📊 Reporte Ventas - Datos preparados: {len(dataset)} registros")
         print(f"📊 Filtros aplicados: {filtros}")
         
         # Generar reporte según formato
         if formato == 'pdf':
-            archivo = exportar_reporte_pdf(datos, 'ventas', filtros)
-            response = HttpResponse(archivo, content_type='application/pdf')
-            response['Content-Disposition'] = f'attachment; filename="reporte_ventas_{timezone.now().strftime("%Y%m%d")}.pdf"'
+            # El PDF se escribe a un archivo temporal y se envía por streaming
+            archivo = exportar_reporte_pdf(dataset, destino=tempfile.TemporaryFile())
+            response = FileResponse(
+                archivo,
+                as_attachment=True,
+                filename=f'reporte_ventas_{timezone.now().strftime("%Y%m%d")}.pdf',
+                content_type='application/pdf'
+            )
         elif formato == 'excel':
-            archivo = exportar_reporte_excel(datos, 'ventas', filtros)
+            archivo = exportar_reporte_excel(dataset)
             response = HttpResponse(archivo, content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
             response['Content-Disposition'] = f'attachment; filename="reporte_ventas_{timezone.now().strftime("%Y%m%d")}.xlsx"'
         elif formato == 'docx':
-            archivo = exportar_reporte_docx(datos, 'ventas', filtros)
-            response = HttpResponse(archivo, content_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document')
-            response['Content-Disposition'] = f'attachment; filename="reporte_ventas_{timezone.now().strftime("%Y%m%d")}.docx"'
+            # Igual que el PDF: se escribe a un archivo temporal y se envía por streaming
+            archivo = exportar_reporte_docx(dataset, destino=tempfile.TemporaryFile())
+            response = FileResponse(
+                archivo,
+                as_attachment=True,
+                filename=f'reporte_ventas_{timezone.now().strftime("%Y%m%d")}.docx',
+                content_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+            )
+        elif formato in ('zip', 'bundle'):
+            # PDF + Excel + DOCX del mismo dataset, renderizados en paralelo
+            archivo = exportar_reporte_bundle(dataset)
+            response = HttpResponse(archivo, content_type='application/zip')
+            response['Content-Disposition'] = f'attachment; filename="reporte_ventas_{timezone.now().strftime("%Y%m%d")}.zip"'
         else:
             return Response({
                 'success': False,
-                'error': 'Formato no soportado. Use: pdf, excel o docx'
+                'error': 'Formato no soportado. Use: pdf, excel, docx o zip'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        print(f"✅ Reporte de ventas generado: {formato}, {len(datos)} registros")
+        print(f"✅ Reporte de ventas generado: {formato}, {len(dataset)} registros")
         return response
         
     except Exception as e:
@@ -626,6 +648,7 @@ def generar_reporte_ventas(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@presupuesto_consultas('reportes')
 @api_view(['GET'])
 @permission_classes([])
 def generar_reporte_clientes(request):
@@ -671,106 +694,54 @@ def generar_reporte_clientes(request):
         else:
             estados_validos = ['CONFIRMADA', 'COMPLETADA', 'PAGADA']
 
-        # Query de usuarios con reservas
-        filtros_reserva_clientes = Q(reservas__estado__in=estados_validos)
-        if fecha_inicio:
-            filtros_reserva_clientes &= Q(reservas__fecha__gte=fecha_inicio)
-        if fecha_fin:
-            filtros_reserva_clientes &= Q(reservas__fecha__lte=fecha_fin)
-        # Filtro por ubicación (aplica a paquete o servicio de la reserva)
-        if departamento:
-            filtros_reserva_clientes &= (
-                Q(reservas__paquete__departamento__icontains=departamento) |
-                Q(reservas__servicio__departamento__icontains=departamento)
-            )
-        if ciudad:
-            filtros_reserva_clientes &= (
-                Q(reservas__paquete__ciudad__icontains=ciudad) |
-                Q(reservas__servicio__ciudad__icontains=ciudad)
-            )
-        
-        usuarios = Usuario.objects.annotate(
-            num_reservas=Count('reservas', filter=filtros_reserva_clientes),
-            reservas_pagadas=Count('reservas', filter=filtros_reserva_clientes & Q(reservas__estado='PAGADA')),
-            reservas_confirmadas=Count('reservas', filter=filtros_reserva_clientes & Q(reservas__estado='CONFIRMADA')),
-            reservas_completadas=Count('reservas', filter=filtros_reserva_clientes & Q(reservas__estado='COMPLETADA')),
-            ultima_compra=Max('reservas__fecha', filter=filtros_reserva_clientes),
-            # Total gastado en USD (convirtiendo BOB)
-            total_gastado_usd=Sum(
-                Case(
-                    When(reservas__moneda='USD', then=F('reservas__total')),
-                    When(reservas__moneda='BOB', then=F('reservas__total') / 6.96),
-                    default=0,
-                    output_field=DecimalField()
-                ),
-                filter=filtros_reserva_clientes
-            ),
-            # Total gastado en BOB (convirtiendo USD)
-            total_gastado_bob=Sum(
-                Case(
-                    When(reservas__moneda='BOB', then=F('reservas__total')),
-                    When(reservas__moneda='USD', then=F('reservas__total') * 6.96),
-                    default=0,
-                    output_field=DecimalField()
-                ),
-                filter=filtros_reserva_clientes
-            )
-        ).filter(num_reservas__gt=0)
-        
-        # Filtrar por tipo
-        if tipo_cliente == 'nuevo':
-            usuarios = usuarios.filter(num_reservas=1)
-        elif tipo_cliente == 'recurrente':
-            usuarios = usuarios.filter(num_reservas__gte=2, num_reservas__lte=5)
-        elif tipo_cliente == 'vip':
-            usuarios = usuarios.filter(num_reservas__gte=6)
-        
-        # Preparar datos
-        datos = []
-        for usuario in usuarios:
-            datos.append({
-                'nombre': usuario.nombre,
-                'email': usuario.user.email if usuario.user else 'N/A',
-                'num_reservas': usuario.num_reservas,
-                'reservas_pagadas': getattr(usuario, 'reservas_pagadas', 0) or 0,
-                'reservas_confirmadas': getattr(usuario, 'reservas_confirmadas', 0) or 0,
-                'reservas_completadas': getattr(usuario, 'reservas_completadas', 0) or 0,
-                'ultima_compra': getattr(usuario, 'ultima_compra', None),
-                'total_gastado_usd': float(usuario.total_gastado_usd or 0),
-                'total_gastado_bob': float(usuario.total_gastado_bob or 0),
-                'tipo': 'VIP' if usuario.num_reservas >= 6 else ('Recurrente' if usuario.num_reservas >= 2 else 'Nuevo')
-            })
-        
         filtros = {
             'tipo_cliente': tipo_cliente,
             'moneda': moneda,
             'fecha_inicio': fecha_inicio,
             'fecha_fin': fecha_fin,
-            'estado': ','.join(estados_validos),
             'departamento': departamento,
-            'ciudad': ciudad
+            'ciudad': ciudad,
+            **parametros_ubicacion(request.GET),
         }
+        dataset = _dataset_compartido(
+            'clientes', {**filtros, 'estados': estados_validos}, lambda: dataset_clientes(filtros, estados_validos)
+        )
         
         # Generar según formato
         if formato == 'pdf':
-            archivo = exportar_reporte_pdf(datos, 'clientes', filtros)
-            response = HttpResponse(archivo, content_type='application/pdf')
-            response['Content-Disposition'] = f'attachment; filename="reporte_clientes_{timezone.now().strftime("%Y%m%d")}.pdf"'
+            # El PDF se escribe a un archivo temporal y se envía por streaming
+            archivo = exportar_reporte_pdf(dataset, destino=tempfile.TemporaryFile())
+            response = FileResponse(
+                archivo,
+                as_attachment=True,
+                filename=f'reporte_clientes_{timezone.now().strftime("%Y%m%d")}.pdf',
+                content_type='application/pdf'
+            )
         elif formato == 'excel':
-            archivo = exportar_reporte_excel(datos, 'clientes', filtros)
+            archivo = exportar_reporte_excel(dataset)
             response = HttpResponse(archivo, content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
             response['Content-Disposition'] = f'attachment; filename="reporte_clientes_{timezone.now().strftime("%Y%m%d")}.xlsx"'
         elif formato == 'docx':
-            archivo = exportar_reporte_docx(datos, 'clientes', filtros)
-            response = HttpResponse(archivo, content_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document')
-            response['Content-Disposition'] = f'attachment; filename="reporte_clientes_{timezone.now().strftime("%Y%m%d")}.docx"'
+            # Igual que el PDF: se escribe a un archivo temporal y se envía por streaming
+            archivo = exportar_reporte_docx(dataset, destino=tempfile.TemporaryFile())
+            response = FileResponse(
+                archivo,
+                as_attachment=True,
+                filename=f'reporte_clientes_{timezone.now().strftime("%Y%m%d")}.docx',
+                content_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+            )
+        elif formato in ('zip', 'bundle'):
+            # PDF + Excel + DOCX del mismo dataset, renderizados en paralelo
+            archivo = exportar_reporte_bundle(dataset)
+            response = HttpResponse(archivo, content_type='application/zip')
+            response['Content-Disposition'] = f'attachment; filename="reporte_clientes_{timezone.now().strftime("%Y%m%d")}.zip"'
         else:
             return Response({
                 'success': False,
                 'error': 'Formato no soportado'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        print(f"✅ Reporte de clientes generado: {formato}, {len(datos)} registros")
+        print(f"✅ Reporte de clientes generado: {formato}, {len(dataset)} registros")
         return response
         
     except Exception as e:
@@ -782,6 +753,7 @@ def generar_reporte_clientes(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@presupuesto_consultas('reportes')
 @api_view(['GET'])
 def generar_reporte_productos(request):
     """
@@ -800,159 +772,54 @@ def generar_reporte_productos(request):
         departamento = request.GET.get('departamento')
         ciudad = request.GET.get('ciudad')
         
-        datos = []
-        
-        # Filtros para contar reservas (se aplican en annotate)
-        filtros_reserva = Q(reservas__estado__in=['CONFIRMADA', 'COMPLETADA', 'PAGADA'])
-        if fecha_inicio:
-            filtros_reserva &= Q(reservas__fecha__gte=fecha_inicio)
-        if fecha_fin:
-            filtros_reserva &= Q(reservas__fecha__lte=fecha_fin)
-        
-        # Paquetes
-        if not tipo_producto or tipo_producto == 'paquete':
-            paquetes_qs = Paquete.objects.prefetch_related('servicios__categoria')
-            
-            # Filtrar por ubicación (estos filtros SÍ existen en Paquete)
-            if departamento:
-                paquetes_qs = paquetes_qs.filter(departamento__icontains=departamento)
-            if ciudad:
-                paquetes_qs = paquetes_qs.filter(ciudad__icontains=ciudad)
-            
-            paquetes = paquetes_qs.annotate(
-                num_ventas=Count('reservas', filter=filtros_reserva),
-                total_reservas=Count('reservas'),  # Total de reservas (incluyendo canceladas)
-                # Ventas en USD: sumar las que están en USD + convertir las de BOB
-                total_ventas_usd=Sum(
-                    Case(
-                        When(reservas__moneda='USD', then=F('reservas__total')),
-                        When(reservas__moneda='BOB', then=F('reservas__total') / 6.96),
-                        default=0,
-                        output_field=DecimalField()
-                    ),
-                    filter=filtros_reserva
-                ),
-                # Ventas en BOB: sumar las que están en BOB + convertir las de USD
-                total_ventas_bob=Sum(
-                    Case(
-                        When(reservas__moneda='BOB', then=F('reservas__total')),
-                        When(reservas__moneda='USD', then=F('reservas__total') * 6.96),
-                        default=0,
-                        output_field=DecimalField()
-                    ),
-                    filter=filtros_reserva
-                )
-            ).filter(num_ventas__gt=0).order_by('-total_ventas_usd')
-            
-            for paquete in paquetes:
-                # Obtener categoría del primer servicio del paquete
-                categoria_nombre = 'Paquete Turístico'
-                primer_servicio = paquete.servicios.first()
-                if primer_servicio and primer_servicio.categoria:
-                    categoria_nombre = primer_servicio.categoria.nombre
-                
-                # Calcular tasa de conversión: ventas confirmadas / total reservas
-                tasa_conversion = (paquete.num_ventas / paquete.total_reservas * 100) if paquete.total_reservas > 0 else 0
-                
-                datos.append({
-                    'nombre': paquete.nombre,
-                    'tipo': 'Paquete',
-                    'categoria': categoria_nombre,
-                    'departamento': paquete.departamento or 'N/A',
-                    'precio': float(paquete.precio_base),
-                    'num_ventas': paquete.num_ventas,
-                    'total_ventas_usd': float(paquete.total_ventas_usd or 0),
-                    'total_ventas_bob': float(paquete.total_ventas_bob or 0),
-                    'tasa_conversion': round(tasa_conversion, 1)
-                })
-        
-        # Servicios
-        if not tipo_producto or tipo_producto == 'servicio':
-            servicios_qs = Servicio.objects.select_related('categoria')
-            
-            # Filtrar por ubicación
-            if departamento:
-                servicios_qs = servicios_qs.filter(departamento__icontains=departamento)
-            if ciudad:
-                servicios_qs = servicios_qs.filter(ciudad__icontains=ciudad)
-            
-            servicios = servicios_qs.annotate(
-                num_ventas=Count('reservas', filter=filtros_reserva),
-                total_reservas=Count('reservas'),  # Total de reservas (incluyendo canceladas)
-                # Ventas en USD
-                total_ventas_usd=Sum(
-                    Case(
-                        When(reservas__moneda='USD', then=F('reservas__total')),
-                        When(reservas__moneda='BOB', then=F('reservas__total') / 6.96),
-                        default=0,
-                        output_field=DecimalField()
-                    ),
-                    filter=filtros_reserva
-                ),
-                # Ventas en BOB
-                total_ventas_bob=Sum(
-                    Case(
-                        When(reservas__moneda='BOB', then=F('reservas__total')),
-                        When(reservas__moneda='USD', then=F('reservas__total') * 6.96),
-                        default=0,
-                        output_field=DecimalField()
-                    ),
-                    filter=filtros_reserva
-                )
-            ).filter(num_ventas__gt=0).order_by('-total_ventas_usd')
-            
-            for servicio in servicios:
-                # Calcular tasa de conversión: ventas confirmadas / total reservas
-                tasa_conversion = (servicio.num_ventas / servicio.total_reservas * 100) if servicio.total_reservas > 0 else 0
-                
-                datos.append({
-                    'nombre': servicio.titulo,
-                    'tipo': 'Servicio',
-                    'categoria': servicio.categoria.nombre if servicio.categoria else 'N/A',
-                    'departamento': servicio.departamento or 'N/A',
-                    'precio': float(servicio.precio_usd),
-                    'num_ventas': servicio.num_ventas,
-                    'total_ventas_usd': float(servicio.total_ventas_usd or 0),
-                    'total_ventas_bob': float(servicio.total_ventas_bob or 0),
-                    'tasa_conversion': round(tasa_conversion, 1)
-                })
-        
-        # Ordenar por total_ventas_usd
-        datos = sorted(datos, key=lambda x: x['total_ventas_usd'], reverse=True)
-        
-        print(f"📦 Reporte Productos - Total productos encontrados: {len(datos)}")
-        print(f"📦 Primeros 3 productos: {datos[:3] if datos else 'VACÍO'}")
-        
-        # Construir filtros completos para el reporte
         filtros = {
             'tipo_producto': tipo_producto,
             'moneda': moneda,
             'fecha_inicio': fecha_inicio,
             'fecha_fin': fecha_fin,
             'departamento': departamento,
-            'ciudad': ciudad
+            'ciudad': ciudad,
+            **parametros_ubicacion(request.GET),
         }
+        dataset = _dataset_compartido('productos', filtros, lambda: dataset_productos(filtros))
+        
+        print(f"📦 Reporte Productos - Total productos encontrados: {len(dataset)}")
         
         # Generar según formato
         if formato == 'pdf':
-            archivo = exportar_reporte_pdf(datos, 'productos', filtros)
-            response = HttpResponse(archivo, content_type='application/pdf')
-            response['Content-Disposition'] = f'attachment; filename="reporte_productos_{timezone.now().strftime("%Y%m%d")}.pdf"'
+            # El PDF se escribe a un archivo temporal y se envía por streaming
+            archivo = exportar_reporte_pdf(dataset, destino=tempfile.TemporaryFile())
+            response = FileResponse(
+                archivo,
+                as_attachment=True,
+                filename=f'reporte_productos_{timezone.now().strftime("%Y%m%d")}.pdf',
+                content_type='application/pdf'
+            )
         elif formato == 'excel':
-            archivo = exportar_reporte_excel(datos, 'productos', filtros)
+            archivo = exportar_reporte_excel(dataset)
             response = HttpResponse(archivo, content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
             response['Content-Disposition'] = f'attachment; filename="reporte_productos_{timezone.now().strftime("%Y%m%d")}.xlsx"'
         elif formato == 'docx':
-            archivo = exportar_reporte_docx(datos, 'productos', filtros)
-            response = HttpResponse(archivo, content_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document')
-            response['Content-Disposition'] = f'attachment; filename="reporte_productos_{timezone.now().strftime("%Y%m%d")}.docx"'
+            # Igual que el PDF: se escribe a un archivo temporal y se envía por streaming
+            archivo = exportar_reporte_docx(dataset, destino=tempfile.TemporaryFile())
+            response = FileResponse(
+                archivo,
+                as_attachment=True,
+                filename=f'reporte_productos_{timezone.now().strftime("%Y%m%d")}.docx',
+                content_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+            )
+        elif formato in ('zip', 'bundle'):
+            # PDF + Excel + DOCX del mismo dataset, renderizados en paralelo
+            archivo = exportar_reporte_bundle(dataset)
+            response = HttpResponse(archivo, content_type='application/zip')
+            response['Content-Disposition'] = f'attachment; filename="reporte_productos_{timezone.now().strftime("%Y%m%d")}.zip"'
         else:
             return Response({
                 'success': False,
                 'error': 'Formato no soportado'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        print(f"✅ Reporte de productos generado: {formato}, {len(datos)} registros")
+        print(f"✅ Reporte de productos generado: {formato}, {len(dataset)} registros")
         return response
         
     except Exception as e:
@@ -964,3 +831,622 @@ def generar_reporte_productos(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+
+# ============================================================================
+# 🗄️ ENDPOINT: Snapshots analíticos columnares (Parquet/Arrow)
+# ============================================================================
+
+@presupuesto_consultas('reportes')
+@api_view(['GET', 'POST'])
+@permission_classes([IsAdminUser])
+def snapshots_analiticos(request):
+    """
+    GET  /api/reportes/snapshots/  → lista archivos generados y marcas de agua
+    POST /api/reportes/snapshots/  → genera un snapshot (incremental por defecto)
+
+    Request Body (POST, opcional):
+    {
+        "datasets": ["reservas", "pagos"],   // por defecto todos
+        "completo": false                     // true ignora las marcas de agua
+    }
+
+    Solo administradores. Los analistas deben consumir estos archivos en vez
+    de paginar la API transaccional.
+    """
+    from .snapshots import exportar_snapshot, listar_snapshots, leer_marcas_agua, formato_disponible
+
+    if request.method == 'GET':
+        return Response({
+            'success': True,
+            'formato': formato_disponible(),
+            'marcas_agua': leer_marcas_agua(),
+            'archivos': listar_snapshots(),
+        })
+
+    try:
+        resultado = exportar_snapshot(
+            datasets=request.data.get('datasets'),
+            incremental=not request.data.get('completo', False),
+        )
+        return Response({'success': True, **resultado}, status=status.HTTP_201_CREATED)
+    except ValueError as e:
+        return Response({'success': False, 'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        print(f"❌ Error en snapshots_analiticos: {e}")
+        return Response({
+            'success': False,
+            'error': 'Error al generar snapshot',
+            'detalle': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def descargar_snapshot_analitico(request, nombre):
+    """
+    GET /api/reportes/snapshots/<nombre>/
+
+    Descarga un archivo de snapshot generado previamente.
+    """
+    from .snapshots import SNAPSHOT_DIR, ARCHIVO_MARCAS
+
+    ruta = (SNAPSHOT_DIR / nombre).resolve()
+    if ruta.parent != SNAPSHOT_DIR.resolve() or nombre == ARCHIVO_MARCAS or not ruta.is_file():
+        raise Http404('Snapshot no encontrado')
+    return FileResponse(open(ruta, 'rb'), as_attachment=True, filename=ruta.name)
+
+
+# ============================================================================
+# 🎯 ENDPOINT: Segmentación RFM de clientes
+# ============================================================================
+
+@presupuesto_consultas('reportes')
+@api_view(['GET', 'POST'])
+@permission_classes([IsAdminUser])
+def segmentos_clientes(request):
+    """
+    GET  /api/reportes/segmentos/  → conteo de clientes por tipo y por segmento
+    POST /api/reportes/segmentos/  → recalcula la tabla ahora (además del job nocturno)
+    """
+    from .segmentacion import recalcular_segmentos, resumen_segmentos
+
+    try:
+        if request.method == 'GET':
+            return Response({'success': True, **resumen_segmentos()})
+        return Response({'success': True, **recalcular_segmentos()})
+    except Exception as e:
+        print(f"❌ Error en segmentos_clientes: {e}")
+        return Response({
+            'success': False,
+            'error': 'Error al obtener segmentos de clientes',
+            'detalle': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+# ============================================================================
+# 📈 ENDPOINT: Cohortes y retención de clientes
+# ============================================================================
+
+@presupuesto_consultas('reportes')
+@api_view(['GET'])
+def cohortes_retencion(request):
+    """
+    GET /api/reportes/cohortes/
+
+    Agrupa a los clientes por el mes de su primera reserva y calcula qué
+    porcentaje vuelve a reservar en cada mes posterior.
+
+    Query Parameters:
+        - desde: primera cohorte 'YYYY-MM' (opcional)
+        - hasta: última cohorte 'YYYY-MM' (opcional)
+        - meses: periodos a mostrar por cohorte (default: 12, máx: 36)
+        - refrescar: 'true' para ignorar la caché del día
+
+    Response:
+    {
+        "success": true,
+        "cohortes": [
+            {"cohorte": "2025-01", "tamano": 120,
+             "retencion": [{"periodo": 0, "clientes": 120, "porcentaje": 100.0}, ...]}
+        ],
+        "retencion_promedio": [{"periodo": 1, "porcentaje": 18.5}, ...],
+        "desde_cache": true
+    }
+    """
+    from .cohortes import obtener_retencion, MESES_POR_DEFECTO
+
+    try:
+        desde = request.GET.get('desde')
+        hasta = request.GET.get('hasta')
+        for valor in (desde, hasta):
+            if valor:
+                datetime.strptime(valor, '%Y-%m')
+        meses = min(int(request.GET.get('meses', MESES_POR_DEFECTO)), 36)
+        if meses < 0:
+            raise ValueError('meses debe ser positivo')
+    except ValueError as e:
+        return Response({
+            'success': False,
+            'error': "Parámetros inválidos (desde/hasta: 'YYYY-MM', meses: entero)",
+            'detalle': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        refrescar = request.GET.get('refrescar', '').lower() in ('1', 'true', 'si')
+        resultado, desde_cache = obtener_retencion(desde, hasta, meses, refrescar=refrescar)
+        return Response({'success': True, **resultado, 'desde_cache': desde_cache})
+    except Exception as e:
+        print(f"❌ Error en cohortes_retencion: {e}")
+        return Response({
+            'success': False,
+            'error': 'Error al calcular cohortes de retención',
+            'detalle': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+# ============================================================================
+# 📉 ENDPOINT: Tendencias con comparación de periodos
+# ============================================================================
+
+@presupuesto_consultas('reportes')
+@api_view(['GET'])
+def tendencias_dashboard(request):
+    """
+    GET /api/reportes/tendencias/
+
+    Series de tendencia con valor del periodo anterior y del mismo periodo
+    del año pasado, más los crecimientos porcentuales.
+
+    Query Parameters:
+        - metricas: 'ventas,reservas,clientes' (default: 'ventas,reservas')
+        - granularidad: 'day', 'week' o 'month' (default: 'month')
+        - fecha_inicio / fecha_fin: YYYY-MM-DD (default: últimos 12 meses)
+        - moneda: 'BOB' o 'USD' (default: 'BOB')
+        - departamento: filtra por departamento del paquete o servicio
+        - departamento_id: ídem por id de departamento canónico
+
+    Response:
+    {
+        "success": true,
+        "series": {
+            "ventas": {
+                "puntos": [{"periodo": "2025-01-01", "valor": 12500.0, "periodo_anterior": 10850.0,
+                            "anio_anterior": 9800.0, "crecimiento": 15.21, "crecimiento_anual": 27.55}, ...],
+                "resumen": {"total": 150000.0, "total_anio_anterior": 120000.0, "crecimiento_anual": 25.0}
+            }
+        }
+    }
+    """
+    from .tendencias import METRICAS, MAX_PUNTOS, contar_puntos, normalizar_granularidad
+
+    try:
+        granularidad = normalizar_granularidad(request.GET.get('granularidad'))
+        metricas = [m.strip().lower() for m in request.GET.get('metricas', 'ventas,reservas').split(',') if m.strip()]
+        invalidas = [m for m in metricas if m not in METRICAS]
+        if invalidas or not metricas:
+            raise ValueError(f"Métricas no soportadas: {', '.join(invalidas) or '(vacío)'}")
+
+        fecha_fin = request.GET.get('fecha_fin')
+        fecha_fin_dt = datetime.strptime(fecha_fin, '%Y-%m-%d').date() if fecha_fin else timezone.localdate()
+        fecha_inicio = request.GET.get('fecha_inicio')
+        fecha_inicio_dt = (
+            datetime.strptime(fecha_inicio, '%Y-%m-%d').date() if fecha_inicio
+            else fecha_fin_dt - timedelta(days=365)
+        )
+        if fecha_inicio_dt > fecha_fin_dt:
+            raise ValueError('fecha_inicio debe ser anterior a fecha_fin')
+        if contar_puntos(fecha_inicio_dt, fecha_fin_dt, granularidad) > MAX_PUNTOS:
+            raise ValueError(f'El rango genera más de {MAX_PUNTOS} puntos; use una granularidad mayor')
+    except ValueError as e:
+        return Response({
+            'success': False,
+            'error': 'Parámetros inválidos',
+            'detalle': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        moneda = request.GET.get('moneda', 'BOB').upper()
+        if moneda not in ('BOB', 'USD'):
+            moneda = 'BOB'
+
+        queryset = Reserva.objects.filter(estado__in=['CONFIRMADA', 'COMPLETADA', 'PAGADA'])
+        queryset = queryset.filter(filtro_ubicacion(
+            {'departamento': request.GET.get('departamento'), **parametros_ubicacion(request.GET)},
+            'paquete__', 'servicio__',
+        ))
+
+        series = {}
+        for metrica in metricas:
+            serie = serie_tendencia(queryset, metrica, granularidad, fecha_inicio_dt, fecha_fin_dt, moneda)
+            series[metrica] = {'puntos': serie['puntos'], 'resumen': serie['resumen']}
+
+        return Response({
+            'success': True,
+            'granularidad': granularidad,
+            'moneda': moneda,
+            'periodo': {
+                'fecha_inicio': fecha_inicio_dt.isoformat(),
+                'fecha_fin': fecha_fin_dt.isoformat()
+            },
+            'series': series,
+        })
+    except Exception as e:
+        print(f"❌ Error en tendencias_dashboard: {e}")
+        return Response({
+            'success': False,
+            'error': 'Error al calcular tendencias',
+            'detalle': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+# ============================================================================
+# 🧊 ENDPOINT: Cubo de ventas (dimensiones × medidas con subtotales)
+# ============================================================================
+
+@presupuesto_consultas('reportes')
+@api_view(['GET'])
+def cubo_ventas(request):
+    """
+    GET /api/reportes/cubo/
+
+    Cortes arbitrarios de las ventas en una sola consulta GROUPING SETS
+    (ver cubo_ventas.py) en lugar de un endpoint por combinación.
+
+    Query Parameters:
+        - dimensiones: lista separada por comas (ej: departamento,mes)
+          departamento, ciudad, mes, anio, tipo_producto, paquete, servicio,
+          categoria, tipo_destino, moneda, estado (máx. 4)
+        - medidas: reservas, clientes, ventas_bob, ventas_usd,
+          ticket_promedio_bob, ticket_promedio_usd (default: reservas,ventas_bob)
+        - subtotales: rollup (default), cubo, ninguno
+        - fecha_inicio / fecha_fin: 'YYYY-MM-DD' (opcional)
+        - estados: lista separada por comas (default: estados de venta)
+        - departamento, departamento_id, moneda: filtros opcionales
+        - refrescar: 'true' para ignorar la caché
+
+    Response:
+    {
+        "success": true,
+        "dimensiones": ["departamento", "mes"],
+        "medidas": ["reservas", "ventas_bob"],
+        "subtotales": "rollup",
+        "filas": [
+            {"departamento": "La Paz", "mes": "2025-01", "reservas": 12, "ventas_bob": 8400.0,
+             "agrupado_por": ["departamento", "mes"], "subtotal": false},
+            {"departamento": "La Paz", "mes": null, ..., "agrupado_por": ["departamento"], "subtotal": true},
+            {"departamento": null, "mes": null, ..., "agrupado_por": [], "subtotal": true}
+        ],
+        "total_filas": 3,
+        "desde_cache": false
+    }
+    """
+    from .cubo_ventas import CuboDemasiadoGrande, calcular_cubo, validar_consulta
+
+    def _lista(nombre, defecto=''):
+        return [v.strip() for v in request.GET.get(nombre, defecto).split(',') if v.strip()]
+
+    try:
+        dimensiones = _lista('dimensiones')
+        medidas = _lista('medidas', 'reservas,ventas_bob')
+        modo = request.GET.get('subtotales', 'rollup')
+        validar_consulta(dimensiones, medidas, modo)
+
+        filtros = {}
+        for campo in ('fecha_inicio', 'fecha_fin'):
+            if request.GET.get(campo):
+                filtros[campo] = datetime.strptime(request.GET[campo], '%Y-%m-%d').date().isoformat()
+        estados = _lista('estados')
+        invalidos = [e for e in estados if e not in dict(Reserva.ESTADOS)]
+        if invalidos:
+            raise ValueError(f"Estados no válidos: {', '.join(invalidos)}")
+        if estados:
+            filtros['estados'] = sorted(estados)
+        if request.GET.get('departamento'):
+            filtros['departamento'] = request.GET['departamento']
+        filtros.update(parametros_ubicacion(request.GET))
+        if request.GET.get('moneda'):
+            filtros['moneda'] = request.GET['moneda'].upper()
+    except ValueError as e:
+        return Response({
+            'success': False,
+            'error': 'Parámetros inválidos',
+            'detalle': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        forma = {'dimensiones': dimensiones, 'medidas': medidas, 'subtotales': modo, 'filtros': filtros}
+        resultado, desde_cache = obtener_o_calcular(
+            'cubo_ventas', forma, lambda: calcular_cubo(dimensiones, medidas, modo, filtros),
+            refrescar=request.GET.get('refrescar', '').lower() == 'true',
+        )
+        return Response({'success': True, **resultado, 'desde_cache': desde_cache})
+    except CuboDemasiadoGrande as e:
+        return Response({
+            'success': False,
+            'error': 'Resultado demasiado grande',
+            'detalle': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        print(f"❌ Error en cubo_ventas: {e}")
+        return Response({
+            'success': False,
+            'error': 'Error al calcular el cubo de ventas',
+            'detalle': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+# ============================================================================
+# 🏪 ENDPOINT: Panel de métricas del proveedor
+# ============================================================================
+
+@presupuesto_consultas('reportes')
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def metricas_proveedor(request):
+    """
+    GET /api/reportes/proveedor/metricas/
+
+    Reservas, ingresos, ocupación y cancelaciones de los servicios y paquetes
+    del proveedor autenticado, por mes. Se lee de la tabla precalculada
+    ``MetricaProveedor`` (job nocturno), nunca de ``Reserva``.
+
+    El contenido depende del plan vigente del proveedor:
+        - estadisticas_basicas: resumen y serie mensual
+        - panel_metricas_avanzado: además desglose por producto con ocupación
+    Sin plan que incluya métricas responde 403. ``cuotas`` trae el uso y los
+    límites del plan (ver cuotas.py).
+
+    Query Parameters:
+        - desde: primer mes 'YYYY-MM' (default: 11 meses antes de 'hasta')
+        - hasta: último mes 'YYYY-MM' (default: mes actual)
+        - proveedor_id: solo administradores, Usuario del proveedor a consultar
+    """
+    from .cuotas import uso_plan
+    from .metricas_proveedor import (
+        MESES_POR_DEFECTO, NIVEL_AVANZADO, metricas_de_proveedor, nivel_metricas, plan_vigente, restar_meses,
+    )
+
+    try:
+        hasta = request.GET.get('hasta')
+        hasta_dt = datetime.strptime(hasta, '%Y-%m').date() if hasta else timezone.localdate().replace(day=1)
+        desde = request.GET.get('desde')
+        desde_dt = (
+            datetime.strptime(desde, '%Y-%m').date() if desde
+            else restar_meses(hasta_dt, MESES_POR_DEFECTO - 1)
+        )
+        if desde_dt > hasta_dt:
+            raise ValueError('desde debe ser anterior a hasta')
+    except ValueError as e:
+        return Response({
+            'success': False,
+            'error': 'Parámetros inválidos',
+            'detalle': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    if request.user.is_staff and request.GET.get('proveedor_id'):
+        proveedor = Usuario.objects.filter(pk=request.GET['proveedor_id']).first()
+        nivel = NIVEL_AVANZADO
+    else:
+        proveedor = getattr(request.user, 'perfil', None)
+        nivel = NIVEL_AVANZADO if request.user.is_staff else nivel_metricas(plan_vigente(proveedor))
+
+    if proveedor is None:
+        return Response({
+            'success': False,
+            'error': 'Proveedor no encontrado'
+        }, status=status.HTTP_404_NOT_FOUND)
+    if nivel is None:
+        return Response({
+            'success': False,
+            'error': 'Tu plan no incluye el panel de métricas',
+            'detalle': 'Se requiere un plan vigente con estadisticas_basicas o panel_metricas_avanzado'
+        }, status=status.HTTP_403_FORBIDDEN)
+
+    try:
+        panel = metricas_de_proveedor(proveedor, desde_dt, hasta_dt, nivel=nivel)
+        return Response({
+            'success': True,
+            'proveedor': {'id': proveedor.id, 'nombre': proveedor.nombre},
+            'cuotas': uso_plan(proveedor.id),
+            **panel,
+        })
+    except Exception as e:
+        print(f"❌ Error en metricas_proveedor: {e}")
+        return Response({
+            'success': False,
+            'error': 'Error al obtener métricas del proveedor',
+            'detalle': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+# ============================================================================
+# 🔮 ENDPOINT: Pronóstico de demanda por paquete y servicio
+# ============================================================================
+
+@presupuesto_consultas('reportes')
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def pronosticos_demanda(request):
+    """
+    GET /api/reportes/pronosticos/
+
+    Demanda pronosticada (reservas por día) de paquetes y servicios, leída de
+    la tabla ``PronosticoDemanda`` que recalcula el job nocturno
+    (``manage.py pronosticar_demanda``). Sin ``producto_id`` lista el
+    resumen de cada producto ordenado por demanda total; con ``producto_id``
+    devuelve además la serie diaria.
+
+    Query Parameters:
+        - tipo: 'paquete' o 'servicio'
+        - producto_id: id del paquete o servicio (requiere tipo)
+        - sobre_capacidad: '1' para listar solo productos cuya capacidad es
+          menor a los cupos sugeridos
+        - limite: máximo de productos en el listado (default: 50, máximo: 500)
+    """
+    tipo = request.GET.get('tipo')
+    producto_id = request.GET.get('producto_id')
+    try:
+        if tipo and tipo not in ('paquete', 'servicio'):
+            raise ValueError("tipo debe ser 'paquete' o 'servicio'")
+        if producto_id and not tipo:
+            raise ValueError('producto_id requiere tipo')
+        producto_id = int(producto_id) if producto_id else None
+        limite = min(int(request.GET.get('limite', 50)), 500)
+        if limite < 1:
+            raise ValueError('limite debe ser positivo')
+    except ValueError as e:
+        return Response({
+            'success': False,
+            'error': 'Parámetros inválidos',
+            'detalle': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    resumen = ['tipo_producto', 'producto_id', 'producto_nombre', 'desde', 'demanda_total',
+               'capacidad', 'cupos_sugeridos', 'calculado_en']
+    try:
+        if producto_id is not None:
+            pronostico = PronosticoDemanda.objects.filter(tipo_producto=tipo, producto_id=producto_id).values(
+                *resumen, 'demanda', 'limite_superior'
+            ).first()
+            if pronostico is None:
+                return Response({
+                    'success': False,
+                    'error': 'Sin pronóstico para el producto',
+                    'detalle': 'El producto no tiene reservas en la historia usada o aún no se recalculó'
+                }, status=status.HTTP_404_NOT_FOUND)
+            inicio = pronostico.pop('desde')
+            serie = [
+                {'fecha': (inicio + timedelta(days=i)).isoformat(), 'demanda': demanda, 'limite_superior': superior}
+                for i, (demanda, superior) in enumerate(zip(pronostico.pop('demanda'), pronostico.pop('limite_superior')))
+            ]
+            return Response({'success': True, 'desde': inicio.isoformat(), **pronostico, 'serie': serie})
+
+        queryset = PronosticoDemanda.objects.all()
+        if tipo:
+            queryset = queryset.filter(tipo_producto=tipo)
+        if request.GET.get('sobre_capacidad') in ('1', 'true', 'True'):
+            queryset = queryset.filter(cupos_sugeridos__gt=F('capacidad'))
+        productos = list(queryset.order_by('-demanda_total').values(*resumen)[:limite])
+        return Response({'success': True, 'total': len(productos), 'productos': productos})
+    except Exception as e:
+        print(f"❌ Error en pronosticos_demanda: {e}")
+        return Response({
+            'success': False,
+            'error': 'Error al obtener pronósticos de demanda',
+            'detalle': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+# ============================================================================
+# 📬 ENDPOINT: Suscripciones a reportes programados
+# ============================================================================
+
+_CAMPOS_SUSCRIPCION = ['id', 'tipo_reporte', 'formato', 'filtros', 'programacion', 'activa',
+                       'proxima_ejecucion', 'ultima_ejecucion', 'ultimo_reporte_id', 'ultimo_error']
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([IsAuthenticated])
+def suscripciones_reportes(request):
+    """
+    GET  /api/reportes/suscripciones/  → suscripciones del usuario autenticado
+    POST /api/reportes/suscripciones/  → crea una suscripción
+
+    Request Body (POST):
+    {
+        "tipo_reporte": "ventas",                 // ventas | clientes | productos
+        "formato": "pdf",                         // pdf | excel | docx
+        "programacion": "0 6 * * 1",              // cron: minuto hora día mes día_semana (hora local)
+        "filtros": {"periodo": "semana_pasada", "departamento": "Santa Cruz"}
+    }
+
+    El reporte se genera en el horario valle (REPORTES_PROGRAMADOS_HORARIO_VALLE)
+    y llega como notificación con el enlace de descarga (ver reportes_programados.py).
+    """
+    from .reportes_programados import proxima_ejecucion, validar_suscripcion
+
+    perfil = getattr(request.user, 'perfil', None)
+    if perfil is None:
+        return Response({
+            'success': False,
+            'error': 'Usuario sin perfil',
+            'detalle': 'Las suscripciones requieren un perfil de usuario'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    if request.method == 'GET':
+        suscripciones = list(perfil.suscripciones_reportes.order_by('-created_at').values(*_CAMPOS_SUSCRIPCION))
+        return Response({'success': True, 'total': len(suscripciones), 'suscripciones': suscripciones})
+
+    tipo_reporte = request.data.get('tipo_reporte')
+    formato = request.data.get('formato', 'pdf')
+    programacion = request.data.get('programacion', '0 6 * * 1')
+    filtros = request.data.get('filtros') or {}
+    try:
+        validar_suscripcion(tipo_reporte, formato, programacion, filtros)
+        siguiente = proxima_ejecucion(programacion, timezone.now())
+    except ValueError as e:
+        return Response({
+            'success': False,
+            'error': 'Suscripción inválida',
+            'detalle': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        suscripcion = SuscripcionReporte.objects.create(
+            usuario=perfil, tipo_reporte=tipo_reporte, formato=formato,
+            programacion=programacion, filtros=filtros, proxima_ejecucion=siguiente,
+        )
+        datos = SuscripcionReporte.objects.filter(pk=suscripcion.pk).values(*_CAMPOS_SUSCRIPCION).get()
+        return Response({'success': True, 'suscripcion': datos}, status=status.HTTP_201_CREATED)
+    except Exception as e:
+        print(f"❌ Error en suscripciones_reportes: {e}")
+        return Response({
+            'success': False,
+            'error': 'Error al crear la suscripción',
+            'detalle': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['DELETE'])
+@permission_classes([IsAuthenticated])
+def suscripcion_reporte_detalle(request, suscripcion_id):
+    """
+    DELETE /api/reportes/suscripciones/<id>/
+
+    Cancela una suscripción propia. Los reportes ya entregados siguen
+    disponibles desde sus notificaciones.
+    """
+    borradas, _ = SuscripcionReporte.objects.filter(
+        pk=suscripcion_id, usuario__user=request.user
+    ).delete()
+    if not borradas:
+        raise Http404('Suscripción no encontrada')
+    return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def descargar_reporte_programado(request, reporte_id):
+    """
+    GET /api/reportes/programados/<id>/descargar/
+
+    Descarga un reporte programado. Solo administradores o usuarios a los que
+    se les entregó (tienen la notificación con ese reporte).
+    """
+    from .export_utils import EXTENSIONES_BUNDLE
+    from .reportes_programados import almacenamiento
+
+    reporte = ReporteGenerado.objects.filter(pk=reporte_id).first()
+    entregado = reporte is not None and (
+        request.user.is_staff or Notificacion.objects.filter(
+            usuario__user=request.user, tipo='reporte_programado', datos__reporte_id=reporte.id
+        ).exists()
+    )
+    if not entregado:
+        raise Http404('Reporte no encontrado')
+    try:
+        archivo = almacenamiento().open(reporte.archivo, 'rb')
+    except FileNotFoundError:
+        raise Http404('El archivo del reporte ya no está disponible')
+    nombre = f"reporte_{reporte.tipo_reporte}_{timezone.localtime(reporte.generado_en):%Y%m%d_%H%M}.{EXTENSIONES_BUNDLE[reporte.formato]}"
+    return FileResponse(archivo, as_attachment=True, filename=nombre)
@@ -23,6 +23,8 @@ STRIPE_PUBLISHABLE_KEY = os.getenv("STRIPE_PUBLISHABLE_KEY")
 
 # OpenAI API Key para procesamiento de comandos de voz con IA
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+# Segundos que se reutiliza la interpretación de un mismo comando (normalizado)
+IA_CACHE_TTL = int(os.getenv("IA_CACHE_TTL", 24 * 60 * 60))
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -78,6 +80,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Último: ejecuta bajo su presupuesto las vistas que declaran @presupuesto_consultas
+    'condominio.presupuestos_consulta.PresupuestoConsultasMiddleware',
 ]
 
 # CORS
@@ -296,6 +300,81 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
+# Caché compartida (tabla en la base de datos): la usan los workers de Gunicorn
+# y el proceso del scheduler, que precalienta el dashboard y los reportes.
+# Crear la tabla con: python manage.py createcachetable
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'cache_reportes',
+    }
+}
+
+# Segundos que duran los agregados cacheados del dashboard/reportes
+CACHE_DASHBOARD_TTL = int(os.getenv('CACHE_DASHBOARD_TTL', 6 * 60 * 60))
+# Segundos que una entrada vencida se sigue sirviendo mientras un solo pedido la recalcula
+CACHE_STALE_SEGUNDOS = int(os.getenv('CACHE_STALE_SEGUNDOS', 10 * 60))
+# Pedidos idénticos concurrentes: vencimiento del candado del cálculo compartido; también
+# es lo más que espera un pedido antes de tomar el relevo (ver condominio/cache_reportes.py)
+COALESCENCIA_CANDADO_TTL = int(os.getenv('COALESCENCIA_CANDADO_TTL', 120))
+# Segundos que se comparte el dataset de una descarga de reporte (ventas/clientes/productos)
+REPORTES_DATASET_TTL = int(os.getenv('REPORTES_DATASET_TTL', 120))
+
+# Horas (HH:MM, hora local, separadas por coma) del precalentamiento de cachés
+PRECALENTAMIENTO_HORAS = [h.strip() for h in os.getenv('PRECALENTAMIENTO_HORAS', '05:30').split(',') if h.strip()]
+PRECALENTAMIENTO_MONEDAS = [m.strip().upper() for m in os.getenv('PRECALENTAMIENTO_MONEDAS', 'BOB').split(',') if m.strip()]
+
+# Captura de planes (EXPLAIN ANALYZE) de cada consulta de reportes; solo para diagnóstico
+CAPTURA_PLANES_CONSULTA = os.getenv('CAPTURA_PLANES_CONSULTA', '').lower() in ('true', '1', 'si', 'yes')
+# Filas leídas por un Seq Scan a partir de las cuales se marca como problema
+PLANES_UMBRAL_SEQ_SCAN = int(os.getenv('PLANES_UMBRAL_SEQ_SCAN', 10000))
+
+# Máximo de filas (detalle + subtotales) que devuelve el cubo de ventas
+CUBO_MAX_FILAS = int(os.getenv('CUBO_MAX_FILAS', 5000))
+
+# Reportes programados: alias de STORAGES donde se guardan los archivos (vacío:
+# carpeta local REPORTES_PROGRAMADOS_DIR) y ventana para reutilizar un render
+# idéntico ya generado
+REPORTES_PROGRAMADOS_STORAGE = os.getenv('REPORTES_PROGRAMADOS_STORAGE', '')
+REPORTES_PROGRAMADOS_DIR = os.getenv('REPORTES_PROGRAMADOS_DIR', str(BASE_DIR / 'reportes_programados'))
+REPORTES_PROGRAMADOS_REUSO_MINUTOS = int(os.getenv('REPORTES_PROGRAMADOS_REUSO_MINUTOS', 60))
+# Horario valle (hora local, "HH:MM-HH:MM") en el que se renderizan los reportes programados;
+# lo que vence fuera de él espera a que abra. Vacío: a cualquier hora
+REPORTES_PROGRAMADOS_HORARIO_VALLE = os.getenv('REPORTES_PROGRAMADOS_HORARIO_VALLE', '00:00-06:00')
+
+# Snapshots analíticos incrementales: segundos antes de la marca de agua que se vuelven a
+# leer, para no perder filas confirmadas tarde (ver condominio/snapshots.py)
+SNAPSHOT_SOLAPE_SEGUNDOS = int(os.getenv('SNAPSHOT_SOLAPE_SEGUNDOS', 300))
+
+# Usuarios por lote al entregar una campaña de notificaciones (bulk_create + multicast FCM)
+CAMPANA_TAMANO_LOTE = int(os.getenv('CAMPANA_TAMANO_LOTE', 1000))
+
+# Envío push (core/envio_push.py): pedidos FCM simultáneos y reintentos ante errores
+# transitorios. FCM_URL_BASE apunta el envío a otro servidor FCM v1, p. ej. el falso de
+# `manage.py servidor_fcm_falso` (http://127.0.0.1:8787), en lugar de Firebase
+FCM_CONCURRENCIA = int(os.getenv('FCM_CONCURRENCIA', 8))
+FCM_REINTENTOS = int(os.getenv('FCM_REINTENTOS', 3))
+FCM_URL_BASE = os.getenv('FCM_URL_BASE', '')
+FCM_PROYECTO = os.getenv('FCM_PROYECTO', 'local')
+
+# Presupuesto de consultas por endpoint (ver condominio/presupuestos_consulta.py):
+# tiempo máximo por sentencia SQL (ms), sentencias y filas leídas por pedido; 0 = sin
+# límite. Solo se aplica a las vistas que lo declaran: "api" por defecto, "reportes" en reportes.
+PRESUPUESTOS_CONSULTA_ACTIVOS = os.getenv('PRESUPUESTOS_CONSULTA_ACTIVOS', 'true').lower() in ('true', '1', 'si', 'yes')
+PRESUPUESTOS_CONSULTA = {
+    'api': {
+        'tiempo_ms': int(os.getenv('PRESUPUESTO_API_TIEMPO_MS', 5000)),
+        'consultas': int(os.getenv('PRESUPUESTO_API_CONSULTAS', 500)),
+        'filas': int(os.getenv('PRESUPUESTO_API_FILAS', 100000)),
+    },
+    'reportes': {
+        'tiempo_ms': int(os.getenv('PRESUPUESTO_REPORTES_TIEMPO_MS', 60000)),
+        'consultas': int(os.getenv('PRESUPUESTO_REPORTES_CONSULTAS', 2000)),
+        'filas': int(os.getenv('PRESUPUESTO_REPORTES_FILAS', 2000000)),
+    },
+}
+
+
 # Django REST Framework configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
@@ -0,0 +1,240 @@
+"""Envío concurrente de notificaciones push (FCM HTTP v1).
+
+FCM v1 acepta un mensaje por pedido HTTP, así que enviar a miles de tokens
+en serie deja al llamador esperando la suma de todas las latencias.
+`EnviadorPush` reparte los envíos en un pool acotado de hilos:
+
+- `concurrencia` pedidos en vuelo como máximo (`FCM_CONCURRENCIA`).
+- Errores transitorios (429, 5xx, cortes de red) se reintentan hasta
+  `FCM_REINTENTOS` veces con pausa exponencial y jitter, o la que indique
+  `Retry-After`.
+- Los tokens se agrupan en lotes (500 por defecto, como un multicast) y se
+  mide cada lote: tokens, éxitos, fallas, inválidos, reintentos y latencia;
+  en total, mensajes por segundo y percentiles p50/p95/p99 por mensaje.
+
+El transporte es intercambiable: `TransporteFirebase` usa firebase-admin y
+`TransporteHTTP` habla FCM v1 contra `FCM_URL_BASE`, p. ej. el servidor falso
+de `core/fcm_falso.py` para medir throughput y latencia de cola sin Firebase.
+"""
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+TAMANO_LOTE = 500
+CONCURRENCIA_POR_DEFECTO = 8
+REINTENTOS_POR_DEFECTO = 3
+PAUSA_BASE = 0.2
+PAUSA_MAXIMA = 5.0
+ESTADOS_TRANSITORIOS = (429, 500, 502, 503, 504)
+ERRORES_TOKEN_INVALIDO = ('UNREGISTERED', 'SENDER_ID_MISMATCH')
+
+
+class ErrorTransitorio(Exception):
+    """Falla que vale la pena reintentar (`reintentar_en`: segundos sugeridos por el servidor)."""
+
+    def __init__(self, mensaje, reintentar_en: Optional[float] = None):
+        super().__init__(mensaje)
+        self.reintentar_en = reintentar_en
+
+
+class TokenInvalido(Exception):
+    """El token ya no está registrado: hay que desactivar el dispositivo."""
+
+
+def mensaje_fcm(titulo: str, cuerpo: str, datos: Dict[str, str] | None = None) -> Dict[str, Any]:
+    """Cuerpo de un mensaje FCM v1 sin token (prioridad alta en Android e iOS)."""
+    return {
+        'notification': {'title': titulo, 'body': cuerpo},
+        'data': {k: str(v) for k, v in (datos or {}).items()},
+        'android': {'priority': 'high'},
+        'apns': {'headers': {'apns-priority': '10'}},
+    }
+
+
+# ============================================================================
+# 🚚 TRANSPORTES
+# ============================================================================
+
+class TransporteHTTP:
+    """FCM HTTP v1 (`POST {url_base}/v1/projects/{proyecto}/messages:send`) con una sesión por hilo."""
+
+    def __init__(self, url_base: str, proyecto: str = 'local', token_acceso: Callable[[], str] | None = None,
+                 timeout: float = 10.0):
+        self.url = f"{url_base.rstrip('/')}/v1/projects/{proyecto}/messages:send"
+        self.token_acceso = token_acceso
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _sesion(self) -> requests.Session:
+        if not hasattr(self._local, 'sesion'):
+            self._local.sesion = requests.Session()
+        return self._local.sesion
+
+    def enviar(self, token: str, mensaje: Dict[str, Any]) -> str:
+        cabeceras = {'Authorization': f'Bearer {self.token_acceso()}'} if self.token_acceso else {}
+        try:
+            resp = self._sesion().post(self.url, json={'message': {**mensaje, 'token': token}},
+                                       headers=cabeceras, timeout=self.timeout)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise ErrorTransitorio(str(e))
+
+        if resp.status_code == 200:
+            return resp.json().get('name', '')
+        try:
+            error = resp.json().get('error', {})
+        except ValueError:
+            error = {}
+        codigos = {d.get('errorCode') for d in error.get('details', []) if isinstance(d, dict)}
+        detalle = f"{resp.status_code} {error.get('status', '')}: {error.get('message', resp.text[:200])}"
+        if resp.status_code == 404 or codigos & set(ERRORES_TOKEN_INVALIDO):
+            raise TokenInvalido(detalle)
+        if resp.status_code in ESTADOS_TRANSITORIOS:
+            reintentar_en = resp.headers.get('Retry-After')
+            raise ErrorTransitorio(detalle, float(reintentar_en) if reintentar_en and reintentar_en.isdigit() else None)
+        raise RuntimeError(detalle)
+
+
+class TransporteFirebase:
+    """Envío con firebase-admin (`messaging.send`), con el mismo contrato de errores."""
+
+    def __init__(self, app):
+        from firebase_admin import exceptions, messaging
+        self.app = app
+        self.messaging = messaging
+        self.invalidos = (messaging.UnregisteredError, messaging.SenderIdMismatchError)
+        self.transitorios = (
+            exceptions.UnavailableError, exceptions.InternalError, exceptions.DeadlineExceededError,
+            messaging.QuotaExceededError,
+        )
+
+    def enviar(self, token: str, mensaje: Dict[str, Any]) -> str:
+        m = self.messaging
+        try:
+            return m.send(m.Message(
+                token=token,
+                notification=m.Notification(title=mensaje['notification']['title'], body=mensaje['notification']['body']),
+                data=mensaje['data'],
+                android=m.AndroidConfig(priority='high'),
+                apns=m.APNSConfig(headers=mensaje['apns']['headers']),
+            ), app=self.app)
+        except self.invalidos as e:
+            raise TokenInvalido(str(e))
+        except self.transitorios as e:
+            raise ErrorTransitorio(str(e))
+
+
+def transporte_configurado():
+    """`TransporteHTTP` si hay `FCM_URL_BASE` (servidor falso o proxy); si no, firebase-admin."""
+    url_base = getattr(settings, 'FCM_URL_BASE', '')
+    if url_base:
+        return TransporteHTTP(url_base, getattr(settings, 'FCM_PROYECTO', 'local'))
+    from .firebase import iniciar_firebase
+    return TransporteFirebase(iniciar_firebase())
+
+
+# ============================================================================
+# ⚡ ENVIADOR CONCURRENTE
+# ============================================================================
+
+def percentil(valores: List[float], p: float) -> float:
+    """Percentil por rango más cercano (0 si no hay valores)."""
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, max(0, round(p / 100 * len(ordenados)) - 1))]
+
+
+class EnviadorPush:
+    """Envía un mismo mensaje a muchos tokens con un pool acotado de hilos y reintentos."""
+
+    def __init__(self, transporte, concurrencia: int | None = None, reintentos: int | None = None,
+                 tamano_lote: int = TAMANO_LOTE, pausa_base: float = PAUSA_BASE, pausa_maxima: float = PAUSA_MAXIMA):
+        self.transporte = transporte
+        self.concurrencia = concurrencia or getattr(settings, 'FCM_CONCURRENCIA', CONCURRENCIA_POR_DEFECTO)
+        self.reintentos = getattr(settings, 'FCM_REINTENTOS', REINTENTOS_POR_DEFECTO) if reintentos is None else reintentos
+        self.tamano_lote = tamano_lote
+        self.pausa_base = pausa_base
+        self.pausa_maxima = pausa_maxima
+
+    def _pausa(self, intento: int, error: ErrorTransitorio) -> float:
+        if error.reintentar_en is not None:
+            return min(error.reintentar_en, self.pausa_maxima)
+        return min(self.pausa_maxima, self.pausa_base * 2 ** intento) * random.uniform(0.5, 1.5)
+
+    def _enviar_token(self, token: str, mensaje: Dict[str, Any]) -> Dict[str, Any]:
+        inicio = time.perf_counter()
+        intento = 0
+        while True:
+            try:
+                self.transporte.enviar(token, mensaje)
+                estado, detalle = 'ok', 'ok'
+            except ErrorTransitorio as e:
+                if intento < self.reintentos:
+                    time.sleep(self._pausa(intento, e))
+                    intento += 1
+                    continue
+                estado, detalle = 'error', str(e)
+            except TokenInvalido as e:
+                estado, detalle = 'invalido', str(e)
+            except Exception as e:
+                estado, detalle = 'error', str(e)
+            return {'estado': estado, 'detalle': detalle, 'reintentos': intento,
+                    'inicio': inicio, 'fin': time.perf_counter()}
+
+    def enviar(self, tokens: List[str], titulo: str, cuerpo: str, datos: Dict[str, str] | None = None) -> Dict[str, Any]:
+        """
+        Envía a todos los `tokens` y espera el resultado. Retorna totales
+        (`success`, `failure`, `invalidos`: tokens a desactivar), la
+        respuesta por token en `responses` (en el orden recibido) y las
+        métricas en `lotes` y `metricas`.
+        """
+        mensaje = mensaje_fcm(titulo, cuerpo, datos)
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrencia, thread_name_prefix='fcm') as pool:
+            futuros = [pool.submit(self._enviar_token, token, mensaje) for token in tokens]
+            envios = [f.result() for f in futuros]
+        duracion = time.perf_counter() - inicio
+
+        lotes = []
+        for numero, desde in enumerate(range(0, len(envios), self.tamano_lote), start=1):
+            lote = envios[desde:desde + self.tamano_lote]
+            estados = [e['estado'] for e in lote]
+            metrica = {
+                'lote': numero,
+                'tokens': len(lote),
+                'exitosos': estados.count('ok'),
+                'fallidos': len(lote) - estados.count('ok'),
+                'invalidos': estados.count('invalido'),
+                'reintentos': sum(e['reintentos'] for e in lote),
+                'latencia_ms': round((max(e['fin'] for e in lote) - min(e['inicio'] for e in lote)) * 1000, 1),
+            }
+            lotes.append(metrica)
+            logger.info('Lote FCM %d: %d/%d ok, %d inválidos, %d reintentos, %.0f ms', numero, metrica['exitosos'],
+                        metrica['tokens'], metrica['invalidos'], metrica['reintentos'], metrica['latencia_ms'])
+
+        latencias = [(e['fin'] - e['inicio']) * 1000 for e in envios]
+        exitosos = sum(1 for e in envios if e['estado'] == 'ok')
+        return {
+            'success': exitosos,
+            'failure': len(envios) - exitosos,
+            'invalidos': [t for t, e in zip(tokens, envios) if e['estado'] == 'invalido'],
+            'responses': [e['detalle'] for e in envios],
+            'lotes': lotes,
+            'metricas': {
+                'duracion_ms': round(duracion * 1000, 1),
+                'mensajes_por_segundo': round(len(envios) / duracion, 1) if duracion else 0.0,
+                'reintentos': sum(e['reintentos'] for e in envios),
+                'p50_ms': round(percentil(latencias, 50), 1),
+                'p95_ms': round(percentil(latencias, 95), 1),
+                'p99_ms': round(percentil(latencias, 99), 1),
+                'concurrencia': self.concurrencia,
+            },
+        }
@@ -0,0 +1,141 @@
+"""Servidor FCM falso para pruebas de carga sin Firebase.
+
+Implementa `POST /v1/projects/<proyecto>/messages:send` de FCM HTTP v1 con:
+
+- latencia configurable: `latencia_ms` fija más una cola exponencial de
+  media `variacion_ms` (la mayoría de los pedidos rápidos, algunos lentos);
+- `tasa_fallas`: fracción de pedidos que responde 503 UNAVAILABLE
+  (transitorio, con `Retry-After` si se configura);
+- `tasa_invalidos`: fracción de pedidos que responde 404 UNREGISTERED. Los
+  tokens que empiezan con `invalido` fallan siempre así.
+
+Se usa apuntando `FCM_URL_BASE` a su URL (ver `core/envio_push.py`), desde
+`manage.py servidor_fcm_falso` o dentro del proceso con `ServidorFCMFalso`
+(`manage.py benchmark_push`, pruebas).
+"""
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+RUTA_ENVIO = re.compile(r'^/v1/projects/[^/]+/messages:send$')
+
+
+def _error(codigo: int, estado: str, mensaje: str, codigo_fcm: Optional[str] = None) -> Dict[str, Any]:
+    detalles = [{'@type': 'type.googleapis.com/google.firebase.fcm.v1.FcmError', 'errorCode': codigo_fcm}] if codigo_fcm else []
+    return {'error': {'code': codigo, 'message': mensaje, 'status': estado, 'details': detalles}}
+
+
+class _ManejadorFCM(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # conexiones persistentes, como la sesión del cliente
+    disable_nagle_algorithm = True  # cabeceras y cuerpo van en escrituras separadas
+    servidor_falso: 'ServidorFCMFalso'
+
+    def log_message(self, formato, *args):
+        pass
+
+    def _responder(self, codigo: int, cuerpo: Dict[str, Any], cabeceras: Dict[str, str] | None = None):
+        contenido = json.dumps(cuerpo).encode()
+        self.send_response(codigo)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(contenido)))
+        for nombre, valor in (cabeceras or {}).items():
+            self.send_header(nombre, valor)
+        self.end_headers()
+        self.wfile.write(contenido)
+
+    def do_POST(self):
+        falso = self.servidor_falso
+        largo = int(self.headers.get('Content-Length') or 0)
+        try:
+            token = json.loads(self.rfile.read(largo) or b'{}')['message']['token']
+        except (ValueError, KeyError, TypeError):
+            token = None
+        if not RUTA_ENVIO.match(self.path) or not token:
+            falso._registrar(400)
+            return self._responder(400, _error(400, 'INVALID_ARGUMENT', 'Mensaje sin token', 'INVALID_ARGUMENT'))
+
+        time.sleep(falso._latencia())
+        sorteo = falso._aleatorio()
+        if token.startswith('invalido') or sorteo < falso.tasa_invalidos:
+            falso._registrar(404)
+            return self._responder(404, _error(404, 'NOT_FOUND', 'Requested entity was not found.', 'UNREGISTERED'))
+        if sorteo < falso.tasa_invalidos + falso.tasa_fallas:
+            falso._registrar(503)
+            cabeceras = {'Retry-After': str(falso.reintentar_en)} if falso.reintentar_en else None
+            return self._responder(503, _error(503, 'UNAVAILABLE', 'The service is currently unavailable.', 'UNAVAILABLE'),
+                                   cabeceras)
+        falso._registrar(200)
+        self._responder(200, {'name': f'projects/falso/messages/{falso._siguiente_id()}'})
+
+
+class _ServidorHTTP(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # muchas conexiones simultáneas del pool del cliente
+
+
+class ServidorFCMFalso:
+    """Servidor FCM v1 falso en un hilo propio; `puerto=0` elige uno libre."""
+
+    def __init__(self, host: str = '127.0.0.1', puerto: int = 0, latencia_ms: float = 30.0,
+                 variacion_ms: float = 10.0, tasa_fallas: float = 0.0, tasa_invalidos: float = 0.0,
+                 reintentar_en: int = 0, semilla: Optional[int] = None):
+        self.latencia_ms = latencia_ms
+        self.variacion_ms = variacion_ms
+        self.tasa_fallas = tasa_fallas
+        self.tasa_invalidos = tasa_invalidos
+        self.reintentar_en = reintentar_en
+        self.respuestas = Counter()
+        self._random = random.Random(semilla)
+        self._candado = threading.Lock()
+        self._ids = 0
+
+        manejador = type('ManejadorFCM', (_ManejadorFCM,), {'servidor_falso': self})
+        self._http = _ServidorHTTP((host, puerto), manejador)
+        self._hilo = None
+
+    @property
+    def url(self) -> str:
+        host, puerto = self._http.server_address[:2]
+        return f'http://{host}:{puerto}'
+
+    def _latencia(self) -> float:
+        with self._candado:
+            cola = self._random.expovariate(1 / self.variacion_ms) if self.variacion_ms else 0.0
+        return (self.latencia_ms + cola) / 1000
+
+    def _aleatorio(self) -> float:
+        with self._candado:
+            return self._random.random()
+
+    def _registrar(self, codigo: int):
+        with self._candado:
+            self.respuestas[codigo] += 1
+
+    def _siguiente_id(self) -> int:
+        with self._candado:
+            self._ids += 1
+            return self._ids
+
+    def iniciar(self) -> 'ServidorFCMFalso':
+        self._hilo = threading.Thread(target=self._http.serve_forever, name='fcm-falso', daemon=True)
+        self._hilo.start()
+        return self
+
+    def servir(self):
+        """Atiende en el hilo actual hasta `detener()` o Ctrl+C."""
+        self._http.serve_forever()
+
+    def detener(self):
+        self._http.shutdown()
+        self._http.server_close()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.detener()
@@ -6,116 +6,128 @@ logger = logging.getLogger(__name__)
 try:
     # Import opcional: solo si se va a enviar realmente
     from firebase_admin import messaging
-    from .firebase import iniciar_firebase
     _HAS_FIREBASE = True
 except Exception:
     messaging = None  # type: ignore
-    iniciar_firebase = None  # type: ignore
     _HAS_FIREBASE = False
 
+from django.conf import settings
+
+from .envio_push import EnviadorPush, transporte_configurado
+
+# Tokens por lote de métricas del envío (el tamaño de un MulticastMessage de FCM)
+MAX_TOKENS_MULTICAST = 500
+
+
+def _simular() -> bool:
+    return os.getenv('SIMULAR_FCM', '').lower() in ('1', 'true', 'si', 'yes')
+
+
+def _enviador():
+    """`EnviadorPush` con el transporte configurado, o None si no hay cómo enviar."""
+    if not getattr(settings, 'FCM_URL_BASE', '') and not _HAS_FIREBASE:
+        logger.error('firebase-admin no está disponible en el entorno; exporta SIMULAR_FCM=1 para pruebas locales')
+        return None
+    try:
+        return EnviadorPush(transporte_configurado(), tamano_lote=MAX_TOKENS_MULTICAST)
+    except Exception as e:
+        logger.exception('No se pudo inicializar Firebase: %s', e)
+        return None
+
+
+def _token(item: Any) -> str | None:
+    # tokens puede ser una lista de strings, dicts {'token':..., 'tipo':...} o tuplas (token, tipo)
+    if isinstance(item, str):
+        return item
+    if isinstance(item, dict):
+        return item.get('token') or item.get('registration_id')
+    try:
+        token, _ = item
+        return token
+    except Exception:
+        logger.warning('Token en formato desconocido: %s', item)
+        return None
+
+
+def _desactivar_tokens(tokens: List[str]) -> int:
+    if not tokens:
+        return 0
+    # Importar modelo de forma local para evitar import cycles
+    from condominio.models import FCMDevice
+    actualizados = FCMDevice.objects.filter(registration_id__in=tokens).update(activo=False)
+    logger.info('Marcados %d tokens como inactivos', actualizados)
+    return actualizados
+
 
 def enviar_tokens_push(tokens: List[Any], titulo: str, cuerpo: str, datos: Dict[str, str] | None = None) -> Dict[str, Any]:
-    """Envía notificaciones a una lista de tokens usando firebase-admin.
+    """Envía notificaciones a una lista de tokens.
 
     Comportamiento seguro para desarrollo:
     - Si la variable de entorno `SIMULAR_FCM` está activada, no intenta conectar con Firebase
       y devuelve una respuesta simulada (útil para pruebas locales).
+    - Con `FCM_URL_BASE` configurado habla FCM v1 con ese servidor (p. ej. el falso de
+      `core/fcm_falso.py`) en lugar de firebase-admin.
+    - Los envíos van en paralelo con reintentos (ver `core/envio_push.py`); los tokens no
+      registrados se marcan inactivos.
     - Usa logging en lugar de prints.
     """
-    simular = os.getenv('SIMULAR_FCM', '').lower() in ('1', 'true', 'si', 'yes')
+    simular = _simular()
     if simular:
         logger.info('SIMULACIÓN FCM: enviando a %d tokens', len(tokens))
         return {'success': len(tokens), 'failure': 0, 'responses': ['simulado' for _ in tokens]}
 
-    if not _HAS_FIREBASE:
-        logger.error('firebase-admin no está disponible en el entorno; exporta SIMULAR_FCM=1 para pruebas locales')
-        return {'success': 0, 'failure': len(tokens), 'responses': ['firebase_not_installed' for _ in tokens]}
+    enviador = _enviador()
+    if enviador is None:
+        motivo = 'firebase_not_installed' if not _HAS_FIREBASE else 'firebase_no_inicializado'
+        return {'success': 0, 'failure': len(tokens), 'responses': [motivo for _ in tokens]}
 
-    try:
-        app = iniciar_firebase()
-    except Exception as e:
-        logger.exception('No se pudo inicializar Firebase: %s', e)
-        return {'success': 0, 'failure': len(tokens), 'responses': [str(e) for _ in tokens]}
-
-    # tokens puede ser una lista de strings (tokens) o dicts {'token':..., 'tipo': 'android'|'ios'|'web'}
-    mensajes = []
-    token_map = []  # mantendremos el token asociado a cada mensaje para manejar respuestas
-    for item in tokens:
-        if isinstance(item, str):
-            token = item
-            tipo = None
-        elif isinstance(item, dict):
-            token = item.get('token') or item.get('registration_id')
-            tipo = item.get('tipo') or item.get('tipo_dispositivo')
-        else:
-            # intentar acceder como tupla (token, tipo)
-            try:
-                token, tipo = item
-            except Exception:
-                logger.warning('Token en formato desconocido: %s', item)
-                continue
-
-        if not token:
-            continue
-
-        # Construir configuración por plataforma si es posible
-        android_conf = None
-        apns_conf = None
-        if tipo and tipo.lower() == 'android' and _HAS_FIREBASE:
-            try:
-                android_conf = messaging.AndroidConfig(priority='high')
-            except Exception:
-                android_conf = None
-        if tipo and tipo.lower() in ('ios', 'apns') and _HAS_FIREBASE:
-            try:
-                apns_conf = messaging.APNSConfig(headers={'apns-priority': '10'})
-            except Exception:
-                apns_conf = None
-
-        msg = messaging.Message(
-            token=token,
-            notification=messaging.Notification(title=titulo, body=cuerpo) if _HAS_FIREBASE else None,
-            data=datos or {},
-            android=android_conf,
-            apns=apns_conf,
-        )
-        mensajes.append(msg)
-        token_map.append(token)
-
-    if not mensajes:
+    validos = [t for t in (_token(item) for item in tokens) if t]
+    if not validos:
         return {'success': 0, 'failure': 0, 'responses': []}
 
-    try:
-        if len(mensajes) == 1:
-            resp = messaging.send(mensajes[0], app=app)
-            return {'success': 1, 'failure': 0, 'responses': [str(resp)]}
-        else:
-            resp = messaging.send_all(mensajes, app=app)
-            respuestas = []
-            # procesar respuestas y marcar tokens inválidos si corresponde
-            for idx, r in enumerate(resp.responses):
-                token = token_map[idx] if idx < len(token_map) else None
-                if r.exception:
-                    respuestas.append(str(r.exception))
-                    # marcaremos el token para revisión (devolveremos en responses); el caller puede limpiar
-                    logger.warning('FCM error for token %s: %s', token, r.exception)
-                    # Intentar marcar token inválido como inactivo si el error indica token no registrado
-                    try:
-                        err_str = str(r.exception).lower()
-                        if token and any(x in err_str for x in ('registration-token-not-registered', 'invalid-registration-token', 'notregistered', 'not_registered')):
-                            # Importar modelo de forma local para evitar import cycles
-                            from condominio.models import FCMDevice
-                            FCMDevice.objects.filter(registration_id=token).update(activo=False)
-                            logger.info('Marcado token como inactivo: %s', token)
-                    except Exception:
-                        logger.exception('Error al marcar token inactivo %s', token)
-                else:
-                    respuestas.append('ok')
-            return {
-                'success': resp.success_count,
-                'failure': resp.failure_count,
-                'responses': respuestas
-            }
-    except Exception as e:
-        logger.exception('Error al enviar mensajes FCM: %s', e)
-        return {'success': 0, 'failure': len(mensajes), 'responses': [str(e) for _ in mensajes]}
+    resultado = enviador.enviar(validos, titulo, cuerpo, datos)
+    for token, respuesta in zip(validos, resultado['responses']):
+        if respuesta != 'ok':
+            logger.warning('FCM error for token %s: %s', token, respuesta)
+    _desactivar_tokens(resultado['invalidos'])
+    return {
+        'success': resultado['success'],
+        'failure': resultado['failure'],
+        'responses': resultado['responses'],
+        'metricas': resultado['metricas'],
+    }
+
+
+def enviar_multicast_push(tokens: List[str], titulo: str, cuerpo: str, datos: Dict[str, str] | None = None) -> Dict[str, Any]:
+    """Envía el mismo mensaje a muchos tokens, medido en lotes de hasta 500.
+
+    Pensado para campañas: los envíos van en paralelo por el pool acotado de
+    `EnviadorPush` (con reintentos ante errores transitorios). Android e iOS
+    reciben prioridad alta en el mismo mensaje. Los tokens que FCM reporta como
+    no registrados se marcan inactivos con un solo UPDATE. Respeta
+    `SIMULAR_FCM` igual que `enviar_tokens_push`.
+    """
+    tokens = [t for t in tokens if t]
+    lotes = (len(tokens) + MAX_TOKENS_MULTICAST - 1) // MAX_TOKENS_MULTICAST
+    resultado = {'success': 0, 'failure': 0, 'lotes': lotes, 'invalidos': 0}
+
+    if _simular():
+        logger.info('SIMULACIÓN FCM multicast: %d tokens en %d lotes', len(tokens), lotes)
+        resultado['success'] = len(tokens)
+        return resultado
+
+    enviador = _enviador()
+    if enviador is None:
+        resultado['failure'] = len(tokens)
+        return resultado
+    if not tokens:
+        return resultado
+
+    envio = enviador.enviar(tokens, titulo, cuerpo, datos)
+    resultado.update(
+        success=envio['success'],
+        failure=envio['failure'],
+        invalidos=_desactivar_tokens(envio['invalidos']),
+        metricas=envio['metricas'],
+    )
+    return resultado
@@ -1,3 +1,75 @@
-from django.test import TestCase
+import os
+import threading
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from condominio.models import FCMDevice, Usuario
+
+from .envio_push import EnviadorPush, ErrorTransitorio, TransporteHTTP, percentil
+from .fcm_falso import ServidorFCMFalso
+from .notifications import enviar_tokens_push
+
+
+class EnviadorPushTests(SimpleTestCase):
+    def test_pool_acotado_y_metricas_por_lote(self):
+        class TransporteLento:
+            def __init__(self):
+                self.en_vuelo = self.maximo = 0
+                self.candado = threading.Lock()
+
+            def enviar(self, token, mensaje):
+                with self.candado:
+                    self.en_vuelo += 1
+                    self.maximo = max(self.maximo, self.en_vuelo)
+                time.sleep(0.01)
+                with self.candado:
+                    self.en_vuelo -= 1
+                return 'ok'
+
+        transporte = TransporteLento()
+        resultado = EnviadorPush(transporte, concurrencia=4, tamano_lote=10).enviar(
+            [f't{i}' for i in range(25)], 'T', 'C')
+        self.assertEqual(transporte.maximo, 4)
+        self.assertEqual(resultado['success'], 25)
+        self.assertEqual([l['tokens'] for l in resultado['lotes']], [10, 10, 5])
+        self.assertGreater(resultado['metricas']['p95_ms'], 5)
+        self.assertEqual(percentil([1, 2, 3, 4], 50), 2)
+
+    def test_servidor_falso_reintentos_e_invalidos(self):
+        with ServidorFCMFalso(latencia_ms=1, variacion_ms=0, tasa_fallas=1.0, reintentar_en=0) as servidor:
+            enviador = EnviadorPush(TransporteHTTP(servidor.url), concurrencia=4, reintentos=2, pausa_base=0.001)
+            resultado = enviador.enviar(['a', 'b', 'invalido-c'], 'T', 'C')
+        # Los 503 se reintentan dos veces; el token no registrado no se reintenta
+        self.assertEqual(servidor.respuestas, {503: 6, 404: 1})
+        self.assertEqual((resultado['success'], resultado['failure']), (0, 3))
+        self.assertEqual(resultado['invalidos'], ['invalido-c'])
+        self.assertEqual(resultado['metricas']['reintentos'], 4)
+
+        with ServidorFCMFalso(latencia_ms=1, variacion_ms=0, tasa_fallas=0.3, semilla=1) as servidor:
+            resultado = EnviadorPush(TransporteHTTP(servidor.url), concurrencia=8, reintentos=10,
+                                     pausa_base=0.001).enviar([f't{i}' for i in range(40)], 'T', 'C')
+        self.assertEqual(resultado['success'], 40)
+        self.assertEqual(resultado['metricas']['reintentos'], servidor.respuestas[503])
+
+    def test_retry_after_acotado(self):
+        enviador = EnviadorPush(None, concurrencia=1, pausa_maxima=2.0)
+        self.assertEqual(enviador._pausa(0, ErrorTransitorio('503', reintentar_en=30)), 2.0)
+
+
+class EnviarTokensPushTests(TestCase):
+    @mock.patch.dict(os.environ, {'SIMULAR_FCM': ''})
+    def test_envio_contra_servidor_falso_desactiva_invalidos(self):
+        usuario = Usuario.objects.create(user=User.objects.create_user(username='u', password='x'), nombre='U')
+        FCMDevice.objects.create(usuario=usuario, registration_id='valido-1')
+        FCMDevice.objects.create(usuario=usuario, registration_id='invalido-1', tipo_dispositivo='ios')
+
+        with ServidorFCMFalso(latencia_ms=1, variacion_ms=0) as servidor, \
+                override_settings(FCM_URL_BASE=servidor.url):
+            resp = enviar_tokens_push([{'token': 'valido-1', 'tipo': 'android'}, ('invalido-1', 'ios')], 'Hola', 'Cuerpo')
+
+        self.assertEqual((resp['success'], resp['failure']), (1, 1))
+        self.assertEqual(list(FCMDevice.objects.filter(activo=False).values_list('registration_id', flat=True)),
+                         ['invalido-1'])
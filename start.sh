@@ -4,6 +4,15 @@
 echo "🔄 Ejecutando migraciones..."
 python manage.py migrate --noinput
 
+echo "💱 Normalizando montos pendientes (BOB/USD)..."
+python manage.py normalizar_montos
+
+echo "📍 Normalizando ubicaciones pendientes (departamento/ciudad)..."
+python manage.py normalizar_ubicaciones
+
+echo "🗄️ Creando tabla de caché (si no existe)..."
+python manage.py createcachetable
+
 echo "📦 Recolectando archivos estáticos..."
 python manage.py collectstatic --noinput --clear
 